@@ -0,0 +1,312 @@
+"""
+ZIP archive helpers for mod builds
+
+Copies already-compressed entries from one archive into another without
+inflating and deflating them again. zipfile has no public API for this, so
+the local header is rewritten by hand and the compressed bytes are copied
+straight across.
+
+When a mod is regenerated over an existing ZIP, PreviousArchive lets the build
+reuse every entry whose content did not change, so only new or edited files
+are deflated again.
+
+Reproducible archives pass every entry through normalize_info, so nothing
+about the machine or the time of the build (file timestamps, permissions,
+host OS) ends up in the ZIP.
+"""
+import hashlib
+import os
+import struct
+import time
+import zipfile
+import zlib
+
+# Copy compressed data in chunks so large DDS entries never sit in memory
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Timestamp and permissions of every entry in a reproducible archive
+# (SOURCE_DATE_EPOCH overrides the timestamp)
+REPRODUCIBLE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+REPRODUCIBLE_FILE_MODE = 0o644
+
+# ZipInfo.create_system value for Unix, used on every OS so the
+# permissions above mean the same everywhere
+_SYSTEM_UNIX = 3
+
+# General purpose flag bits (see APPNOTE.TXT 4.4.4)
+_FLAG_ENCRYPTED = 0x01
+_FLAG_DATA_DESCRIPTOR = 0x08
+
+
+def reproducible_date_time():
+    """
+    Entry timestamp for reproducible archives: SOURCE_DATE_EPOCH (UTC) if it
+    is set, otherwise REPRODUCIBLE_DATE_TIME
+    """
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if not epoch:
+        return REPRODUCIBLE_DATE_TIME
+    try:
+        date_time = tuple(time.gmtime(int(epoch))[:6])
+    except (ValueError, OverflowError, OSError):
+        print(f"[WARNING] Ignoring invalid SOURCE_DATE_EPOCH: {epoch}")
+        return REPRODUCIBLE_DATE_TIME
+    # ZIP timestamps cannot go back further than 1980
+    return max(date_time, REPRODUCIBLE_DATE_TIME)
+
+
+def normalize_info(info, date_time=REPRODUCIBLE_DATE_TIME):
+    """
+    Replace an entry's metadata with fixed values (in place).
+
+    Returns:
+        ZipInfo: info
+    """
+    info.date_time = date_time
+    info.create_system = _SYSTEM_UNIX
+    info.external_attr = REPRODUCIBLE_FILE_MODE << 16
+    info.internal_attr = 0
+    info.comment = b""
+    info.extra = b""
+    return info
+
+
+def archive_digest(path):
+    """SHA-256 of a whole archive file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_raw_offset(source, info):
+    """Get the offset of an entry's compressed data in the source archive"""
+    source.fp.seek(info.header_offset)
+    header = source.fp.read(zipfile.sizeFileHeader)
+    if len(header) != zipfile.sizeFileHeader:
+        raise zipfile.BadZipFile(f"Truncated file header for {info.filename}")
+
+    fields = struct.unpack(zipfile.structFileHeader, header)
+    if fields[zipfile._FH_SIGNATURE] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"Bad magic number for file header of {info.filename}")
+
+    name_length = fields[zipfile._FH_FILENAME_LENGTH]
+    extra_length = fields[zipfile._FH_EXTRA_FIELD_LENGTH]
+    return info.header_offset + zipfile.sizeFileHeader + name_length + extra_length
+
+
+def _read_chunks(fp, offset, size, label, on_chunk=None):
+    """Yield size bytes from fp starting at offset, in COPY_CHUNK_SIZE chunks"""
+    fp.seek(offset)
+    remaining = size
+    while remaining > 0:
+        chunk = fp.read(min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated data for {label}")
+        remaining -= len(chunk)
+        yield chunk
+        if on_chunk:
+            on_chunk(len(chunk))
+
+
+def write_raw_entry(target, info, chunks):
+    """
+    Write an entry whose compressed bytes are already known.
+
+    Args:
+        target: ZipFile opened for writing
+        info: ZipInfo with compress_type, CRC, compress_size and file_size set
+        chunks: Iterable of compressed byte strings (compress_size in total)
+
+    Returns:
+        ZipInfo: info, now part of target
+    """
+    zip64 = (
+        info.file_size > zipfile.ZIP64_LIMIT
+        or info.compress_size > zipfile.ZIP64_LIMIT
+    )
+
+    with target._lock:
+        if target._writing:
+            raise ValueError("Can't write to the ZIP file while there is an open writing handle on it")
+
+        target._writecheck(info)
+        target._didModify = True
+        target.fp.seek(target.start_dir)
+        info.header_offset = target.fp.tell()
+        target.fp.write(info.FileHeader(zip64))
+
+        written = 0
+        for chunk in chunks:
+            target.fp.write(chunk)
+            written += len(chunk)
+        if written != info.compress_size:
+            raise zipfile.BadZipFile(
+                f"Wrote {written} bytes for {info.filename}, expected {info.compress_size}"
+            )
+
+        target.start_dir = target.fp.tell()
+        target.filelist.append(info)
+        target.NameToInfo[info.filename] = info
+
+    return info
+
+
+def copy_entry_raw(source, info, target, arcname=None, date_time=None, on_chunk=None, normalize=None):
+    """
+    Copy one entry between open archives without recompressing it.
+
+    Args:
+        source: ZipFile opened for reading
+        info: ZipInfo of the entry in source
+        target: ZipFile opened for writing
+        arcname: Name in the target archive (defaults to the source name)
+        date_time: Timestamp for the copy (defaults to the source timestamp)
+        on_chunk: Called with the size of each compressed chunk written
+        normalize: Called with the new ZipInfo before it is written (e.g.
+                   normalize_info for reproducible archives)
+
+    Returns:
+        ZipInfo: The entry as written to target
+    """
+    if info.flag_bits & _FLAG_ENCRYPTED:
+        raise ValueError(f"Cannot copy encrypted entry: {info.filename}")
+
+    new_info = zipfile.ZipInfo(arcname or info.filename, date_time or info.date_time)
+    new_info.compress_type = info.compress_type
+    new_info.comment = info.comment
+    new_info.create_system = info.create_system
+    new_info.external_attr = info.external_attr
+    new_info.internal_attr = info.internal_attr
+    new_info.flag_bits = info.flag_bits & ~_FLAG_DATA_DESCRIPTOR
+    new_info.CRC = info.CRC
+    new_info.compress_size = info.compress_size
+    new_info.file_size = info.file_size
+    # zipfile adds its own ZIP64 field when the sizes need it
+    new_info.extra = zipfile._strip_extra(info.extra, (1,))
+    if normalize:
+        normalize(new_info)
+
+    with source._lock:
+        data_offset = _read_raw_offset(source, info)
+        chunks = _read_chunks(source.fp, data_offset, info.compress_size, info.filename, on_chunk)
+        return write_raw_entry(target, new_info, chunks)
+
+
+def copy_archive_raw(source_path, target, on_entry=None, normalize=None):
+    """
+    Copy every entry of an archive into an open target archive, in order,
+    without recompressing anything.
+
+    Args:
+        on_entry: Called with each source ZipInfo before it is copied; may
+                  return an on_chunk callback for copy_entry_raw
+        normalize: Passed on to copy_entry_raw
+
+    Returns:
+        list: ZipInfo of each entry as written to target
+    """
+    written = []
+    with zipfile.ZipFile(source_path, "r") as source:
+        for info in source.infolist():
+            on_chunk = on_entry(info) if on_entry else None
+            written.append(copy_entry_raw(source, info, target, on_chunk=on_chunk, normalize=normalize))
+    return written
+
+
+def _file_crc(path):
+    """CRC-32 of a file, read in chunks"""
+    crc = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+class PreviousArchive:
+    """
+    An existing version of an archive that is being rebuilt.
+
+    Entries are reused when the new content is identical: same name, same
+    compression method, same size and same CRC-32. Files on disk are always
+    read to check their CRC: a matching size and DOS timestamp (2 second
+    resolution) does not prove the content is the same, e.g. two textures
+    of the same dimensions exported in the same second.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Path of the previous archive (opened for reading)
+        """
+        self.path = path
+        self._zip = zipfile.ZipFile(path, "r")
+        self._infos = {info.filename: info for info in self._zip.infolist()}
+        self.reused = 0
+        self.reused_bytes = 0
+
+    def _matching_info(self, arcname, size, compress_types):
+        info = self._infos.get(arcname)
+        if info is None or info.file_size != size or info.compress_type not in compress_types:
+            return None
+        if info.flag_bits & _FLAG_ENCRYPTED:
+            return None
+        return info
+
+    def find_unchanged_data(self, arcname, data, compress_types):
+        """
+        Find the old entry if it holds exactly these bytes.
+
+        Args:
+            compress_types: Compression methods the new entry may use
+
+        Returns:
+            ZipInfo or None
+        """
+        info = self._matching_info(arcname, len(data), compress_types)
+        if info is None or info.CRC != zlib.crc32(data):
+            return None
+        return info
+
+    def find_unchanged_file(self, arcname, source_path, compress_types):
+        """
+        Find the old entry if it holds the same content as a file.
+
+        Returns:
+            tuple: (ZipInfo, date_time) where date_time is the file's current
+                   timestamp, like a fresh write would store; or None
+        """
+        stat = os.stat(source_path)
+        info = self._matching_info(arcname, stat.st_size, compress_types)
+        if info is None:
+            return None
+
+        date_time = time.localtime(stat.st_mtime)[0:6]
+        if date_time[0] < 1980:
+            date_time = (1980, 1, 1, 0, 0, 0)
+
+        if info.CRC != _file_crc(source_path):
+            return None
+        return info, date_time
+
+    def copy(self, info, target, date_time=None, on_chunk=None, normalize=None):
+        """Copy an entry found by find_unchanged_* into target"""
+        copy_entry_raw(self._zip, info, target, date_time=date_time, on_chunk=on_chunk, normalize=normalize)
+        self.reused += 1
+        self.reused_bytes += info.compress_size
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,513 @@
+"""
+Block-compressed texture decoding with NumPy
+
+Pillow decodes BC1-BC7, but not every version knows every DX10 header
+(the DXGI format ids artists' exporters write differ between tools), and
+a preview that fails shows "Preview unavailable" for exactly the textures
+skins use most. This module decodes the BC formats skins are made of
+(BC1, BC3, BC4, BC5 and BC7) from the raw bytes of a mip level into an
+RGBA array, so previews never depend on the installed Pillow's DDS
+plugin (see core/previews.py, which tries Pillow first).
+
+Every block of a level is decoded at once with vectorized NumPy: 4x4
+pixel blocks become rows of a (blocks, 16) array, palettes are built per
+block and pixels are gathered from them. BC7 blocks are grouped by mode;
+within a mode every field sits at the same bit offset, except the index
+bits, whose offsets depend on the block's partition (anchor pixels store
+one bit less) and are gathered per pixel. Output matches Pillow's decoder
+bit for bit.
+
+NumPy is optional: without it available() is False and callers fall back
+to Pillow. `python -m core.bcn [file.dds ...]` benchmarks both.
+"""
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Formats decode() understands
+DECODABLE_FORMATS = ("BC1", "BC3", "BC4", "BC5", "BC7")
+
+# Blocks decoded per step, bounds the temporary arrays (BC7 unpacks every
+# block into 128 bytes of bits)
+CHUNK_BLOCKS = 1 << 16
+
+# BC7 modes: (subsets, partition bits, rotation bits, index selection bits,
+# color bits, alpha bits, endpoint p-bits, shared p-bits, index bits,
+# secondary index bits)
+BC7_MODES = (
+    (3, 4, 0, 0, 4, 0, 1, 0, 3, 0),
+    (2, 6, 0, 0, 6, 0, 0, 1, 3, 0),
+    (3, 6, 0, 0, 5, 0, 0, 0, 2, 0),
+    (2, 6, 0, 0, 7, 0, 1, 0, 2, 0),
+    (1, 0, 2, 1, 5, 6, 0, 0, 2, 3),
+    (1, 0, 2, 0, 7, 8, 0, 0, 2, 2),
+    (1, 0, 0, 0, 7, 7, 1, 0, 4, 0),
+    (2, 6, 0, 0, 5, 5, 1, 0, 2, 0),
+)
+
+# Subset of each pixel in the 64 two-subset partitions, bit i = pixel i
+BC7_PARTITIONS_2 = (
+    0xCCCC, 0x8888, 0xEEEE, 0xECC8, 0xC880, 0xFEEC, 0xFEC8, 0xEC80,
+    0xC800, 0xFFEC, 0xFE80, 0xE800, 0xFFE8, 0xFF00, 0xFFF0, 0xF000,
+    0xF710, 0x008E, 0x7100, 0x08CE, 0x008C, 0x7310, 0x3100, 0x8CCE,
+    0x088C, 0x3110, 0x6666, 0x366C, 0x17E8, 0x0FF0, 0x718E, 0x399C,
+    0xAAAA, 0xF0F0, 0x5A5A, 0x33CC, 0x3C3C, 0x55AA, 0x9696, 0xA55A,
+    0x73CE, 0x13C8, 0x324C, 0x3BDC, 0x6996, 0xC33C, 0x9966, 0x0660,
+    0x0272, 0x04E4, 0x4E40, 0x2720, 0xC936, 0x936C, 0x39C6, 0x639C,
+    0x9336, 0x9CC6, 0x817E, 0xE718, 0xCCF0, 0x0FCC, 0x7744, 0xEE22,
+)
+
+# Subset of each pixel in the 64 three-subset partitions, one row per partition
+BC7_PARTITIONS_3 = (
+    "0011001102212222", "0001001122112221", "0000200122112211", "0222002200110111",
+    "0000000011221122", "0011001100220022", "0022002211111111", "0011001122112211",
+    "0000000011112222", "0000111111112222", "0000111122222222", "0012001200120012",
+    "0112011201120112", "0122012201220122", "0011011211221222", "0011200122002220",
+    "0001001101121122", "0111001120012200", "0000112211221122", "0022002200221111",
+    "0111011102220222", "0001000122212221", "0000001101220122", "0000110022102210",
+    "0122012200110000", "0012001211222222", "0110122112210110", "0000011012211221",
+    "0022110211020022", "0110011020022222", "0011012201220011", "0000200022112221",
+    "0000000211221222", "0222002200120011", "0011001200220222", "0120012001200120",
+    "0000111122220000", "0120120120120120", "0120201212010120", "0011220011220011",
+    "0011112222000011", "0101010122222222", "0000000021212121", "0022112200221122",
+    "0022001100220011", "0220122102201221", "0101222222220101", "0000212121212121",
+    "0101010101012222", "0222011102220111", "0002111200021112", "0000211221122112",
+    "0222011101110222", "0002111211120002", "0110011001102222", "0000000021122112",
+    "0110011022222222", "0022001100110022", "0022112211220022", "0000000000002112",
+    "0002000100020001", "0222122202221222", "0101222222222222", "0111201122012220",
+)
+
+# Anchor pixel of the second subset of the two-subset partitions
+BC7_ANCHORS_2 = (
+    15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15,
+    15, 2, 8, 2, 2, 8, 8, 15, 2, 8, 2, 2, 8, 8, 2, 2,
+    15, 15, 6, 8, 2, 8, 15, 15, 2, 8, 2, 2, 2, 15, 15, 6,
+    6, 2, 6, 8, 15, 15, 2, 2, 15, 15, 15, 15, 15, 2, 2, 15,
+)
+
+# Anchor pixels of the second and third subsets of the three-subset partitions
+BC7_ANCHORS_3 = (
+    (
+        3, 3, 15, 15, 8, 3, 15, 15, 8, 8, 6, 6, 6, 5, 3, 3,
+        3, 3, 8, 15, 3, 3, 6, 10, 5, 8, 8, 6, 8, 5, 15, 15,
+        8, 15, 3, 5, 6, 10, 8, 15, 15, 3, 15, 5, 15, 15, 15, 15,
+        3, 15, 5, 5, 5, 8, 5, 10, 5, 10, 8, 13, 15, 12, 3, 3,
+    ),
+    (
+        15, 8, 8, 3, 15, 15, 3, 8, 15, 15, 15, 15, 15, 15, 15, 8,
+        15, 8, 15, 3, 15, 8, 15, 8, 3, 15, 6, 10, 15, 15, 10, 8,
+        15, 3, 15, 10, 10, 8, 9, 10, 6, 15, 8, 15, 3, 6, 6, 8,
+        15, 3, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 3, 15, 15, 8,
+    ),
+)
+
+# Interpolation weights by index bits
+BC7_WEIGHTS = {
+    2: (0, 21, 43, 64),
+    3: (0, 9, 18, 27, 37, 46, 55, 64),
+    4: (0, 4, 9, 13, 17, 21, 26, 30, 34, 38, 43, 47, 51, 55, 60, 64),
+}
+
+_bc7_tables = None
+
+
+def available():
+    """True if NumPy is installed"""
+    return np is not None
+
+
+def can_decode(pixel_format):
+    """True if decode() handles the format (a DDSInfo.format name) here"""
+    return np is not None and pixel_format in DECODABLE_FORMATS
+
+
+def _blocks(data, width, height, block_bytes):
+    """The level's blocks as a (blocks, block_bytes) uint8 array"""
+    count = ((width + 3) // 4) * ((height + 3) // 4)
+    size = count * block_bytes
+    if len(data) < size:
+        raise ValueError(f"{width}x{height} needs {size} bytes of blocks, got {len(data)}")
+    return np.frombuffer(data, dtype=np.uint8, count=size).reshape(count, block_bytes)
+
+
+def _to_image(pixels, width, height):
+    """(blocks, 16, 4) block pixels -> (height, width, 4) image"""
+    blocks_x = (width + 3) // 4
+    blocks_y = (height + 3) // 4
+    image = pixels.reshape(blocks_y, blocks_x, 4, 4, 4).transpose(0, 2, 1, 3, 4)
+    return np.ascontiguousarray(image.reshape(blocks_y * 4, blocks_x * 4, 4)[:height, :width])
+
+
+def _chunked(decode_blocks, blocks):
+    """Run decode_blocks over CHUNK_BLOCKS blocks at a time"""
+    if len(blocks) <= CHUNK_BLOCKS:
+        return decode_blocks(blocks)
+    return np.concatenate([
+        decode_blocks(blocks[start:start + CHUNK_BLOCKS]) for start in range(0, len(blocks), CHUNK_BLOCKS)
+    ])
+
+
+def _expand_565(colors):
+    """uint16 R5G6B5 -> (..., 3) int32 8-bit channels"""
+    colors = colors.astype(np.int32)
+    r = (colors >> 11) & 31
+    g = (colors >> 5) & 63
+    b = colors & 31
+    return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=-1)
+
+
+def _bc1_pixels(blocks, separate_alpha=False):
+    """
+    8-byte BC1 color blocks -> (blocks, 16, 4) uint8. With separate_alpha
+    (BC2/BC3 color) the four-color mode is always used and alpha is 255.
+    """
+    c0 = blocks[:, 0].astype(np.uint16) | (blocks[:, 1].astype(np.uint16) << 8)
+    c1 = blocks[:, 2].astype(np.uint16) | (blocks[:, 3].astype(np.uint16) << 8)
+    indices = blocks[:, 4:8].copy().view("<u4")[:, 0]
+
+    e0 = _expand_565(c0)
+    e1 = _expand_565(c1)
+    four_colors = (c0 > c1)[:, None]
+    if separate_alpha:
+        four_colors = np.ones_like(four_colors)
+
+    palette = np.empty((len(blocks), 4, 4), dtype=np.uint8)
+    palette[:, 0, :3] = e0
+    palette[:, 1, :3] = e1
+    palette[:, 2, :3] = np.where(four_colors, (2 * e0 + e1) // 3, (e0 + e1) // 2)
+    palette[:, 3, :3] = np.where(four_colors, (e0 + 2 * e1) // 3, 0)
+    palette[:, :3, 3] = 255
+    palette[:, 3, 3] = np.where(four_colors[:, 0], 255, 0)
+
+    selectors = (indices[:, None] >> (2 * np.arange(16, dtype=np.uint32))) & 3
+    return np.take_along_axis(palette, selectors[:, :, None].astype(np.intp), axis=1)
+
+
+def _bc4_values(blocks):
+    """8-byte BC4 (BC3 alpha) blocks -> (blocks, 16) uint8"""
+    a0 = blocks[:, 0].astype(np.int32)[:, None]
+    a1 = blocks[:, 1].astype(np.int32)[:, None]
+    steps = np.arange(1, 7, dtype=np.int32)
+
+    lut = np.empty((len(blocks), 8), dtype=np.int32)
+    lut[:, 0:1] = a0
+    lut[:, 1:2] = a1
+    eight = a0 > a1
+    lut[:, 2:8] = np.where(eight, ((7 - steps) * a0 + steps * a1) // 7, 0)
+    six = ~eight[:, 0]
+    six_steps = np.arange(1, 5, dtype=np.int32)
+    lut[six, 2:6] = ((5 - six_steps) * a0[six] + six_steps * a1[six]) // 5
+    lut[six, 6] = 0
+    lut[six, 7] = 255
+
+    bits = np.zeros((len(blocks), 8), dtype=np.uint8)
+    bits[:, :6] = blocks[:, 2:8]
+    bits = bits.view("<u8")[:, 0]
+    selectors = (bits[:, None] >> (3 * np.arange(16, dtype=np.uint64))) & 7
+    return np.take_along_axis(lut, selectors.astype(np.intp), axis=1).astype(np.uint8)
+
+
+def _decode_bc1_blocks(blocks):
+    return _bc1_pixels(blocks)
+
+
+def _decode_bc3_blocks(blocks):
+    pixels = _bc1_pixels(blocks[:, 8:], separate_alpha=True)
+    pixels[:, :, 3] = _bc4_values(blocks[:, :8])
+    return pixels
+
+
+def _decode_bc4_blocks(blocks):
+    values = _bc4_values(blocks)
+    pixels = np.empty((len(blocks), 16, 4), dtype=np.uint8)
+    pixels[:, :, :3] = values[:, :, None]
+    pixels[:, :, 3] = 255
+    return pixels
+
+
+def _decode_bc5_blocks(blocks):
+    pixels = np.empty((len(blocks), 16, 4), dtype=np.uint8)
+    pixels[:, :, 0] = _bc4_values(blocks[:, :8])
+    pixels[:, :, 1] = _bc4_values(blocks[:, 8:])
+    pixels[:, :, 2] = 0
+    pixels[:, :, 3] = 255
+    return pixels
+
+
+def _bc7_lookup():
+    """Partition and anchor tables as arrays: subsets[(2|3)][partition] -> (16,), anchors likewise"""
+    global _bc7_tables
+    if _bc7_tables is None:
+        pixels = np.arange(16)
+        subsets2 = (np.array(BC7_PARTITIONS_2)[:, None] >> pixels) & 1
+        subsets3 = np.array([[int(c) for c in row] for row in BC7_PARTITIONS_3])
+        anchors2 = np.zeros((64, 16), dtype=bool)
+        anchors2[:, 0] = True
+        anchors2[np.arange(64), BC7_ANCHORS_2] = True
+        anchors3 = np.zeros((64, 16), dtype=bool)
+        anchors3[:, 0] = True
+        anchors3[np.arange(64), BC7_ANCHORS_3[0]] = True
+        anchors3[np.arange(64), BC7_ANCHORS_3[1]] = True
+        _bc7_tables = {
+            1: (np.zeros((1, 16), dtype=np.intp), np.eye(1, 16, dtype=bool)),
+            2: (subsets2.astype(np.intp), anchors2),
+            3: (subsets3.astype(np.intp), anchors3),
+        }
+    return _bc7_tables
+
+
+def _fields(bits, offset, width, count=1):
+    """count consecutive width-bit fields starting at offset -> (blocks, count) int32"""
+    if width == 0:
+        return np.zeros((len(bits), count), dtype=np.int32)
+    chunk = bits[:, offset:offset + width * count].reshape(len(bits), count, width).astype(np.int32)
+    return chunk @ (1 << np.arange(width, dtype=np.int32))
+
+
+def _bc7_indices(bits, offset, width, anchors):
+    """
+    16 indices of width bits starting at offset, the anchor pixels' one bit
+    shorter (blocks of one partition, so the layout is the same for all).
+
+    Returns:
+        tuple: ((blocks, 16) int32 indices, offset after them)
+    """
+    widths = width - anchors.astype(np.int32)
+    starts = offset + np.cumsum(widths) - widths
+    stored = np.arange(width) < widths[:, None]
+    positions = np.where(stored, starts[:, None] + np.arange(width), 0)
+    weights = np.where(stored, 1 << np.arange(width, dtype=np.int32), 0)
+    indices = (bits[:, positions].astype(np.int32) * weights).sum(axis=2)
+    return indices, offset + int(widths.sum())
+
+
+def _unquantize(values, precision):
+    values = values << (8 - precision)
+    return values | (values >> precision)
+
+
+def _interpolate(endpoints, subsets, indices, width):
+    """Weighted endpoints of each pixel's subset -> (blocks, 16, channels) int32"""
+    weights = np.array(BC7_WEIGHTS[width], dtype=np.int32)[indices][:, :, None]
+    return ((64 - weights) * endpoints[:, 2 * subsets] + weights * endpoints[:, 2 * subsets + 1] + 32) >> 6
+
+
+def _decode_bc7_mode(bits, mode):
+    """Decode blocks that all use one BC7 mode -> (blocks, 16, 4) uint8"""
+    (subsets_count, partition_bits, rotation_bits, selection_bits, color_bits, alpha_bits,
+     endpoint_pbits, shared_pbits, index_bits, index_bits2) = BC7_MODES[mode]
+    count = len(bits)
+    endpoints_count = 2 * subsets_count
+    offset = mode + 1
+
+    partition = _fields(bits, offset, partition_bits)[:, 0]
+    offset += partition_bits
+    rotation = _fields(bits, offset, rotation_bits)[:, 0]
+    offset += rotation_bits
+    selection = _fields(bits, offset, selection_bits)[:, 0]
+    offset += selection_bits
+
+    endpoints = np.empty((count, endpoints_count, 4), dtype=np.int32)
+    for channel in range(3):
+        endpoints[:, :, channel] = _fields(bits, offset, color_bits, endpoints_count)
+        offset += color_bits * endpoints_count
+    if alpha_bits:
+        endpoints[:, :, 3] = _fields(bits, offset, alpha_bits, endpoints_count)
+        offset += alpha_bits * endpoints_count
+
+    color_precision = color_bits
+    alpha_precision = alpha_bits
+    if endpoint_pbits or shared_pbits:
+        pbits = _fields(bits, offset, 1, endpoints_count if endpoint_pbits else subsets_count)
+        offset += pbits.shape[1]
+        if shared_pbits:
+            pbits = pbits.repeat(2, axis=1)
+        endpoints = (endpoints << 1) | pbits[:, :, None]
+        color_precision += 1
+        alpha_precision += 1 if alpha_bits else 0
+
+    endpoints[:, :, :3] = _unquantize(endpoints[:, :, :3], color_precision)
+    if alpha_bits:
+        endpoints[:, :, 3] = _unquantize(endpoints[:, :, 3], alpha_precision)
+    else:
+        endpoints[:, :, 3] = 255
+
+    # Index bit offsets and subsets only depend on the partition: decode
+    # the blocks of each partition together
+    subset_table, anchor_table = _bc7_lookup()[subsets_count]
+    pixels = np.empty((count, 16, 4), dtype=np.int32)
+    for number in np.unique(partition):
+        rows = np.flatnonzero(partition == number)
+        part_bits = bits[rows]
+        part_endpoints = endpoints[rows]
+        subsets = subset_table[number]
+        indices, indices2_offset = _bc7_indices(part_bits, offset, index_bits, anchor_table[number])
+        if not index_bits2:
+            pixels[rows] = _interpolate(part_endpoints, subsets, indices, index_bits)
+            continue
+
+        # Modes 4 and 5 have a second index set for alpha; mode 4's index
+        # selection bit swaps which of them is the color one
+        indices2, _ = _bc7_indices(part_bits, indices2_offset, index_bits2, anchor_table[number])
+        swap = selection[rows] == 1
+        for chosen, color_indices, color_width, alpha_indices, alpha_width in (
+                (~swap, indices, index_bits, indices2, index_bits2),
+                (swap, indices2, index_bits2, indices, index_bits)):
+            if chosen.any():
+                block_pixels = np.empty((int(chosen.sum()), 16, 4), dtype=np.int32)
+                block_pixels[:, :, :3] = _interpolate(
+                    part_endpoints[chosen, :, :3], subsets, color_indices[chosen], color_width
+                )
+                block_pixels[:, :, 3:] = _interpolate(
+                    part_endpoints[chosen, :, 3:], subsets, alpha_indices[chosen], alpha_width
+                )
+                pixels[rows[chosen]] = block_pixels
+
+    for channel in (0, 1, 2):
+        rows = rotation == channel + 1
+        if rows.any():
+            pixels[rows, :, channel], pixels[rows, :, 3] = pixels[rows, :, 3], pixels[rows, :, channel].copy()
+    return pixels.astype(np.uint8)
+
+
+def _decode_bc7_blocks(blocks):
+    bits = np.unpackbits(blocks, axis=1, bitorder="little")
+    first_byte = blocks[:, 0]
+    modes = np.full(len(blocks), 8, dtype=np.int32)
+    for mode in range(7, -1, -1):
+        modes[(first_byte >> mode) & 1 == 1] = mode
+
+    # Reserved mode (first byte 0) decodes to black, opaque like Pillow's
+    pixels = np.zeros((len(blocks), 16, 4), dtype=np.uint8)
+    pixels[:, :, 3] = 255
+    for mode in range(8):
+        rows = modes == mode
+        if rows.any():
+            pixels[rows] = _decode_bc7_mode(bits[rows], mode)
+    return pixels
+
+
+_DECODERS = {
+    "BC1": (8, _decode_bc1_blocks),
+    "BC3": (16, _decode_bc3_blocks),
+    "BC4": (8, _decode_bc4_blocks),
+    "BC5": (16, _decode_bc5_blocks),
+    "BC7": (16, _decode_bc7_blocks),
+}
+
+
+def decode(data, pixel_format, width, height):
+    """
+    Decode one block-compressed mip level.
+
+    Args:
+        data: The level's bytes (extra bytes after it are ignored)
+        pixel_format: "BC1", "BC3", "BC4", "BC5" or "BC7" (DDSInfo.format)
+        width: Level width in pixels
+        height: Level height in pixels
+
+    Returns:
+        numpy.ndarray: (height, width, 4) uint8 RGBA; BC4 is gray, BC5 is
+                       red/green with blue 0 (like Pillow)
+
+    Raises:
+        ValueError: Unsupported format, NumPy missing, or not enough data
+    """
+    if np is None:
+        raise ValueError("NumPy is not installed")
+    if pixel_format not in _DECODERS:
+        raise ValueError(f"Cannot decode {pixel_format} textures")
+    block_bytes, decode_blocks = _DECODERS[pixel_format]
+    blocks = _blocks(data, width, height, block_bytes)
+    return _to_image(_chunked(decode_blocks, blocks), width, height)
+
+
+def decode_image(data, pixel_format, width, height):
+    """decode() as an RGBA PIL image"""
+    from PIL import Image
+    return Image.fromarray(decode(data, pixel_format, width, height), "RGBA")
+
+
+def _pillow_decode(data, pixel_format, width, height):
+    """Decode with Pillow through a minimal in-memory DDS file (for comparison)"""
+    import io
+    import struct
+    from PIL import Image
+
+    dxgi = {"BC1": 71, "BC3": 77, "BC4": 80, "BC5": 83, "BC7": 98}[pixel_format]
+    header = bytearray(148)
+    header[:4] = b"DDS "
+    struct.pack_into("<7I", header, 4, 124, 0x1007 | 0x80000, height, width, len(data), 0, 1)
+    struct.pack_into("<2I4s", header, 76, 32, 0x4, b"DX10")
+    struct.pack_into("<I", header, 108, 0x1000)
+    struct.pack_into("<5I", header, 128, dxgi, 3, 0, 1, 0)
+    image = Image.open(io.BytesIO(bytes(header) + data))
+    image.load()
+    return image
+
+
+def _benchmark(label, data, pixel_format, width, height):
+    """Time decode() against Pillow on one level and compare their pixels"""
+    started = time.perf_counter()
+    pixels = decode(data, pixel_format, width, height)
+    numpy_seconds = time.perf_counter() - started
+
+    try:
+        started = time.perf_counter()
+        reference = _pillow_decode(data, pixel_format, width, height)
+        pillow_seconds = time.perf_counter() - started
+    except Exception as e:
+        print(f"{label}: numpy {numpy_seconds * 1000:.0f} ms, Pillow cannot decode it ({e})")
+        return
+
+    expected = np.asarray(reference.convert("RGBA"))
+    if reference.mode == "L":
+        compare = pixels[:, :, :1], expected[:, :, :1]
+    elif reference.mode == "RGB":
+        compare = pixels[:, :, :3], expected[:, :, :3]
+    else:
+        compare = pixels, expected
+    difference = int(np.abs(compare[0].astype(np.int32) - compare[1].astype(np.int32)).max())
+    print(f"{label}: numpy {numpy_seconds * 1000:.0f} ms, Pillow {pillow_seconds * 1000:.0f} ms, "
+          f"max difference {difference}")
+
+
+def main(argv=None):
+    """Benchmark decode() against Pillow on DDS files, or on random 4096x4096 blocks"""
+    from core.dds import DDSError, read_dds_info
+
+    if np is None:
+        print("NumPy is not installed")
+        return 1
+    paths = sys.argv[1:] if argv is None else argv
+    if not paths:
+        size = 4096
+        random = np.random.default_rng(0)
+        for pixel_format in DECODABLE_FORMATS:
+            block_bytes = _DECODERS[pixel_format][0]
+            data = random.integers(0, 256, (size // 4) ** 2 * block_bytes, dtype=np.uint8).tobytes()
+            _benchmark(f"random {size}x{size} {pixel_format}", data, pixel_format, size, size)
+        return 0
+
+    for path in paths:
+        try:
+            info = read_dds_info(path)
+        except (OSError, DDSError) as e:
+            print(f"{path}: {e}")
+            continue
+        if info.format not in DECODABLE_FORMATS:
+            print(f"{path}: {info.format} is not decoded here")
+            continue
+        with open(path, "rb") as f:
+            f.seek(info.header_size)
+            data = f.read(info.mip_size(0))
+        _benchmark(f"{path} ({info.describe()})", data, info.format, info.width, info.height)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
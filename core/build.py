@@ -0,0 +1,536 @@
+"""
+Headless batch builder
+
+Builds one or more .bsproject files without the GUI:
+
+    python -m core.build MyMod.bsproject OtherMod.bsproject -o out --overwrite
+    python -m core.build *.bsproject --jobs 2 --json summary.json
+
+Every project goes through generate_multi_skin_mod exactly like the Generate
+button does. Projects built in parallel (--jobs) run as threads in this
+process, so they share the compiled template cache: a vehicle used by several
+projects is only compiled once.
+
+Nothing here imports tkinter or customtkinter.
+
+The JSON summary (--json FILE, or --json - for stdout) has one record per
+project with its status, output path, size and timings. With --json - all
+build output goes to stderr so stdout stays machine-readable.
+
+Ctrl+C cancels the running builds cleanly (partial ZIPs and temp folders are
+removed); press it again to abort immediately. Builds keep a journal (see
+core/build_journal.py), so running the same command again with --resume only
+builds the skins a failed, cancelled or killed run had not finished.
+
+With --unpacked the mod is written as a folder (by default into the mods
+folder's unpacked/ folder) and a rebuild only rewrites the files that changed.
+
+With --watch the projects are rebuilt (incrementally) whenever a texture or
+config file they use changes, until Ctrl+C.
+
+With --reproducible the same project and assets always give a byte-identical
+ZIP; its SHA-256 is added to the project's JSON record.
+
+With --shard-size MB a mod bigger than MB is split into several ZIPs
+(<mod>_part01.zip, ...) plus a <mod>.shards.json manifest; the JSON record
+lists every shard.
+
+Skins whose texture is a PNG, TGA or JPG file are converted to DDS first
+(--texture-format, --texture-preset; see core/texture_convert.py), and the
+converted files are cached, so only edited images are converted again.
+
+Every build appends a build report (timings per stage, bytes per skin, cache
+hits, peak memory; see core/build_report.py) to <mod>.buildreport.json next
+to its .bsproject file and prints how it compares with the previous build.
+
+Exit codes: 0 all projects built, 1 at least one failed, 2 bad arguments,
+130 cancelled.
+"""
+import argparse
+import contextlib
+import json
+import os
+import signal
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+SUMMARY_VERSION = 1
+
+# The app's own folder: vehicles/ and data/ are resolved from here
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_project(path):
+    """
+    Read a .bsproject file.
+
+    Raises:
+        ValueError: The file is not a BeamSkin project
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        project_data = json.load(f)
+    if not isinstance(project_data, dict) or "cars" not in project_data:
+        raise ValueError(f"Invalid project file (no 'cars'): {path}")
+    return project_data
+
+
+def _error_record(record, error):
+    """Fill the error fields of a project record"""
+    from core.file_ops import SkinBuildError
+    from core.cancel import BuildCancelled
+
+    record["status"] = "cancelled" if isinstance(error, BuildCancelled) else "failed"
+    record["error_type"] = type(error).__name__
+    record["error"] = str(error)
+    if isinstance(error, SkinBuildError):
+        record["skin_errors"] = [
+            {"car_instance_id": car_id, "skin_name": skin_name, "message": message}
+            for car_id, skin_name, message in error.errors
+        ]
+
+
+def _duplicate_outputs(project_paths):
+    """
+    Find projects that would write the same mod ZIP as an earlier one.
+
+    Returns:
+        dict: Project path -> path of the earlier project with the same mod name
+    """
+    from core.file_ops import sanitize_mod_name
+
+    first_by_name = {}
+    duplicates = {}
+    for path in project_paths:
+        try:
+            mod_name = sanitize_mod_name(load_project(path).get("mod_name", ""))
+        except Exception:
+            # Reported properly when the project is built
+            continue
+        if mod_name in first_by_name:
+            duplicates[path] = first_by_name[mod_name]
+        else:
+            first_by_name[mod_name] = path
+    return duplicates
+
+
+def _build_kwargs(options):
+    """generate_multi_skin_mod arguments from the command-line options"""
+    return {
+        "output_path": options.output,
+        "workers": options.workers,
+        "use_processes": options.processes,
+        "build_mode": options.mode,
+        "incremental": options.incremental,
+        "cache_dir": options.cache_dir,
+        "update_existing": options.overwrite,
+        "compression_rules": options.compression_rules,
+        "journal": options.journal,
+        "reproducible": options.reproducible,
+        "output_format": "folder" if options.unpacked else "zip",
+        "shard_size": int(options.shard_size * 1024 * 1024) or None,
+        "texture_format": options.texture_format,
+        "texture_preset": options.texture_preset,
+    }
+
+
+def _report_path(project_path, project_data):
+    """Build report file of a project (next to the .bsproject)"""
+    from core.build_report import build_report_path
+    from core.file_ops import sanitize_mod_name
+    return build_report_path(project_path, sanitize_mod_name(project_data.get("mod_name", "")))
+
+
+def build_project(project_path, options, started_at):
+    """
+    Build (or plan) one project.
+
+    Args:
+        project_path: Absolute path of the .bsproject file
+        options: Parsed command-line options
+        started_at: time.perf_counter() value of the batch start
+
+    Returns:
+        dict: Summary record for the project (never raises)
+    """
+    from core.file_ops import generate_multi_skin_mod
+
+    record = {
+        "project": project_path,
+        "status": "ok",
+        "mod_name": None,
+        "zip_path": None,
+        "skins": 0,
+        "size_bytes": None,
+        "error": None,
+        "error_type": None,
+        "timings": {},
+    }
+    start = time.perf_counter()
+    record["timings"]["start_offset"] = round(start - started_at, 3)
+
+    try:
+        project_data = load_project(project_path)
+        loaded = time.perf_counter()
+        record["timings"]["load_seconds"] = round(loaded - start, 3)
+
+        result = generate_multi_skin_mod(
+            project_data,
+            dry_run=options.dry_run,
+            cancel_token=options.cancel_token,
+            resume=options.resume,
+            report_path=None if options.dry_run else _report_path(project_path, project_data),
+            **_build_kwargs(options)
+        )
+
+        if options.dry_run:
+            plan = result
+            record["status"] = "planned" if plan.ok else "failed"
+            record["mod_name"] = plan.mod_name
+            record["zip_path"] = plan.zip_path
+            record["skins"] = len(plan.skins)
+            record["plan"] = plan.as_dict()
+            if not plan.ok:
+                record["error_type"] = "BuildPlanError"
+                record["error"] = plan.errors[0]["message"]
+        else:
+            report = result
+            result = report.output_path
+            record["zip_path"] = result
+            record["report_path"] = _report_path(project_path, project_data)
+            record["timings"]["phases"] = {name: row["wall_seconds"] for name, row in report.phases.items()}
+            record["peak_memory_bytes"] = report.memory["peak_rss_bytes"]
+            record["skins"] = sum(len(car.get("skins", [])) for car in project_data["cars"].values())
+            if options.unpacked:
+                record["mod_name"] = os.path.basename(result)
+                record["size_bytes"] = sum(
+                    os.path.getsize(os.path.join(root, name))
+                    for root, _, files in os.walk(result) for name in files
+                )
+            elif options.shard_size:
+                from core.sharding import read_shard_manifest
+                manifest = read_shard_manifest(result)
+                record["mod_name"] = manifest["mod_name"]
+                record["size_bytes"] = sum(shard["size_bytes"] for shard in manifest["shards"])
+                record["shards"] = [
+                    {
+                        "zip_path": os.path.join(os.path.dirname(result), shard["file"]),
+                        "size_bytes": shard["size_bytes"],
+                        "sha256": shard["sha256"],
+                        "skins": len(shard["skins"]),
+                    }
+                    for shard in manifest["shards"]
+                ]
+            else:
+                record["mod_name"] = os.path.splitext(os.path.basename(result))[0]
+                record["size_bytes"] = os.path.getsize(result)
+            if options.reproducible and not options.unpacked and not options.shard_size:
+                from core.archive import archive_digest
+                record["sha256"] = archive_digest(result)
+
+    except Exception as e:
+        _error_record(record, e)
+        if record["status"] == "cancelled":
+            print(f"[DEBUG] Build cancelled: {project_path}")
+        else:
+            print(f"[ERROR] Build failed for {project_path}: {e}")
+            traceback.print_exc()
+
+    finished = time.perf_counter()
+    record["timings"]["build_seconds"] = round(
+        finished - start - record["timings"].get("load_seconds", 0), 3
+    )
+    record["timings"]["total_seconds"] = round(finished - start, 3)
+    return record
+
+
+def run_batch(project_paths, options):
+    """
+    Build every project, options.jobs at a time.
+
+    Returns:
+        dict: JSON summary (see module docstring)
+    """
+    from core.templates import get_template_cache
+
+    started_at = time.perf_counter()
+    jobs = max(1, min(options.jobs, len(project_paths)))
+    duplicates = _duplicate_outputs(project_paths)
+
+    def run(path):
+        if path in duplicates:
+            error = FileExistsError(f"Same mod name as {duplicates[path]}, both would write the same ZIP")
+            record = {"project": path, "status": "failed", "mod_name": None, "zip_path": None,
+                      "skins": 0, "size_bytes": None, "timings": {"total_seconds": 0.0}}
+            _error_record(record, error)
+            print(f"[ERROR] Skipping {path}: {error}")
+            return record
+        return build_project(path, options, started_at)
+
+    if jobs == 1:
+        records = [run(path) for path in project_paths]
+    else:
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="project") as executor:
+            records = list(executor.map(run, project_paths))
+
+    cache = get_template_cache()
+    failed = sum(1 for record in records if record["status"] == "failed")
+    cancelled = sum(1 for record in records if record["status"] == "cancelled")
+    return {
+        "version": SUMMARY_VERSION,
+        "finished_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "jobs": jobs,
+        "total_seconds": round(time.perf_counter() - started_at, 3),
+        "succeeded": len(records) - failed - cancelled,
+        "failed": failed,
+        "cancelled": cancelled,
+        "template_cache": {"hits": cache.hits, "misses": cache.misses},
+        "projects": records,
+    }
+
+
+def watch_projects(project_paths, options):
+    """
+    Rebuild projects whenever a file they use changes, until the cancel
+    token is cancelled (Ctrl+C). Every rebuild updates the existing mod
+    incrementally.
+    """
+    from core.build_worker import start_build
+    from core.watch import WatchSession
+
+    build_kwargs = _build_kwargs(options)
+    build_kwargs.update(incremental=True, update_existing=True)
+
+    def start_rebuild(project_data, project_path):
+        # A thread, so rebuilds share this process's template cache
+        return start_build(project_data, use_process=False,
+                           report_path=_report_path(project_path, project_data), **build_kwargs)
+
+    sessions = []
+    for path in project_paths:
+        try:
+            sessions.append(WatchSession(load_project(path),
+                                         lambda project_data, path=path: start_rebuild(project_data, path),
+                                         debounce=options.watch_debounce,
+                                         max_concurrent=options.watch_max_concurrent))
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Cannot watch {path}: {e}")
+    if not sessions:
+        return
+
+    print(f"\nWatching {len(sessions)} project(s) for changes, press Ctrl+C to stop")
+    while not options.cancel_token.cancelled:
+        for session in sessions:
+            session.poll()
+        time.sleep(0.1)
+
+    for session in sessions:
+        session.stop()
+    while any(session.busy for session in sessions):
+        for session in sessions:
+            session.poll()
+        time.sleep(0.05)
+    for session in sessions:
+        print(f"Watch {session.project_data.get('mod_name', '')}: {session.latency_summary()}")
+
+
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
+
+
+def _compression_rule(value):
+    """Parse EXT=RULE (e.g. .dds=store)"""
+    extension, sep, rule = value.partition("=")
+    if not sep or not extension or not rule:
+        raise argparse.ArgumentTypeError(f"expected EXT=RULE, got '{value}'")
+    from core.compression import parse_rule
+    try:
+        parse_rule(rule)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return extension.lower(), rule
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m core.build",
+        description="Build BeamNG skin mods from .bsproject files without the GUI.",
+    )
+    parser.add_argument("projects", nargs="+", help=".bsproject files to build")
+    parser.add_argument("-o", "--output", help="Folder the mod ZIPs are written to "
+                                               "(default: the mods folder from the app settings)")
+    parser.add_argument("-f", "--overwrite", action="store_true",
+                        help="Replace existing mod ZIPs instead of failing")
+    parser.add_argument("-j", "--jobs", type=_positive_int, default=1,
+                        help="Projects built at the same time (default: 1)")
+    parser.add_argument("-w", "--workers", type=_positive_int, default=None,
+                        help="Skins built in parallel per project (default: app setting)")
+    parser.add_argument("--processes", action="store_true", default=None,
+                        help="Build skins in worker processes instead of threads")
+    parser.add_argument("--mode", choices=("stream", "staged"), default=None,
+                        help="Build mode (default: app setting)")
+    parser.add_argument("--incremental", action="store_true", default=None,
+                        help="Reuse unchanged skins from the build cache")
+    parser.add_argument("--cache-dir", help="Build cache folder (default: data/cache/build)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume each project's last unfinished build")
+    parser.add_argument("--no-journal", dest="journal", action="store_false", default=None,
+                        help="Do not keep a build journal (builds cannot be resumed)")
+    parser.add_argument("--watch", action="store_true",
+                        help="After building, rebuild whenever a texture or config file changes "
+                             "(implies --incremental and --overwrite)")
+    parser.add_argument("--watch-debounce", type=float, default=None, metavar="SECONDS",
+                        help="Wait until the files have not changed for SECONDS before rebuilding "
+                             "(default: app setting)")
+    parser.add_argument("--unpacked", action="store_true",
+                        help="Write each mod as a folder (default: <mods>/unpacked/<name>), syncing only changed files")
+    parser.add_argument("--shard-size", type=float, default=None, metavar="MB",
+                        help="Split mods bigger than MB into several ZIPs plus a manifest (default: app setting)")
+    parser.add_argument("--reproducible", action="store_true", default=None,
+                        help="Write byte-identical ZIPs for identical inputs (sorted entries, fixed timestamps)")
+    parser.add_argument("--texture-format", choices=("auto", "BC1", "BC3", "BC7"), default=None,
+                        help="Block format PNG/TGA/JPG textures are converted to (default: app setting)")
+    parser.add_argument("--texture-preset", choices=("fast", "balanced", "quality"), default=None,
+                        help="Texture conversion speed/quality (default: app setting)")
+    parser.add_argument("--compression", action="append", type=_compression_rule, default=None,
+                        metavar="EXT=RULE", help="Compression rule override, e.g. .dds=store (repeatable)")
+    parser.add_argument("-n", "--dry-run", action="store_true",
+                        help="Only plan the builds and report problems")
+    parser.add_argument("--json", metavar="FILE",
+                        help="Write the JSON summary to FILE ('-' for stdout)")
+    return parser
+
+
+def _apply_settings_defaults(options):
+    """Fill options left unset from the app settings, like the GUI does"""
+    from core.settings import (
+        get_build_workers,
+        get_build_use_processes,
+        get_build_mode,
+        get_build_incremental,
+        get_compression_rules,
+        get_build_journal,
+        get_build_reproducible,
+        get_build_shard_size_mb,
+        get_texture_format,
+        get_texture_preset,
+        get_watch_debounce,
+        get_watch_max_concurrent,
+    )
+
+    if options.workers is None:
+        options.workers = get_build_workers()
+    if options.processes is None:
+        options.processes = get_build_use_processes()
+    if options.mode is None:
+        options.mode = get_build_mode()
+    if options.incremental is None:
+        options.incremental = get_build_incremental()
+    if options.journal is None:
+        options.journal = get_build_journal()
+    if options.reproducible is None:
+        options.reproducible = get_build_reproducible()
+    if options.shard_size is None:
+        options.shard_size = get_build_shard_size_mb()
+    if options.texture_format is None:
+        options.texture_format = get_texture_format()
+    if options.texture_preset is None:
+        options.texture_preset = get_texture_preset()
+    if options.watch_debounce is None:
+        options.watch_debounce = get_watch_debounce()
+    options.watch_max_concurrent = get_watch_max_concurrent()
+
+    rules = dict(get_compression_rules())
+    rules.update(options.compression or [])
+    options.compression_rules = rules
+
+
+def _print_summary(summary):
+    for record in summary["projects"]:
+        name = record["mod_name"] or os.path.basename(record["project"])
+        seconds = record["timings"]["total_seconds"]
+        if record["status"] == "failed":
+            print(f"  FAILED  {name} ({seconds:.2f}s): {record['error_type']}: {record['error']}")
+        elif record["status"] == "cancelled":
+            print(f"  CANCELLED {name} ({seconds:.2f}s)")
+        elif record["status"] == "planned":
+            print(f"  PLANNED {name}: {record['skins']} skin(s) -> {record['zip_path']}")
+        else:
+            size_mb = record["size_bytes"] / (1024 * 1024)
+            print(f"  OK      {name} ({seconds:.2f}s, {record['skins']} skin(s), {size_mb:.1f} MB) -> {record['zip_path']}")
+    print(f"{summary['succeeded']} succeeded, {summary['failed']} failed, "
+          f"{summary['cancelled']} cancelled in {summary['total_seconds']:.2f}s")
+
+
+def main(argv=None):
+    parser = build_parser()
+    options = parser.parse_args(argv)
+
+    # Paths on the command line are relative to where the command was run;
+    # everything else (vehicles/, data/) is relative to the app folder
+    project_paths = [os.path.abspath(path) for path in options.projects]
+    missing = [path for path in project_paths if not os.path.isfile(path)]
+    if missing:
+        parser.error(f"project file not found: {missing[0]}")
+    if options.watch and options.dry_run:
+        parser.error("--watch cannot be combined with --dry-run")
+    if options.shard_size is not None and options.shard_size < 0:
+        parser.error("--shard-size must not be negative")
+    if options.watch:
+        options.incremental = options.overwrite = True
+    if options.output:
+        options.output = os.path.abspath(options.output)
+    if options.cache_dir:
+        options.cache_dir = os.path.abspath(options.cache_dir)
+    json_path = None
+    if options.json and options.json != "-":
+        json_path = os.path.abspath(options.json)
+
+    os.chdir(APP_ROOT)
+    _apply_settings_defaults(options)
+
+    # First Ctrl+C cancels cleanly, a second one falls back to KeyboardInterrupt
+    from core.cancel import CancelToken
+    options.cancel_token = CancelToken()
+
+    def on_interrupt(signum, frame):
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        print("\n[DEBUG] Interrupted, cancelling builds (Ctrl+C again to abort)", file=sys.stderr)
+        options.cancel_token.cancel()
+
+    signal.signal(signal.SIGINT, on_interrupt)
+
+    # Keep stdout clean for the JSON summary
+    log_stream = sys.stderr if options.json == "-" else sys.stdout
+    with contextlib.redirect_stdout(log_stream):
+        summary = run_batch(project_paths, options)
+        print(f"\n{'='*60}")
+        print("BATCH BUILD SUMMARY")
+        print(f"{'='*60}")
+        _print_summary(summary)
+
+    if options.json == "-":
+        json.dump(summary, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    elif json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+    if options.watch and not summary["cancelled"]:
+        with contextlib.redirect_stdout(log_stream):
+            watch_projects(project_paths, options)
+
+    if summary["cancelled"]:
+        return 130
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    # Needed when --processes is used from a frozen build
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,399 @@
+"""
+Incremental build cache
+
+Every skin in a streamed build is written into its own small "fragment" ZIP
+under data/cache/build/fragments, named after a hash of everything that can
+change its output:
+
+    templates  - the vehicle's SKINNAME files, its info template and the
+                 build code itself
+    dds        - the texture's content
+    skin       - skin name, DDS file name, vehicle and author
+    config     - config data plus the .pc/.jpg contents
+    materials  - material property overrides
+    compression - the compression rules the fragment was written with
+
+When the hash matches an existing fragment, the skin is not rendered again and
+its already-compressed entries are copied straight into the mod ZIP. Texture
+hashes are remembered per (size, mtime), so a no-op rebuild never re-reads the
+DDS files.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import zipfile
+
+# Bump when the fragment layout changes
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join("data", "cache", "build")
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Input groups in the order they are checked when explaining a rebuild
+INPUT_REASONS = (
+    ("templates", "template files changed"),
+    ("dds", "DDS texture changed"),
+    ("skin", "skin name/author changed"),
+    ("config", "config data changed"),
+    ("materials", "material properties changed"),
+    ("compression", "compression rules changed"),
+)
+
+# Build code that affects what ends up in a fragment
+_BUILD_SOURCES = (
+    "file_ops.py", "templates.py", "materials.py", "archive.py", "build_cache.py", "compression.py",
+)
+
+
+def _hash_json(value):
+    """Stable hash of a JSON-serialisable value"""
+    text = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def skin_slot(job):
+    """Name used to track a skin between builds of the same mod"""
+    return f"{job['car_instance_id']}/{job['skin']['name']}"
+
+
+class BuildCache:
+    """
+    Persistent cache of rendered skins for one cache folder.
+    Only used from the thread that runs the build; the fragments themselves are
+    written by the skin workers.
+    """
+
+    def __init__(self, cache_dir=None):
+        """
+        Args:
+            cache_dir: Cache folder (defaults to data/cache/build)
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.fragments_dir = os.path.join(self.cache_dir, "fragments")
+        self.index_dir = os.path.join(self.cache_dir, "index")
+        self.hashes_file = os.path.join(self.cache_dir, "file_hashes.json")
+        os.makedirs(self.fragments_dir, exist_ok=True)
+        os.makedirs(self.index_dir, exist_ok=True)
+
+        self._file_hashes = {}
+        self._template_hashes = {}
+        self._hashed_files = 0
+        self._hashed_bytes = 0
+
+        if os.path.exists(self.hashes_file):
+            try:
+                with open(self.hashes_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    self._file_hashes = data.get("files", {})
+            except Exception as e:
+                print(f"[WARNING] Could not read build cache hashes: {e}")
+
+    # ------------------------------------------------------------------
+    # Content hashes
+    # ------------------------------------------------------------------
+
+    def file_hash(self, path):
+        """
+        SHA-256 of a file's content, reusing the previous result while the
+        file's size and modification time are unchanged.
+        Missing files hash to "missing" so they still produce a stable key.
+        """
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return "missing"
+
+        cached = self._file_hashes.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(HASH_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+        result = digest.hexdigest()
+
+        self._hashed_files += 1
+        self._hashed_bytes += stat.st_size
+        self._file_hashes[path] = [stat.st_size, stat.st_mtime_ns, result]
+        return result
+
+    def _template_hash(self, template_path):
+        """Hash of a vehicle's template folder, info templates and the build code"""
+        if template_path in self._template_hashes:
+            return self._template_hashes[template_path]
+
+        files = []
+        for root_dir, dirs, names in os.walk(template_path):
+            dirs.sort()
+            for name in sorted(names):
+                if name.lower().endswith(".dds"):
+                    continue
+                full_path = os.path.join(root_dir, name)
+                rel_path = os.path.relpath(full_path, template_path).replace(os.sep, "/")
+                files.append((rel_path, self.file_hash(full_path)))
+
+        vehicle_root = os.path.dirname(template_path)
+        for name in sorted(os.listdir(vehicle_root)):
+            if name.startswith("info") and name.endswith(".json"):
+                files.append((f"../{name}", self.file_hash(os.path.join(vehicle_root, name))))
+
+        core_dir = os.path.dirname(os.path.abspath(__file__))
+        code = [(name, self.file_hash(os.path.join(core_dir, name))) for name in _BUILD_SOURCES]
+
+        result = _hash_json({"files": files, "code": code, "linesep": os.linesep})
+        self._template_hashes[template_path] = result
+        return result
+
+    def skin_inputs(self, job):
+        """
+        Hash each group of inputs that can change a skin's output.
+
+        Args:
+            job: Skin job dict from generate_multi_skin_mod
+
+        Returns:
+            dict: Input group name -> hash
+        """
+        skin = job["skin"]
+        config_data = skin.get("config_data")
+
+        config = None
+        if config_data is not None:
+            config = {
+                "data": config_data,
+                "pc": self.file_hash(config_data["pc_file_path"]) if config_data.get("pc_file_path") else None,
+                "jpg": self.file_hash(config_data["jpg_file_path"]) if config_data.get("jpg_file_path") else None,
+            }
+
+        return {
+            "templates": self._template_hash(job["template_path"]),
+            "dds": self.file_hash(skin["dds_path"]),
+            "skin": _hash_json({
+                "name": skin["name"],
+                "dds_filename": os.path.basename(skin["dds_path"]),
+                "base_carid": job["base_carid"],
+                "author": job["author"],
+                "shared_dds": job.get("shared_dds"),
+            }),
+            "config": _hash_json(config),
+            "materials": _hash_json(skin.get("material_properties")),
+            "compression": _hash_json(
+                job["compression_policy"].signature() if job.get("compression_policy") else None
+            ),
+        }
+
+    @staticmethod
+    def skin_key(inputs):
+        """Cache key for a skin from its input hashes"""
+        return _hash_json({"version": CACHE_VERSION, "inputs": inputs})[:32]
+
+    # ------------------------------------------------------------------
+    # Fragments
+    # ------------------------------------------------------------------
+
+    def fragment_path(self, key):
+        """Path of the fragment ZIP for a cache key"""
+        return os.path.join(self.fragments_dir, f"{key}.zip")
+
+    def load_fragment(self, key):
+        """
+        Open a cached fragment and read back what the skin produced.
+
+        Returns:
+            dict: {'arcnames': [...], 'warnings': [...]}, or None when the
+                  fragment is missing or unreadable
+        """
+        path = self.fragment_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with zipfile.ZipFile(path, "r") as zipf:
+                meta = json.loads(zipf.comment.decode("utf-8") or "{}")
+                return {
+                    "arcnames": zipf.namelist(),
+                    "warnings": meta.get("warnings", []),
+                }
+        except Exception as e:
+            print(f"[WARNING] Discarding unreadable cache fragment {path}: {e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    # ------------------------------------------------------------------
+    # Per-mod index (what each skin was built from last time)
+    # ------------------------------------------------------------------
+
+    def _index_path(self, mod_name):
+        return os.path.join(self.index_dir, f"{mod_name}.json")
+
+    def load_index(self, mod_name):
+        """Get the skin records from the last build of a mod"""
+        path = self._index_path(mod_name)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION:
+                return {}
+            return data.get("skins", {})
+        except Exception as e:
+            print(f"[WARNING] Could not read build index for {mod_name}: {e}")
+            return {}
+
+    def save_index(self, mod_name, skins, summary):
+        """
+        Remember what each skin of a mod was built from.
+
+        Args:
+            mod_name: Sanitized mod name
+            skins: Skin slot -> {'key': ..., 'inputs': {...}}
+            summary: Rebuild summary from the build (stored for inspection)
+        """
+        data = {
+            "version": CACHE_VERSION,
+            "built_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "skins": skins,
+            "last_build": summary,
+        }
+        path = self._index_path(mod_name)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def explain(inputs, previous, fragment_found):
+        """
+        Describe why a skin has to be rebuilt.
+
+        Returns:
+            str: Reason, or None if the cached fragment can be reused
+        """
+        if fragment_found:
+            return None
+        if previous is None:
+            return "new skin"
+
+        old_inputs = previous.get("inputs", {})
+        changed = [reason for name, reason in INPUT_REASONS if old_inputs.get(name) != inputs.get(name)]
+        if changed:
+            return ", ".join(changed)
+        return "cache entry missing"
+
+    # ------------------------------------------------------------------
+    # Housekeeping
+    # ------------------------------------------------------------------
+
+    def save(self):
+        """Write the file hash cache, forgetting files that no longer exist"""
+        files = {path: entry for path, entry in self._file_hashes.items() if os.path.exists(path)}
+        # Builds running side by side (python -m core.build --jobs) share this file
+        temp_path = f"{self.hashes_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "files": files}, f)
+            os.replace(temp_path, self.hashes_file)
+        except OSError as e:
+            print(f"[WARNING] Could not save build cache hashes: {e}")
+
+    def _referenced_keys(self):
+        """
+        Keys of the fragments a mod index or an unfinished build journal
+        refers to, or None if an index cannot be read
+        """
+        referenced = set()
+        for name in os.listdir(self.index_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.index_dir, name), "r", encoding="utf-8") as f:
+                    skins = json.load(f).get("skins", {})
+                referenced.update(record["key"] for record in skins.values())
+            except Exception:
+                # Unreadable index: keep everything rather than guess
+                return None
+
+        # Skins finished by an interrupted build stay until it is resumed
+        journal_dir = os.path.join(self.cache_dir, "journal")
+        if os.path.isdir(journal_dir):
+            from core.build_journal import read_journal
+            for name in os.listdir(journal_dir):
+                if name.endswith(".jsonl"):
+                    state = read_journal(os.path.join(journal_dir, name))
+                    if state and state["status"] != "complete":
+                        referenced.update(state["skins"].values())
+        return referenced
+
+    def discard(self, keys):
+        """
+        Delete the fragments of a finished journaled build that nothing else
+        refers to. They only existed so the build could be resumed.
+
+        Returns:
+            int: Bytes freed
+        """
+        referenced = self._referenced_keys()
+        if referenced is None:
+            return 0
+        freed = 0
+        for key in set(keys) - referenced:
+            path = self.fragment_path(key)
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                freed += size
+            except OSError:
+                pass
+        if freed:
+            print(f"[DEBUG] Build cache: removed the journal's fragments ({freed / (1024 * 1024):.1f} MB)")
+        return freed
+
+    def prune(self, older_than):
+        """
+        Delete fragments that no mod index or build journal refers to any more.
+
+        Args:
+            older_than: Only fragments last modified before this time.time()
+                        value are removed, so a build running at the same time
+                        never loses a fragment it has just written
+
+        Returns:
+            int: Number of fragments removed
+        """
+        referenced = self._referenced_keys()
+        if referenced is None:
+            return 0
+
+        removed = 0
+        for name in os.listdir(self.fragments_dir):
+            key, ext = os.path.splitext(name)
+            path = os.path.join(self.fragments_dir, name)
+            if ext == ".zip" and key in referenced:
+                continue
+            try:
+                if os.path.getmtime(path) < older_than:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+
+        if removed:
+            print(f"[DEBUG] Build cache: removed {removed} unused fragment(s)")
+        return removed
+
+    @property
+    def hashed_bytes(self):
+        """Bytes read to hash files during this build (0 on a no-op rebuild)"""
+        return self._hashed_bytes
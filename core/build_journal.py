@@ -0,0 +1,228 @@
+"""
+Crash-safe build journal
+
+A journaled build renders every skin into a build cache fragment (see
+core/build_cache.py) and appends one JSON line per event to
+data/cache/build/journal/<mod name>.jsonl, synced to disk after every line:
+
+    {"event": "start", ...}                       mod name, ZIP path, skin count
+    {"event": "skin", "slot": ..., "key": ...}    skin done, its fragment is complete
+    {"event": "failed", "slot": ..., "error": ...}
+    {"event": "write", "path": ...}               ZIP (or one shard) is being written to path
+    {"event": "end", "status": ..., "error": ...} complete, failed or cancelled
+
+A journal without an "end" line belongs to a build whose process died. When a
+build fails, is cancelled or dies, resuming it reuses every recorded fragment
+whose key still matches the skin's inputs and only renders the rest. A
+truncated last line (the process died while writing it) is ignored.
+
+Once a build completes, the fragments it rendered only for resuming are
+deleted; incremental builds keep theirs in the mod's build cache index.
+"""
+import json
+import os
+import threading
+import time
+
+JOURNAL_VERSION = 1
+
+
+def journal_path(mod_name, cache_dir=None):
+    """Path of a mod's journal"""
+    from core.build_cache import DEFAULT_CACHE_DIR
+    return os.path.join(cache_dir or DEFAULT_CACHE_DIR, "journal", f"{mod_name}.jsonl")
+
+
+def read_journal(path):
+    """
+    Replay a journal file.
+
+    Returns:
+        dict: mod_name, zip_path, skin_count, started_at, status ("running"
+              builds that never wrote an end line are reported as
+              "interrupted"), error, write_path (the last one), write_paths
+              (all of them), skins (slot -> key) and failed (slot -> error);
+              None if the file is missing or unusable
+    """
+    if not os.path.exists(path):
+        return None
+
+    state = None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Last line cut short by a crash
+                    break
+                event = record.get("event")
+                if event == "start":
+                    if record.get("version") != JOURNAL_VERSION:
+                        return None
+                    state = {
+                        "mod_name": record.get("mod_name"),
+                        "zip_path": record.get("zip_path"),
+                        "skin_count": record.get("skin_count", 0),
+                        "started_at": record.get("started_at"),
+                        "status": "running",
+                        "error": None,
+                        "write_path": None,
+                        "write_paths": [],
+                        "skins": {},
+                        "failed": {},
+                    }
+                elif state is None:
+                    return None
+                elif event == "skin":
+                    state["skins"][record["slot"]] = record["key"]
+                    state["failed"].pop(record["slot"], None)
+                elif event == "failed":
+                    state["failed"][record["slot"]] = record.get("error")
+                    state["skins"].pop(record["slot"], None)
+                elif event == "write":
+                    state["write_path"] = record.get("path")
+                    state["write_paths"].append(record.get("path"))
+                elif event == "end":
+                    state["status"] = record.get("status", "failed")
+                    state["error"] = record.get("error")
+    except OSError as e:
+        print(f"[WARNING] Could not read build journal {path}: {e}")
+        return None
+
+    if state is not None and state["status"] == "running":
+        state["status"] = "interrupted"
+    return state
+
+
+def find_resumable_build(mod_name, cache_dir=None):
+    """
+    Get the unfinished build of a mod, if there is one.
+
+    Args:
+        mod_name: Sanitized mod name
+        cache_dir: Build cache folder (defaults to data/cache/build)
+
+    Returns:
+        dict: Journal state (see read_journal) of a build that failed, was
+              cancelled or was interrupted, or None
+    """
+    if not mod_name:
+        return None
+    state = read_journal(journal_path(mod_name, cache_dir))
+    if state is None or state["status"] == "complete":
+        return None
+    return state
+
+
+class BuildJournal:
+    """
+    Journal of one build. Only used from the thread that runs the build.
+    """
+
+    def __init__(self, mod_name, cache_dir=None):
+        self.mod_name = mod_name
+        self.path = journal_path(mod_name, cache_dir)
+        self.skins = {}
+        self._file = None
+
+    def start(self, zip_path, skin_count, resume=False):
+        """
+        Start a new journal, replacing the previous one.
+
+        ZIPs left half-written by the previous build are removed. When
+        resuming, the skins the previous build finished are carried over.
+
+        Args:
+            zip_path: Mod ZIP the build writes
+            skin_count: Number of skins in the build
+            resume: Carry over the skins of an unfinished previous build
+
+        Returns:
+            dict: Slot -> fragment key of the skins that may be reused
+        """
+        previous = read_journal(self.path)
+        if previous and previous["status"] != "complete":
+            for stale in previous.get("write_paths", []):
+                if stale and stale != zip_path and os.path.exists(stale):
+                    try:
+                        os.remove(stale)
+                        print(f"[DEBUG] Removed partial ZIP of an earlier build: {stale}")
+                    except OSError as e:
+                        print(f"[WARNING] Could not remove partial ZIP {stale}: {e}")
+
+        carried = {}
+        if resume and previous and previous["status"] != "complete":
+            carried = dict(previous["skins"])
+            print(f"[DEBUG] Resuming {previous['status']} build of {self.mod_name}: "
+                  f"{len(carried)}/{previous['skin_count']} skin(s) already built")
+        elif resume:
+            print(f"[DEBUG] No unfinished build of {self.mod_name} to resume, building everything")
+
+        lines = [{
+            "event": "start",
+            "version": JOURNAL_VERSION,
+            "mod_name": self.mod_name,
+            "zip_path": zip_path,
+            "skin_count": skin_count,
+            "started_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "resumed": len(carried),
+        }]
+        lines.extend({"event": "skin", "slot": slot, "key": key} for slot, key in carried.items())
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for record in lines:
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+        self.skins = dict(carried)
+        self._file = open(self.path, "a", encoding="utf-8")
+        return carried
+
+    def _append(self, record):
+        if self._file is None:
+            return
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def skin_done(self, slot, key):
+        """Record a skin whose fragment is complete"""
+        if self.skins.get(slot) == key:
+            return
+        self.skins[slot] = key
+        self._append({"event": "skin", "slot": slot, "key": key})
+
+    def skin_failed(self, slot, error):
+        """Record a skin that failed to build"""
+        self.skins.pop(slot, None)
+        self._append({"event": "failed", "slot": slot, "error": error})
+
+    def writing(self, path):
+        """Record where the ZIP is being written (removed if the build dies)"""
+        self._append({"event": "write", "path": path})
+
+    def finish(self, status, error=None):
+        """
+        Record how the build ended and close the journal.
+
+        Args:
+            status: "complete", "failed" or "cancelled"
+            error: Error message for failed builds
+        """
+        try:
+            self._append({"event": "end", "status": status, "error": error})
+        except OSError as e:
+            # Without an end line the build counts as interrupted, which is
+            # still safe to resume
+            print(f"[WARNING] Could not finish build journal {self.path}: {e}")
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
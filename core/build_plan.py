@@ -0,0 +1,547 @@
+"""
+Build plan
+
+Works out everything a mod build will produce before any file is copied or
+rendered: every path in the ZIP and where it comes from, the final DDS names,
+estimated sizes and all problems that would make the build fail. Only stats,
+directory listings and texture headers (see core/dds.py) are read here, so
+it is cheap enough to run as a pre-flight check from the GUI (plan_build)
+and it is what generate_multi_skin_mod executes.
+
+dedupe_textures is the one step that reads file contents: skins that use the
+same texture (a fleet of car instances, or one livery on several skins) get
+it stored once in the mod, so it is run by the build, not the pre-flight.
+"""
+import hashlib
+import os
+
+from core.cancel import check_cancelled
+from core.dds import DDSError, dds_problems, read_dds_info
+from core.sharding import shard_manifest_path
+from core.texture_convert import is_source_texture
+
+from core.file_ops import (
+    sanitize_mod_name,
+    sanitize_folder_name,
+    normalize_dds_filename,
+    find_info_template,
+    get_beamng_mods_path,
+)
+
+
+class BuildPlanError(Exception):
+    """Raised when a plan is executed while it still has errors"""
+
+
+class BuildPlan:
+    """
+    Complete manifest of a mod build.
+
+    Attributes:
+        mod_name: Sanitized mod name
+        author: Author written into the jbeam files
+        zip_path: Output ZIP path (the mod folder for unpacked output, the
+                  shard manifest for sharded output)
+        zip_exists: True if zip_path (or one of the shard ZIPs) already exists
+        output_format: "zip" or "folder" (unpacked mod)
+        shard_size: Largest shard ZIP in bytes, or None for one ZIP
+        shards: Shards of a sharded build once core.sharding.shard_plan ran
+        skins: One dict per skin, in build order (see plan_build)
+        problems: List of dicts with severity ("error"/"warning"),
+                  car_instance_id, skin_name and message
+        shared_textures: Textures stored once for several skins (see
+                         dedupe_textures): arcname, size and the skins using it
+    """
+
+    def __init__(self, mod_name, author, zip_path, output_format="zip", shard_size=None):
+        self.mod_name = mod_name
+        self.author = author
+        self.zip_path = zip_path
+        self.zip_exists = False
+        self.output_format = output_format
+        self.shard_size = shard_size
+        self.shards = []
+        self.skins = []
+        self.problems = []
+        self.missing_templates = []
+        self.shared_textures = []
+
+    def add_problem(self, severity, message, car_instance_id=None, skin_name=None):
+        self.problems.append({
+            "severity": severity,
+            "car_instance_id": car_instance_id,
+            "skin_name": skin_name,
+            "message": message,
+        })
+
+    @property
+    def entries(self):
+        """Every planned ZIP entry, in the order it is written"""
+        return [entry for skin in self.skins for entry in skin["entries"]]
+
+    @property
+    def errors(self):
+        return [p for p in self.problems if p["severity"] == "error"]
+
+    @property
+    def warnings(self):
+        return [p for p in self.problems if p["severity"] == "warning"]
+
+    @property
+    def ok(self):
+        """True if the build can run"""
+        return not self.errors
+
+    @property
+    def total_size(self):
+        """Estimated uncompressed size of all entries in bytes"""
+        return sum(entry["size"] for entry in self.entries)
+
+    @property
+    def deduplicated_bytes(self):
+        """Texture bytes not written because another skin's copy is shared"""
+        return sum(texture["size"] * (len(texture["skins"]) - 1) for texture in self.shared_textures)
+
+    def summary(self):
+        """Short multi-line description for logs and the GUI"""
+        lines = [
+            f"Build plan for {os.path.basename(self.zip_path)}: {len(self.skins)} skin(s), "
+            f"{len(self.entries)} file(s), ~{self.total_size / (1024 * 1024):.1f} MB"
+        ]
+        if self.shared_textures:
+            lines.append(
+                f"  Texture dedup: {sum(len(t['skins']) for t in self.shared_textures)} skin(s) share "
+                f"{len(self.shared_textures)} texture(s) stored once, "
+                f"{self.deduplicated_bytes / (1024 * 1024):.1f} MB saved"
+            )
+        if self.shards:
+            lines.append(
+                f"  Shards: {len(self.shards)} archive(s) of at most {self.shard_size / (1024 * 1024):.1f} MB: "
+                + ", ".join(
+                    f"{os.path.basename(shard['zip_path'])} ({len(shard['skins'])} skin(s), "
+                    f"~{shard['size'] / (1024 * 1024):.1f} MB)"
+                    for shard in self.shards[:5]
+                )
+                + (f" and {len(self.shards) - 5} more" if len(self.shards) > 5 else "")
+            )
+        for problem in self.problems:
+            where = "/".join(p for p in (problem["car_instance_id"], problem["skin_name"]) if p)
+            lines.append(f"  [{problem['severity'].upper()}] {where + ': ' if where else ''}{problem['message']}")
+        return "\n".join(lines)
+
+    def as_dict(self):
+        """JSON-friendly version of the plan (for dry runs)"""
+        return {
+            "mod_name": self.mod_name,
+            "zip_path": self.zip_path,
+            "zip_exists": self.zip_exists,
+            "output_format": self.output_format,
+            "shard_size": self.shard_size,
+            "shards": [
+                {
+                    "index": shard["index"],
+                    "zip_path": shard["zip_path"],
+                    "size": shard["size"],
+                    "skins": [f"{planned['car_instance_id']}/{planned['skin_name']}" for planned in shard["skins"]],
+                }
+                for shard in self.shards
+            ],
+            "total_size": self.total_size,
+            "deduplicated_bytes": self.deduplicated_bytes,
+            "shared_textures": self.shared_textures,
+            "skins": [
+                {key: value for key, value in skin.items() if key not in ("skin", "template_files")}
+                for skin in self.skins
+            ],
+            "problems": self.problems,
+        }
+
+    def raise_for_errors(self):
+        """
+        Raise the same exceptions a failing build would.
+
+        Raises:
+            FileNotFoundError: A vehicle template is missing
+            FileExistsError: The ZIP exists and the plan does not replace it
+            SkinBuildError: One or more skins cannot be built
+            BuildPlanError: Any other problem
+        """
+        from core.file_ops import SkinBuildError
+
+        if self.missing_templates:
+            base_carid, template_path = self.missing_templates[0]
+            raise FileNotFoundError(
+                f"No template found for vehicle '{base_carid}'.\n"
+                f"Expected location: {template_path}\n\n"
+                f"Please make sure the vehicle exists in the Developer tab."
+            )
+
+        errors = self.errors
+        existing = [p["message"] for p in errors if p["message"].startswith("ZIP already exists: ")]
+        if self.zip_exists and existing:
+            raise FileExistsError(
+                f"A mod named '{os.path.basename(existing[0][len('ZIP already exists: '):])}' already exists.\n"
+                f"Please choose a different name or delete the existing file."
+            )
+
+        skin_errors = [p for p in errors if p["skin_name"] is not None]
+        if skin_errors:
+            raise SkinBuildError([
+                (p["car_instance_id"], p["skin_name"], p["message"]) for p in skin_errors
+            ])
+
+        if errors:
+            raise BuildPlanError(errors[0]["message"])
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _list_template_files(template_path):
+    """
+    Template files copied into every skin folder (existing .dds files are
+    skipped), in a stable order.
+
+    Returns:
+        list: (rel_path, file_name, full_path, size) tuples
+    """
+    template_files = []
+    for root_dir, dirs, files in os.walk(template_path):
+        dirs.sort()
+        for file in sorted(files):
+            if file.lower().endswith(".dds"):
+                continue
+            full_path = os.path.join(root_dir, file)
+            rel_path = os.path.relpath(full_path, template_path).replace(os.sep, "/")
+            template_files.append((rel_path, file, full_path, _file_size(full_path)))
+    return template_files
+
+
+def _template_kind(file_name):
+    """How a template file ends up in the skin folder"""
+    if file_name.endswith(".jbeam"):
+        return "jbeam"
+    if file_name.endswith(".json") and not file_name.startswith("info"):
+        return "json"
+    return "copy"
+
+
+def plan_build(project_data, output_path=None, update_existing=False, output_format="zip", shard_size=None):
+    """
+    Plan a multi-skin build without writing anything.
+
+    Args:
+        project_data: Project dict with mod_name, author and cars
+        output_path: Folder the ZIP goes to (defaults to the BeamNG mods
+                     folder, or its unpacked/ folder for unpacked output)
+        update_existing: An existing ZIP will be replaced instead of being an error
+        output_format: "zip", or "folder" to write the mod unpacked into
+                       <output_path>/<mod name>; an existing folder is
+                       synced, never an error
+        shard_size: Split a ZIP build into shard ZIPs of at most this many
+                    bytes; zip_path is then the shard manifest (the shards
+                    themselves are planned by core.sharding.shard_plan)
+
+    Returns:
+        BuildPlan: Each skin dict has car_instance_id, base_carid, skin_name,
+                   skin_folder, template_path, dds_path, dds_filename,
+                   final_dds_filename, texture (DDSInfo.as_dict() of the
+                   texture's header, or None), entries (arcname, kind,
+                   source, size), plus the original skin dict and template file list for
+                   the executor
+    """
+    mod_name = sanitize_mod_name(project_data.get("mod_name", ""))
+    author = project_data.get("author", "Unknown")
+    if output_format not in ("zip", "folder"):
+        raise ValueError(f"Unknown output format: {output_format}")
+    if output_format == "folder":
+        shard_size = None
+        zip_path = os.path.join(output_path or os.path.join(get_beamng_mods_path(), "unpacked"), mod_name)
+    elif shard_size:
+        zip_path = shard_manifest_path(output_path or get_beamng_mods_path(), mod_name)
+    else:
+        shard_size = None
+        zip_path = os.path.join(output_path or get_beamng_mods_path(), f"{mod_name}.zip")
+
+    plan = BuildPlan(mod_name, author, zip_path, output_format, shard_size)
+
+    if not mod_name:
+        plan.add_problem("error", "Mod name is empty")
+
+    plan.zip_exists = os.path.exists(zip_path)
+    if output_format == "folder":
+        if plan.zip_exists and not os.path.isdir(zip_path):
+            plan.add_problem("error", f"Not a folder: {zip_path}")
+        # BeamNG loads mods/<name>.zip and mods/unpacked/<name> side by side
+        packed = os.path.join(os.path.dirname(os.path.dirname(zip_path)), f"{mod_name}.zip")
+        if os.path.basename(os.path.dirname(zip_path)) == "unpacked" and os.path.exists(packed):
+            plan.add_problem("warning", f"The packed mod is installed too and will load alongside: {packed}")
+    elif plan.zip_exists and not update_existing and not shard_size:
+        # (shard ZIPs are checked by shard_plan once the shards are known)
+        plan.add_problem("error", f"ZIP already exists: {zip_path}")
+    if output_format == "zip" and not shard_size:
+        manifest = shard_manifest_path(os.path.dirname(zip_path), mod_name)
+        if os.path.exists(manifest):
+            plan.add_problem("warning", f"Shards of an earlier sharded build are installed too and will load "
+                                        f"alongside (see {os.path.basename(manifest)})")
+
+    cars = project_data.get("cars", {})
+    if not any(car_info.get("skins") for car_info in cars.values()):
+        plan.add_problem("warning", "Project has no skins")
+
+    template_cache = {}
+    writers = {}
+
+    for car_instance_id, car_info in cars.items():
+        base_carid = car_info.get("base_carid", car_instance_id)
+        skins = car_info.get("skins", [])
+
+        template_path = os.path.join(os.getcwd(), "vehicles", base_carid, "SKINNAME")
+        if template_path not in template_cache:
+            if os.path.isdir(template_path):
+                template_cache[template_path] = (
+                    _list_template_files(template_path),
+                    find_info_template(os.path.dirname(template_path))
+                )
+            else:
+                template_cache[template_path] = None
+                plan.missing_templates.append((base_carid, template_path))
+                plan.add_problem("error", f"No template found for vehicle '{base_carid}'", car_instance_id)
+
+        if template_cache[template_path] is None:
+            continue
+        template_files, info_template = template_cache[template_path]
+
+        for skin_idx, skin in enumerate(skins):
+            skin_name = skin.get("name", "")
+            skin_folder = sanitize_folder_name(skin_name)
+            dds_path = skin.get("dds_path", "")
+            dds_filename = os.path.basename(dds_path)
+            skin_prefix = f"vehicles/{base_carid}/{skin_folder}"
+
+            def problem(severity, message):
+                plan.add_problem(severity, message, car_instance_id, skin_name)
+
+            if not skin_folder:
+                problem("error", "Skin name is empty")
+
+            texture = None
+            if skin.get("texture_error"):
+                problem("error", f"Texture conversion failed: {skin['texture_error']}")
+            elif not dds_path or not os.path.isfile(dds_path):
+                problem("error", f"FileNotFoundError: DDS file not found: {dds_path}")
+            elif is_source_texture(dds_path):
+                # Not converted yet (a pre-flight plan): the build converts it
+                # to <name>.dds first, see core/texture_convert.py
+                dds_filename = os.path.splitext(dds_filename)[0] + ".dds"
+            else:
+                # Header only: size, format and mipmaps without decoding anything
+                try:
+                    texture = read_dds_info(dds_path)
+                except (DDSError, OSError) as e:
+                    problem("warning", f"Texture is not a valid DDS file, the game may not show it: {e}")
+                else:
+                    for severity, message in dds_problems(texture):
+                        problem(severity, message)
+
+            new_dds_filename, dds_error = normalize_dds_filename(dds_filename, base_carid)
+            if dds_error:
+                problem("warning", f"DDS name '{dds_filename}' kept as-is: {dds_error}")
+            final_dds_filename = new_dds_filename or dds_filename
+
+            entries = []
+            for rel_path, file, full_path, size in template_files:
+                kind = _template_kind(file)
+                entries.append({
+                    "arcname": f"{skin_prefix}/{rel_path}",
+                    "kind": "template" if kind == "copy" else f"rendered-{kind}",
+                    "source": full_path,
+                    "size": size,
+                })
+            entries.append({
+                "arcname": f"{skin_prefix}/{final_dds_filename}",
+                "kind": "dds",
+                "source": dds_path,
+                "size": texture.file_size if texture else _file_size(dds_path),
+            })
+
+            config_data = skin.get("config_data")
+            if config_data is not None:
+                pc_path = config_data.get("pc_file_path")
+                jpg_path = config_data.get("jpg_file_path")
+                config_ok = True
+                for label, path in ((".pc", pc_path), (".jpg", jpg_path)):
+                    if path and not os.path.exists(path):
+                        problem("warning", f"Config data skipped, {label} file not found: {path}")
+                        config_ok = False
+                if config_ok and not info_template:
+                    problem("warning", "Config data skipped, no info.json template for this vehicle")
+                    config_ok = False
+
+                if config_ok:
+                    vehicle_prefix = f"vehicles/{base_carid}"
+                    if pc_path:
+                        entries.append({"arcname": f"{vehicle_prefix}/{skin_folder}.pc", "kind": "config",
+                                        "source": pc_path, "size": _file_size(pc_path)})
+                    if jpg_path:
+                        entries.append({"arcname": f"{vehicle_prefix}/{skin_folder}.jpg", "kind": "config",
+                                        "source": jpg_path, "size": _file_size(jpg_path)})
+                    entries.append({"arcname": f"{vehicle_prefix}/info_{skin_folder}.json", "kind": "rendered-info",
+                                    "source": info_template, "size": _file_size(info_template)})
+
+            if "material_properties" in skin and not any(
+                file.endswith(".materials.json") or file == "materials.json"
+                for _, file, _, _ in template_files
+            ):
+                problem("warning", "Material properties skipped, template has no materials files")
+
+            # Two skins must never write the same file (e.g. duplicate skin names)
+            for entry in entries:
+                other = writers.get(entry["arcname"])
+                if other is not None:
+                    problem("error", f"FileExistsError: {entry['arcname']} is also written by '{other}'")
+                    break
+            for entry in entries:
+                writers.setdefault(entry["arcname"], skin_name)
+
+            plan.skins.append({
+                "car_instance_id": car_instance_id,
+                "base_carid": base_carid,
+                "skin_name": skin_name,
+                "skin_folder": skin_folder,
+                "skin_idx": skin_idx,
+                "skin_count": len(skins),
+                "template_path": template_path,
+                "dds_path": dds_path,
+                "dds_filename": dds_filename,
+                "final_dds_filename": final_dds_filename,
+                "texture": texture.as_dict() if texture else None,
+                "entries": entries,
+                "skin": skin,
+                "template_files": [(rel_path, file, full_path) for rel_path, file, full_path, _ in template_files],
+            })
+
+    return plan
+
+
+# Bytes read from each end of a texture before hashing it in full
+TEXTURE_SAMPLE_SIZE = 64 * 1024
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _texture_sample(path):
+    """Hash of a texture's first and last TEXTURE_SAMPLE_SIZE bytes"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        digest.update(f.read(TEXTURE_SAMPLE_SIZE))
+        f.seek(max(0, os.path.getsize(path) - TEXTURE_SAMPLE_SIZE))
+        digest.update(f.read(TEXTURE_SAMPLE_SIZE))
+    return digest.hexdigest()
+
+
+def _texture_hash(path, progress=None, cancel_token=None):
+    """Streaming hash of a whole texture"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            if progress:
+                progress.advance(len(chunk), path)
+            check_cancelled(cancel_token)
+    return digest.hexdigest()
+
+
+def dedupe_textures(plan, progress=None, cancel_token=None):
+    """
+    Store every distinct DDS texture of a plan only once.
+
+    Textures are compared by size first, then by a hash of their first and
+    last bytes (the last bytes are the smallest mip levels, which differ for
+    almost any two different images), and only textures that still match
+    are hashed in full. The same file used by several skins is never read.
+
+    The first skin (in build order) using a texture keeps its DDS entry.
+    Later skins with the same content lose theirs and get 'shared_dds', the
+    arcname their materials are pointed at. A skin none of whose materials
+    refers to its texture keeps its entry (see
+    core.materials.uses_shared_texture), so planned sizes stay exact.
+
+    Args:
+        plan: BuildPlan from plan_build (changed in place)
+        progress: Optional BuildProgress; a "dedupe" stage is added when
+                  textures have to be hashed in full
+        cancel_token: Optional CancelToken, checked per chunk hashed
+
+    Returns:
+        int: Bytes saved (also in plan.deduplicated_bytes)
+    """
+    candidates = []
+    for planned in plan.skins:
+        for entry in planned["entries"]:
+            if entry["kind"] == "dds" and os.path.isfile(entry["source"]):
+                candidates.append((planned, entry))
+
+    by_size = {}
+    for planned, entry in candidates:
+        by_size.setdefault(entry["size"], []).append((planned, entry))
+
+    # Content key per source file: its real path when no other file of that
+    # size exists, its full hash when one might have the same content
+    content_keys = {}
+    to_hash = []
+    for group in by_size.values():
+        paths = sorted({os.path.normcase(os.path.realpath(entry["source"])) for _, entry in group})
+        if len(paths) == 1:
+            content_keys[paths[0]] = ("file", paths[0])
+            continue
+        by_sample = {}
+        for path in paths:
+            check_cancelled(cancel_token)
+            by_sample.setdefault(_texture_sample(path), []).append(path)
+        for same_sample in by_sample.values():
+            if len(same_sample) == 1:
+                content_keys[same_sample[0]] = ("file", same_sample[0])
+            else:
+                to_hash.extend(same_sample)
+
+    if to_hash and progress:
+        progress.add_stage("dedupe", "Checking textures", sum(os.path.getsize(path) for path in to_hash))
+        progress.start_stage("dedupe")
+    for path in to_hash:
+        content_keys[path] = ("sha256", _texture_hash(path, progress, cancel_token))
+
+    from core.materials import uses_shared_texture
+    owners = {}
+    shared = {}
+    for planned, entry in candidates:
+        key = content_keys[os.path.normcase(os.path.realpath(entry["source"]))]
+        slot = f"{planned['car_instance_id']}/{planned['skin_name']}"
+        owner = owners.get(key)
+        if owner is None:
+            owners[key] = entry
+            continue
+        if not uses_shared_texture(planned, owner["arcname"]):
+            # No material refers to the texture: the build keeps its own copy
+            continue
+        planned["shared_dds"] = owner["arcname"]
+        planned["entries"].remove(entry)
+        texture = shared.get(key)
+        if texture is None:
+            owner_skin = next(p for p in plan.skins if owner in p["entries"])
+            texture = shared[key] = {
+                "arcname": owner["arcname"],
+                "size": owner["size"],
+                "skins": [f"{owner_skin['car_instance_id']}/{owner_skin['skin_name']}"],
+            }
+        texture["skins"].append(slot)
+
+    plan.shared_textures = list(shared.values())
+    return plan.deduplicated_bytes
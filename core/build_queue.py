@@ -0,0 +1,309 @@
+"""
+Background build queue
+
+The Generate button adds a job to the BuildQueue instead of building right
+away, so the project can be edited (and the next mod queued) while earlier
+ones build. Every job gets a deep copy of project_data taken when it is
+queued; later edits never leak into a queued build.
+
+The queue runs up to max_concurrent jobs at once, each through
+core/build_worker.py (a worker process by default). Two jobs that write the
+same mod never run at the same time: the later one waits. Like the build
+runners, the queue is driven by poll() from the owner's event loop (a Tk
+after() loop in the GUI) and never blocks.
+
+Finished jobs move to a short history with their status, timings and
+result, newest first.
+"""
+import copy
+import itertools
+import os
+import time
+
+# Finished jobs kept in the history
+HISTORY_SIZE = 50
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+def split_project_by_car(project_data):
+    """
+    One project per car, e.g. to queue a fleet as separate mods.
+
+    Returns:
+        list: (car_instance_id, project dict) tuples; each mod is named
+              "<mod name>_<car_instance_id>"
+    """
+    projects = []
+    for car_instance_id, car_info in project_data.get("cars", {}).items():
+        project = {key: value for key, value in project_data.items() if key != "cars"}
+        project["cars"] = {car_instance_id: copy.deepcopy(car_info)}
+        project["mod_name"] = f"{project_data.get('mod_name', '')}_{car_instance_id}"
+        projects.append((car_instance_id, project))
+    return projects
+
+
+def build_target(project_data, build_settings):
+    """What a build writes: (output folder, mod name, output format)"""
+    from core.file_ops import sanitize_mod_name
+    return (
+        os.path.abspath(build_settings.get("output_path") or ""),
+        sanitize_mod_name(project_data.get("mod_name", "")),
+        build_settings.get("output_format", "zip"),
+    )
+
+
+class BuildJob:
+    """
+    One queued generation.
+
+    Attributes:
+        id: Number, unique within the queue
+        label: Name shown to the user (the mod name)
+        project_data: Snapshot of the project taken when the job was queued
+        build_settings: Keyword arguments for start_build
+        status: "queued", "running", "done", "failed" or "cancelled"
+        status_text: Latest progress line (see ProgressEvent.format)
+        fraction: Progress between 0.0 and 1.0
+        result: ZIP path or mod folder of a finished job
+        report: BuildReport.as_dict() of a finished job (see
+                core/build_report.py)
+        error: Error payload of a failed job (see core/build_worker.py)
+        queued_at / started_at / finished_at: time.time() values
+    """
+
+    def __init__(self, job_id, label, project_data, build_settings):
+        self.id = job_id
+        self.label = label
+        self.project_data = project_data
+        self.build_settings = build_settings
+        self.status = QUEUED
+        self.status_text = "Waiting..."
+        self.fraction = 0.0
+        self.result = None
+        self.report = None
+        self.error = None
+        self.queued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_latency = None
+        self.runner = None
+
+    @property
+    def skin_count(self):
+        return sum(len(car.get("skins", [])) for car in self.project_data.get("cars", {}).values())
+
+    @property
+    def target(self):
+        """What the job writes; jobs with the same target never run together"""
+        return build_target(self.project_data, self.build_settings)
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def duration(self):
+        """Seconds the job ran (so far), or None if it has not started"""
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.started_at
+
+    def exception(self):
+        """The exception a failed job raised (see BuildProcess.exception)"""
+        from core.build_worker import BuildThread
+        return BuildThread.exception(self.error)
+
+    def as_dict(self):
+        """JSON-friendly summary (no project data)"""
+        return {
+            "id": self.id,
+            "label": self.label,
+            "status": self.status,
+            "status_text": self.status_text,
+            "skins": self.skin_count,
+            "result": self.result,
+            "report": self.report,
+            "error": self.error,
+            "queued_at": self.queued_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration": self.duration,
+        }
+
+
+class BuildQueue:
+    """
+    Runs queued builds in the background.
+    """
+
+    def __init__(self, start_job=None, max_concurrent=1, history_size=HISTORY_SIZE):
+        """
+        Args:
+            start_job: Called with (project_data, build_settings), returns a
+                       started build runner; defaults to
+                       core.build_worker.start_build
+            max_concurrent: Jobs running at the same time
+            history_size: Finished jobs kept in self.history
+        """
+        if start_job is None:
+            from core.build_worker import start_build
+
+            def start_job(project_data, build_settings):
+                return start_build(project_data, **build_settings)
+
+        self.start_job = start_job
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.history_size = history_size
+        self.jobs = []
+        self.history = []
+        self._ids = itertools.count(1)
+
+    @property
+    def running(self):
+        return [job for job in self.jobs if job.status == RUNNING]
+
+    @property
+    def queued(self):
+        return [job for job in self.jobs if job.status == QUEUED]
+
+    @property
+    def busy(self):
+        return bool(self.jobs)
+
+    def enqueue(self, project_data, build_settings, label=None):
+        """
+        Queue a build of a snapshot of project_data.
+
+        Args:
+            project_data: Project dict (deep-copied here)
+            build_settings: Keyword arguments for start_build (use_process,
+                            output_path, workers, ...)
+            label: Name to show (defaults to the mod name)
+
+        Returns:
+            BuildJob
+        """
+        snapshot = copy.deepcopy(project_data)
+        job = BuildJob(next(self._ids), label or snapshot.get("mod_name", ""), snapshot, dict(build_settings))
+        self.jobs.append(job)
+        print(f"[DEBUG] Build queue: queued #{job.id} {job.label} ({job.skin_count} skins), "
+              f"{len(self.jobs)} job(s) in the queue")
+        return job
+
+    def writes(self, project_data, build_settings):
+        """True if a queued or running job writes the mod this build would write"""
+        target = build_target(project_data, build_settings)
+        return any(job.target == target for job in self.jobs)
+
+    def cancel(self, job_id):
+        """Cancel a queued job (dropped at once) or a running one (stops at its next check)"""
+        for job in self.jobs:
+            if job.id != job_id:
+                continue
+            if job.status == QUEUED:
+                job.status_text = "Cancelled before it started"
+                self._finish(job, CANCELLED)
+            elif job.runner is not None:
+                job.status_text = "Cancelling..."
+                job.runner.cancel()
+            return True
+        return False
+
+    def cancel_all(self):
+        for job in list(self.jobs):
+            self.cancel(job.id)
+
+    def clear_history(self):
+        self.history = []
+
+    def poll(self):
+        """
+        Collect what the running jobs report and start queued ones.
+
+        Returns:
+            list: (job, kind, payload) events: ("started", None), the build's
+                  "log" events, the latest "progress" event of each job per
+                  poll, the "report" of a finished build, and
+                  "done"/"cancelled"/"error" when a job ends (job.status is
+                  already updated then)
+        """
+        events = []
+
+        for job in self.running:
+            latest_progress = None
+            for kind, payload in job.runner.poll():
+                if kind == "progress":
+                    latest_progress = payload
+                elif kind == "log":
+                    events.append((job, kind, payload))
+                elif kind == "report":
+                    job.report = payload
+                    events.append((job, kind, payload))
+                else:
+                    if latest_progress is not None:
+                        events.append((job, "progress", latest_progress))
+                        latest_progress = None
+                    self._end(job, kind, payload)
+                    events.append((job, kind, payload))
+                    break
+            if latest_progress is not None:
+                job.fraction = latest_progress.fraction
+                if job.runner.cancel_requested_at is None:
+                    job.status_text = latest_progress.format()
+                events.append((job, "progress", latest_progress))
+
+        for job in self.queued:
+            if len(self.running) >= self.max_concurrent:
+                break
+            if any(other.target == job.target for other in self.running):
+                job.status_text = "Waiting for the previous build of this mod..."
+                continue
+            if self._start(job):
+                events.append((job, "started", None))
+            else:
+                events.append((job, "error", job.error))
+
+        return events
+
+    def _start(self, job):
+        """Start a queued job; False if it could not start (it is FAILED then)"""
+        job.status = RUNNING
+        job.status_text = "Starting..."
+        job.started_at = time.time()
+        print(f"[DEBUG] Build queue: starting #{job.id} {job.label} "
+              f"(waited {job.started_at - job.queued_at:.1f}s)")
+        try:
+            job.runner = self.start_job(job.project_data, job.build_settings)
+        except Exception as e:
+            job.error = {"type": type(e).__name__, "message": str(e)}
+            job.status_text = f"Could not start: {e}"
+            self._finish(job, FAILED)
+            return False
+        return True
+
+    def _end(self, job, kind, payload):
+        if kind == "done":
+            job.result = payload
+            job.fraction = 1.0
+            job.status_text = "Done"
+            self._finish(job, DONE)
+        elif kind == "cancelled":
+            job.cancel_latency = job.runner.cancel_latency()
+            job.status_text = "Cancelled"
+            self._finish(job, CANCELLED)
+        else:
+            job.error = payload
+            job.status_text = f"Failed: {payload.get('message', '')}".splitlines()[0]
+            self._finish(job, FAILED)
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+        job.runner = None
+        self.jobs.remove(job)
+        self.history.insert(0, job)
+        del self.history[self.history_size:]
+        duration = f" after {job.duration:.1f}s" if job.duration is not None else ""
+        print(f"[DEBUG] Build queue: #{job.id} {job.label} {status}{duration}, "
+              f"{len(self.jobs)} job(s) left")
@@ -0,0 +1,505 @@
+"""
+Build reports
+
+generate_multi_skin_mod returns a BuildReport describing the build it ran:
+
+    phases        wall and CPU seconds of each step of the build (plan,
+                  dedupe, render, zip or sync, install)
+    skin stages   wall and CPU seconds spent per step inside the skins
+                  (copy, jbeam, json, materials, config, dds-fix,
+                  compress), summed over all skins
+    skins         per skin: time, bytes read from its sources (0 for a
+                  skin reused from the build cache), its content size
+                  (uncompressed) and the bytes it takes in the archive
+    bytes         measured I/O: bytes read from sources, bytes written to
+                  the output (for ZIPs split into entries compressed by
+                  this build and entries copied raw from the build cache
+                  or the previous ZIP; for folders only the files the sync
+                  rewrote), plus the mod's content size and size on disk
+    cache         skins reused from the build cache, entries reused from
+                  the previous ZIP, unchanged files of an unpacked sync and
+                  bytes saved by texture dedup
+    memory        peak resident memory of the build process and of its
+                  largest finished worker process
+
+Phase CPU time is the CPU time of the whole build process; skin stage CPU
+time is measured per thread inside the worker that built the skin, so it
+also covers skins built in worker processes. The OS only keeps a process's
+peak memory since it started, so it is the build's own peak only for the
+first build of a dedicated worker process (builds started from the GUI, see
+core/build_worker.py). Other builds (a batch or watch mode on the command
+line, thread fallback builds) record it as process_peak_rss_bytes, which
+includes everything the process did before.
+
+Reports are saved as JSON (save_build_report) next to the project, one
+file per mod holding the last HISTORY_SIZE builds, so a regression shows up
+as the difference to the previous build (BuildReport.compare).
+"""
+import contextlib
+import json
+import os
+import platform
+import sys
+import threading
+import time
+
+# Bump when the report layout changes
+REPORT_VERSION = 2
+
+# Builds kept per report file
+HISTORY_SIZE = 20
+
+# Folder of the reports of projects that were never saved
+DEFAULT_REPORT_DIR = os.path.join("data", "build_reports")
+
+# The app's own folder (version.txt lives here)
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Smaller differences are never marked as a regression (timer noise)
+MIN_SECONDS = 0.05
+MIN_BYTES = 1024 * 1024
+
+SKIN_STAGES = ("copy", "jbeam", "json", "materials", "config", "dds-fix", "compress")
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+# Set in worker processes that exist to run builds; the first build of such
+# a process owns its peak memory
+_dedicated_process = False
+_builds_started = 0
+_builds_lock = threading.Lock()
+
+
+def mark_dedicated_process():
+    """Declare this process a build worker (peak memory is then per build)"""
+    global _dedicated_process
+    _dedicated_process = True
+
+
+def build_report_path(project_path, mod_name):
+    """
+    Where a mod's reports are saved: <mod name>.buildreport.json next to the
+    project file, or in data/build_reports/ for an unsaved project.
+    """
+    folder = os.path.dirname(os.path.abspath(project_path)) if project_path else DEFAULT_REPORT_DIR
+    return os.path.join(folder, f"{mod_name}.buildreport.json")
+
+
+def app_version():
+    """Version from version.txt, or None"""
+    try:
+        with open(os.path.join(APP_ROOT, "version.txt"), "r", encoding="utf-8") as f:
+            return f.read().replace("Version:", "").strip() or None
+    except OSError:
+        return None
+
+
+def _windows_peak_rss():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.PeakWorkingSetSize
+
+
+def peak_memory():
+    """
+    Returns:
+        tuple: (peak RSS of this process, peak RSS of its largest finished
+               child process) in bytes; None where it cannot be measured
+    """
+    if resource is None:
+        try:
+            return _windows_peak_rss(), None
+        except Exception:
+            return None, None
+    # ru_maxrss is in KB on Linux, in bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return own, children or None
+
+
+class SkinClock:
+    """
+    Wall and CPU time of one skin's stages. Created inside the worker that
+    builds the skin; finish() gives the plain dict stored in its result.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def add(self, name, wall_seconds, cpu_seconds):
+        row = self.stages.setdefault(name, [0.0, 0.0])
+        row[0] += wall_seconds
+        row[1] += cpu_seconds
+
+    def finish(self):
+        """
+        Returns:
+            dict: wall, cpu (seconds since the clock was created) and
+                  stages (name -> [wall, cpu])
+        """
+        return {
+            "wall": time.perf_counter() - self._wall,
+            "cpu": time.thread_time() - self._cpu,
+            "stages": self.stages,
+        }
+
+
+def add_skin_time(timings, stage, wall_seconds, cpu_seconds):
+    """Add a stage to a finished SkinClock dict (e.g. work done after it)"""
+    row = timings["stages"].setdefault(stage, [0.0, 0.0])
+    row[0] += wall_seconds
+    row[1] += cpu_seconds
+    timings["wall"] += wall_seconds
+    timings["cpu"] += cpu_seconds
+
+
+def _seconds(wall, cpu):
+    return {"wall_seconds": round(wall, 4), "cpu_seconds": round(cpu, 4)}
+
+
+class BuildReport:
+    """
+    What one build did and how long each part took.
+
+    Attributes:
+        mod_name: Sanitized mod name
+        output_path: ZIP, shard manifest or mod folder that was written
+        output_format: "zip" or "folder"
+        settings: The build options that affect speed (workers, mode, ...)
+        phases: Phase -> wall_seconds, cpu_seconds (in the order they ran)
+        skin_stages: Stage -> wall_seconds, cpu_seconds, skins (summed over
+                     the skins that ran it)
+        skins: Per skin: skin ("car/skin"), cached, wall_seconds,
+               cpu_seconds, read_bytes, content_bytes, stored_bytes
+        bytes: read (from sources), written (to the output), compressed
+               (ZIP entries compressed by this build) and copied (ZIP
+               entries copied raw), content (uncompressed mod size) and
+               output (size on disk)
+        cache: skins_reused, skins_rendered, zip_entries_reused,
+               zip_bytes_reused, files_unchanged, dedup_bytes_saved
+        memory: peak_rss_bytes, peak_worker_rss_bytes (None unless the
+                build ran alone in its process) and process_peak_rss_bytes
+        compression: CompressionReport.as_dict() of the archive(s)
+    """
+
+    def __init__(self, mod_name, output_path=None, output_format="zip", settings=None):
+        self.mod_name = mod_name
+        self.output_path = output_path
+        self.output_format = output_format
+        self.settings = dict(settings or {})
+        self.started_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.app_version = app_version()
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.phases = {}
+        self.skin_stages = {}
+        self.skins = []
+        self.bytes = {"read": 0, "written": 0, "compressed": 0, "copied": 0, "content": 0, "output": 0}
+        self.cache = {
+            "skins_reused": 0,
+            "skins_rendered": 0,
+            "zip_entries_reused": 0,
+            "zip_bytes_reused": 0,
+            "files_unchanged": 0,
+            "dedup_bytes_saved": 0,
+        }
+        self.memory = {"peak_rss_bytes": None, "peak_worker_rss_bytes": None, "process_peak_rss_bytes": None}
+        self.compression = {}
+        self._lock = threading.Lock()
+        global _builds_started
+        with _builds_lock:
+            _builds_started += 1
+            self._owns_process = _dedicated_process and _builds_started == 1
+        self._start = (time.perf_counter(), time.process_time())
+        self._phase = None
+
+    def start_phase(self, name):
+        """End the running phase (if any) and start timing name"""
+        now = (time.perf_counter(), time.process_time())
+        with self._lock:
+            self._end_phase(now)
+            self._phase = (name, now)
+
+    def _end_phase(self, now):
+        if self._phase is None:
+            return
+        name, (wall, cpu) = self._phase
+        row = self.phases.setdefault(name, {"wall_seconds": 0.0, "cpu_seconds": 0.0})
+        row["wall_seconds"] = round(row["wall_seconds"] + now[0] - wall, 4)
+        row["cpu_seconds"] = round(row["cpu_seconds"] + now[1] - cpu, 4)
+        self._phase = None
+
+    def add_skin(self, slot, timings=None, cached=False, read_bytes=0, content_bytes=0, stored_bytes=0):
+        """
+        Record one skin.
+
+        Args:
+            slot: "car_instance_id/skin name"
+            timings: SkinClock.finish() dict of the worker that built it
+                     (None for skins reused from the build cache)
+            cached: The skin was reused from the build cache
+            read_bytes: Bytes read from its sources (0 when cached)
+            content_bytes: Uncompressed size of its files in the mod
+            stored_bytes: Size of its files in the archive (content_bytes
+                          for folder output)
+        """
+        timings = timings or {"wall": 0.0, "cpu": 0.0, "stages": {}}
+        for stage, (wall, cpu) in timings["stages"].items():
+            row = self.skin_stages.setdefault(stage, {"wall_seconds": 0.0, "cpu_seconds": 0.0, "skins": 0})
+            row["wall_seconds"] = round(row["wall_seconds"] + wall, 4)
+            row["cpu_seconds"] = round(row["cpu_seconds"] + cpu, 4)
+            row["skins"] += 1
+        self.skins.append({
+            "skin": slot,
+            "cached": cached,
+            "wall_seconds": round(timings["wall"], 4),
+            "cpu_seconds": round(timings["cpu"], 4),
+            "read_bytes": read_bytes,
+            "content_bytes": content_bytes,
+            "stored_bytes": stored_bytes,
+        })
+        self.bytes["read"] += read_bytes
+        self.bytes["content"] += content_bytes
+        self.cache["skins_reused" if cached else "skins_rendered"] += 1
+
+    def finish(self, output_path=None):
+        """Stop the clocks and take the peak memory"""
+        now = (time.perf_counter(), time.process_time())
+        with self._lock:
+            self._end_phase(now)
+        if output_path is not None:
+            self.output_path = output_path
+        self.wall_seconds = round(now[0] - self._start[0], 4)
+        self.cpu_seconds = round(now[1] - self._start[1], 4)
+        own, workers = peak_memory()
+        self.memory = {
+            "peak_rss_bytes": own if self._owns_process else None,
+            "peak_worker_rss_bytes": workers if self._owns_process else None,
+            "process_peak_rss_bytes": own,
+        }
+
+    def as_dict(self):
+        """JSON-friendly version of the report"""
+        return {
+            "version": REPORT_VERSION,
+            "mod_name": self.mod_name,
+            "output_path": self.output_path,
+            "output_format": self.output_format,
+            "started_at": self.started_at,
+            "app_version": self.app_version,
+            "python": platform.python_version(),
+            "platform": sys.platform,
+            "settings": self.settings,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "phases": self.phases,
+            "skin_stages": {
+                stage: self.skin_stages[stage]
+                for stage in sorted(self.skin_stages, key=lambda s: SKIN_STAGES.index(s) if s in SKIN_STAGES else 99)
+            },
+            "bytes": self.bytes,
+            "cache": self.cache,
+            "memory": self.memory,
+            "compression": self.compression,
+            "skins": self.skins,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """A report loaded from JSON (see load_build_reports)"""
+        report = cls(data.get("mod_name"), data.get("output_path"), data.get("output_format", "zip"),
+                     data.get("settings"))
+        for key in ("started_at", "app_version", "wall_seconds", "cpu_seconds", "phases", "skin_stages",
+                    "skins", "bytes", "cache", "memory", "compression"):
+            if key in data:
+                setattr(report, key, data[key])
+        return report
+
+    def format(self, slowest=5):
+        """Multi-line summary for logs and the GUI"""
+        mb = 1024 * 1024
+        lines = [
+            f"Build report for {self.mod_name} ({len(self.skins)} skin(s)), {self.started_at}"
+            + (f", version {self.app_version}" if self.app_version else ""),
+            f"  Total: {self.wall_seconds:.2f}s wall, {self.cpu_seconds:.2f}s CPU"
+            + (f", peak memory {self.memory['peak_rss_bytes'] / mb:.0f} MB" if self.memory.get("peak_rss_bytes") else "")
+            + (f" (largest child process {self.memory['peak_worker_rss_bytes'] / mb:.0f} MB)"
+               if self.memory.get("peak_worker_rss_bytes") else "")
+            + (f", process peak memory {self.memory['process_peak_rss_bytes'] / mb:.0f} MB (since the process "
+               f"started, not this build's)"
+               if not self.memory.get("peak_rss_bytes") and self.memory.get("process_peak_rss_bytes") else ""),
+            f"  {'Phase':<24}{'Wall s':>9}{'CPU s':>9}",
+        ]
+        for name, row in self.phases.items():
+            lines.append(f"    {name:<22}{row['wall_seconds']:>9.2f}{row['cpu_seconds']:>9.2f}")
+        if self.skin_stages:
+            lines.append(f"  {'Skin stage (all skins)':<24}{'Wall s':>9}{'CPU s':>9}")
+            for name, row in self.as_dict()["skin_stages"].items():
+                lines.append(f"    {name:<22}{row['wall_seconds']:>9.2f}{row['cpu_seconds']:>9.2f}")
+        written = f"{self.bytes['written'] / mb:.1f} MB written"
+        if self.output_format == "folder":
+            written += " (changed files)"
+        else:
+            written += (f" ({self.bytes['compressed'] / mb:.1f} MB newly compressed, "
+                        f"{self.bytes['copied'] / mb:.1f} MB copied raw)")
+        lines.append(
+            f"  Bytes: {self.bytes['read'] / mb:.1f} MB read, {written}, "
+            f"{self.bytes['content'] / mb:.1f} MB content, {self.bytes['output'] / mb:.1f} MB on disk"
+        )
+        cache = self.cache
+        lines.append(
+            f"  Cache: {cache['skins_reused']}/{len(self.skins)} skin(s) reused, "
+            f"{cache['zip_entries_reused']} entries ({cache['zip_bytes_reused'] / mb:.1f} MB) reused from the "
+            f"previous ZIP, {cache['files_unchanged']} unchanged file(s), "
+            f"{cache['dedup_bytes_saved'] / mb:.1f} MB saved by texture dedup"
+        )
+        rendered = sorted((s for s in self.skins if not s["cached"]), key=lambda s: -s["wall_seconds"])
+        if rendered and slowest:
+            lines.append("  Slowest skins: " + ", ".join(
+                f"{s['skin']} {s['wall_seconds']:.3f}s" for s in rendered[:slowest]
+            ))
+        return "\n".join(lines)
+
+    def compare(self, previous, threshold=0.1):
+        """
+        What changed since an earlier build of the same mod. Changes of at
+        least threshold (and more than MIN_SECONDS / MIN_BYTES) are marked
+        with "!".
+
+        Args:
+            previous: Earlier BuildReport
+            threshold: Relative change that is marked
+
+        Returns:
+            str: Multi-line comparison
+        """
+        mb = 1024 * 1024
+
+        def change(new, old, unit="s", scale=1.0, digits=2, floor=MIN_SECONDS):
+            if old is None or new is None:
+                return None
+            text = f"{new / scale:.{digits}f}{unit} (was {old / scale:.{digits}f}{unit}"
+            if old:
+                delta = (new - old) / old
+                text += f", {delta:+.0%}"
+                if abs(delta) >= threshold and abs(new - old) >= floor:
+                    text += ", !"
+            return text + ")"
+
+        lines = [
+            f"Compared with the build of {previous.started_at}"
+            + (f" (version {previous.app_version})" if previous.app_version else "")
+            + (", settings changed" if previous.settings != self.settings else "")
+            + ":",
+            f"  Total wall: {change(self.wall_seconds, previous.wall_seconds)}",
+            f"  Total CPU: {change(self.cpu_seconds, previous.cpu_seconds)}",
+        ]
+        for name, row in self.phases.items():
+            old = previous.phases.get(name)
+            if old:
+                lines.append(f"    {name}: {change(row['wall_seconds'], old['wall_seconds'])}")
+        memory = change(self.memory.get("peak_rss_bytes"), previous.memory.get("peak_rss_bytes"), " MB", mb, 0,
+                        MIN_BYTES)
+        if memory:
+            lines.append(f"  Peak memory: {memory}")
+        size = change(self.bytes.get("output"), previous.bytes.get("output"), " MB", mb, 1, MIN_BYTES)
+        if size:
+            lines.append(f"  Output size: {size}")
+        if len(previous.skins) != len(self.skins):
+            lines.append(f"  Skins: {len(self.skins)} (was {len(previous.skins)})")
+        return "\n".join(lines)
+
+
+def load_build_reports(path):
+    """
+    Reports saved in a report file, oldest first.
+
+    Returns:
+        list: BuildReport objects (empty if the file is missing or unusable)
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if not isinstance(data, dict) or data.get("version") != REPORT_VERSION:
+        return []
+    return [BuildReport.from_dict(report) for report in data.get("reports", [])]
+
+
+def previous_build_report(report, reports):
+    """
+    The build before report in a report file's history.
+
+    Args:
+        report: BuildReport (as saved, or not saved yet)
+        reports: load_build_reports() of its report file
+
+    Returns:
+        BuildReport: The build before it, or None
+    """
+    for index, saved in enumerate(reports):
+        if saved.started_at == report.started_at and saved.wall_seconds == report.wall_seconds:
+            return reports[index - 1] if index else None
+    return reports[-1] if reports else None
+
+
+def save_build_report(report, path):
+    """
+    Append a report to a report file, keeping the last HISTORY_SIZE.
+
+    Returns:
+        BuildReport: The previous report in the file, or None
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        reports = data.get("reports", []) if data.get("version") == REPORT_VERSION else []
+    except (OSError, ValueError, AttributeError):
+        reports = []
+    previous = BuildReport.from_dict(reports[-1]) if reports else None
+    reports.append(report.as_dict())
+    del reports[:-HISTORY_SIZE]
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": REPORT_VERSION, "reports": reports}, f, indent=1)
+        f.write("\n")
+    os.replace(temp_path, path)
+    return previous
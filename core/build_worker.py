@@ -0,0 +1,335 @@
+"""
+Mod builds in a worker process
+
+The GUI starts a build with start_build() and polls the returned runner from
+the Tk event loop (e.g. every 50 ms with widget.after). The build itself runs
+generate_multi_skin_mod in a separate process, so deflating and template
+rendering never compete with Tk for the GIL. Everything the build reports
+comes back over a one-way pipe as (kind, payload) events:
+
+    ("progress", ProgressEvent)   throttled by core/progress.py
+    ("log", text)                 the build's print output, in batches
+    ("report", dict)              BuildReport.as_dict() of the finished
+                                  build (see core/build_report.py), sent
+                                  right before "done"
+    ("done", zip_path)            build finished
+    ("cancelled", None)           build stopped after runner.cancel()
+    ("error", {...})              build failed: type, message and, for
+                                  SkinBuildError, the per-skin errors
+
+Exactly one of done/cancelled/error ends every build, also when the worker
+process dies (reported as an error of type "WorkerCrashed").
+runner.exception(payload) turns an error event back into the exception the
+build raised, so callers can keep their existing except clauses.
+
+If a process cannot be started, start_build falls back to a thread in this
+process that sends the same events.
+"""
+import atexit
+import io
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+import traceback
+
+# Log output is sent in batches at most this often
+LOG_FLUSH_INTERVAL = 0.1
+
+# How often the worker process checks whether the build was cancelled
+CANCEL_POLL_INTERVAL = 0.02
+
+TERMINAL_EVENTS = ("done", "cancelled", "error")
+
+
+class BuildWorkerError(Exception):
+    """A build failed with an exception that is not rebuilt on this side"""
+
+    def __init__(self, error_type, message):
+        self.error_type = error_type
+        super().__init__(f"{error_type}: {message}" if error_type else message)
+
+
+class _EventLog(io.TextIOBase):
+    """stdout replacement that sends what the build prints as "log" events"""
+
+    def __init__(self, send):
+        self._send = send
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_flush = time.perf_counter()
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        with self._lock:
+            self._buffer.append(text)
+            due = time.perf_counter() - self._last_flush >= LOG_FLUSH_INTERVAL
+        if due:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        with self._lock:
+            text = "".join(self._buffer)
+            self._buffer = []
+            self._last_flush = time.perf_counter()
+        if text:
+            self._send("log", text)
+
+
+def _error_payload(error):
+    from core.file_ops import SkinBuildError
+
+    payload = {"type": type(error).__name__, "message": str(error)}
+    if isinstance(error, SkinBuildError):
+        payload["skin_errors"] = [list(item) for item in error.errors]
+    return payload
+
+
+def _run_build(send, project_data, build_kwargs, token, capture_output):
+    """
+    Run one build, reporting everything through send(kind, payload).
+
+    Args:
+        capture_output: Send print output as "log" events. Only done in the
+                        worker process; a thread must not take over the
+                        whole process's stdout
+    """
+    from core.cancel import BuildCancelled
+    from core.file_ops import generate_multi_skin_mod
+
+    log = _EventLog(send) if capture_output else sys.stdout
+    original_stdout = sys.stdout
+    if capture_output:
+        sys.stdout = log
+    try:
+        def on_progress(event):
+            log.flush()
+            send("progress", event)
+
+        report = generate_multi_skin_mod(
+            project_data,
+            progress_listener=on_progress,
+            cancel_token=token,
+            **build_kwargs
+        )
+        log.flush()
+        send("report", report.as_dict())
+        send("done", report.output_path)
+    except BuildCancelled:
+        log.flush()
+        send("cancelled", None)
+    except Exception as e:
+        traceback.print_exc(file=log)
+        log.flush()
+        send("error", _error_payload(e))
+    finally:
+        if capture_output:
+            sys.stdout = original_stdout
+
+
+def _worker_main(conn, cancel_flag, project_data, build_kwargs):
+    """
+    Entry point of the worker process.
+
+    Args:
+        cancel_flag: Shared byte the parent sets to 1 to cancel. Polled
+                     rather than waited on: setting a multiprocessing.Event
+                     blocks until its waiters acknowledge, which never
+                     happens once this process has exited
+    """
+    from core.build_report import mark_dedicated_process
+    from core.cancel import CancelToken
+
+    # This process runs one build, so its peak memory is the build's
+    mark_dedicated_process()
+    send_lock = threading.Lock()
+
+    def send(kind, payload):
+        with send_lock:
+            conn.send((kind, payload))
+
+    token = CancelToken()
+
+    def watch_cancel():
+        while not cancel_flag.value:
+            time.sleep(CANCEL_POLL_INTERVAL)
+        token.cancel()
+
+    threading.Thread(target=watch_cancel, daemon=True).start()
+
+    try:
+        _run_build(send, project_data, build_kwargs, token, capture_output=True)
+    finally:
+        conn.close()
+
+
+class _BuildRunner:
+    """Common part of BuildProcess and BuildThread"""
+
+    def __init__(self):
+        self.finished = False
+        self.started_at = None
+        self.cancel_requested_at = None
+
+    def cancel(self):
+        """Ask the build to stop; a "cancelled" event follows"""
+        if self.cancel_requested_at is None and not self.finished:
+            self.cancel_requested_at = time.perf_counter()
+            self._request_cancel()
+
+    def cancel_latency(self):
+        """Seconds from cancel() until now (call it when "cancelled" arrives)"""
+        if self.cancel_requested_at is None:
+            return None
+        return time.perf_counter() - self.cancel_requested_at
+
+    def poll(self, max_events=100):
+        """
+        Get the events that have arrived, without blocking.
+
+        Args:
+            max_events: Stop after this many, so one poll never holds up
+                        the UI for long
+
+        Returns:
+            list: (kind, payload) tuples
+        """
+        events = []
+        while not self.finished and len(events) < max_events:
+            event = self._next_event()
+            if event is None:
+                break
+            if event[0] in TERMINAL_EVENTS:
+                self.finished = True
+                self._cleanup()
+            events.append(event)
+        return events
+
+    @staticmethod
+    def exception(payload):
+        """Rebuild the exception behind an "error" event"""
+        from core.file_ops import SkinBuildError
+
+        if payload.get("skin_errors"):
+            return SkinBuildError([tuple(item) for item in payload["skin_errors"]])
+        builtin = {
+            "FileExistsError": FileExistsError,
+            "FileNotFoundError": FileNotFoundError,
+            "PermissionError": PermissionError,
+            "ValueError": ValueError,
+        }.get(payload["type"])
+        if builtin:
+            return builtin(payload["message"])
+        return BuildWorkerError(payload["type"], payload["message"])
+
+    def _cleanup(self):
+        pass
+
+
+class BuildProcess(_BuildRunner):
+    """A build running in its own process"""
+
+    def __init__(self, project_data, build_kwargs):
+        super().__init__()
+        # Never fork a process that runs Tk; spawn is also what Windows uses
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe(duplex=False)
+        self._cancel_flag = context.Value("b", 0, lock=False)
+        self._process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self._cancel_flag, project_data, build_kwargs),
+            name="BeamSkinBuild",
+            # Not a daemon: the build may start its own worker processes
+            daemon=False,
+        )
+        self._process.start()
+        atexit.register(self._stop_on_exit)
+        child_conn.close()
+        self.started_at = time.perf_counter()
+        print(f"[DEBUG] Build worker process started (pid {self._process.pid})")
+
+    def _request_cancel(self):
+        # Never blocks, also when the worker has already exited
+        self._cancel_flag.value = 1
+
+    def _next_event(self):
+        try:
+            if not self._conn.poll():
+                return None
+            return self._conn.recv()
+        except (EOFError, OSError):
+            self._process.join(timeout=1)
+            return ("error", {
+                "type": "WorkerCrashed",
+                "message": f"Build process exited unexpectedly (exit code {self._process.exitcode})",
+            })
+
+    def _cleanup(self):
+        self._conn.close()
+        self._process.join(timeout=5)
+        atexit.unregister(self._stop_on_exit)
+
+    def _stop_on_exit(self):
+        """The app is closing mid-build: cancel, and kill the worker if it hangs"""
+        if self._process.is_alive():
+            self._cancel_flag.value = 1
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.terminate()
+
+
+class BuildThread(_BuildRunner):
+    """Fallback: the same events from a thread in this process"""
+
+    def __init__(self, project_data, build_kwargs):
+        super().__init__()
+        from core.cancel import CancelToken
+
+        self._events = queue.Queue()
+        self._token = CancelToken()
+        self._thread = threading.Thread(
+            target=_run_build,
+            args=(self._send, project_data, build_kwargs, self._token, False),
+            name="BeamSkinBuild",
+            daemon=True,
+        )
+        self._thread.start()
+        self.started_at = time.perf_counter()
+
+    def _send(self, kind, payload):
+        self._events.put((kind, payload))
+
+    def _request_cancel(self):
+        self._token.cancel()
+
+    def _next_event(self):
+        try:
+            return self._events.get_nowait()
+        except queue.Empty:
+            return None
+
+
+def start_build(project_data, use_process=True, **build_kwargs):
+    """
+    Start generate_multi_skin_mod in the background.
+
+    Args:
+        project_data: Project dict (copied to the worker)
+        use_process: Run in a worker process (falls back to a thread if the
+                     process cannot be started)
+        **build_kwargs: Passed on to generate_multi_skin_mod (everything
+                        except progress_listener/progress_callback/cancel_token)
+
+    Returns:
+        BuildProcess or BuildThread: poll() it for events
+    """
+    if use_process:
+        try:
+            return BuildProcess(project_data, build_kwargs)
+        except Exception as e:
+            print(f"[WARNING] Could not start build process, building in a thread: {e}")
+    return BuildThread(project_data, build_kwargs)
@@ -0,0 +1,56 @@
+"""
+Cooperative build cancellation
+
+The GUI (or the command line on Ctrl+C) calls CancelToken.cancel(). The build
+checks the token between skins, between files and after every chunk it
+copies or compresses, raises BuildCancelled at the next check and removes
+its partial temp folders and archives on the way out.
+
+Skins rendered in worker processes cannot see the token; the build stops
+waiting for them and drops the skins that have not started yet.
+"""
+import threading
+import time
+
+
+class BuildCancelled(Exception):
+    """Raised inside a build once its CancelToken has been cancelled"""
+
+
+class CancelToken:
+    """Thread-safe cancellation flag shared by everything in one build"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.requested_at = None
+
+    def cancel(self):
+        """Ask the build to stop (safe to call from any thread, more than once)"""
+        if not self._event.is_set():
+            self.requested_at = time.perf_counter()
+            self._event.set()
+            print("[DEBUG] Build cancellation requested")
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """
+        Raises:
+            BuildCancelled: cancel() has been called
+        """
+        if self._event.is_set():
+            raise BuildCancelled("Build cancelled")
+
+    def latency(self):
+        """Seconds since cancel() was called, or None if it was not"""
+        if self.requested_at is None:
+            return None
+        return time.perf_counter() - self.requested_at
+
+
+def check_cancelled(token):
+    """raise_if_cancelled for an optional token"""
+    if token is not None:
+        token.raise_if_cancelled()
@@ -0,0 +1,565 @@
+"""
+Compression policy for mod archives
+
+Decides per file extension how each ZIP entry is stored:
+
+    "store"       no compression (JPG/PNG are already compressed)
+    "deflate:N"   deflate at level N (0-9, "deflate" alone means 6)
+    "auto:N"      deflate a few samples of the file first and only deflate the
+                  whole file (at level N) if that saves enough space. BC
+                  compressed DDS textures often gain very little.
+
+Large entries are compressed on a process pool while the archive is written
+in the original entry order, so the output does not depend on which worker
+finishes first. Everything else is read, compressed and written in
+CHUNK_SIZE pieces, reporting progress after each chunk.
+"""
+import multiprocessing
+import os
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Extension -> rule. "*" is used for everything else.
+DEFAULT_COMPRESSION_RULES = {
+    ".dds": "auto:6",
+    ".jpg": "store",
+    ".jpeg": "store",
+    ".png": "store",
+    "*": "deflate:6",
+}
+
+# zipfile's own default (Z_DEFAULT_COMPRESSION), used as the baseline in reports
+BASELINE_LEVEL = 6
+
+# "auto" compresses this many evenly spaced samples of this size...
+AUTO_SAMPLE_SIZE = 64 * 1024
+AUTO_SAMPLE_COUNT = 3
+# ...and deflates the file only if the samples shrink by at least this much
+AUTO_MIN_SAVING = 0.10
+
+# Entries smaller than this are compressed inline; shipping them to a worker
+# process costs more than compressing them
+PARALLEL_MIN_SIZE = 256 * 1024
+
+# Compressed entries waiting to be written, per worker
+PENDING_PER_WORKER = 2
+
+# Entries are read, compressed and written in pieces of this size
+CHUNK_SIZE = 1024 * 1024
+
+# CompressionReport rule of entries copied unchanged from the previous ZIP
+REUSED_RULE = "(reused from previous ZIP)"
+
+# CompressionReport rule of entries copied from build cache fragments
+CACHE_COPY_RULE = "(copied from build cache)"
+
+# CompressionReport rule of entries copied from fragments this build compressed
+NEW_FRAGMENT_RULE = "(compressed into build cache)"
+
+# Rules of entries copied raw; every other rule was compressed by the build
+RAW_COPY_RULES = (REUSED_RULE, CACHE_COPY_RULE)
+
+
+def parse_rule(spec):
+    """
+    Parse a rule string.
+
+    Returns:
+        tuple: (method, level) where method is "store", "deflate" or "auto"
+    """
+    method, _, level = str(spec).strip().lower().partition(":")
+    if method not in ("store", "deflate", "auto"):
+        raise ValueError(f"Unknown compression rule: {spec}")
+    if method == "store":
+        return method, 0
+    level = int(level) if level else BASELINE_LEVEL
+    if not 0 <= level <= 9:
+        raise ValueError(f"Compression level must be 0-9: {spec}")
+    return method, level
+
+
+class CompressionPolicy:
+    """Per-extension compression rules"""
+
+    def __init__(self, rules=None):
+        """
+        Args:
+            rules: Extension -> rule string, merged over
+                   DEFAULT_COMPRESSION_RULES (e.g. {".dds": "store"})
+        """
+        merged = dict(DEFAULT_COMPRESSION_RULES)
+        for extension, spec in (rules or {}).items():
+            extension = extension.lower()
+            if extension != "*" and not extension.startswith("."):
+                extension = "." + extension
+            merged[extension] = spec
+
+        self.rules = {extension: parse_rule(spec) for extension, spec in merged.items()}
+
+    def rule_for(self, arcname):
+        """
+        Get the rule for an entry.
+
+        Returns:
+            tuple: (rule name for reports, method, level)
+        """
+        extension = os.path.splitext(arcname)[1].lower()
+        key = extension if extension in self.rules else "*"
+        method, level = self.rules[key]
+        label = "store" if method == "store" else f"{method}:{level}"
+        return f"{key} {label}", method, level
+
+    def signature(self):
+        """Stable description of the rules, for build cache keys"""
+        return sorted((extension, method, level) for extension, (method, level) in self.rules.items())
+
+
+def _sample(data):
+    """Evenly spaced samples of data, at most AUTO_SAMPLE_COUNT * AUTO_SAMPLE_SIZE bytes"""
+    if len(data) <= AUTO_SAMPLE_SIZE * AUTO_SAMPLE_COUNT:
+        return [data]
+    step = (len(data) - AUTO_SAMPLE_SIZE) // (AUTO_SAMPLE_COUNT - 1)
+    return [data[i * step:i * step + AUTO_SAMPLE_SIZE] for i in range(AUTO_SAMPLE_COUNT)]
+
+
+def _file_samples(path, size):
+    """The samples _sample would take, read from a file without loading all of it"""
+    with open(path, "rb") as f:
+        if size <= AUTO_SAMPLE_SIZE * AUTO_SAMPLE_COUNT:
+            return [f.read()]
+        step = (size - AUTO_SAMPLE_SIZE) // (AUTO_SAMPLE_COUNT - 1)
+        samples = []
+        for i in range(AUTO_SAMPLE_COUNT):
+            f.seek(i * step)
+            samples.append(f.read(AUTO_SAMPLE_SIZE))
+        return samples
+
+
+def iter_chunks(data, source_path):
+    """Yield an entry's content in CHUNK_SIZE pieces, from memory or from disk"""
+    if data is not None:
+        view = memoryview(data)
+        for offset in range(0, len(data), CHUNK_SIZE):
+            yield view[offset:offset + CHUNK_SIZE]
+        return
+
+    with open(source_path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _deflate(data, level):
+    """Raw deflate stream, the same format zipfile writes"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _estimate_seconds(samples, size, level):
+    """Estimate how long deflating size bytes at level would take, from samples"""
+    start = time.perf_counter()
+    for sample in samples:
+        _deflate(sample, level)
+    sampled = sum(len(sample) for sample in samples)
+    return (time.perf_counter() - start) * size / max(sampled, 1)
+
+
+def compress_entry(data, source_path, method, level, on_chunk=None):
+    """
+    Compress one entry, CHUNK_SIZE bytes at a time. Runs inline or in a
+    worker process.
+
+    Args:
+        data: Entry bytes, or None to read source_path
+        source_path: File to read when data is None
+        method: "deflate" or "auto"
+        level: Deflate level
+        on_chunk: Called with the size of each input chunk once it is
+                  compressed (inline only, it cannot cross processes)
+
+    Returns:
+        dict: crc, file_size, compressed (deflate stream, or None if the entry
+              should be stored), seconds, baseline_seconds (estimated time at
+              the default level, for the report)
+    """
+    size = len(data) if data is not None else os.path.getsize(source_path)
+    samples = None
+
+    # CPU time of this thread, so busy neighbouring workers do not inflate it
+    start = time.thread_time()
+
+    if method == "auto":
+        samples = _sample(data) if data is not None else _file_samples(source_path, size)
+        sampled = sum(len(sample) for sample in samples)
+        packed = sum(len(_deflate(sample, 1)) for sample in samples)
+        method = "deflate" if sampled and packed <= sampled * (1 - AUTO_MIN_SAVING) else "store"
+
+    if method == "store":
+        # Stored entries are streamed by the writer; nothing to keep here
+        seconds = time.thread_time() - start
+        return {
+            "crc": None,
+            "file_size": size,
+            "compressed": None,
+            "seconds": seconds,
+            "baseline_seconds": _estimate_seconds(samples, size, BASELINE_LEVEL),
+        }
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    crc = 0
+    size = 0
+    parts = []
+    for chunk in iter_chunks(data, source_path):
+        crc = zlib.crc32(chunk, crc)
+        parts.append(compressor.compress(chunk))
+        size += len(chunk)
+        if on_chunk:
+            on_chunk(len(chunk))
+    parts.append(compressor.flush())
+
+    seconds = time.thread_time() - start
+    if level == BASELINE_LEVEL:
+        baseline_seconds = seconds
+    else:
+        if samples is None:
+            samples = _sample(data) if data is not None else _file_samples(source_path, size)
+        baseline_seconds = _estimate_seconds(samples, size, BASELINE_LEVEL)
+
+    return {
+        "crc": crc,
+        "file_size": size,
+        "compressed": b"".join(parts),
+        "seconds": seconds,
+        "baseline_seconds": baseline_seconds,
+    }
+
+
+class CompressionReport:
+    """Bytes and time per compression rule for one archive"""
+
+    def __init__(self):
+        self.rules = {}
+
+    def add(self, rule, input_bytes, output_bytes, seconds=0.0, baseline_seconds=0.0):
+        row = self.rules.setdefault(rule, {
+            "files": 0, "input_bytes": 0, "output_bytes": 0,
+            "seconds": 0.0, "baseline_seconds": 0.0
+        })
+        row["files"] += 1
+        row["input_bytes"] += input_bytes
+        row["output_bytes"] += output_bytes
+        row["seconds"] += seconds
+        row["baseline_seconds"] += baseline_seconds
+
+    def merge(self, other):
+        """Add another report's totals (e.g. of the other shards of a mod)"""
+        for rule, row in other.rules.items():
+            mine = self.rules.setdefault(rule, {
+                "files": 0, "input_bytes": 0, "output_bytes": 0,
+                "seconds": 0.0, "baseline_seconds": 0.0
+            })
+            for key, value in row.items():
+                mine[key] += value
+
+    def as_dict(self):
+        """Rule -> totals, plus bytes_saved and seconds_saved"""
+        result = {}
+        for rule, row in sorted(self.rules.items()):
+            result[rule] = dict(row)
+            result[rule]["bytes_saved"] = row["input_bytes"] - row["output_bytes"]
+            result[rule]["seconds_saved"] = round(row["baseline_seconds"] - row["seconds"], 4)
+        return result
+
+    def format(self):
+        """Human readable table"""
+        mb = 1024 * 1024
+        lines = [
+            "Compression report (CPU seconds; time saved is against deflate level 6):",
+            f"  {'Rule':<28}{'Files':>7}{'In MB':>10}{'Out MB':>10}{'Saved MB':>10}{'CPU s':>9}{'Saved s':>9}",
+        ]
+        for rule, row in self.as_dict().items():
+            lines.append(
+                f"  {rule:<28}{row['files']:>7}"
+                f"{row['input_bytes'] / mb:>10.1f}{row['output_bytes'] / mb:>10.1f}"
+                f"{row['bytes_saved'] / mb:>10.1f}{row['seconds']:>9.2f}{row['seconds_saved']:>9.2f}"
+            )
+        return "\n".join(lines)
+
+
+class CompressingWriter:
+    """
+    Writes entries into an open ZipFile using a CompressionPolicy.
+
+    Entries are written in the order they are added. Large entries are
+    compressed on a process pool (created on first use) while earlier
+    entries are still being written.
+    """
+
+    def __init__(self, zipf, policy=None, workers=1, previous=None, report=None, progress=None,
+                 cancel_token=None, reproducible=False):
+        """
+        Args:
+            zipf: ZipFile opened for writing
+            policy: CompressionPolicy (defaults to DEFAULT_COMPRESSION_RULES)
+            workers: Compression processes (1 = compress everything inline)
+            previous: Optional PreviousArchive to reuse unchanged entries from
+            report: Optional CompressionReport to fill in
+            progress: Optional BuildProgress, advanced by each entry's
+                      uncompressed size as its chunks are processed
+            cancel_token: Optional CancelToken, checked for every entry and
+                          chunk (raises BuildCancelled; call abort() then)
+            reproducible: Give every entry a fixed timestamp and permissions
+                          (see core.archive.normalize_info)
+        """
+        self.zipf = zipf
+        self.policy = policy or CompressionPolicy()
+        self.workers = max(1, int(workers or 1))
+        self.previous = previous
+        self.report = report if report is not None else CompressionReport()
+        self.progress = progress
+        self.cancel_token = cancel_token
+        self._pool = None
+        self._pending = deque()
+        self._source = None
+
+        self._normalize = None
+        if reproducible:
+            from core.archive import normalize_info, reproducible_date_time
+            date_time = reproducible_date_time()
+            self._normalize = lambda info: normalize_info(info, date_time)
+
+    def add(self, arcname, data=None, source_path=None):
+        """
+        Queue an entry. data is the entry's bytes, or None to read source_path.
+        """
+        self._check_cancelled()
+        rule, method, level = self.policy.rule_for(arcname)
+        compress_types = {
+            "store": (zipfile.ZIP_STORED,),
+            "deflate": (zipfile.ZIP_DEFLATED,),
+            "auto": (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED),
+        }[method]
+
+        if data is not None:
+            info = zipfile.ZipInfo(arcname, time.localtime(time.time())[:6])
+            info.external_attr = 0o600 << 16
+            size = len(data)
+        else:
+            info = zipfile.ZipInfo.from_file(source_path, arcname, strict_timestamps=self.zipf._strict_timestamps)
+            size = info.file_size
+        if self._normalize:
+            self._normalize(info)
+
+        if self.previous:
+            if data is not None:
+                found = self.previous.find_unchanged_data(arcname, data, compress_types)
+                date_time = None
+            else:
+                found = self.previous.find_unchanged_file(arcname, source_path, compress_types)
+                found, date_time = found if found else (None, None)
+            if found:
+                self._pending.append(("reuse", (found, date_time), None))
+                self._drain()
+                return
+
+        if self.workers > 1 and size >= PARALLEL_MIN_SIZE and method != "store":
+            if self._pool is None:
+                # Spawned, not forked: thread fallback builds run in the GUI
+                # process, which must never be forked while Tk runs
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            future = self._pool.submit(compress_entry, data, source_path, method, level)
+            self._pending.append(("future", future, (info, data, source_path, rule)))
+        else:
+            self._pending.append(("inline", None, (info, data, source_path, rule, method, level)))
+
+        self._drain()
+
+    def add_archive(self, path, label=CACHE_COPY_RULE):
+        """Queue every entry of another archive, copied without recompressing"""
+        self._pending.append(("archive", path, label))
+        self._drain()
+
+    def add_archive_entry(self, path, arcname, label=CACHE_COPY_RULE):
+        """Queue one entry of another archive, copied without recompressing"""
+        self._pending.append(("archive_entry", (path, arcname), label))
+        self._drain()
+
+    def add_marker(self, callback):
+        """Call callback once every entry added before it has been written"""
+        self._pending.append(("marker", callback, None))
+        self._drain()
+
+    def _drain(self, flush=False):
+        limit = 0 if flush else self.workers * PENDING_PER_WORKER
+        while self._pending:
+            kind, value, entry = self._pending[0]
+            if not flush and kind == "future" and not value.done() and len(self._pending) <= limit:
+                return
+            self._check_cancelled()
+            self._pending.popleft()
+
+            if kind == "marker":
+                value()
+            elif kind == "archive":
+                from core.archive import copy_archive_raw
+                for info in copy_archive_raw(value, self.zipf, on_entry=self._raw_chunk_counter,
+                                             normalize=self._normalize):
+                    self.report.add(entry, info.file_size, info.compress_size)
+            elif kind == "archive_entry":
+                from core.archive import copy_entry_raw
+                path, arcname = value
+                source = self._open_source(path)
+                info = source.getinfo(arcname)
+                copy_entry_raw(source, info, self.zipf, on_chunk=self._raw_chunk_counter(info),
+                               normalize=self._normalize)
+                self.report.add(entry, info.file_size, info.compress_size)
+            elif kind == "reuse":
+                info, date_time = value
+                self.previous.copy(info, self.zipf, date_time=date_time,
+                                   on_chunk=self._raw_chunk_counter(info), normalize=self._normalize)
+                self.report.add(REUSED_RULE, info.file_size, info.compress_size)
+            elif kind == "future":
+                self._write(value.result(), *entry, counted=False)
+            else:
+                info, data, source_path, rule, method, level = entry
+                if method == "store":
+                    self._write_stored(info, data, source_path, rule)
+                else:
+                    on_chunk = self._input_chunk_counter(info.filename)
+                    result = compress_entry(data, source_path, method, level, on_chunk)
+                    self._write(result, info, data, source_path, rule, counted=True)
+
+    def _open_source(self, path):
+        """Archive to copy single entries from; the last one stays open, as
+        consecutive entries usually come from the same archive"""
+        if self._source is not None and self._source[0] != path:
+            self._close_source()
+        if self._source is None:
+            self._source = (path, zipfile.ZipFile(path, "r"))
+        return self._source[1]
+
+    def _close_source(self):
+        if self._source is not None:
+            self._source[1].close()
+            self._source = None
+
+    def _check_cancelled(self):
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
+
+    def _input_chunk_counter(self, arcname):
+        """on_chunk callback for uncompressed chunks of an entry"""
+        if self.progress is None and self.cancel_token is None:
+            return None
+
+        def on_chunk(nbytes):
+            if self.progress is not None:
+                self.progress.advance(nbytes, arcname)
+            self._check_cancelled()
+
+        return on_chunk
+
+    def _raw_chunk_counter(self, info):
+        """on_chunk callback for compressed chunks of an entry being copied"""
+        if self.progress is None and self.cancel_token is None:
+            return None
+        counter = None
+        if self.progress is not None:
+            counter = self.progress.chunk_counter(info.filename, info.file_size, info.compress_size)
+
+        def on_chunk(nbytes):
+            if counter:
+                counter(nbytes)
+            self._check_cancelled()
+
+        return on_chunk
+
+    def _stream_stored(self, info, data, source_path):
+        """
+        Store an entry chunk by chunk, exactly like ZipFile.write/writestr
+        would (no need to load the file)
+        """
+        info.compress_type = zipfile.ZIP_STORED
+        if data is not None:
+            info.file_size = len(data)
+        on_chunk = self._input_chunk_counter(info.filename)
+        with self.zipf.open(info, mode="w") as dest:
+            for chunk in iter_chunks(data, source_path):
+                dest.write(chunk)
+                if on_chunk:
+                    on_chunk(len(chunk))
+
+    def _write_stored(self, info, data, source_path, rule):
+        start = time.thread_time()
+        self._stream_stored(info, data, source_path)
+        seconds = time.thread_time() - start
+
+        # Baseline estimate only needs a few samples of the file
+        samples = _sample(data) if data is not None else _file_samples(source_path, info.file_size)
+        baseline = _estimate_seconds(samples, info.file_size, BASELINE_LEVEL)
+        self.report.add(rule, info.file_size, info.file_size, seconds, baseline)
+
+    def _write(self, result, info, data, source_path, rule, counted):
+        """
+        Write the result of compress_entry.
+
+        Args:
+            counted: The entry's bytes were already reported to progress
+                     while it was compressed
+        """
+        if result["compressed"] is None:
+            start = time.thread_time()
+            self._stream_stored(info, data, source_path)
+            seconds = result["seconds"] + time.thread_time() - start
+            self.report.add(rule, result["file_size"], result["file_size"], seconds, result["baseline_seconds"])
+            return
+
+        from core.archive import write_raw_entry
+
+        compressed = result["compressed"]
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.CRC = result["crc"]
+        info.file_size = result["file_size"]
+        info.compress_size = len(compressed)
+
+        view = memoryview(compressed)
+        chunks = (view[offset:offset + CHUNK_SIZE] for offset in range(0, len(compressed), CHUNK_SIZE))
+        on_chunk = self._raw_chunk_counter(info) if not counted else None
+        if on_chunk:
+            chunks = self._counted(chunks, on_chunk)
+        write_raw_entry(self.zipf, info, chunks)
+        self.report.add(
+            rule, info.file_size, info.compress_size,
+            result["seconds"], result["baseline_seconds"]
+        )
+
+    @staticmethod
+    def _counted(chunks, on_chunk):
+        for chunk in chunks:
+            yield chunk
+            on_chunk(len(chunk))
+
+    def close(self):
+        """Write everything still pending and shut the pool down"""
+        try:
+            self._drain(flush=True)
+        finally:
+            self._close_source()
+            self._shutdown(wait=True)
+
+    def abort(self):
+        """Drop everything still pending (after an error or cancellation)"""
+        self._pending.clear()
+        self._close_source()
+        self._shutdown(wait=False)
+
+    def _shutdown(self, wait):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,495 @@
+"""
+DDS texture headers
+
+Reads what a DDS file is (size, pixel format, mip count, cubemap/volume/
+array flags) from its header alone: the 128-byte DDS header plus the
+20-byte DX10 extension when the FourCC is "DX10". Only those bytes are
+memory-mapped, so inspecting a 64 MB texture costs the same as a 64 KB one
+and a whole project's textures are checked in milliseconds; nothing is
+decoded.
+
+    info = read_dds_info(path)       DDSInfo, or raises DDSError
+    info.describe()                  "2048x2048 BC3, 12 mips, 5.3 MB"
+    dds_problems(info)               what would look wrong in the game
+    validate_project_textures(data)  the above for every skin of a project
+
+The build plan uses it to warn about broken textures before a build,
+the skin editor to describe a texture without decoding it, and the size
+of the pixel data (DDSInfo.data_size) tells how big a texture is once its
+mipmaps are counted.
+
+Run it directly to inspect files:
+
+    python -m core.dds texture.dds other.dds
+"""
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import NamedTuple, Optional
+
+DDS_MAGIC = b"DDS "
+HEADER_SIZE = 4 + 124
+DX10_HEADER_SIZE = HEADER_SIZE + 20
+
+# DDS_HEADER.dwFlags
+DDSD_MIPMAPCOUNT = 0x20000
+DDSD_DEPTH = 0x800000
+
+# DDS_PIXELFORMAT.dwFlags
+DDPF_ALPHAPIXELS = 0x1
+DDPF_ALPHA = 0x2
+DDPF_FOURCC = 0x4
+DDPF_RGB = 0x40
+DDPF_YUV = 0x200
+DDPF_LUMINANCE = 0x20000
+
+# DDS_HEADER.dwCaps2
+DDSCAPS2_CUBEMAP = 0x200
+DDSCAPS2_CUBEMAP_ALLFACES = 0xFC00
+DDSCAPS2_VOLUME = 0x200000
+
+# DDS_HEADER_DXT10
+D3D10_RESOURCE_DIMENSION_TEXTURE3D = 4
+D3D10_RESOURCE_MISC_TEXTURECUBE = 0x4
+
+# Legacy FourCC -> (format, bytes per 4x4 block)
+FOURCC_FORMATS = {
+    b"DXT1": ("BC1", 8),
+    b"DXT2": ("BC2", 16),
+    b"DXT3": ("BC2", 16),
+    b"DXT4": ("BC3", 16),
+    b"DXT5": ("BC3", 16),
+    b"ATI1": ("BC4", 8),
+    b"BC4U": ("BC4", 8),
+    b"BC4S": ("BC4_SNORM", 8),
+    b"ATI2": ("BC5", 16),
+    b"BC5U": ("BC5", 16),
+    b"BC5S": ("BC5_SNORM", 16),
+}
+
+# D3DFORMAT values stored in the FourCC field -> (format, bits per pixel)
+D3DFMT_FORMATS = {
+    36: ("R16G16B16A16", 64),
+    110: ("R16G16B16A16_SNORM", 64),
+    111: ("R16_FLOAT", 16),
+    112: ("R16G16_FLOAT", 32),
+    113: ("R16G16B16A16_FLOAT", 64),
+    114: ("R32_FLOAT", 32),
+    115: ("R32G32_FLOAT", 64),
+    116: ("R32G32B32A32_FLOAT", 128),
+}
+
+# DXGI_FORMAT -> (format, bytes per 4x4 block or None, bits per pixel or None, sRGB)
+DXGI_FORMATS = {
+    2: ("R32G32B32A32_FLOAT", None, 128, False),
+    10: ("R16G16B16A16_FLOAT", None, 64, False),
+    11: ("R16G16B16A16", None, 64, False),
+    24: ("R10G10B10A2", None, 32, False),
+    27: ("R8G8B8A8", None, 32, False),
+    28: ("R8G8B8A8", None, 32, False),
+    29: ("R8G8B8A8", None, 32, True),
+    34: ("R16G16_FLOAT", None, 32, False),
+    41: ("R32_FLOAT", None, 32, False),
+    48: ("R8G8", None, 16, False),
+    49: ("R8G8", None, 16, False),
+    54: ("R16_FLOAT", None, 16, False),
+    56: ("R16", None, 16, False),
+    60: ("R8", None, 8, False),
+    61: ("R8", None, 8, False),
+    65: ("A8", None, 8, False),
+    70: ("BC1", 8, None, False),
+    71: ("BC1", 8, None, False),
+    72: ("BC1", 8, None, True),
+    73: ("BC2", 16, None, False),
+    74: ("BC2", 16, None, False),
+    75: ("BC2", 16, None, True),
+    76: ("BC3", 16, None, False),
+    77: ("BC3", 16, None, False),
+    78: ("BC3", 16, None, True),
+    79: ("BC4", 8, None, False),
+    80: ("BC4", 8, None, False),
+    81: ("BC4_SNORM", 8, None, False),
+    82: ("BC5", 16, None, False),
+    83: ("BC5", 16, None, False),
+    84: ("BC5_SNORM", 16, None, False),
+    85: ("B5G6R5", None, 16, False),
+    86: ("B5G5R5A1", None, 16, False),
+    87: ("B8G8R8A8", None, 32, False),
+    88: ("B8G8R8X8", None, 32, False),
+    90: ("B8G8R8A8", None, 32, False),
+    91: ("B8G8R8A8", None, 32, True),
+    92: ("B8G8R8X8", None, 32, False),
+    93: ("B8G8R8X8", None, 32, True),
+    94: ("BC6H", 16, None, False),
+    95: ("BC6H", 16, None, False),
+    96: ("BC6H_SF16", 16, None, False),
+    97: ("BC7", 16, None, False),
+    98: ("BC7", 16, None, False),
+    99: ("BC7", 16, None, True),
+    115: ("B4G4R4A4", None, 16, False),
+}
+
+# Formats without an alpha channel
+OPAQUE_FORMATS = {"BC1", "BC4", "BC4_SNORM", "BC5", "BC5_SNORM", "BC6H", "BC6H_SF16", "B8G8R8X8", "B5G6R5",
+                  "B8G8R8", "R8G8B8", "R8", "R8G8", "R16", "R16_FLOAT", "R32_FLOAT", "R16G16_FLOAT", "L8", "L16"}
+
+# Headers of files that did not change are not read again
+_CACHE_SIZE = 4096
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+class DDSError(ValueError):
+    """The file is not a DDS texture this module understands"""
+
+
+class DDSInfo(NamedTuple):
+    """
+    What a DDS header says about a texture.
+
+    format is the pixel format's name: "BC1".."BC7" for block-compressed
+    textures (DXT1/DXT5 are BC1/BC3), otherwise the DXGI-style channel
+    layout such as "B8G8R8A8", or "UNKNOWN" when the header is valid but
+    the format is not known here (data_size is None then).
+    """
+    path: str
+    file_size: int
+    width: int
+    height: int
+    depth: int
+    mip_count: int
+    format: str
+    block_bytes: Optional[int]
+    bits_per_pixel: Optional[int]
+    srgb: bool
+    alpha: bool
+    cubemap: bool
+    volume: bool
+    array_size: int
+    dx10: bool
+    fourcc: Optional[str]
+    dxgi_format: Optional[int]
+
+    @property
+    def header_size(self):
+        """Bytes before the pixel data (128, or 148 with a DX10 header)"""
+        return DX10_HEADER_SIZE if self.dx10 else HEADER_SIZE
+
+    @property
+    def block_compressed(self):
+        return self.block_bytes is not None
+
+    @property
+    def faces(self):
+        return 6 if self.cubemap else 1
+
+    @property
+    def full_mip_count(self):
+        """Mip levels down to 1x1"""
+        return max(self.width, self.height, self.depth).bit_length()
+
+    def mip_dimensions(self, level):
+        """(width, height) of a mip level"""
+        return max(1, self.width >> level), max(1, self.height >> level)
+
+    def mip_size(self, level):
+        """Bytes of one mip level of one face/array slice, or None for an unknown format"""
+        width, height = self.mip_dimensions(level)
+        depth = max(1, self.depth >> level) if self.volume else 1
+        if self.block_bytes is not None:
+            return ((width + 3) // 4) * ((height + 3) // 4) * self.block_bytes * depth
+        if self.bits_per_pixel is not None:
+            return ((width * self.bits_per_pixel + 7) // 8) * height * depth
+        return None
+
+    def mip_offset(self, level):
+        """File offset of a mip level of the first face/slice, or None for an unknown format"""
+        offset = self.header_size
+        for earlier in range(level):
+            size = self.mip_size(earlier)
+            if size is None:
+                return None
+            offset += size
+        return offset
+
+    @property
+    def data_size(self):
+        """Bytes of pixel data the header describes, or None for an unknown format"""
+        sizes = [self.mip_size(level) for level in range(self.mip_count)]
+        if None in sizes:
+            return None
+        return sum(sizes) * self.faces * self.array_size
+
+    @property
+    def truncated(self):
+        """True if the file is shorter than its header says"""
+        data_size = self.data_size
+        return data_size is not None and self.file_size < self.header_size + data_size
+
+    def describe(self):
+        """Short summary, e.g. "2048x2048 BC3, 12 mips, 5.3 MB" """
+        kind = ""
+        if self.cubemap:
+            kind = " cubemap"
+        elif self.volume:
+            kind = f"x{self.depth} volume"
+        elif self.array_size > 1:
+            kind = f" array of {self.array_size}"
+        return (
+            f"{self.width}x{self.height}{kind} {self.format}{' sRGB' if self.srgb else ''}, "
+            f"{self.mip_count} mip{'s' if self.mip_count != 1 else ''}, "
+            f"{self.file_size / (1024 * 1024):.1f} MB"
+        )
+
+    def as_dict(self):
+        """JSON-friendly version (for build plans)"""
+        info = self._asdict()
+        info["data_size"] = self.data_size
+        return info
+
+
+def _rgb_format(pf_flags, bit_count, masks):
+    """Name and bits per pixel of an uncompressed legacy pixel format"""
+    r, g, b, a = masks
+    if not pf_flags & DDPF_ALPHAPIXELS:
+        a = 0
+    if pf_flags & DDPF_LUMINANCE:
+        return ("L8A8" if a else "L8", bit_count) if bit_count <= 16 and r == 0xFF else ("L16", bit_count)
+    if pf_flags & DDPF_ALPHA and not pf_flags & DDPF_RGB:
+        return "A8", bit_count
+    layouts = {
+        (32, 0xFF0000, 0xFF00, 0xFF, 0xFF000000): "B8G8R8A8",
+        (32, 0xFF0000, 0xFF00, 0xFF, 0): "B8G8R8X8",
+        (32, 0xFF, 0xFF00, 0xFF0000, 0xFF000000): "R8G8B8A8",
+        (32, 0xFF, 0xFF00, 0xFF0000, 0): "R8G8B8X8",
+        (24, 0xFF0000, 0xFF00, 0xFF, 0): "B8G8R8",
+        (24, 0xFF, 0xFF00, 0xFF0000, 0): "R8G8B8",
+        (16, 0xF800, 0x7E0, 0x1F, 0): "B5G6R5",
+        (16, 0x7C00, 0x3E0, 0x1F, 0x8000): "B5G5R5A1",
+        (16, 0xF00, 0xF0, 0xF, 0xF000): "B4G4R4A4",
+    }
+    return layouts.get((bit_count, r, g, b, a), f"RGB{bit_count}"), bit_count
+
+
+def parse_dds_header(data, path="", file_size=None):
+    """
+    Parse a DDS header.
+
+    Args:
+        data: The file's first bytes (at least 128, 148 for DX10 files)
+        path: Only used in messages and DDSInfo.path
+        file_size: Size of the whole file (defaults to len(data))
+
+    Returns:
+        DDSInfo
+
+    Raises:
+        DDSError: Not a DDS file, or a damaged header
+    """
+    file_size = len(data) if file_size is None else file_size
+    name = os.path.basename(path) or "texture"
+    if len(data) < HEADER_SIZE or data[:4] != DDS_MAGIC:
+        raise DDSError(f"{name} is not a DDS file")
+
+    (header_size, flags, height, width, _, depth, mip_count) = struct.unpack_from("<7I", data, 4)
+    (pf_size, pf_flags, fourcc, bit_count, r_mask, g_mask, b_mask, a_mask) = struct.unpack_from("<2I4s5I", data, 76)
+    _, caps2 = struct.unpack_from("<2I", data, 108)
+    if header_size != 124 or pf_size != 32:
+        raise DDSError(f"{name} has a damaged DDS header")
+    if not width or not height:
+        raise DDSError(f"{name} has no size in its DDS header")
+
+    mip_count = mip_count if flags & DDSD_MIPMAPCOUNT and mip_count else 1
+    depth = depth if flags & DDSD_DEPTH and depth else 1
+    cubemap = bool(caps2 & DDSCAPS2_CUBEMAP)
+    volume = bool(caps2 & DDSCAPS2_VOLUME)
+    array_size = 1
+    dxgi_format = None
+    block_bytes = bits_per_pixel = None
+    srgb = False
+    dx10 = pf_flags & DDPF_FOURCC and fourcc == b"DX10"
+
+    if dx10:
+        if len(data) < DX10_HEADER_SIZE:
+            raise DDSError(f"{name} is cut off in its DX10 header")
+        dxgi_format, dimension, misc_flags, array_size = struct.unpack_from("<4I", data, HEADER_SIZE)
+        array_size = max(1, array_size)
+        cubemap = bool(misc_flags & D3D10_RESOURCE_MISC_TEXTURECUBE)
+        volume = dimension == D3D10_RESOURCE_DIMENSION_TEXTURE3D
+        pixel_format, block_bytes, bits_per_pixel, srgb = DXGI_FORMATS.get(dxgi_format, ("UNKNOWN", None, None, False))
+    elif pf_flags & DDPF_FOURCC:
+        if fourcc in FOURCC_FORMATS:
+            pixel_format, block_bytes = FOURCC_FORMATS[fourcc]
+        else:
+            pixel_format, bits_per_pixel = D3DFMT_FORMATS.get(
+                struct.unpack("<I", fourcc)[0], ("UNKNOWN", None)
+            )
+    elif pf_flags & (DDPF_RGB | DDPF_LUMINANCE | DDPF_ALPHA | DDPF_YUV) and bit_count:
+        pixel_format, bits_per_pixel = _rgb_format(pf_flags, bit_count, (r_mask, g_mask, b_mask, a_mask))
+    else:
+        pixel_format = "UNKNOWN"
+
+    if not volume:
+        depth = 1
+    if pixel_format in OPAQUE_FORMATS or pixel_format.endswith("X8"):
+        alpha = False
+    elif dx10 or pf_flags & DDPF_FOURCC:
+        alpha = pixel_format != "UNKNOWN"
+    else:
+        alpha = bool(pf_flags & (DDPF_ALPHAPIXELS | DDPF_ALPHA) and a_mask)
+
+    fourcc_text = fourcc.decode("latin-1").rstrip("\0") if pf_flags & DDPF_FOURCC else None
+    return DDSInfo(
+        path=path,
+        file_size=file_size,
+        width=width,
+        height=height,
+        depth=depth,
+        mip_count=mip_count,
+        format=pixel_format,
+        block_bytes=block_bytes,
+        bits_per_pixel=bits_per_pixel,
+        srgb=srgb,
+        alpha=alpha,
+        cubemap=cubemap,
+        volume=volume,
+        array_size=array_size,
+        dx10=bool(dx10),
+        fourcc=fourcc_text if fourcc_text and fourcc_text.isprintable() else None,
+        dxgi_format=dxgi_format,
+    )
+
+
+def read_dds_info(path):
+    """
+    Read a texture's header, memory-mapping only its first 148 bytes.
+    Results are cached per file (path, size and modification time).
+
+    Returns:
+        DDSInfo
+
+    Raises:
+        DDSError: Not a DDS file, or a damaged header
+        OSError: The file cannot be read
+    """
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        cached = _cache.get(key)
+        if cached is not None:
+            return cached
+        if stat.st_size < HEADER_SIZE:
+            raise DDSError(f"{os.path.basename(path)} is too small to be a DDS file ({stat.st_size} bytes)")
+        with mmap.mmap(f.fileno(), min(stat.st_size, DX10_HEADER_SIZE), access=mmap.ACCESS_READ) as header:
+            info = parse_dds_header(header[:], path, stat.st_size)
+
+    with _cache_lock:
+        if len(_cache) >= _CACHE_SIZE:
+            _cache.clear()
+        _cache[key] = info
+    return info
+
+
+def _is_power_of_two(value):
+    return value & (value - 1) == 0
+
+
+def dds_problems(info):
+    """
+    What is wrong with a texture used as a skin.
+
+    Returns:
+        list: (severity, message) tuples; "error" for files the game cannot
+              load, "warning" for textures that load but look or perform
+              badly
+    """
+    problems = []
+    name = os.path.basename(info.path) or "texture"
+    if info.truncated:
+        problems.append((
+            "error",
+            f"{name} is cut off: {info.file_size} bytes, its header describes "
+            f"{info.header_size + info.data_size}"
+        ))
+    if info.cubemap or info.volume or info.array_size > 1:
+        kind = "a cubemap" if info.cubemap else "a volume texture" if info.volume else "a texture array"
+        problems.append(("warning", f"{name} is {kind}, skins use plain 2D textures"))
+    if info.format == "UNKNOWN":
+        problems.append(("warning", f"{name} uses a pixel format BeamSkin Studio does not know"))
+    if info.block_compressed and (info.width % 4 or info.height % 4):
+        problems.append((
+            "warning", f"{name} is {info.width}x{info.height}, block-compressed textures need sizes in multiples of 4"
+        ))
+    elif not (_is_power_of_two(info.width) and _is_power_of_two(info.height)):
+        problems.append(("warning", f"{name} is {info.width}x{info.height}, not a power of two"))
+    if info.mip_count == 1 and info.full_mip_count > 1:
+        problems.append((
+            "warning", f"{name} has no mipmaps: it shimmers at a distance and is always loaded at full size"
+        ))
+    return problems
+
+
+def validate_project_textures(project_data):
+    """
+    Check every skin texture of a project from its header.
+
+    Returns:
+        list: One dict per skin texture with car_instance_id, skin_name,
+              dds_path, info (DDSInfo or None) and problems ((severity,
+              message) tuples, a missing or non-DDS file is an error;
+              PNG/TGA/JPG files the build converts only need to exist)
+    """
+    from core.texture_convert import is_source_texture
+
+    started = time.perf_counter()
+    results = []
+    for car_instance_id, car_info in project_data.get("cars", {}).items():
+        for skin in car_info.get("skins", []):
+            dds_path = skin.get("dds_path", "")
+            info = None
+            try:
+                if is_source_texture(dds_path):
+                    os.stat(dds_path)
+                    problems = []
+                else:
+                    info = read_dds_info(dds_path)
+                    problems = dds_problems(info)
+            except (OSError, DDSError) as e:
+                problems = [("error", str(e) if isinstance(e, DDSError) else f"Cannot read {dds_path}: {e}")]
+            results.append({
+                "car_instance_id": car_instance_id,
+                "skin_name": skin.get("name", ""),
+                "dds_path": dds_path,
+                "info": info,
+                "problems": problems,
+            })
+    print(f"[DEBUG] Checked {len(results)} texture header(s) in "
+          f"{(time.perf_counter() - started) * 1000:.1f} ms")
+    return results
+
+
+def main(argv=None):
+    """Print the header of every DDS file given"""
+    paths = sys.argv[1:] if argv is None else argv
+    if not paths:
+        print("Usage: python -m core.dds TEXTURE.dds [...]")
+        return 2
+    status = 0
+    for path in paths:
+        try:
+            info = read_dds_info(path)
+        except (OSError, DDSError) as e:
+            print(f"{path}: {e}")
+            status = 1
+            continue
+        print(f"{path}: {info.describe()}")
+        for severity, message in dds_problems(info):
+            print(f"  {severity}: {message}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,12 @@ import zipfile
 import getpass
 import re
 import json  # ADDED: Required for process_material_properties
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, FIRST_EXCEPTION, wait
+
+from core.cancel import BuildCancelled, check_cancelled
 
 # =============================================================================
 # HELPER FUNCTIONS
@@ -72,25 +78,101 @@ def get_beamng_mods_path():
     print(f"[DEBUG] Using default mods path: {default_path}")
     return default_path
 
-def zip_folder(source_dir, zip_path):
+def zip_folder(source_dir, zip_path, policy=None, workers=1, progress=None, cancel_token=None,
+               reproducible=False):
     """
     Create a ZIP file from a directory.
     
     Args:
         source_dir: Directory to zip
         zip_path: Path where ZIP file should be created
+        policy: CompressionPolicy (defaults to the per-extension defaults in
+                core/compression.py)
+        workers: Processes used to compress large files in parallel
+        progress: Optional BuildProgress, advanced per chunk written
+        cancel_token: Optional CancelToken, checked per file and chunk
+        reproducible: Write the entries sorted by name, with fixed
+                      timestamps and permissions
+    
+    Returns:
+        CompressionReport: Bytes and time per compression rule
     """
+    from core.compression import CompressingWriter
+    
+    files_to_add = []
+    for root_dir, _, files in os.walk(source_dir):
+        for file in files:
+            full_path = os.path.join(root_dir, file)
+            files_to_add.append((os.path.relpath(full_path, source_dir), full_path))
+    if reproducible:
+        files_to_add.sort(key=lambda item: item[0].replace(os.sep, "/"))
+    
     with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for root_dir, _, files in os.walk(source_dir):
-            for file in files:
-                full_path = os.path.join(root_dir, file)
-                relative_path = os.path.relpath(full_path, source_dir)
-                zipf.write(full_path, relative_path)
+        writer = CompressingWriter(zipf, policy, workers, progress=progress, cancel_token=cancel_token,
+                                   reproducible=reproducible)
+        try:
+            for relative_path, full_path in files_to_add:
+                writer.add(relative_path, source_path=full_path)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close()
+    
+    return writer.report
 
 # =============================================================================
 # DDS FILE VALIDATION AND CORRECTION
 # =============================================================================
 
+def normalize_dds_filename(filename, car_id):
+    """
+    Work out the correct name for a DDS file without touching the disk.
+    Correct format: <carid>_skin_<skinname>.dds
+    
+    Args:
+        filename: Current DDS filename (no directory)
+        car_id: The car ID that should prefix the DDS file
+    
+    Returns:
+        tuple: (new_filename, error) - new_filename is None if the name is already
+               correct or could not be fixed, error is None unless it could not be fixed
+    """
+    # Pattern to match correct DDS naming: <carid>_skin_<skinname>.dds
+    correct_pattern = re.compile(rf'^{re.escape(car_id)}_skin_.*\.dds$', re.IGNORECASE)
+    
+    # Check if filename already has correct car_id prefix
+    if correct_pattern.match(filename):
+        return None, None
+    
+    # Extract the skin name portion
+    skin_name = None
+    
+    # Try different patterns to extract skin name
+    # Pattern 1: <something>_skin_<n>.dds
+    if '_skin_' in filename.lower():
+        parts = filename.split('_skin_')
+        if len(parts) >= 2:
+            # Take everything after last '_skin_' and remove .dds
+            skin_name = parts[-1].replace('.dds', '').replace('.DDS', '')
+    # Pattern 2: skin_<n>.dds (starts with skin_)
+    elif filename.lower().startswith('skin_'):
+        skin_name = filename[5:].replace('.dds', '').replace('.DDS', '')
+    # Pattern 3: <carid>skin<n>.dds (no underscores)
+    elif 'skin' in filename.lower():
+        skin_index = filename.lower().find('skin')
+        skin_name = filename[skin_index + 4:].replace('.dds', '').replace('.DDS', '')
+        # Remove any leading underscores
+        skin_name = skin_name.lstrip('_')
+    # Pattern 4: Just <n>.dds (no skin keyword)
+    else:
+        skin_name = filename.replace('.dds', '').replace('.DDS', '')
+    
+    if not skin_name:
+        return None, "Could not extract skin name"
+    
+    # Construct the correct filename: <carid>_skin_<skinname>.dds
+    return f"{car_id}_skin_{skin_name}.dds", None
+
 def validate_and_fix_dds_filenames(skin_folder_path, car_id):
     """
     Validates and fixes DDS filenames in a skin folder.
@@ -104,66 +186,50 @@ def validate_and_fix_dds_filenames(skin_folder_path, car_id):
         dict: {
             'renamed': [(old_name, new_name), ...],
             'already_correct': [filename, ...],
-            'errors': [(filename, error_msg), ...]
+            'errors': [(filename, error_msg), ...],
+            'problems': [(filename, severity, message), ...]  # from the DDS header
         }
     """
+    from core.dds import DDSError, dds_problems, read_dds_info
+    
     results = {
         'renamed': [],
         'already_correct': [],
-        'errors': []
+        'errors': [],
+        'problems': []
     }
     
     if not os.path.exists(skin_folder_path):
         results['errors'].append((skin_folder_path, "Folder does not exist"))
         return results
     
-    # Pattern to match correct DDS naming: <carid>_skin_<skinname>.dds
-    correct_pattern = re.compile(rf'^{re.escape(car_id)}_skin_.*\.dds$', re.IGNORECASE)
-    
     for filename in os.listdir(skin_folder_path):
         if not filename.lower().endswith('.dds'):
             continue
         
         file_path = os.path.join(skin_folder_path, filename)
         
+        try:
+            for severity, message in dds_problems(read_dds_info(file_path)):
+                results['problems'].append((filename, severity, message))
+        except (DDSError, OSError) as e:
+            results['problems'].append((filename, "warning", str(e)))
+        
+        new_filename, error = normalize_dds_filename(filename, car_id)
+        
+        if error:
+            print(f"[DEBUG] DDS file needs correction: {filename}")
+            results['errors'].append((filename, error))
+            continue
+        
         # Check if filename already has correct car_id prefix
-        if correct_pattern.match(filename):
+        if new_filename is None:
             print(f"[DEBUG] DDS file already correct: {filename}")
             results['already_correct'].append(filename)
             continue
         
         # File needs to be renamed
         print(f"[DEBUG] DDS file needs correction: {filename}")
-        
-        # Extract the skin name portion
-        skin_name = None
-        
-        # Try different patterns to extract skin name
-        # Pattern 1: <something>_skin_<n>.dds
-        if '_skin_' in filename.lower():
-            parts = filename.split('_skin_')
-            if len(parts) >= 2:
-                # Take everything after last '_skin_' and remove .dds
-                skin_name = parts[-1].replace('.dds', '').replace('.DDS', '')
-        # Pattern 2: skin_<n>.dds (starts with skin_)
-        elif filename.lower().startswith('skin_'):
-            skin_name = filename[5:].replace('.dds', '').replace('.DDS', '')
-        # Pattern 3: <carid>skin<n>.dds (no underscores)
-        elif 'skin' in filename.lower():
-            skin_index = filename.lower().find('skin')
-            skin_name = filename[skin_index + 4:].replace('.dds', '').replace('.DDS', '')
-            # Remove any leading underscores
-            skin_name = skin_name.lstrip('_')
-        # Pattern 4: Just <n>.dds (no skin keyword)
-        else:
-            skin_name = filename.replace('.dds', '').replace('.DDS', '')
-        
-        if not skin_name:
-            results['errors'].append((filename, "Could not extract skin name"))
-            continue
-        
-        # Construct the correct filename: <carid>_skin_<skinname>.dds
-        new_filename = f"{car_id}_skin_{skin_name}.dds"
         new_file_path = os.path.join(skin_folder_path, new_filename)
         
         # Check if target filename already exists
@@ -196,6 +262,7 @@ def process_dds_files_in_mod(temp_mod_root):
         'renamed': [],
         'already_correct': [],
         'errors': [],
+        'problems': [],
         'skins_processed': 0
     }
     
@@ -230,6 +297,8 @@ def process_dds_files_in_mod(temp_mod_root):
             total_results['renamed'].extend([(car_id, item, old, new) for old, new in results['renamed']])
             total_results['already_correct'].extend([(car_id, item, f) for f in results['already_correct']])
             total_results['errors'].extend([(car_id, item, f, err) for f, err in results['errors']])
+            total_results['problems'].extend([(car_id, item, f, severity, message)
+                                              for f, severity, message in results['problems']])
             total_results['skins_processed'] += 1
     
     # Print summary
@@ -249,11 +318,40 @@ def process_dds_files_in_mod(temp_mod_root):
         for car_id, skin, filename, error in total_results['errors']:
             print(f"[DEBUG]   {car_id}/{skin}/{filename}: {error}")
     
+    for car_id, skin, filename, severity, message in total_results['problems']:
+        print(f"[{severity.upper()}]   {car_id}/{skin}/{filename}: {message}")
+    
     return total_results
 
 # CONFIG DATA PROCESSING
 # =============================================================================
 
+def render_info_text(content, config_type, config_name, quiet=False):
+    """
+    Set the 'Config Type' and 'Configuration' fields in info JSON text using Regex.
+    Used by update_info_json_fields and by the streaming build (no files on disk).
+    quiet skips the debug output (used when compiling templates).
+    """
+    # Update "Config Type"
+    config_type_pattern = r'("Config Type"\s*:\s*")[^"]*(")'
+    if re.search(config_type_pattern, content):
+        content = re.sub(config_type_pattern, rf'\g<1>{config_type}\g<2>', content)
+        if not quiet:
+            print(f"[DEBUG]   ✓ Set Config Type to: {config_type}")
+    elif not quiet:
+        print(f"[WARNING]   'Config Type' key not found")
+    
+    # Update "Configuration" - NOW USES CUSTOM NAME
+    configuration_pattern = r'("Configuration"\s*:\s*")[^"]*(")'
+    if re.search(configuration_pattern, content):
+        content = re.sub(configuration_pattern, rf'\g<1>{config_name}\g<2>', content)
+        if not quiet:
+            print(f"[DEBUG]   ✓ Set Configuration to: {config_name}")
+    elif not quiet:
+        print(f"[WARNING]   'Configuration' key not found")
+    
+    return content
+
 def update_info_json_fields(json_path, config_type, config_name):
     """
     Update the 'Config Type' and 'Configuration' fields in the info JSON file using Regex.
@@ -270,21 +368,7 @@ def update_info_json_fields(json_path, config_type, config_name):
         with open(json_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # Update "Config Type"
-        config_type_pattern = r'("Config Type"\s*:\s*")[^"]*(")'
-        if re.search(config_type_pattern, content):
-            content = re.sub(config_type_pattern, rf'\g<1>{config_type}\g<2>', content)
-            print(f"[DEBUG]   ✓ Set Config Type to: {config_type}")
-        else:
-            print(f"[WARNING]   'Config Type' key not found")
-        
-        # Update "Configuration" - NOW USES CUSTOM NAME
-        configuration_pattern = r'("Configuration"\s*:\s*")[^"]*(")'
-        if re.search(configuration_pattern, content):
-            content = re.sub(configuration_pattern, rf'\g<1>{config_name}\g<2>', content)
-            print(f"[DEBUG]   ✓ Set Configuration to: {config_name}")
-        else:
-            print(f"[WARNING]   'Configuration' key not found")
+        content = render_info_text(content, config_type, config_name)
         
         # Write back to file
         with open(json_path, 'w', encoding='utf-8') as f:
@@ -296,6 +380,28 @@ def update_info_json_fields(json_path, config_type, config_name):
         print(f"[ERROR] Failed to update info JSON fields: {e}")
         return False
 
+def find_info_template(vehicle_template_root):
+    """
+    Find the info JSON template in vehicles/<carid>/ (next to the SKINNAME folder).
+    Prefers info.json / info_template.json, then the first info*.json found.
+    
+    Returns: Path to the info template, or None if there is none
+    """
+    # Check for standard names
+    for filename in ["info.json", "info_template.json"]:
+        potential_path = os.path.join(vehicle_template_root, filename)
+        if os.path.exists(potential_path):
+            print(f"[DEBUG]   Found info file: {filename}")
+            return potential_path
+    
+    # If no specific name found, grab the first .json starting with 'info'
+    for filename in os.listdir(vehicle_template_root):
+        if filename.startswith("info") and filename.endswith(".json"):
+            print(f"[DEBUG]   Found info file (wildcard): {filename}")
+            return os.path.join(vehicle_template_root, filename)
+    
+    return None
+
 def process_skin_config_data(skin_data, base_carid, skin_name, temp_mod_root, template_path):
     """
     Process config data for a skin. 
@@ -357,9 +463,6 @@ def process_skin_config_data(skin_data, base_carid, skin_name, temp_mod_root, te
         # So we need to go up one level from template_path
         vehicle_template_root = os.path.dirname(template_path)
         
-        # Look for the base info.json in the vehicle root folder
-        source_info_file = None
-        
         # First check if vehicle template root exists
         if not os.path.exists(vehicle_template_root):
             print(f"[ERROR]   Vehicle template root does not exist: {vehicle_template_root}")
@@ -372,21 +475,8 @@ def process_skin_config_data(skin_data, base_carid, skin_name, temp_mod_root, te
         for f in os.listdir(vehicle_template_root):
             print(f"[DEBUG]     - {f}")
         
-        # Check for standard names
-        for filename in ["info.json", "info_template.json"]:
-            potential_path = os.path.join(vehicle_template_root, filename)
-            if os.path.exists(potential_path):
-                source_info_file = potential_path
-                print(f"[DEBUG]   Found info file: {filename}")
-                break
-        
-        # If no specific name found, grab the first .json starting with 'info'
-        if not source_info_file:
-            for filename in os.listdir(vehicle_template_root):
-                if filename.startswith("info") and filename.endswith(".json"):
-                    source_info_file = os.path.join(vehicle_template_root, filename)
-                    print(f"[DEBUG]   Found info file (wildcard): {filename}")
-                    break
+        # Look for the base info.json in the vehicle root folder
+        source_info_file = find_info_template(vehicle_template_root)
 
         if source_info_file:
             dest_info = os.path.join(vehicle_root, f"info_{skin_name}.json")
@@ -424,6 +514,130 @@ def process_skin_config_data(skin_data, base_carid, skin_name, temp_mod_root, te
         traceback.print_exc()
         return False
 
+def parse_materials_text(content, file_label="materials.json"):
+    """
+    Parse the text of a materials file, allowing BeamNG's trailing commas.
+    
+    Returns:
+        dict: Parsed materials, or None if the text is not valid JSON
+    """
+    # Handle trailing commas (BeamNG allows them, Python doesn't)
+    content = re.sub(r',(\s*[}\]])', r'\1', content)
+    
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError as e:
+        print(f"[ERROR]     JSON decode error in {file_label}: {e}")
+        print(f"[ERROR]     Line {e.lineno}, column {e.colno}")
+        return None
+
+def apply_material_properties_text(content, material_props, file_label="materials.json"):
+    """
+    Apply material property overrides to the text of one materials file.
+    
+    Returns:
+        str: The updated JSON text, or None if the file could not be parsed
+             or nothing in it needed to change
+    """
+    materials_data = parse_materials_text(content, file_label)
+    if materials_data is None:
+        return None
+    
+    if not apply_material_properties(materials_data, material_props):
+        return None
+    
+    return json.dumps(materials_data, indent=2)
+
+def apply_material_properties(materials_data, material_props):
+    """
+    Apply material property overrides to parsed materials (in place).
+    Used by the materials document pipeline (core/materials.py).
+    
+    Args:
+        materials_data: Parsed materials file (material name -> material)
+        material_props: {material_name: {stage: {property: value}}} from the skin
+    
+    Returns:
+        bool: True if any property was set
+    """
+    print(f"[DEBUG]     Materials in file: {list(materials_data.keys())}")
+    
+    file_modified = False
+    
+    # Update the properties
+    for material_name_template, stages in material_props.items():
+        # Extract the base material name (everything before .skin.)
+        # e.g., "ccf_main.skin.skinname" → "ccf_main"
+        if '.skin.' in material_name_template:
+            base_material = material_name_template.split('.skin.')[0]
+        else:
+            base_material = material_name_template
+    
+        print(f"[DEBUG]     Looking for materials starting with: {base_material}.skin.")
+    
+        # Find matching material in the file (any material that starts with base_material.skin.)
+        actual_material_name = None
+        for mat_name in materials_data.keys():
+            if mat_name.startswith(f"{base_material}.skin."):
+                actual_material_name = mat_name
+                print(f"[DEBUG]     Found match: {material_name_template} → {actual_material_name}")
+                break
+    
+        if actual_material_name is None:
+            print(f"[DEBUG]     No material found matching '{base_material}.skin.*', skipping")
+            continue
+    
+        print(f"[DEBUG]     Found material '{actual_material_name}' in file")
+    
+        if "Stages" not in materials_data[actual_material_name]:
+            print(f"[DEBUG]     Material '{actual_material_name}' has no Stages, skipping")
+            continue
+    
+        material_stages = materials_data[actual_material_name]["Stages"]
+        print(f"[DEBUG]     Material has {len(material_stages)} stages")
+    
+        # Update each stage's properties
+        for stage_num_str, properties in stages.items():
+            print(f"[DEBUG]     Processing stage_num_str: '{stage_num_str}' (type: {type(stage_num_str).__name__})")
+    
+            # Convert stage number to integer
+            try:
+                stage_num = int(stage_num_str)
+                print(f"[DEBUG]     Converted to stage_num: {stage_num} (type: int)")
+            except (ValueError, TypeError) as e:
+                print(f"[ERROR]     Cannot convert stage number '{stage_num_str}' to int: {e}")
+                continue
+    
+            if stage_num >= len(material_stages):
+                print(f"[WARNING]     Stage {stage_num} does not exist for {actual_material_name} (material has {len(material_stages)} stages)")
+                continue
+    
+            stage = material_stages[stage_num]
+            print(f"[DEBUG]     Updating stage {stage_num} with {len(properties)} properties")
+            print(f"[DEBUG]     Stage {stage_num} current keys: {list(stage.keys())}")
+            print(f"[DEBUG]     Properties to update: {properties}")
+    
+            # Update each property in this stage
+            for prop_name, prop_value in properties.items():
+                old_value = stage.get(prop_name, "NOT_FOUND")
+                stage[prop_name] = prop_value
+                print(f"[DEBUG]       ✓ Set {actual_material_name}.Stages[{stage_num}].{prop_name}")
+                print(f"[DEBUG]         Old: {old_value}")
+                print(f"[DEBUG]         New: {prop_value}")
+                file_modified = True
+    
+    if not file_modified:
+        return False
+    
+    # Show what we're about to write
+    print(f"[DEBUG]   Sample of updated materials (first material only):")
+    first_material = list(materials_data.keys())[0] if materials_data else None
+    if first_material and "Stages" in materials_data[first_material]:
+        print(f"[DEBUG]   {first_material}:")
+        print(f"[DEBUG]   {json.dumps(materials_data[first_material]['Stages'], indent=6)}")
+    
+    return True
+
 def process_material_properties(skin_data, base_carid, skin_id, dest_skin_folder):
     """
     Process material properties from skin data and update .materials.json files
@@ -476,95 +690,15 @@ def process_material_properties(skin_data, base_carid, skin_id, dest_skin_folder
             with open(material_file, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            # Handle trailing commas (BeamNG allows them, Python doesn't)
-            content = re.sub(r',(\s*[}\]])', r'\1', content)
-            
-            try:
-                materials_data = json.loads(content)
-            except json.JSONDecodeError as e:
-                print(f"[ERROR]     JSON decode error in {os.path.basename(material_file)}: {e}")
-                print(f"[ERROR]     Line {e.lineno}, column {e.colno}")
-                continue
-            
-            print(f"[DEBUG]     Materials in file: {list(materials_data.keys())}")
-            
-            file_modified = False
-            
-            # Update the properties
-            for material_name_template, stages in material_props.items():
-                # Extract the base material name (everything before .skin.)
-                # e.g., "ccf_main.skin.skinname" → "ccf_main"
-                if '.skin.' in material_name_template:
-                    base_material = material_name_template.split('.skin.')[0]
-                else:
-                    base_material = material_name_template
-                
-                print(f"[DEBUG]     Looking for materials starting with: {base_material}.skin.")
-                
-                # Find matching material in the file (any material that starts with base_material.skin.)
-                actual_material_name = None
-                for mat_name in materials_data.keys():
-                    if mat_name.startswith(f"{base_material}.skin."):
-                        actual_material_name = mat_name
-                        print(f"[DEBUG]     Found match: {material_name_template} → {actual_material_name}")
-                        break
-                
-                if actual_material_name is None:
-                    print(f"[DEBUG]     No material found matching '{base_material}.skin.*', skipping")
-                    continue
-                
-                print(f"[DEBUG]     Found material '{actual_material_name}' in file")
-                
-                if "Stages" not in materials_data[actual_material_name]:
-                    print(f"[DEBUG]     Material '{actual_material_name}' has no Stages, skipping")
-                    continue
-                
-                material_stages = materials_data[actual_material_name]["Stages"]
-                print(f"[DEBUG]     Material has {len(material_stages)} stages")
-                
-                # Update each stage's properties
-                for stage_num_str, properties in stages.items():
-                    print(f"[DEBUG]     Processing stage_num_str: '{stage_num_str}' (type: {type(stage_num_str).__name__})")
-                    
-                    # Convert stage number to integer
-                    try:
-                        stage_num = int(stage_num_str)
-                        print(f"[DEBUG]     Converted to stage_num: {stage_num} (type: int)")
-                    except (ValueError, TypeError) as e:
-                        print(f"[ERROR]     Cannot convert stage number '{stage_num_str}' to int: {e}")
-                        continue
-                    
-                    if stage_num >= len(material_stages):
-                        print(f"[WARNING]     Stage {stage_num} does not exist for {actual_material_name} (material has {len(material_stages)} stages)")
-                        continue
-                    
-                    stage = material_stages[stage_num]
-                    print(f"[DEBUG]     Updating stage {stage_num} with {len(properties)} properties")
-                    print(f"[DEBUG]     Stage {stage_num} current keys: {list(stage.keys())}")
-                    print(f"[DEBUG]     Properties to update: {properties}")
-                    
-                    # Update each property in this stage
-                    for prop_name, prop_value in properties.items():
-                        old_value = stage.get(prop_name, "NOT_FOUND")
-                        stage[prop_name] = prop_value
-                        print(f"[DEBUG]       ✓ Set {actual_material_name}.Stages[{stage_num}].{prop_name}")
-                        print(f"[DEBUG]         Old: {old_value}")
-                        print(f"[DEBUG]         New: {prop_value}")
-                        file_modified = True
+            updated = apply_material_properties_text(
+                content, material_props, file_label=os.path.basename(material_file)
+            )
             
             # Save the updated material file if any changes were made
-            if file_modified:
-                # Show what we're about to write
+            if updated is not None:
                 print(f"[DEBUG]   Writing updated material data to file...")
-                print(f"[DEBUG]   Sample of updated materials (first material only):")
-                first_material = list(materials_data.keys())[0] if materials_data else None
-                if first_material and "Stages" in materials_data[first_material]:
-                    import json as json_module
-                    print(f"[DEBUG]   {first_material}:")
-                    print(f"[DEBUG]   {json_module.dumps(materials_data[first_material]['Stages'], indent=6)}")
-                
                 with open(material_file, 'w', encoding='utf-8') as f:
-                    json.dump(materials_data, f, indent=2)
+                    f.write(updated)
                 print(f"[DEBUG]   ✓ Updated {os.path.basename(material_file)}")
                 
                 # Verify by reading back
@@ -660,223 +794,1458 @@ def generate_mod(
 # MULTI-SKIN GENERATION
 # =============================================================================
 
-def generate_multi_skin_mod(
-    project_data,
-    output_path=None,
-    progress_callback=None
-):
+class SkinBuildError(Exception):
     """
-    Generate a mod with multiple cars and multiple skins per car.
+    Raised when one or more skins fail to build.
+    
+    Attributes:
+        errors: list of (car_instance_id, skin_name, message) tuples,
+                in the same order as the skins appear in the project
     """
-    print(f"\n{'='*60}")
-    print(f"MULTI-SKIN MOD GENERATION")
-    print(f"{'='*60}")
+    def __init__(self, errors):
+        self.errors = errors
+        lines = [f"  - {car_id} / {skin_name}: {message}" for car_id, skin_name, message in errors]
+        super().__init__(
+            f"{len(errors)} skin(s) failed to build:\n" + "\n".join(lines)
+        )
+
+# Warning of a skin that keeps its own texture although an identical one is shared
+SHARED_TEXTURE_KEPT = "Shared texture not referenced by any material, kept its own copy"
+
+def _ignore_dds_files(directory, files):
+    return [f for f in files if f.lower().endswith(".dds")]
+
+def _build_skin(job):
+    """
+    Build a single skin into the staging directory.
+    Runs inline or inside a thread/process pool worker, so it only writes
+    inside its own skin folder (plus its own .pc/.jpg/info files).
+    
+    Args:
+        job: dict with car_instance_id, base_carid, skin, skin_idx, skin_count,
+             author, template_path, final_dds_filename and temp_dir
     
-    # Extract project data
-    mod_name = sanitize_mod_name(project_data["mod_name"])
-    author = project_data.get("author", "Unknown")
-    cars = project_data["cars"]
+    Returns:
+        dict: {'car_instance_id', 'skin_name', 'skin_folder', 'warnings', 'error',
+               'timings'} (timings: SkinClock.finish() of the skin's stages)
+    """
+    from core.build_report import SkinClock
+    clock = SkinClock()
+    skin = job["skin"]
+    base_carid = job["base_carid"]
+    temp_dir = job["temp_dir"]
+    template_path = job["template_path"]
     
-    # Calculate totals
-    total_cars = len(cars)
-    total_skins = sum(len(car_info['skins']) for car_info in cars.values())
+    skin_id = sanitize_skin_id(skin["name"])  # For DDS identifier (no spaces)
+    skin_folder = sanitize_folder_name(skin["name"])  # For folder name (underscores)
+    dds_path = skin["dds_path"]
     
-    print(f"Mod Name: {mod_name}")
-    print(f"Author: {author}")
-    print(f"Total Cars: {total_cars}")
-    print(f"Total Skins: {total_skins}")
+    result = {
+        'car_instance_id': job["car_instance_id"],
+        'skin_name': skin["name"],
+        'skin_folder': skin_folder,
+        'warnings': [],
+        'error': None
+    }
     
-    # Create temporary directory
-    temp_dir = tempfile.mkdtemp()
-    print(f"Temp directory: {temp_dir}")
+    print(f"  [{job['skin_idx'] + 1}/{job['skin_count']}] Processing: {skin['name']} -> {skin_folder}")
     
     try:
-        processed_skins = 0
+        # Create destination folder
+        dest_skin_folder = os.path.join(
+            temp_dir,
+            "vehicles",
+            base_carid,
+            skin_folder  # Use folder name with underscores
+        )
         
-        # Process each car
-        for car_instance_id, car_info in cars.items():
-            base_carid = car_info.get("base_carid", car_instance_id)
-            skins = car_info["skins"]
-            
-            print(f"\n--- Processing {base_carid} ({len(skins)} skins) ---")
-            
-            # Find template folder
-            template_path = os.path.join(os.getcwd(), "vehicles", base_carid, "SKINNAME")
-            
-            if not os.path.exists(template_path):
-                raise FileNotFoundError(
-                    f"No template found for vehicle '{base_carid}'.\n"
-                    f"Expected location: {template_path}\n\n"
-                    f"Please make sure the vehicle exists in the Developer tab."
-                )
-            
-            # Process each skin for this car
-            for skin_idx, skin in enumerate(skins):
-                skin_id = sanitize_skin_id(skin["name"])  # For DDS identifier (no spaces)
-                skin_folder = sanitize_folder_name(skin["name"])  # For folder name (underscores)
-                dds_path = skin["dds_path"]
-                
-                print(f"  [{skin_idx + 1}/{len(skins)}] Processing: {skin['name']} -> {skin_folder}")
-                
-                # Create destination folder
-                dest_skin_folder = os.path.join(
-                    temp_dir,
-                    "vehicles",
-                    base_carid,
-                    skin_folder  # Use folder name with underscores
-                )
-                
-                # Copy template folder (exclude existing .dds files)
-                def ignore_dds_files(directory, files):
-                    return [f for f in files if f.lower().endswith(".dds")]
-                
-                shutil.copytree(template_path, dest_skin_folder, ignore=ignore_dds_files)
-                
-                # Copy DDS file
-                dds_filename = os.path.basename(dds_path)
-                dds_dest = os.path.join(dest_skin_folder, dds_filename)
+        cancel_token = job.get("cancel_token")
+        check_cancelled(cancel_token)
+        
+        # Copy template folder (exclude existing .dds files)
+        with clock.stage("copy"):
+            shutil.copytree(template_path, dest_skin_folder, ignore=_ignore_dds_files)
+        check_cancelled(cancel_token)
+        
+        # Copy DDS file straight to its final (normalized) name from the build plan,
+        # unless another skin's identical texture is shared
+        dds_filename = os.path.basename(dds_path)
+        final_dds_filename = job["final_dds_filename"]
+        if not job.get("shared_dds"):
+            dds_dest = os.path.join(dest_skin_folder, final_dds_filename)
+            with clock.stage("dds-fix"):
                 shutil.copy(dds_path, dds_dest)
+        
+        # Extract skin identifier from DDS filename
+        dds_identifier = os.path.splitext(dds_filename)[0].split("_")[-1]
+        
+        # Process JBEAM files
+        with clock.stage("jbeam"):
+            process_jbeam_files(
+                dest_skin_folder,
+                dds_identifier,
+                skin["name"],  # Use original display name
+                job["author"],
+                base_carid
+            )
+        
+        # Process JSON files: each file is read once, rendered, run through the
+        # materials pipeline (material properties, DDS rename) and written once
+        from core.materials import MaterialsDocument, run_materials_stages
+        context = {
+            "skin": skin,
+            "base_carid": base_carid,
+            "skin_prefix": f"vehicles/{base_carid}/{skin_folder}",
+            "dds_filename": dds_filename,
+            "final_dds_filename": final_dds_filename,
+            "shared_dds": job.get("shared_dds")
+        }
+        materials_found = False
+        for root_dir, _, files in os.walk(dest_skin_folder):
+            for file in files:
+                if not file.endswith(".json") or file.startswith("info"):
+                    continue
+                check_cancelled(cancel_token)
                 
-                # Extract skin identifier from DDS filename
-                dds_identifier = os.path.splitext(dds_filename)[0].split("_")[-1]
+                file_path = os.path.join(root_dir, file)
+                rel_path = os.path.relpath(file_path, dest_skin_folder).replace(os.sep, "/")
                 
-                # Process JBEAM files
-                process_jbeam_files(
-                    dest_skin_folder,
-                    dds_identifier,
-                    skin["name"],  # Use original display name
-                    author,
-                    base_carid
-                )
+                with clock.stage("json"):
+                    with open(file_path, "r", encoding="utf-8") as f:
+                        content = f.read()
+                    
+                    document = MaterialsDocument(
+                        render_json_text(
+                            content, base_carid, skin_folder, dds_filename, dds_identifier, file_label=file_path
+                        ),
+                        rel_path,
+                        file_label=file
+                    )
+                materials_found = materials_found or document.is_materials_file
+                with clock.stage("materials"):
+                    content, stage_warnings = run_materials_stages(document, context)
+                for warning in stage_warnings:
+                    if warning not in result['warnings']:
+                        result['warnings'].append(warning)
                 
-                # Process JSON files
-                process_json_files(
-                    dest_skin_folder,
+                with clock.stage("json"):
+                    with open(file_path, "w", encoding="utf-8") as f:
+                        f.write(content)
+        
+        # Process config data (if present)
+        if "config_data" in skin:
+            print(f"  → Processing config data...")
+            with clock.stage("config"):
+                success = process_skin_config_data(
+                    skin,
                     base_carid,
-                    skin_folder,  # Pass folder name (with underscores)
-                    dds_filename,
-                    dds_identifier
+                    skin_folder,  # Use folder name (with underscores)
+                    temp_dir,
+                    template_path
                 )
-                
-                # Process config data (if present)
-                if "config_data" in skin:
-                    print(f"  → Processing config data...")
-                    success = process_skin_config_data(
-                        skin,
-                        base_carid,
-                        skin_folder,  # Use folder name (with underscores)
-                        temp_dir,
-                        template_path
-                    )
-                    if not success:
-                        print(f"  [WARNING] Config data processing failed for {skin_folder}")
-                
-                # Process material properties (if present)
-                if "material_properties" in skin:
-                    print(f"  → Processing material properties...")
-                    success = process_material_properties(
-                        skin,
-                        base_carid,
-                        skin_folder,  # Use folder name (with underscores)
-                        dest_skin_folder
-                    )
-                    if not success:
-                        print(f"  [WARNING] Material properties processing failed for {skin_folder}")
-                
-                # Update progress
-                processed_skins += 1
-                if progress_callback:
-                    # Progress: 10% to 85% for skin processing
-                    progress = 0.1 + (processed_skins / total_skins) * 0.75
-                    progress_callback(progress)
-        
-        # ===== DDS FILENAME VALIDATION AND CORRECTION =====
-        print(f"\n{'='*60}")
-        print(f"VALIDATING AND FIXING DDS FILENAMES")
-        print(f"{'='*60}")
-        
-        dds_results = process_dds_files_in_mod(temp_dir)
-        
-        if dds_results['renamed']:
-            print(f"\n✓ Fixed {len(dds_results['renamed'])} DDS filename(s)")
-            
-            # Update skin.materials.json files to reflect the renamed DDS files
-            print(f"\nUpdating skin.materials.json files with new DDS paths...")
-            for car_id, skin_folder, old_dds, new_dds in dds_results['renamed']:
-                skin_folder_path = os.path.join(temp_dir, "vehicles", car_id, skin_folder)
-                materials_json_path = os.path.join(skin_folder_path, "skin.materials.json")
-                
-                if os.path.exists(materials_json_path):
-                    try:
-                        with open(materials_json_path, "r", encoding="utf-8") as f:
-                            content = f.read()
-                        
-                        # Replace the old DDS filename with the new one in baseColorMap paths
-                        old_path = f"vehicles/{car_id}/{skin_folder}/{old_dds}"
-                        new_path = f"vehicles/{car_id}/{skin_folder}/{new_dds}"
-                        
-                        if old_path in content:
-                            content = content.replace(old_path, new_path)
-                            
-                            with open(materials_json_path, "w", encoding="utf-8") as f:
-                                f.write(content)
-                            
-                            print(f"  Updated {car_id}/{skin_folder}/skin.materials.json")
-                            print(f"    {old_path} -> {new_path}")
-                    except Exception as e:
-                        print(f"  [WARNING] Failed to update materials.json for {car_id}/{skin_folder}: {e}")
-        
-        if dds_results['errors']:
-            print(f"\n⚠ {len(dds_results['errors'])} DDS file(s) had errors")
-        
-        # Create ZIP file
-        print(f"\nCreating final ZIP file...")
-        
-        if progress_callback:
-            progress_callback(0.9)
+            if not success:
+                print(f"  [WARNING] Config data processing failed for {skin_folder}")
+                result['warnings'].append("Config data processing failed")
         
-        mods_path = output_path or get_beamng_mods_path()
-        os.makedirs(mods_path, exist_ok=True)
-        zip_path = os.path.join(mods_path, f"{mod_name}.zip")
+        if job.get("shared_dds") and not context.get("shared_dds_used"):
+            # Nothing points at the shared copy, so the skin needs its own
+            print(f"  [WARNING] No material of {skin['name']} refers to its texture, keeping its own copy")
+            result['warnings'].append(SHARED_TEXTURE_KEPT)
+            with clock.stage("dds-fix"):
+                shutil.copy(dds_path, os.path.join(dest_skin_folder, final_dds_filename))
         
-        print(f"ZIP path: {zip_path}")
+        if "material_properties" in skin and not materials_found:
+            print(f"[WARNING]   No .materials.json files found in {dest_skin_folder}")
+            print(f"  [WARNING] Material properties processing failed for {skin_folder}")
+            result['warnings'].append("Material properties processing failed")
         
-        if os.path.exists(zip_path):
-            raise FileExistsError(
-                f"A mod named '{mod_name}.zip' already exists.\n"
-                f"Please choose a different name or delete the existing file."
-            )
+        if final_dds_filename != dds_filename:
+            print(f"  DDS renamed: {dds_filename} -> {final_dds_filename}")
+    
+    except BuildCancelled:
+        raise
+    except Exception as e:
+        print(f"  [ERROR] Failed to build {skin['name']} for {base_carid}: {e}")
+        result['error'] = f"{type(e).__name__}: {e}"
+    
+    result['timings'] = clock.finish()
+    return result
+
+def _read_text_file(path):
+    """Read a template file the same way the staged build does (text mode, UTF-8)"""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def _text_to_bytes(text):
+    """Encode text exactly as a text-mode write would store it on disk"""
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode("utf-8")
+
+def _render_config_entries(skin, base_carid, skin_folder, template_path, entries):
+    """
+    In-memory version of process_skin_config_data.
+    Appends the .pc, .jpg and info_<skin>.json entries for a skin.
+    
+    Returns: True if successful, False if the config data could not be exported
+    """
+    config_data = skin["config_data"]
+    config_type = config_data.get("config_type", "Factory")
+    config_name = config_data.get("config_name", skin.get("name", skin_folder))
+    pc_path = config_data.get("pc_file_path")
+    jpg_path = config_data.get("jpg_file_path")
+    
+    print(f"[DEBUG] ===== Rendering config data for {skin_folder} =====")
+    
+    # Validate file existence before processing
+    has_errors = False
+    if pc_path and not os.path.exists(pc_path):
+        print(f"[ERROR]   .pc file not found: {pc_path}")
+        has_errors = True
+    if jpg_path and not os.path.exists(jpg_path):
+        print(f"[ERROR]   .jpg file not found: {jpg_path}")
+        has_errors = True
+    
+    if has_errors:
+        print(f"[ERROR] Config data validation failed for {skin_folder}")
+        return False
+    
+    vehicle_prefix = f"vehicles/{base_carid}"
+    
+    if pc_path:
+        entries.append((f"{vehicle_prefix}/{skin_folder}.pc", None, pc_path))
+    if jpg_path:
+        entries.append((f"{vehicle_prefix}/{skin_folder}.jpg", None, jpg_path))
+    
+    vehicle_template_root = os.path.dirname(template_path)
+    source_info_file = find_info_template(vehicle_template_root)
+    
+    if not source_info_file:
+        print(f"[ERROR]   No info.json template found in {template_path}")
+        return False
+    
+    info_arcname = f"{vehicle_prefix}/info_{skin_folder}.json"
+    try:
+        from core.templates import get_template_cache
+        content = get_template_cache().get(source_info_file, "info").render(
+            config_type=config_type,
+            config_name=config_name
+        )
+        entries.append((info_arcname, _text_to_bytes(content), None))
+    except Exception as e:
+        # Same as the staged build: keep the unmodified copy of the template
+        print(f"[ERROR] Failed to update info JSON fields: {e}")
+        print(f"[WARNING]   Info JSON fields update failed")
+        entries.append((info_arcname, None, source_info_file))
+    
+    return True
+
+def _render_skin(job):
+    """
+    Render a single skin entirely in memory for the streaming build.
+    Produces the same file contents as _build_skin followed by the DDS
+    filename fix-up, but as ZIP entries instead of files in a temp folder.
+    
+    Args:
+        job: Same job dict as _build_skin (temp_dir is not used), including
+             template_files and final_dds_filename from the build plan
+    
+    Returns:
+        dict: Same keys as _build_skin plus 'entries', a list of
+              (arcname, data, source_path) tuples. data is the rendered bytes,
+              or None when the entry should be copied from source_path.
+    """
+    from core.build_report import SkinClock
+    clock = SkinClock()
+    skin = job["skin"]
+    base_carid = job["base_carid"]
+    template_path = job["template_path"]
+    
+    skin_folder = sanitize_folder_name(skin["name"])
+    dds_path = skin["dds_path"]
+    
+    result = {
+        'car_instance_id': job["car_instance_id"],
+        'skin_name': skin["name"],
+        'skin_folder': skin_folder,
+        'warnings': [],
+        'error': None,
+        'entries': []
+    }
+    
+    print(f"  [{job['skin_idx'] + 1}/{job['skin_count']}] Rendering: {skin['name']} -> {skin_folder}")
+    
+    try:
+        skin_prefix = f"vehicles/{base_carid}/{skin_folder}"
         
-        # List all files being zipped for verification
-        print(f"\n[DEBUG] Files being zipped from {temp_dir}:")
-        for root, dirs, files in os.walk(temp_dir):
-            for file in files:
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, temp_dir)
-                print(f"[DEBUG]   {rel_path}")
+        # Fail the same way the staged copy would if the texture is missing
+        os.stat(dds_path)
         
-        zip_folder(temp_dir, zip_path)
+        dds_filename = os.path.basename(dds_path)
+        dds_identifier = os.path.splitext(dds_filename)[0].split("_")[-1]
         
-        if progress_callback:
-            progress_callback(1.0)
+        # Template files (excluding existing .dds files), listed by the build plan
+        template_files = job["template_files"]
         
-        print(f"\n✓ Multi-skin mod created successfully!")
-        print(f"  Cars: {total_cars}")
-        print(f"  Skins: {total_skins}")
-        print(f"  Location: {zip_path}")
-        print(f"{'='*60}\n")
+        # Rendered text per template file; files not in here are copied as-is
+        texts = {}
         
-        return zip_path
+        # Templates are compiled once per process and rendered in a single pass
+        from core.templates import get_template_cache
+        template_cache = get_template_cache()
         
-    finally:
-        # Clean up temporary directory
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-
-# =============================================================================
-# FILE PROCESSING FUNCTIONS
+        cancel_token = job.get("cancel_token")
+        for rel_path, file, full_path in template_files:
+            check_cancelled(cancel_token)
+            if file.endswith(".jbeam"):
+                with clock.stage("jbeam"):
+                    texts[rel_path] = template_cache.get(full_path, "jbeam").render(
+                        dds_identifier=dds_identifier,
+                        skin_display_name=skin["name"],
+                        author=job["author"],
+                        vehicle_id=base_carid
+                    )
+        
+        # Config data (.pc, .jpg and info_<skin>.json next to the skin folder)
+        config_entries = []
+        if "config_data" in skin:
+            with clock.stage("config"):
+                config_ok = _render_config_entries(skin, base_carid, skin_folder, template_path, config_entries)
+            if not config_ok:
+                print(f"  [WARNING] Config data processing failed for {skin_folder}")
+                result['warnings'].append("Config data processing failed")
+        
+        if "material_properties" in skin and not any(
+            file.endswith('.materials.json') or file == 'materials.json'
+            for _, file, _ in template_files
+        ):
+            print(f"[WARNING]   No .materials.json files found in {skin_prefix}")
+            print(f"  [WARNING] Material properties processing failed for {skin_folder}")
+            result['warnings'].append("Material properties processing failed")
+        
+        # JSON files go through the materials pipeline: rendered once, every
+        # stage (material properties, DDS rename) applied in memory, serialized once
+        from core.materials import MaterialsDocument, run_materials_stages
+        context = {
+            "skin": skin,
+            "base_carid": base_carid,
+            "skin_prefix": skin_prefix,
+            "dds_filename": dds_filename,
+            "final_dds_filename": job["final_dds_filename"],
+            "shared_dds": job.get("shared_dds")
+        }
+        for rel_path, file, full_path in template_files:
+            if file.endswith(".json") and not file.startswith("info"):
+                check_cancelled(cancel_token)
+                with clock.stage("json"):
+                    document = MaterialsDocument(
+                        template_cache.get(full_path, "json").render(
+                            vehicle_id=base_carid,
+                            skin_folder_name=skin_folder,
+                            dds_filename=dds_filename,
+                            dds_identifier=dds_identifier
+                        ),
+                        rel_path
+                    )
+                with clock.stage("materials"):
+                    texts[rel_path], stage_warnings = run_materials_stages(document, context)
+                for warning in stage_warnings:
+                    if warning not in result['warnings']:
+                        result['warnings'].append(warning)
+        
+        final_dds_filename = job["final_dds_filename"]
+        if final_dds_filename != dds_filename:
+            print(f"[DEBUG]   DDS renamed in stream: {dds_filename} -> {final_dds_filename}")
+        
+        shared_dds = job.get("shared_dds")
+        if shared_dds and not context.get("shared_dds_used"):
+            # Nothing points at the shared copy, so the skin needs its own
+            print(f"  [WARNING] No material of {skin['name']} refers to its texture, keeping its own copy")
+            result['warnings'].append(SHARED_TEXTURE_KEPT)
+            shared_dds = None
+        
+        # The in-memory counterpart of copying the skin folder
+        with clock.stage("copy"):
+            for rel_path, file, full_path in template_files:
+                arcname = f"{skin_prefix}/{rel_path}"
+                if rel_path in texts:
+                    result['entries'].append((arcname, _text_to_bytes(texts[rel_path]), None))
+                else:
+                    result['entries'].append((arcname, None, full_path))
+        
+        if not shared_dds:
+            result['entries'].append((f"{skin_prefix}/{final_dds_filename}", None, dds_path))
+        result['entries'].extend(config_entries)
+    
+    except BuildCancelled:
+        raise
+    except Exception as e:
+        print(f"  [ERROR] Failed to render {skin['name']} for {base_carid}: {e}")
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['entries'] = []
+    
+    result['timings'] = clock.finish()
+    return result
+
+def _render_skin_to_fragment(job):
+    """
+    Render a skin and compress it into its build cache fragment.
+    Used by incremental builds; the mod ZIP is then assembled by copying the
+    fragment's compressed entries, so each skin is only deflated once.
+    
+    Returns:
+        dict: Same as _render_skin, with 'fragment' set to the fragment path
+              and the entry data dropped (it lives in the fragment now)
+    """
+    result = _render_skin(job)
+    if result['error']:
+        return result
+    
+    from core.build_report import add_skin_time
+    from core.compression import CompressingWriter
+    
+    fragment_path = job["fragment_path"]
+    temp_path = f"{fragment_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+            # Skins already run in parallel, so compress inline here
+            writer = CompressingWriter(zipf, job.get("compression_policy"), cancel_token=job.get("cancel_token"))
+            for arcname, data, source_path in result['entries']:
+                writer.add(arcname, data, source_path)
+            writer.close()
+            zipf.comment = json.dumps({"warnings": result['warnings']}).encode("utf-8")
+        os.replace(temp_path, fragment_path)
+        add_skin_time(result['timings'], "compress", time.perf_counter() - wall, time.thread_time() - cpu)
+    except BuildCancelled:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    except Exception as e:
+        print(f"  [ERROR] Failed to write cache fragment for {job['skin']['name']}: {e}")
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['entries'] = []
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return result
+    
+    result['fragment'] = fragment_path
+    result['entries'] = [(arcname, None, None) for arcname, _, _ in result['entries']]
+    return result
+
+def _stream_input_bytes(results):
+    """Uncompressed size of everything _write_stream_archive will write"""
+    total = 0
+    for result in results:
+        if result.get('fragment'):
+            with zipfile.ZipFile(result['fragment'], "r") as fragment:
+                total += sum(info.file_size for info in fragment.infolist())
+            continue
+        for _, data, source_path in result['entries']:
+            if data is not None:
+                total += len(data)
+            elif source_path and os.path.exists(source_path):
+                total += os.path.getsize(source_path)
+    return total
+
+def _write_stream_archive(zip_path, results, progress=None, previous_path=None,
+                          policy=None, workers=1, cancel_token=None, reproducible=False):
+    """
+    Write rendered skin entries straight into the output ZIP.
+    Rendered files come from memory and DDS/config files are read from
+    their source paths, so nothing is staged on disk. Skins that were built
+    into a cache fragment are copied over without recompressing.
+    
+    Args:
+        progress: Optional BuildProgress, advanced per chunk written
+        previous_path: Existing version of the mod; entries whose content is
+                       unchanged are copied from it without recompressing
+        policy: CompressionPolicy for new entries
+        workers: Processes used to compress large entries in parallel
+        cancel_token: Optional CancelToken, checked per file and chunk
+        reproducible: Write the entries sorted by name (fragment entries one
+                      by one), with fixed timestamps and permissions
+    
+    Returns:
+        CompressionReport: Bytes and time per compression rule
+    """
+    from core.archive import PreviousArchive
+    from core.compression import CACHE_COPY_RULE, NEW_FRAGMENT_RULE, CompressingWriter
+    
+    def _fragment_rule(result):
+        # Skins built by this run compressed their fragment; the others are
+        # copies of earlier work
+        return NEW_FRAGMENT_RULE if 'timings' in result else CACHE_COPY_RULE
+    
+    previous = PreviousArchive(previous_path) if previous_path else None
+    
+    try:
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+            writer = CompressingWriter(zipf, policy, workers, previous, progress=progress,
+                                       cancel_token=cancel_token, reproducible=reproducible)
+            try:
+                if reproducible:
+                    entries = [
+                        (arcname, data, source_path, result.get('fragment'), _fragment_rule(result))
+                        for result in results
+                        for arcname, data, source_path in result['entries']
+                    ]
+                    entries.sort(key=lambda entry: entry[0])
+                    for arcname, data, source_path, fragment, rule in entries:
+                        if fragment:
+                            writer.add_archive_entry(fragment, arcname, rule)
+                        else:
+                            writer.add(arcname, data, source_path)
+                else:
+                    for result in results:
+                        if result.get('fragment'):
+                            writer.add_archive(result['fragment'], _fragment_rule(result))
+                        else:
+                            for arcname, data, source_path in result['entries']:
+                                writer.add(arcname, data, source_path)
+            except BaseException:
+                writer.abort()
+                raise
+            writer.close()
+        return writer.report
+    finally:
+        if previous:
+            print(f"[DEBUG] Reused {previous.reused} unchanged entries "
+                  f"({previous.reused_bytes / (1024 * 1024):.1f} MB) from the previous ZIP")
+            previous.close()
+
+def _run_skin_jobs(jobs, workers, use_processes, on_done, build_fn=_build_skin, cancel_token=None):
+    """
+    Run skin jobs inline (workers <= 1) or on a thread/process pool.
+    Results are returned in job order regardless of completion order.
+    on_done(job, result) is called from the calling thread after each job finishes.
+    build_fn must be a module-level function so it can be sent to worker processes.
+    
+    Raises:
+        BuildCancelled: cancel_token was cancelled. Skins that have not
+                        started are dropped and running ones are waited for
+                        (thread workers stop at their next check), so nothing
+                        writes into the build folders after this returns.
+    """
+    results = [None] * len(jobs)
+    
+    if workers <= 1 or len(jobs) <= 1:
+        for index, job in enumerate(jobs):
+            check_cancelled(cancel_token)
+            results[index] = build_fn(job)
+            on_done(job, results[index])
+        return results
+    
+    print(f"[DEBUG] Building skins with {workers} {'process' if use_processes else 'thread'} workers")
+    
+    if use_processes:
+        # Spawned, not forked: thread fallback builds run in the GUI process,
+        # which must never be forked while Tk runs
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {pool.submit(build_fn, job): index for index, job in enumerate(jobs)}
+        pending = set(futures)
+        while pending:
+            # Wake up regularly so a cancel is noticed while every worker is busy
+            done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            check_cancelled(cancel_token)
+            for future in done:
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except BuildCancelled:
+                    raise
+                except Exception as e:
+                    # Worker crashed before it could report (e.g. broken process pool)
+                    job = jobs[index]
+                    results[index] = {
+                        'car_instance_id': job["car_instance_id"],
+                        'skin_name': job["skin"]["name"],
+                        'skin_folder': sanitize_folder_name(job["skin"]["name"]),
+                        'warnings': [],
+                        'error': f"{type(e).__name__}: {e}",
+                        'entries': []
+                    }
+                on_done(jobs[index], results[index])
+    except BaseException:
+        pool.shutdown(wait=True, cancel_futures=True)
+        raise
+    pool.shutdown()
+    
+    return results
+
+def _run_incremental_skin_jobs(jobs, workers, use_processes, mod_name, cache_dir=None,
+                               on_done=None, cancel_token=None, reuse_keys=None, journal=None):
+    """
+    Streaming build that only renders skins whose inputs changed since they
+    were last built. Unchanged skins are served from the build cache.
+    on_done(job, result) is called for every skin, cached ones included.
+    
+    Args:
+        reuse_keys: Only reuse cached fragments with these keys (the skins
+                    an interrupted build finished); None reuses any
+        journal: BuildJournal recording every skin as it finishes
+    
+    Returns:
+        list: Results in job order, each with a 'fragment' to copy from
+    """
+    from core.build_cache import BuildCache, skin_slot
+    
+    build_cache = BuildCache(cache_dir)
+    started = time.time()
+    previous = build_cache.load_index(mod_name)
+    
+    results = [None] * len(jobs)
+    records = {}
+    rebuilt = []
+    pending = []
+    
+    def finished(job, result):
+        if journal:
+            slot = skin_slot(job)
+            if result['error']:
+                journal.skin_failed(slot, result['error'])
+            else:
+                journal.skin_done(slot, records[slot]["key"])
+        if on_done:
+            on_done(job, result)
+    
+    for index, job in enumerate(jobs):
+        check_cancelled(cancel_token)
+        slot = skin_slot(job)
+        inputs = build_cache.skin_inputs(job)
+        key = build_cache.skin_key(inputs)
+        records[slot] = {"key": key, "inputs": inputs}
+        
+        if reuse_keys is None or key in reuse_keys:
+            cached = build_cache.load_fragment(key)
+            reason = build_cache.explain(inputs, previous.get(slot), cached is not None)
+        else:
+            cached = None
+            reason = "not built yet"
+        
+        if reason is None:
+            results[index] = result = {
+                'car_instance_id': job["car_instance_id"],
+                'skin_name': job["skin"]["name"],
+                'skin_folder': sanitize_folder_name(job["skin"]["name"]),
+                'warnings': cached['warnings'],
+                'error': None,
+                'entries': [(arcname, None, None) for arcname in cached['arcnames']],
+                'fragment': build_cache.fragment_path(key)
+            }
+            finished(job, result)
+        else:
+            rebuilt.append((slot, reason))
+            pending.append(index)
+            jobs[index]["fragment_path"] = build_cache.fragment_path(key)
+    
+    print(f"[DEBUG] {'Incremental' if reuse_keys is None else 'Journaled'} build: {len(pending)} to rebuild, "
+          f"{len(jobs) - len(pending)} reused from cache "
+          f"({build_cache.hashed_bytes / (1024 * 1024):.1f} MB hashed)")
+    if reuse_keys is None:
+        for slot, reason in rebuilt:
+            print(f"[DEBUG]   rebuild {slot}: {reason}")
+    
+    pending_results = _run_skin_jobs(
+        [jobs[index] for index in pending], workers, use_processes,
+        finished, build_fn=_render_skin_to_fragment,
+        cancel_token=cancel_token
+    )
+    for index, result in zip(pending, pending_results):
+        results[index] = result
+    
+    # Only remember skins that actually made it into the cache
+    failed_slots = {
+        f"{r['car_instance_id']}/{r['skin_name']}" for r in results if r['error']
+    }
+    for slot in failed_slots:
+        records.pop(slot, None)
+    
+    build_cache.save()
+    try:
+        # A journal-only build's fragments are removed once it completes;
+        # only incremental builds remember them for the next build
+        if reuse_keys is None:
+            build_cache.save_index(mod_name, records, {
+                "rebuilt": [{"skin": slot, "reason": reason} for slot, reason in rebuilt],
+                "reused": len(jobs) - len(pending),
+                "failed": sorted(failed_slots)
+            })
+        build_cache.prune(older_than=started)
+    except OSError as e:
+        print(f"[WARNING] Could not update build cache index: {e}")
+    
+    return results
+
+def _finish_journal(journal, cache_dir=None):
+    """
+    Mark a journaled build complete and delete the fragments it rendered
+    only to be resumable (incremental builds keep theirs in the mod index),
+    so the textures are not left on disk a second time.
+    """
+    from core.build_cache import BuildCache
+    
+    journal.finish("complete")
+    try:
+        BuildCache(cache_dir).discard(journal.skins.values())
+    except OSError as e:
+        print(f"[WARNING] Could not remove build journal fragments: {e}")
+
+def _log_texture_dedup(plan, results):
+    """
+    Print what sharing identical textures saved, minus skins that kept their own copy.
+    
+    Returns:
+        int: Bytes saved
+    """
+    if not plan.shared_textures:
+        return 0
+    kept = {(r['car_instance_id'], r['skin_name']) for r in results if SHARED_TEXTURE_KEPT in r['warnings']}
+    shared = 0
+    saved = 0
+    for planned in plan.skins:
+        if planned.get("shared_dds") and (planned["car_instance_id"], planned["skin_name"]) not in kept:
+            shared += 1
+            saved += os.path.getsize(planned["dds_path"])
+    print(f"Texture dedup: {shared} skin(s) use a shared texture, {saved / (1024 * 1024):.1f} MB saved"
+          + (f", {len(kept)} kept their own copy" if kept else ""))
+    return saved
+
+def _complete_build_report(report, plan, results, archives=(), compression_report=None, sync_report=None,
+                           dedup_saved=0, report_path=None):
+    """
+    Add the per-skin numbers and totals to a build report, stop its clocks
+    and save it.
+    
+    Bytes read are the planned sources of the skins that were built (a skin
+    reused from the build cache reads nothing). Bytes written are measured
+    at the output: the entries the writer compressed or copied raw for a
+    ZIP, the files the sync rewrote for a folder.
+    
+    Args:
+        report: BuildReport of the running build
+        plan: BuildPlan the build ran
+        results: Skin results in plan.skins order
+        archives: ZIPs written; each skin's stored bytes are read from
+                  their central directories (folder output: stored bytes
+                  are the content bytes)
+        compression_report: CompressionReport of the archives
+        sync_report: SyncReport of an unpacked build
+        dedup_saved: Bytes texture dedup saved
+        report_path: Report file to append the report to (None: not saved)
+    """
+    from core.compression import RAW_COPY_RULES, REUSED_RULE
+    
+    report.start_phase("report")
+    sizes = {}
+    for path in archives:
+        with zipfile.ZipFile(path, "r") as zipf:
+            for info in zipf.infolist():
+                sizes[info.filename] = (info.file_size, info.compress_size)
+    
+    for planned, result in zip(plan.skins, results):
+        if 'entries' in result:
+            arcnames = [(arcname, data, source_path) for arcname, data, source_path in result['entries']]
+        else:
+            # Staged skins: the planned files, plus the texture a skin kept
+            # instead of using the shared copy
+            own_dds = f"vehicles/{planned['base_carid']}/{planned['skin_folder']}/{planned['final_dds_filename']}"
+            names = dict.fromkeys([entry["arcname"] for entry in planned["entries"]] + [own_dds])
+            arcnames = [(arcname, None, None) for arcname in names]
+        content = stored = 0
+        for arcname, data, source_path in arcnames:
+            if arcname in sizes:
+                file_size, compress_size = sizes[arcname]
+            elif data is not None:
+                file_size = compress_size = len(data)
+            elif source_path and os.path.exists(source_path):
+                file_size = compress_size = os.path.getsize(source_path)
+            else:
+                continue
+            content += file_size
+            stored += compress_size
+        cached = 'timings' not in result
+        report.add_skin(
+            f"{result['car_instance_id']}/{result['skin_name']}", result.get('timings'),
+            cached=cached,
+            read_bytes=0 if cached else sum(entry["size"] for entry in planned["entries"]),
+            content_bytes=content, stored_bytes=stored
+        )
+    
+    if compression_report is not None:
+        reused = compression_report.rules.get(REUSED_RULE)
+        if reused:
+            report.cache["zip_entries_reused"] = reused["files"]
+            report.cache["zip_bytes_reused"] = reused["input_bytes"]
+        for rule, row in compression_report.rules.items():
+            report.bytes["copied" if rule in RAW_COPY_RULES else "compressed"] += row["output_bytes"]
+        report.bytes["written"] = report.bytes["compressed"] + report.bytes["copied"]
+        report.compression = compression_report.as_dict()
+    if sync_report is not None:
+        report.cache["files_unchanged"] = sync_report.unchanged
+        report.bytes["written"] = sync_report.written_bytes
+    report.cache["dedup_bytes_saved"] = dedup_saved
+    report.bytes["output"] = sum(os.path.getsize(path) for path in archives) if archives else report.bytes["content"]
+    
+    report.finish()
+    print(f"\n{report.format()}")
+    if report_path:
+        from core.build_report import save_build_report
+        try:
+            previous = save_build_report(report, report_path)
+            print(f"Build report saved: {report_path}")
+            if previous is not None:
+                print(report.compare(previous))
+        except OSError as e:
+            print(f"[WARNING] Could not save build report {report_path}: {e}")
+
+def _temp_zip_path(zip_path):
+    """
+    Temporary path next to zip_path, so os.replace stays on one drive.
+    Named after the process and thread, so builds running side by side never
+    share it; a file left behind by a crash is removed by the next
+    journaled build of the mod.
+    """
+    return os.path.join(
+        os.path.dirname(zip_path),
+        f".{os.path.basename(zip_path)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+
+def _write_shard_archives(plan, results, write_paths, progress=None, policy=None, workers=1,
+                          cancel_token=None, reproducible=False):
+    """
+    Write every shard of a sharded plan into its temp ZIP at the same time,
+    one thread per shard (zlib releases the GIL while compressing). The
+    compression processes are split between the shards.
+    
+    Args:
+        plan: BuildPlan with shards (see core.sharding.shard_plan)
+        results: Rendered skins, in plan.skins order
+        write_paths: Shard index -> temp ZIP path
+        workers: Compression processes for all shards together
+        (the rest as for _write_stream_archive; an existing shard ZIP is the
+        previous version of that shard)
+    
+    Returns:
+        CompressionReport: Totals of all shards
+    """
+    from core.cancel import CancelToken
+    from core.compression import CompressionReport
+    
+    result_of = {id(planned): result for planned, result in zip(plan.skins, results)}
+    threads = max(1, min(len(plan.shards), os.cpu_count() or 1))
+    shard_workers = max(1, workers // threads)
+    # Stops every shard once one fails or the build is cancelled
+    stop = CancelToken()
+    
+    def write_shard(shard):
+        zip_path = shard["zip_path"]
+        return _write_stream_archive(
+            write_paths[shard["index"]], [result_of[id(planned)] for planned in shard["skins"]],
+            progress, zip_path if os.path.exists(zip_path) else None,
+            policy=policy, workers=shard_workers, cancel_token=stop, reproducible=reproducible
+        )
+    
+    report = CompressionReport()
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="BeamSkinShard") as pool:
+        futures = [pool.submit(write_shard, shard) for shard in plan.shards]
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.1, return_when=FIRST_EXCEPTION)
+            if any(future.exception() for future in done) or (cancel_token is not None and cancel_token.cancelled):
+                stop.cancel()
+    
+    check_cancelled(cancel_token)
+    errors = [future.exception() for future in futures if future.exception()]
+    if errors:
+        # The shard that failed, not the ones it stopped
+        raise next((e for e in errors if not isinstance(e, BuildCancelled)), errors[0])
+    for future in futures:
+        report.merge(future.result())
+    return report
+
+def _install_archive(write_path, zip_path, reproducible=False):
+    """
+    Move a finished archive to its final name; the mod only appears under
+    its name once it is complete.
+    
+    Returns:
+        str: SHA-256 of the archive when reproducible, else None
+    """
+    replacing = os.path.exists(zip_path)
+    unchanged = False
+    digest = None
+    if reproducible:
+        from core.archive import archive_digest
+        digest = archive_digest(write_path)
+        print(f"Archive SHA-256: {digest}")
+        unchanged = (
+            replacing and os.path.getsize(zip_path) == os.path.getsize(write_path)
+            and archive_digest(zip_path) == digest
+        )
+    if unchanged:
+        # Same bytes: keep the old file (and its timestamp) as it is
+        os.remove(write_path)
+        print(f"Mod unchanged (same archive hash), kept existing ZIP: {zip_path}")
+    else:
+        if replacing:
+            shutil.copymode(zip_path, write_path)
+        os.replace(write_path, zip_path)
+        if replacing:
+            print(f"Replaced existing mod: {zip_path}")
+    return digest
+
+def generate_multi_skin_mod(
+    project_data,
+    output_path=None,
+    progress_callback=None,
+    workers=1,
+    use_processes=False,
+    build_mode="stream",
+    incremental=False,
+    cache_dir=None,
+    update_existing=False,
+    compression_rules=None,
+    compression_workers=None,
+    dry_run=False,
+    progress_listener=None,
+    cancel_token=None,
+    journal=False,
+    resume=False,
+    dedupe_textures=True,
+    reproducible=False,
+    output_format="zip",
+    shard_size=None,
+    report_path=None,
+    texture_format="auto",
+    texture_preset="balanced"
+):
+    """
+    Generate a mod with multiple cars and multiple skins per car.
+    
+    Args:
+        project_data: Project dict with mod_name, author and cars
+        output_path: Folder to write the ZIP to (defaults to the BeamNG mods folder)
+        progress_callback: Called with a float between 0.0 and 1.0 (the share
+                           of bytes rendered, compressed and written so far)
+        workers: Number of skins to build at the same time (1 = sequential)
+        use_processes: Use a process pool instead of a thread pool when workers > 1
+        build_mode: "stream" renders templates in memory and writes straight into
+                    the ZIP; "staged" copies everything into a temp folder first
+                    (slower, but the intermediate files can be inspected)
+        incremental: Stream mode only. Reuse skins whose templates, texture,
+                     metadata, config data and material properties are
+                     unchanged since the last build (see core/build_cache.py)
+        cache_dir: Build cache folder for incremental builds
+                   (defaults to data/cache/build)
+        update_existing: Replace an existing mod ZIP instead of raising
+                         FileExistsError. In stream mode, entries whose content
+                         is unchanged are copied from the old ZIP without
+                         recompressing. The new ZIP is written next to the old
+                         one and swapped in with os.replace, so the old mod is
+                         left untouched if the build fails.
+        compression_rules: Extension -> rule ("store", "deflate:N", "auto:N"),
+                           merged over the defaults in core/compression.py
+        compression_workers: Processes used to deflate large entries
+                             (defaults to workers)
+        dry_run: Only plan the build and return the BuildPlan (nothing is written)
+        progress_listener: Called with a core.progress.ProgressEvent (stage,
+                           current file, bytes, MB/s, ETA) as the build runs
+        cancel_token: core.cancel.CancelToken. Checked between skins, files
+                      and chunks; once cancelled the build removes its temp
+                      folder and partial ZIP and raises BuildCancelled
+        journal: Stream mode only. Render every skin into the build cache and
+                 record it in the build journal (see core/build_journal.py)
+                 as soon as it is done, so a build that fails, is cancelled
+                 or dies can be resumed
+        resume: Resume the last unfinished journaled build of this mod:
+                skins it finished (with unchanged inputs) are not rendered
+                again. Implies journal
+        dedupe_textures: Store DDS textures used by several skins only once
+                         and point the other skins' materials at that copy
+                         (see core.build_plan.dedupe_textures)
+        reproducible: Write a reproducible archive: entries sorted by name,
+                      fixed timestamps (SOURCE_DATE_EPOCH or 1980-01-01) and
+                      permissions, so the same inputs always give the same
+                      bytes. An existing ZIP with the same SHA-256 is left
+                      untouched instead of being replaced
+        output_format: "zip", or "folder" to write the mod unpacked into
+                       <output_path>/<mod name> (output_path defaults to the
+                       mods folder's unpacked/ folder). Only files whose
+                       content changed are written (see core/unpacked.py);
+                       rendering is always streamed and neither the build
+                       cache nor the journal is used
+        shard_size: Split the mod into ZIPs of at most this many bytes
+                    (<mod name>_part01.zip, ...) plus the shard manifest
+                    <mod name>.shards.json (see core/sharding.py). Skins are
+                    rendered once and every shard is written at the same
+                    time; shards an earlier build wrote but this one does not
+                    are removed. Always streamed; ignored for folder output
+        report_path: Append the build report to this JSON file (see
+                     core.build_report.build_report_path), keeping the
+                     reports of earlier builds for comparison
+        texture_format: Block format skins with a PNG/TGA/JPG texture are
+                        converted to ("auto", "BC1", "BC3", "BC7"; see
+                        core/texture_convert.py) once the plan has no
+                        errors. Conversions are cached by content under
+                        data/cache/textures; dry runs convert nothing
+        texture_preset: Conversion speed/quality: "fast", "balanced" or "quality"
+    
+    Returns:
+        BuildReport: Timings per phase and skin stage, bytes per skin, cache
+                     hits and peak memory (see core/build_report.py);
+                     output_path is the created ZIP, shard manifest or mod
+                     folder. The BuildPlan when dry_run is set
+    
+    Raises:
+        FileNotFoundError: A vehicle template is missing (found while planning)
+        FileExistsError: The ZIP exists and update_existing is not set
+        SkinBuildError: If any skin failed to build (all skins are attempted first)
+        BuildCancelled: cancel_token was cancelled (nothing is left behind)
+    """
+    print(f"\n{'='*60}")
+    print(f"MULTI-SKIN MOD GENERATION")
+    print(f"{'='*60}")
+    
+    if build_mode not in ("stream", "staged"):
+        raise ValueError(f"Unknown build mode: {build_mode}")
+    
+    from core.build_report import BuildReport
+    report = BuildReport(sanitize_mod_name(project_data.get("mod_name", "")), output_format=output_format)
+    
+    # Progress is measured in bytes: what each stage reads, renders and writes
+    from core.progress import BuildProgress
+    progress = BuildProgress(progress_listener, progress_callback)
+    
+    from core.build_plan import plan_build, dedupe_textures as dedupe_plan_textures
+    from core.texture_convert import convert_project_textures, is_source_texture
+    
+    def plan_project(project_data, dedupe):
+        plan = plan_build(project_data, output_path, update_existing=update_existing,
+                          output_format=output_format, shard_size=shard_size)
+        if dedupe and plan.ok:
+            report.start_phase("dedupe")
+            dedupe_plan_textures(plan, progress, cancel_token)
+        if plan.shard_size and plan.ok:
+            report.start_phase("shard")
+            from core.sharding import shard_plan
+            shard_plan(plan, plan.shard_size, update_existing)
+        return plan
+    
+    report.start_phase("plan")
+    
+    # Plan every output file up front, so nothing is converted or copied
+    # before a problem is found. PNG/TGA/JPG textures are planned as the
+    # <name>.dds they become; they are converted once the plan is clean
+    convert = any(is_source_texture(skin.get("dds_path")) for car_info in project_data.get("cars", {}).values()
+                  for skin in car_info.get("skins", []))
+    plan = plan_project(project_data, dedupe_textures and not convert)
+    print(plan.summary())
+    
+    if dry_run:
+        return plan
+    
+    plan.raise_for_errors()
+    
+    if convert:
+        report.start_phase("convert")
+        project_data, _ = convert_project_textures(project_data, texture_format, texture_preset,
+                                                   workers=max(1, int(workers or 1)), progress=progress,
+                                                   cancel_token=cancel_token)
+        # Plan again with the DDS files: their sizes, headers and dedup
+        report.start_phase("plan")
+        plan = plan_project(project_data, dedupe_textures)
+        print(plan.summary())
+        plan.raise_for_errors()
+    
+    mod_name = plan.mod_name
+    author = plan.author
+    zip_path = plan.zip_path
+    
+    # Calculate totals
+    total_cars = len(project_data["cars"])
+    total_skins = len(plan.skins)
+    workers = max(1, int(workers or 1))
+    compression_workers = max(1, int(compression_workers or workers))
+    
+    from core.compression import CompressionPolicy
+    compression_policy = CompressionPolicy(compression_rules)
+    
+    print(f"Mod Name: {mod_name}")
+    print(f"Author: {author}")
+    print(f"Total Cars: {total_cars}")
+    print(f"Total Skins: {total_skins}")
+    print(f"Workers: {workers}")
+    unpacked = output_format == "folder"
+    if unpacked:
+        # Syncing the folder already skips unchanged files; nothing to stage,
+        # cache or resume
+        if build_mode != "stream" or incremental or journal or resume:
+            print(f"[DEBUG] Unpacked output: rendering in memory without build cache or journal")
+        if shard_size:
+            print(f"[DEBUG] Unpacked output is never sharded")
+        build_mode = "stream"
+        incremental = journal = resume = False
+    if plan.shards and build_mode != "stream":
+        print(f"[DEBUG] Sharded output: rendering in memory, not staged")
+        build_mode = "stream"
+    print(f"Build mode: {build_mode}{' (incremental)' if incremental else ''}")
+    
+    if incremental and build_mode != "stream":
+        print(f"[WARNING] Incremental builds need the stream build mode, building everything")
+        incremental = False
+    
+    journal = journal or resume
+    if journal and build_mode != "stream":
+        print(f"[WARNING] The build journal needs the stream build mode, building without it")
+        journal = resume = False
+    
+    report.mod_name = mod_name
+    report.settings = {
+        "skins": total_skins,
+        "build_mode": build_mode,
+        "workers": workers,
+        "use_processes": bool(use_processes and workers > 1),
+        "compression_workers": compression_workers,
+        "incremental": bool(incremental),
+        "journal": bool(journal),
+        "dedupe_textures": bool(dedupe_textures),
+        "reproducible": bool(reproducible),
+        "shards": len(plan.shards) if plan.shards else None,
+    }
+        
+    # Create temporary directory (staged mode only)
+    temp_dir = None
+    write_path = None
+    shard_write_paths = {}
+    zip_complete = False
+    build_journal = None
+    if build_mode == "staged":
+        temp_dir = tempfile.mkdtemp()
+        print(f"Temp directory: {temp_dir}")
+    
+    try:
+        os.makedirs(os.path.dirname(zip_path), exist_ok=True)
+        print(f"{'Mod folder' if unpacked else 'ZIP path'}: {zip_path}")
+        
+        # Bytes each skin adds to the first stage: rendered templates for a
+        # plain streamed build, everything it writes otherwise
+        def skin_bytes(planned):
+            if build_mode == "stream" and not (incremental or journal):
+                return sum(e["size"] for e in planned["entries"] if e["kind"] not in ("dds", "config"))
+            return sum(e["size"] for e in planned["entries"])
+        
+        # One job per planned skin
+        jobs = [
+            {
+                "car_instance_id": planned["car_instance_id"],
+                "base_carid": planned["base_carid"],
+                "skin": planned["skin"],
+                "skin_idx": planned["skin_idx"],
+                "skin_count": planned["skin_count"],
+                "author": author,
+                "template_path": planned["template_path"],
+                "template_files": planned["template_files"],
+                "final_dds_filename": planned["final_dds_filename"],
+                "shared_dds": planned.get("shared_dds"),
+                "temp_dir": temp_dir,
+                "compression_policy": compression_policy,
+                "input_bytes": skin_bytes(planned),
+                # A threading.Event cannot be sent to worker processes
+                "cancel_token": None if use_processes and workers > 1 else cancel_token
+            }
+            for planned in plan.skins
+        ]
+        
+        def on_skin_done(job, result):
+            progress.advance(job["input_bytes"], f"{job['car_instance_id']}/{job['skin']['name']}")
+        
+        first_stage_bytes = sum(job["input_bytes"] for job in jobs)
+        
+        if build_mode == "stream":
+            progress.add_stage("render", "Rendering skins", first_stage_bytes)
+            progress.add_stage("write", "Syncing mod folder" if unpacked else "Writing ZIP", plan.total_size)
+            progress.start_stage("render")
+            report.start_phase("render")
+            
+            reuse_keys = None
+            if journal:
+                from core.build_journal import BuildJournal
+                build_journal = BuildJournal(mod_name, cache_dir)
+                carried = build_journal.start(zip_path, len(jobs), resume=resume)
+                if not incremental:
+                    reuse_keys = set(carried.values())
+            
+            if incremental or journal:
+                results = _run_incremental_skin_jobs(jobs, workers, use_processes, mod_name, cache_dir,
+                                                     on_done=on_skin_done, cancel_token=cancel_token,
+                                                     reuse_keys=reuse_keys, journal=build_journal)
+            else:
+                results = _run_skin_jobs(jobs, workers, use_processes, on_skin_done, build_fn=_render_skin,
+                                         cancel_token=cancel_token)
+            
+            failed = [
+                (r['car_instance_id'], r['skin_name'], r['error'])
+                for r in results if r['error']
+            ]
+            if failed:
+                raise SkinBuildError(failed)
+            
+            progress.set_total("write", _stream_input_bytes(results))
+            progress.start_stage("write")
+            report.start_phase("sync" if unpacked else "zip")
+            
+            if unpacked:
+                from core.unpacked import sync_unpacked_mod, unpacked_state_path
+                sync_report = sync_unpacked_mod(
+                    zip_path, results, unpacked_state_path(mod_name, cache_dir),
+                    progress, cancel_token
+                )
+                progress.finish()
+                
+                print(f"\n{sync_report.format()}")
+                dedup_saved = _log_texture_dedup(plan, results)
+                
+                print(f"\n✓ Unpacked mod synced successfully!")
+                print(f"  Cars: {total_cars}")
+                print(f"  Skins: {total_skins}")
+                print(f"  Location: {zip_path}")
+                print(f"{'='*60}\n")
+                
+                report.output_path = zip_path
+                _complete_build_report(report, plan, results, sync_report=sync_report,
+                                       dedup_saved=dedup_saved, report_path=report_path)
+                return report
+            
+            if plan.shards:
+                for shard in plan.shards:
+                    shard_write_paths[shard["index"]] = _temp_zip_path(shard["zip_path"])
+                    if build_journal:
+                        build_journal.writing(shard_write_paths[shard["index"]])
+                
+                print(f"\nStreaming {sum(len(r['entries']) for r in results)} files "
+                      f"into {len(plan.shards)} shard ZIPs...")
+                compression_report = _write_shard_archives(
+                    plan, results, shard_write_paths, progress,
+                    policy=compression_policy, workers=compression_workers, cancel_token=cancel_token,
+                    reproducible=reproducible
+                )
+                
+                from core.sharding import (
+                    read_shard_manifest, write_shard_manifest, shard_manifest, remove_stale_shards
+                )
+                report.start_phase("install")
+                previous_manifest = read_shard_manifest(zip_path)
+                shard_files = {}
+                for shard in plan.shards:
+                    digest = _install_archive(shard_write_paths.pop(shard["index"]), shard["zip_path"],
+                                              reproducible)
+                    shard_files[shard["index"]] = (os.path.getsize(shard["zip_path"]), digest)
+                manifest = shard_manifest(plan, shard_files)
+                write_shard_manifest(zip_path, manifest)
+                remove_stale_shards(previous_manifest, manifest, os.path.dirname(zip_path))
+                zip_complete = True
+                
+                if build_journal:
+                    _finish_journal(build_journal, cache_dir)
+                
+                progress.finish()
+                
+                print(f"\n{compression_report.format()}")
+                dedup_saved = _log_texture_dedup(plan, results)
+                
+                print(f"\n✓ Sharded mod created successfully!")
+                print(f"  Cars: {total_cars}")
+                print(f"  Skins: {total_skins}")
+                for shard in manifest["shards"]:
+                    print(f"  {shard['file']}: {len(shard['skins'])} skin(s), "
+                          f"{shard['size_bytes'] / (1024 * 1024):.1f} MB")
+                print(f"  Manifest: {zip_path}")
+                print(f"{'='*60}\n")
+                
+                report.output_path = zip_path
+                _complete_build_report(report, plan, results, [shard["zip_path"] for shard in plan.shards],
+                                       compression_report, dedup_saved=dedup_saved, report_path=report_path)
+                return report
+            
+            previous_path = zip_path if os.path.exists(zip_path) else None
+            write_path = _temp_zip_path(zip_path)
+            if build_journal:
+                build_journal.writing(write_path)
+            
+            print(f"\nStreaming {sum(len(r['entries']) for r in results)} files into ZIP...")
+            compression_report = _write_stream_archive(
+                write_path, results, progress, previous_path,
+                policy=compression_policy, workers=compression_workers, cancel_token=cancel_token,
+                reproducible=reproducible
+            )
+        
+        else:
+            progress.add_stage("copy", "Copying skin files", first_stage_bytes)
+            progress.add_stage("zip", "Creating ZIP archive", plan.total_size)
+            progress.start_stage("copy")
+            report.start_phase("copy")
+            
+            results = _run_skin_jobs(jobs, workers, use_processes, on_skin_done, cancel_token=cancel_token)
+            
+            failed = [
+                (r['car_instance_id'], r['skin_name'], r['error'])
+                for r in results if r['error']
+            ]
+            if failed:
+                raise SkinBuildError(failed)
+            
+            # Create ZIP file
+            print(f"\nCreating final ZIP file...")
+            
+            write_path = _temp_zip_path(zip_path)
+            
+            # List all files being zipped for verification
+            staged_bytes = 0
+            print(f"\n[DEBUG] Files being zipped from {temp_dir}:")
+            for root, dirs, files in os.walk(temp_dir):
+                for file in files:
+                    full_path = os.path.join(root, file)
+                    rel_path = os.path.relpath(full_path, temp_dir)
+                    staged_bytes += os.path.getsize(full_path)
+                    print(f"[DEBUG]   {rel_path}")
+            
+            progress.set_total("zip", staged_bytes)
+            progress.start_stage("zip")
+            report.start_phase("zip")
+            compression_report = zip_folder(temp_dir, write_path, compression_policy, compression_workers,
+                                            progress=progress, cancel_token=cancel_token,
+                                            reproducible=reproducible)
+        
+        report.start_phase("install")
+        _install_archive(write_path, zip_path, reproducible)
+        zip_complete = True
+        
+        if build_journal:
+            _finish_journal(build_journal, cache_dir)
+        
+        progress.finish()
+        
+        print(f"\n{compression_report.format()}")
+        dedup_saved = _log_texture_dedup(plan, results)
+        
+        print(f"\n✓ Multi-skin mod created successfully!")
+        print(f"  Cars: {total_cars}")
+        print(f"  Skins: {total_skins}")
+        print(f"  Location: {zip_path}")
+        print(f"{'='*60}\n")
+        
+        report.output_path = zip_path
+        _complete_build_report(report, plan, results, [zip_path], compression_report,
+                               dedup_saved=dedup_saved, report_path=report_path)
+        return report
+    
+    except BaseException as e:
+        if build_journal and not zip_complete:
+            build_journal.finish(
+                "cancelled" if isinstance(e, BuildCancelled) else "failed",
+                f"{type(e).__name__}: {e}"
+            )
+        raise
+        
+    finally:
+        if build_journal:
+            build_journal.close()
+        
+        # Never leave a half-written archive behind
+        for partial in [write_path] + list(shard_write_paths.values()):
+            if partial and not zip_complete and os.path.exists(partial):
+                try:
+                    os.remove(partial)
+                except OSError as e:
+                    print(f"[WARNING] Could not remove partial ZIP {partial}: {e}")
+        
+        # Clean up temporary directory
+        if temp_dir and os.path.exists(temp_dir):
+            shutil.rmtree(temp_dir)
+        
+        if cancel_token is not None and cancel_token.cancelled and not zip_complete:
+            print(f"[DEBUG] Build cancelled and cleaned up "
+                  f"{cancel_token.latency() * 1000:.0f} ms after the request")
+
+# =============================================================================
+# FILE PROCESSING FUNCTIONS
 # =============================================================================
 
+def render_jbeam_text(content, dds_identifier, skin_display_name, author, vehicle_id=None):
+    """
+    Apply the JBEAM template substitutions to a file's text.
+    Used by process_jbeam_files and by the streaming build (no files on disk).
+    """
+    # Update author
+    content = re.sub(
+        r'("authors"\s*:\s*")[^"]*(")',
+        rf'\g<1>{author}\g<2>',
+        content
+    )
+    
+    # Update skin display name
+    content = re.sub(
+        r'("name"\s*:\s*")[^"]*(")',
+        rf'\g<1>{skin_display_name}\g<2>',
+        content
+    )
+    
+    # Update skin key - replace SKINNAME placeholder only, preserve car ID
+    # Pattern: "<carid>_skin_SKINNAME" -> "<carid>_skin_<actual_skin_id>"
+    content = re.sub(
+        r'"([^"]+_skin_)SKINNAME"',
+        rf'"\g<1>{dds_identifier}"',
+        content
+    )
+    
+    # Update globalSkin - replace SKINNAME placeholder
+    content = re.sub(
+        r'("globalSkin"\s*:\s*")SKINNAME(")',
+        rf'\g<1>{dds_identifier}\g<2>',
+        content
+    )
+    
+    # Update _extra.skin references
+    def replace_extra_skin(match):
+        return f'"{match.group(1)}{dds_identifier}"'
+    
+    content = re.sub(
+        r'"([^"]*_extra\.skin\.)[^"]+"',
+        replace_extra_skin,
+        content
+    )
+    
+    def replace_extra_skin_name(match):
+        return f'{match.group(1)}{dds_identifier}"'
+    
+    content = re.sub(
+        r'("name"\s*:\s*"[^"]*_extra\.skin\.)[^"]+"',
+        replace_extra_skin_name,
+        content
+    )
+    content = re.sub(
+        r'("mapTo"\s*:\s*"[^"]*_extra\.skin\.)[^"]+"',
+        replace_extra_skin_name,
+        content
+    )
+    
+    # Replace "carid" placeholder with actual vehicle_id (case-insensitive)
+    # This handles patterns like: carid_skin_identifier or paths with carid
+    # Uses lookbehind to allow matching carid followed by underscore
+    if vehicle_id:
+        content = re.sub(
+            r'(?<![a-zA-Z0-9])carid',
+            vehicle_id,
+            content,
+            flags=re.IGNORECASE
+        )
+    
+    return content
+
 def process_jbeam_files(folder_path, dds_identifier, skin_display_name, author, vehicle_id=None):
     """
     Process all JBEAM files in the folder.
@@ -893,73 +2262,172 @@ def process_jbeam_files(folder_path, dds_identifier, skin_display_name, author,
             with open(file_path, "r", encoding="utf-8") as f:
                 content = f.read()
             
-            # Update author
-            content = re.sub(
-                r'("authors"\s*:\s*")[^"]*(")',
-                rf'\g<1>{author}\g<2>',
-                content
-            )
-            
-            # Update skin display name
-            content = re.sub(
-                r'("name"\s*:\s*")[^"]*(")',
-                rf'\g<1>{skin_display_name}\g<2>',
-                content
-            )
-            
-            # Update skin key - replace SKINNAME placeholder only, preserve car ID
-            # Pattern: "<carid>_skin_SKINNAME" -> "<carid>_skin_<actual_skin_id>"
-            content = re.sub(
-                r'"([^"]+_skin_)SKINNAME"',
-                rf'"\g<1>{dds_identifier}"',
-                content
-            )
-            
-            # Update globalSkin - replace SKINNAME placeholder
-            content = re.sub(
-                r'("globalSkin"\s*:\s*")SKINNAME(")',
-                rf'\g<1>{dds_identifier}\g<2>',
-                content
-            )
-            
-            # Update _extra.skin references
-            def replace_extra_skin(match):
-                return f'"{match.group(1)}{dds_identifier}"'
-            
-            content = re.sub(
-                r'"([^"]*_extra\.skin\.)[^"]+"',
-                replace_extra_skin,
-                content
-            )
-            
-            def replace_extra_skin_name(match):
-                return f'{match.group(1)}{dds_identifier}"'
-            
-            content = re.sub(
-                r'("name"\s*:\s*"[^"]*_extra\.skin\.)[^"]+"',
-                replace_extra_skin_name,
-                content
-            )
-            content = re.sub(
-                r'("mapTo"\s*:\s*"[^"]*_extra\.skin\.)[^"]+"',
-                replace_extra_skin_name,
-                content
-            )
-            
-            # Replace "carid" placeholder with actual vehicle_id (case-insensitive)
-            # This handles patterns like: carid_skin_identifier or paths with carid
-            # Uses lookbehind to allow matching carid followed by underscore
-            if vehicle_id:
-                content = re.sub(
-                    r'(?<![a-zA-Z0-9])carid',
-                    vehicle_id,
-                    content,
-                    flags=re.IGNORECASE
-                )
+            content = render_jbeam_text(content, dds_identifier, skin_display_name, author, vehicle_id)
             
             with open(file_path, "w", encoding="utf-8") as f:
                 f.write(content)
 
+def render_json_text(content, vehicle_id, skin_folder_name, dds_filename, dds_identifier, file_label="materials",
+                     quiet=False):
+    """
+    Apply the JSON (materials) template substitutions to a file's text.
+    Used by process_json_files and by the streaming build (no files on disk).
+    ONLY updates Stage 2 baseColorMap - leaves Stage 1 untouched.
+    quiet skips the debug output (used when compiling templates).
+    """
+    # Try to parse as JSON first for proper Stage 2 handling
+    try:
+        data = json.loads(content)
+        
+        # Process each material
+        for material_key, material_data in data.items():
+            if not isinstance(material_data, dict):
+                continue
+    
+            # Update Stages - ONLY modify Stage 2 baseColorMap
+            if "Stages" in material_data and isinstance(material_data["Stages"], list):
+                stages = material_data["Stages"]
+    
+                # ONLY update Stage 2 (index 1) baseColorMap
+                if len(stages) > 1 and isinstance(stages[1], dict):
+                    stage2 = stages[1]
+                    if "baseColorMap" in stage2:
+                        old_path = stage2["baseColorMap"]
+    
+                        # Check if path contains SKINNAME placeholder (case-insensitive)
+                        if "SKINNAME" in old_path.upper():
+                            # Replace SKINNAME in folder path with skin_folder_name (has underscores)
+                            # Replace SKINNAME in filename with dds_identifier (no spaces/underscores)
+                            # Preserve original file extension
+                            # Example: vehicles/etki/SKINNAME/etki_skin_SKINNAME.dds
+                            #       -> vehicles/etki/7-eleven_V1/etki_skin_7-elevenV1.dds
+                            new_path = re.sub(r'/SKINNAME/', f"/{skin_folder_name}/", old_path, flags=re.IGNORECASE)
+                            # Replace SKINNAME but preserve the file extension
+                            new_path = re.sub(r'_skin_SKINNAME(\.\w+)', f"_skin_{dds_identifier}\\1", new_path, flags=re.IGNORECASE)
+                            # Also replace carid placeholder
+                            new_path = re.sub(r'(?<![a-zA-Z0-9])carid', vehicle_id, new_path, flags=re.IGNORECASE)
+                            message = f"[DEBUG] Replaced SKINNAME placeholder in baseColorMap for {material_key}:"
+                        else:
+                            # Build new path from parameters (legacy behavior)
+                            new_path = f"vehicles/{vehicle_id}/{skin_folder_name}/{dds_filename}"
+                            message = f"[DEBUG] Updated Stage 2 baseColorMap in {material_key}:"
+    
+                        stage2["baseColorMap"] = new_path
+                        if not quiet:
+                            print(message)
+                            print(f"[DEBUG]   From: {old_path}")
+                            print(f"[DEBUG]   To:   {new_path}")
+    
+        # Now handle skin name replacements with regex on the JSON string
+        content = json.dumps(data, indent=2)
+        
+    except json.JSONDecodeError:
+        # If JSON parsing fails, fall back to regex on raw text
+        if not quiet:
+            print(f"[DEBUG] JSON parse failed for {file_label}, using regex fallback")
+    
+    # Update generic .skin. references (ALL occurrences)
+    def replace_skin_ref(match):
+        return f'"{match.group(1)}{dds_identifier}"'
+    
+    content = re.sub(
+        r'"([^"]+\.skin\.)[^"]+"',
+        replace_skin_ref,
+        content
+    )
+    
+    # Also handle .skin_ (underscore) pattern, replacing everything after .skin_*. with identifier
+    content = re.sub(
+        r'"([^"]+\.skin_[^.]*\.)[^"]+"',
+        replace_skin_ref,
+        content
+    )
+    
+    def replace_skin_name(match):
+        return f'{match.group(1)}{dds_identifier}"'
+    
+    content = re.sub(
+        r'("name"\s*:\s*"[^"]+\.skin\.)[^"]+"',
+        replace_skin_name,
+        content
+    )
+    content = re.sub(
+        r'("mapTo"\s*:\s*"[^"]+\.skin\.)[^"]+"',
+        replace_skin_name,
+        content
+    )
+    
+    # Also handle .skin_ pattern for name and mapTo
+    content = re.sub(
+        r'("name"\s*:\s*"[^"]+\.skin_[^.]*\.)[^"]+"',
+        replace_skin_name,
+        content
+    )
+    content = re.sub(
+        r'("mapTo"\s*:\s*"[^"]+\.skin_[^.]*\.)[^"]+"',
+        replace_skin_name,
+        content
+    )
+    
+    # Update _extra.skin references
+    def replace_extra_skin_all(match):
+        return f'"{match.group(1)}{dds_identifier}"'
+    
+    content = re.sub(
+        r'"([^"]*_extra\.skin\.)[^"]+"',
+        replace_extra_skin_all,
+        content
+    )
+    
+    def replace_extra_skin_name_all(match):
+        return f'{match.group(1)}{dds_identifier}"'
+    
+    content = re.sub(
+        r'("name"\s*:\s*"[^"]*_extra\.skin\.)[^"]+"',
+        replace_extra_skin_name_all,
+        content
+    )
+    content = re.sub(
+        r'("mapTo"\s*:\s*"[^"]*_extra\.skin\.)[^"]+"',
+        replace_extra_skin_name_all,
+        content
+    )
+    
+    # Update SKINNAME placeholders in paths
+    # This handles the template format: /vehicles/carid/SKINNAME/carid_skin_SKINNAME.ext
+    # IMPORTANT: Use skin_folder_name for folder (preserves format like "7-eleven_V1")
+    #            Use dds_identifier for filename (sanitized like "7-elevenV1")
+    #            Preserve original file extension (.dds, .png, .json, etc.)
+    content = re.sub(
+        r'/SKINNAME/',
+        f'/{skin_folder_name}/',
+        content,
+        flags=re.IGNORECASE
+    )
+    # Replace SKINNAME in filenames while preserving extension
+    content = re.sub(
+        r'_skin_SKINNAME(\.\w+)',
+        f'_skin_{dds_identifier}\\1',
+        content,
+        flags=re.IGNORECASE
+    )
+    
+    # Replace "carid" placeholder with actual vehicle_id (case-insensitive)
+    # This handles paths like: vehicles/carid/skinname/carid_skin_identifier.dds
+    # Uses lookbehind to allow matching carid followed by underscore
+    # Will replace both in paths and filenames
+    content = re.sub(
+        r'(?<![a-zA-Z0-9])carid',
+        vehicle_id,
+        content,
+        flags=re.IGNORECASE
+    )
+    
+    # NOTE: baseColorMap is now handled above in the JSON parsing section
+    # We do NOT use regex replacement for baseColorMap anymore to avoid touching Stage 1
+    
+    return content
+
 def process_json_files(folder_path, vehicle_id, skin_folder_name, dds_filename, dds_identifier):
     """
     Process all JSON files in the folder.
@@ -974,156 +2442,12 @@ def process_json_files(folder_path, vehicle_id, skin_folder_name, dds_filename,
             
             file_path = os.path.join(root_dir, file)
             
-            # Try to parse as JSON first for proper Stage 2 handling
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                
-                # Process each material
-                for material_key, material_data in data.items():
-                    if not isinstance(material_data, dict):
-                        continue
-                    
-                    # Update Stages - ONLY modify Stage 2 baseColorMap
-                    if "Stages" in material_data and isinstance(material_data["Stages"], list):
-                        stages = material_data["Stages"]
-                        
-                        # ONLY update Stage 2 (index 1) baseColorMap
-                        if len(stages) > 1 and isinstance(stages[1], dict):
-                            stage2 = stages[1]
-                            if "baseColorMap" in stage2:
-                                old_path = stage2["baseColorMap"]
-                                
-                                # Check if path contains SKINNAME placeholder (case-insensitive)
-                                if "SKINNAME" in old_path.upper():
-                                    # Replace SKINNAME in folder path with skin_folder_name (has underscores)
-                                    # Replace SKINNAME in filename with dds_identifier (no spaces/underscores)
-                                    # Preserve original file extension
-                                    # Example: vehicles/etki/SKINNAME/etki_skin_SKINNAME.dds
-                                    #       -> vehicles/etki/7-eleven_V1/etki_skin_7-elevenV1.dds
-                                    new_path = re.sub(r'/SKINNAME/', f"/{skin_folder_name}/", old_path, flags=re.IGNORECASE)
-                                    # Replace SKINNAME but preserve the file extension
-                                    new_path = re.sub(r'_skin_SKINNAME(\.\w+)', f"_skin_{dds_identifier}\\1", new_path, flags=re.IGNORECASE)
-                                    # Also replace carid placeholder
-                                    new_path = re.sub(r'(?<![a-zA-Z0-9])carid', vehicle_id, new_path, flags=re.IGNORECASE)
-                                    print(f"[DEBUG] Replaced SKINNAME placeholder in baseColorMap for {material_key}:")
-                                else:
-                                    # Build new path from parameters (legacy behavior)
-                                    new_path = f"vehicles/{vehicle_id}/{skin_folder_name}/{dds_filename}"
-                                    print(f"[DEBUG] Updated Stage 2 baseColorMap in {material_key}:")
-                                
-                                stage2["baseColorMap"] = new_path
-                                print(f"[DEBUG]   From: {old_path}")
-                                print(f"[DEBUG]   To:   {new_path}")
-                
-                # Now handle skin name replacements with regex on the JSON string
-                content = json.dumps(data, indent=2)
-                
-            except json.JSONDecodeError:
-                # If JSON parsing fails, fall back to regex on raw text
-                print(f"[DEBUG] JSON parse failed for {file_path}, using regex fallback")
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-            
-            # Update generic .skin. references (ALL occurrences)
-            def replace_skin_ref(match):
-                return f'"{match.group(1)}{dds_identifier}"'
-            
-            content = re.sub(
-                r'"([^"]+\.skin\.)[^"]+"',
-                replace_skin_ref,
-                content
-            )
-            
-            # Also handle .skin_ (underscore) pattern, replacing everything after .skin_*. with identifier
-            content = re.sub(
-                r'"([^"]+\.skin_[^.]*\.)[^"]+"',
-                replace_skin_ref,
-                content
-            )
-            
-            def replace_skin_name(match):
-                return f'{match.group(1)}{dds_identifier}"'
-            
-            content = re.sub(
-                r'("name"\s*:\s*"[^"]+\.skin\.)[^"]+"',
-                replace_skin_name,
-                content
-            )
-            content = re.sub(
-                r'("mapTo"\s*:\s*"[^"]+\.skin\.)[^"]+"',
-                replace_skin_name,
-                content
-            )
-            
-            # Also handle .skin_ pattern for name and mapTo
-            content = re.sub(
-                r'("name"\s*:\s*"[^"]+\.skin_[^.]*\.)[^"]+"',
-                replace_skin_name,
-                content
-            )
-            content = re.sub(
-                r'("mapTo"\s*:\s*"[^"]+\.skin_[^.]*\.)[^"]+"',
-                replace_skin_name,
-                content
-            )
-            
-            # Update _extra.skin references
-            def replace_extra_skin_all(match):
-                return f'"{match.group(1)}{dds_identifier}"'
-            
-            content = re.sub(
-                r'"([^"]*_extra\.skin\.)[^"]+"',
-                replace_extra_skin_all,
-                content
-            )
-            
-            def replace_extra_skin_name_all(match):
-                return f'{match.group(1)}{dds_identifier}"'
-            
-            content = re.sub(
-                r'("name"\s*:\s*"[^"]*_extra\.skin\.)[^"]+"',
-                replace_extra_skin_name_all,
-                content
-            )
-            content = re.sub(
-                r'("mapTo"\s*:\s*"[^"]*_extra\.skin\.)[^"]+"',
-                replace_extra_skin_name_all,
-                content
-            )
-            
-            # Update SKINNAME placeholders in paths
-            # This handles the template format: /vehicles/carid/SKINNAME/carid_skin_SKINNAME.ext
-            # IMPORTANT: Use skin_folder_name for folder (preserves format like "7-eleven_V1")
-            #            Use dds_identifier for filename (sanitized like "7-elevenV1")
-            #            Preserve original file extension (.dds, .png, .json, etc.)
-            content = re.sub(
-                r'/SKINNAME/',
-                f'/{skin_folder_name}/',
-                content,
-                flags=re.IGNORECASE
-            )
-            # Replace SKINNAME in filenames while preserving extension
-            content = re.sub(
-                r'_skin_SKINNAME(\.\w+)',
-                f'_skin_{dds_identifier}\\1',
-                content,
-                flags=re.IGNORECASE
-            )
+            with open(file_path, "r", encoding="utf-8") as f:
+                content = f.read()
             
-            # Replace "carid" placeholder with actual vehicle_id (case-insensitive)
-            # This handles paths like: vehicles/carid/skinname/carid_skin_identifier.dds
-            # Uses lookbehind to allow matching carid followed by underscore
-            # Will replace both in paths and filenames
-            content = re.sub(
-                r'(?<![a-zA-Z0-9])carid',
-                vehicle_id,
-                content,
-                flags=re.IGNORECASE
+            content = render_json_text(
+                content, vehicle_id, skin_folder_name, dds_filename, dds_identifier, file_label=file_path
             )
             
-            # NOTE: baseColorMap is now handled above in the JSON parsing section
-            # We do NOT use regex replacement for baseColorMap anymore to avoid touching Stage 1
-            
             with open(file_path, "w", encoding="utf-8") as f:
-                f.write(content)
\ No newline at end of file
+                f.write(content)
@@ -0,0 +1,244 @@
+"""
+Materials document pipeline
+
+Each rendered materials JSON file of a skin is held in a MaterialsDocument and
+passed through the registered stages in order. The document keeps the text
+and, once a stage needs it, the parsed model. The text is parsed at most once
+and serialized at most once, no matter how many stages touch the file.
+
+Stages are plain functions registered with @materials_stage(name). They get
+the document and the skin's build context:
+
+    skin                The skin dict from the project
+    base_carid          Vehicle ID
+    skin_prefix         "vehicles/<carid>/<skin folder>"
+    dds_filename        DDS file name as added by the user
+    final_dds_filename  Normalized DDS name from the build plan
+    shared_dds          Arcname of another skin's identical texture that this
+                        skin uses instead of its own copy, or None
+
+Stages may also write to the context: the shared_texture stage sets
+shared_dds_used once a material points at the shared copy.
+"""
+import json
+import os
+
+from core.file_ops import parse_materials_text, apply_material_properties
+
+# (name, function) in the order the stages run
+MATERIALS_STAGES = []
+
+
+def materials_stage(name):
+    """Register a function as a materials pipeline stage"""
+    def decorator(func):
+        MATERIALS_STAGES.append((name, func))
+        return func
+    return decorator
+
+
+def _json_safe(text):
+    """True if text appears unchanged inside a json.dumps string"""
+    return json.dumps(text)[1:-1] == text
+
+
+def _replace_in_model(value, old, new):
+    """Replace old with new in every string (keys and values) of a parsed model"""
+    if isinstance(value, str):
+        return value.replace(old, new)
+    if isinstance(value, dict):
+        return {
+            _replace_in_model(key, old, new): _replace_in_model(item, old, new)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_replace_in_model(item, old, new) for item in value]
+    return value
+
+
+class MaterialsDocument:
+    """One materials JSON file of one skin, loaded once"""
+
+    def __init__(self, text, rel_path, file_label=None):
+        """
+        Args:
+            text: Rendered file text
+            rel_path: Path inside the skin folder, with forward slashes
+            file_label: Name used in debug output
+        """
+        self.rel_path = rel_path
+        self.file_name = rel_path.rsplit("/", 1)[-1]
+        self.file_label = file_label or self.file_name
+        self._text = text
+        self._model = None
+        self._parse_failed = False
+        self._model_changed = False
+        self.parses = 0
+        self.serializations = 0
+
+    @property
+    def is_materials_file(self):
+        """True for materials.json and *.materials.json"""
+        return self.file_name == "materials.json" or self.file_name.endswith(".materials.json")
+
+    @property
+    def text(self):
+        """Current text, serializing the model only if a stage changed it"""
+        if self._model_changed:
+            self._text = json.dumps(self._model, indent=2)
+            self._model_changed = False
+            self.serializations += 1
+        return self._text
+
+    def model(self):
+        """
+        Parsed materials (parsed on first use).
+
+        Returns:
+            dict: The model (edit in place, then call mark_changed), or None
+                  if the text is not valid JSON
+        """
+        if self._model is None and not self._parse_failed:
+            self._model = parse_materials_text(self._text, self.file_label)
+            self._parse_failed = self._model is None
+            self.parses += 1
+        return self._model
+
+    def mark_changed(self):
+        """Tell the document its model was edited"""
+        self._model_changed = True
+
+    def replace(self, old, new):
+        """
+        Replace a string everywhere in the file, as a text replace would.
+        Works on the model when it is already loaded and changed, so the file
+        is not serialized and parsed again.
+        """
+        if self._model_changed and _json_safe(old) and _json_safe(new):
+            self._model = _replace_in_model(self._model, old, new)
+            return
+
+        text = self.text
+        if old in text:
+            self._text = text.replace(old, new)
+            # Any parsed model is now out of date
+            self._model = None
+            self._parse_failed = False
+
+
+def run_materials_stages(document, context, stages=None):
+    """
+    Run every registered stage on a document.
+
+    Args:
+        document: MaterialsDocument
+        context: Skin build context (see module docstring)
+        stages: Stage list to use instead of MATERIALS_STAGES
+
+    Returns:
+        tuple: (final text, warnings). A stage that raises is reported as a
+               warning ("Material properties processing failed") and the
+               remaining stages still run.
+    """
+    warnings = []
+    for name, stage in (stages if stages is not None else MATERIALS_STAGES):
+        try:
+            stage(document, context)
+        except Exception as e:
+            print(f"  [WARNING] {name} stage failed for {document.file_label}: {e}")
+            warnings.append(f"{name.replace('_', ' ').capitalize()} processing failed")
+    return document.text, warnings
+
+
+@materials_stage("material_properties")
+def _material_properties_stage(document, context):
+    """Apply the skin's material property overrides"""
+    material_props = context["skin"].get("material_properties")
+    if not material_props or not document.is_materials_file:
+        return
+
+    model = document.model()
+    if model is None:
+        return
+    if apply_material_properties(model, material_props):
+        document.mark_changed()
+
+
+@materials_stage("dds_path")
+def _dds_path_stage(document, context):
+    """Point skin.materials.json at the normalized DDS name"""
+    if document.rel_path != "skin.materials.json":
+        return
+    if context["final_dds_filename"] == context["dds_filename"]:
+        return
+
+    prefix = context["skin_prefix"]
+    document.replace(
+        f"{prefix}/{context['dds_filename']}",
+        f"{prefix}/{context['final_dds_filename']}"
+    )
+
+
+@materials_stage("shared_texture")
+def _shared_texture_stage(document, context):
+    """Point a skin whose texture is stored once for the whole mod at the shared copy"""
+    shared_dds = context.get("shared_dds")
+    if not shared_dds:
+        return
+
+    # A .png reference also loads the .dds in game, so both are pointed at the shared copy
+    stem = os.path.splitext(context["final_dds_filename"])[0]
+    for extension in (".dds", ".png"):
+        old = f"{context['skin_prefix']}/{stem}{extension}"
+        if old in document.text:
+            document.replace(old, shared_dds)
+            context["shared_dds_used"] = True
+
+
+def uses_shared_texture(planned, shared_dds):
+    """
+    Check whether a planned skin would point at a shared texture, i.e. one of
+    its materials refers to its own texture. A skin where none does keeps its
+    own copy when it is built, so it must not be deduplicated.
+
+    The skin's materials files are rendered and run through the stages that
+    touch texture paths, the same way the build does.
+
+    Args:
+        planned: Skin of a BuildPlan
+        shared_dds: Arcname of the copy the skin would use
+
+    Returns:
+        bool
+    """
+    from core.templates import get_template_cache
+    template_cache = get_template_cache()
+
+    skin = planned["skin"]
+    dds_filename = os.path.basename(skin["dds_path"])
+    context = {
+        "skin": skin,
+        "base_carid": planned["base_carid"],
+        "skin_prefix": f"vehicles/{planned['base_carid']}/{planned['skin_folder']}",
+        "dds_filename": dds_filename,
+        "final_dds_filename": planned["final_dds_filename"],
+        "shared_dds": shared_dds,
+    }
+    # Material properties never change texture paths
+    stages = [(name, stage) for name, stage in MATERIALS_STAGES if name != "material_properties"]
+    for rel_path, file, full_path in planned["template_files"]:
+        if not file.endswith(".json") or file.startswith("info"):
+            continue
+        document = MaterialsDocument(
+            template_cache.get(full_path, "json").render(
+                vehicle_id=planned["base_carid"],
+                skin_folder_name=planned["skin_folder"],
+                dds_filename=dds_filename,
+                dds_identifier=os.path.splitext(dds_filename)[0].split("_")[-1]
+            ),
+            rel_path
+        )
+        run_materials_stages(document, context, stages)
+        if context.get("shared_dds_used"):
+            return True
+    return False
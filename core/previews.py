@@ -0,0 +1,296 @@
+"""
+Texture previews
+
+A skin texture is often 4096x4096 or 8192x8192, and decoding its full top
+mip only to shrink it to an 800x800 preview takes seconds. DDS files
+already store every smaller size as a mip level, so a preview decodes the
+smallest stored mip that is still at least the preview size, read straight
+from its offset in the file (see DDSInfo.mip_offset in core/dds.py), and
+resizes it the same way Image.thumbnail would. That decodes 1/16th to
+1/100th of the pixels for the same picture.
+
+Previews are progressive: a small mip (about DRAFT_SIZE pixels across)
+comes first, shown scaled up, then the sharp one. PreviewLoader does the
+decoding on a background thread; like the build runners it is driven by
+poll() from the owner's event loop (a Tk after() loop in the GUI) and never
+blocks. Only the newest request is worked on: requesting another texture
+drops the stages of the previous one that were not decoded yet.
+
+Block-compressed formats the installed Pillow cannot decode (it has no
+BC1/BC3 sRGB, for one) are decoded with NumPy by core/bcn.py. Files that
+are not DDS and other formats Pillow cannot decode per mip fall back to a
+full decode, still off the UI thread.
+
+With a ThumbnailCache (core/thumbnail_cache.py), PreviewLoader answers
+requests for textures it has shown before straight from the cache, and
+stores every preview it finishes.
+"""
+import io
+import math
+import queue
+import struct
+import threading
+
+from core import bcn
+from core.dds import DDSError, DX10_HEADER_SIZE, HEADER_SIZE, read_dds_info
+
+# Bounding box of the skin editor's preview
+PREVIEW_BOX = (800, 800)
+
+# The first, blurry stage uses the smallest mip with a side of at least this
+DRAFT_SIZE = 128
+
+
+def thumbnail_size(width, height, box=PREVIEW_BOX):
+    """
+    Size Image.thumbnail(box) gives an image of width x height (aspect
+    kept, never enlarged).
+    """
+    x, y = box
+    if x >= width and y >= height:
+        return width, height
+
+    def round_aspect(number, key):
+        return max(min(math.floor(number), math.ceil(number), key=key), 1)
+
+    aspect = width / height
+    if x / y >= aspect:
+        x = round_aspect(y * aspect, key=lambda n: abs(aspect - n / y))
+    else:
+        y = round_aspect(x / aspect, key=lambda n: 0 if n == 0 else abs(aspect - x / n))
+    return x, y
+
+
+def preview_mip_level(info, box=PREVIEW_BOX):
+    """Smallest stored mip level that is still at least the preview size"""
+    target_width, target_height = thumbnail_size(info.width, info.height, box)
+    level = 0
+    while level + 1 < info.mip_count:
+        width, height = info.mip_dimensions(level + 1)
+        if width < target_width or height < target_height:
+            break
+        level += 1
+    return level
+
+
+def draft_mip_level(info, size=DRAFT_SIZE):
+    """Smallest stored mip level with a side of at least size pixels"""
+    level = 0
+    while level + 1 < info.mip_count and max(info.mip_dimensions(level + 1)) >= size:
+        level += 1
+    return level
+
+
+def read_mip(info, level):
+    """
+    Decode one stored mip level of a DDS texture (the first face or slice
+    of cubemaps, arrays and volumes).
+
+    The level's bytes are read from their offset and handed to Pillow with
+    a copy of the file's header describing just that level, so only that
+    mip is decoded. Block-compressed formats Pillow cannot decode go
+    through the NumPy decoder instead.
+
+    Returns:
+        PIL.Image.Image
+
+    Raises:
+        DDSError: The format's mip layout is unknown
+        OSError: Pillow cannot decode the format, or the file is cut off
+    """
+    from PIL import Image
+
+    offset = info.mip_offset(level)
+    size = info.mip_size(level)
+    if offset is None or size is None:
+        raise DDSError(f"Unknown mip layout for {info.format}")
+    if info.volume:
+        size //= max(1, info.depth >> level)
+    width, height = info.mip_dimensions(level)
+
+    with open(info.path, "rb") as f:
+        header = bytearray(f.read(info.header_size))
+        f.seek(offset)
+        data = f.read(size)
+    if len(data) < size:
+        raise OSError(f"{info.path} is cut off in mip level {level}")
+
+    # One plain 2D level: size, linear size and mip count patched, cubemap
+    # and volume flags dropped
+    struct.pack_into("<3I", header, 12, height, width, size)
+    struct.pack_into("<I", header, 24, 0)
+    struct.pack_into("<I", header, 28, 1)
+    struct.pack_into("<I", header, 112, 0)
+    if len(header) >= DX10_HEADER_SIZE:
+        struct.pack_into("<3I", header, HEADER_SIZE + 4, 3, 0, 1)
+
+    try:
+        image = Image.open(io.BytesIO(bytes(header) + data))
+        image.load()
+    except (OSError, NotImplementedError, ValueError) as e:
+        if not bcn.can_decode(info.format):
+            raise
+        print(f"[DEBUG] Pillow cannot decode {info.format} ({e}), using the NumPy decoder")
+        image = bcn.decode_image(data, info.format, width, height)
+    return image
+
+
+def _full_preview(path, box):
+    """Decode the whole top level and shrink it (anything Pillow opens)"""
+    from PIL import Image
+    image = Image.open(path)
+    image.thumbnail(box, Image.Resampling.LANCZOS)
+    return image
+
+
+def render_preview(path, box=PREVIEW_BOX, draft=True):
+    """
+    Decode a texture's preview, stage by stage.
+
+    Args:
+        path: Texture file (DDS; anything else Pillow opens is decoded in full)
+        box: Bounding box of the preview
+        draft: Yield a small mip first when the texture has one
+
+    Yields:
+        tuple: (stage, image, size): stage is "draft" (a small mip, to be
+               shown scaled up to size) or "final" (image.size == size);
+               the final stage is always the last one
+    """
+    from PIL import Image
+
+    try:
+        info = read_dds_info(path)
+    except (DDSError, OSError):
+        info = None
+
+    if info is not None:
+        size = thumbnail_size(info.width, info.height, box)
+        level = preview_mip_level(info, box)
+        try:
+            if draft:
+                draft_level = draft_mip_level(info)
+                if draft_level > level + 1:
+                    yield "draft", read_mip(info, draft_level), size
+            image = read_mip(info, level)
+        except (DDSError, OSError, NotImplementedError, ValueError) as e:
+            print(f"[DEBUG] Mip preview unavailable ({e}), decoding the full texture")
+        else:
+            if image.size != size:
+                image = image.resize(size, Image.Resampling.LANCZOS)
+            print(f"[DEBUG] Preview from mip {level} ({info.mip_dimensions(level)[0]}x"
+                  f"{info.mip_dimensions(level)[1]}) of {info.width}x{info.height}")
+            yield "final", image, size
+            return
+
+    image = _full_preview(path, box)
+    yield "final", image, image.size
+
+
+class PreviewLoader:
+    """
+    Decodes previews on a background thread.
+
+        loader = PreviewLoader()
+        request_id = loader.request(path)
+        ... later, from the event loop:
+        for request_id, stage, image, size in loader.poll(): ...
+
+    stage is "draft", "final" or "error" (image is then the exception and
+    size is None). Events of requests that were superseded are dropped.
+
+    With a cache, request() looks the texture up right away: on a hit the
+    final event is ready before it returns.
+    """
+
+    def __init__(self, box=PREVIEW_BOX, render=render_preview, cache=None):
+        self.box = box
+        self.render = render
+        self.cache = cache
+        self._requests = queue.Queue()
+        self._events = queue.Queue()
+        self._latest = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def busy(self):
+        """True while the newest request has not delivered its final stage (keep polling)"""
+        return self._pending or not self._events.empty()
+
+    def request(self, path):
+        """
+        Start decoding a preview of path; earlier requests are abandoned.
+
+        Returns:
+            int: Request id the events are tagged with
+        """
+        cached = self.cache.get(path, self.box) if self.cache is not None else None
+        if cached is not None:
+            with self._lock:
+                self._latest += 1
+                request_id = self._latest
+                self._pending = False
+            self._events.put((request_id, "final", cached, cached.size))
+            return request_id
+
+        with self._lock:
+            self._latest += 1
+            request_id = self._latest
+            self._pending = True
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="BeamSkinPreview", daemon=True)
+                self._thread.start()
+        self._requests.put((request_id, path))
+        return request_id
+
+    def cancel(self):
+        """Abandon the current request"""
+        with self._lock:
+            self._latest += 1
+            self._pending = False
+
+    _pending = False
+
+    def poll(self):
+        """
+        Returns:
+            list: (request_id, stage, image, size) events of the newest request
+        """
+        events = []
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == self._latest:
+                events.append(event)
+        return events
+
+    def _superseded(self, request_id):
+        return request_id != self._latest
+
+    def _run(self):
+        while True:
+            request_id, path = self._requests.get()
+            # Only the newest request matters
+            while not self._requests.empty():
+                request_id, path = self._requests.get_nowait()
+            if self._superseded(request_id):
+                continue
+            key = self.cache.key(path, self.box) if self.cache is not None else None
+            try:
+                for stage, image, size in self.render(path, self.box):
+                    superseded = self._superseded(request_id)
+                    if not superseded:
+                        self._events.put((request_id, stage, image, size))
+                    if stage == "final" and key is not None:
+                        self.cache.store(key, image)
+                    if superseded:
+                        break
+            except Exception as e:
+                print(f"[DEBUG] Could not load preview of {path}: {e}")
+                self._events.put((request_id, "error", e, None))
+            with self._lock:
+                if request_id == self._latest:
+                    self._pending = False
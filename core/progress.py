@@ -0,0 +1,220 @@
+"""
+Build progress tracking
+
+A build is split into stages ("render", "write", ...), each with a total in
+bytes: template bytes rendered, then entry bytes read, compressed and written
+into the ZIP. Workers call BuildProgress.advance() as bytes are processed
+(the ZIP writer does so per chunk) and listeners receive ProgressEvent
+snapshots with the current stage, the current file, the overall fraction,
+the throughput in MB/s and an ETA.
+
+Events are throttled to one every min_interval seconds, except for stage
+changes and the final event, which are always delivered.
+"""
+import threading
+import time
+
+# Seconds of history used for the MB/s figure
+RATE_WINDOW = 3.0
+
+# ETA is only reported once a stage has run this long
+MIN_ETA_SECONDS = 0.5
+
+
+def format_duration(seconds):
+    """1:05 or 1:02:05"""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+class ProgressEvent:
+    """
+    Snapshot of a build's progress.
+
+    Attributes:
+        stage: Stage name ("plan", "render", "write", ...)
+        stage_label: Human readable stage name
+        file: File or skin currently being processed (may be None)
+        bytes_done / bytes_total: Across all stages
+        stage_bytes_done / stage_bytes_total: Within the current stage
+        fraction: bytes_done / bytes_total (0.0 - 1.0)
+        mb_per_s: Recent throughput of the current stage, or None
+        eta_seconds: Estimated time until the build finishes, or None
+        elapsed_seconds: Time since the build started
+        finished: True for the last event of a build
+    """
+
+    def __init__(self, stage, stage_label, file, bytes_done, bytes_total,
+                 stage_bytes_done, stage_bytes_total, mb_per_s, eta_seconds,
+                 elapsed_seconds, finished=False):
+        self.stage = stage
+        self.stage_label = stage_label
+        self.file = file
+        self.bytes_done = bytes_done
+        self.bytes_total = bytes_total
+        self.stage_bytes_done = stage_bytes_done
+        self.stage_bytes_total = stage_bytes_total
+        self.fraction = 1.0 if finished else (min(1.0, bytes_done / bytes_total) if bytes_total else 0.0)
+        self.mb_per_s = mb_per_s
+        self.eta_seconds = eta_seconds
+        self.elapsed_seconds = elapsed_seconds
+        self.finished = finished
+
+    def format(self):
+        """One line status text, e.g. 'Writing ZIP: 120/430 MB, 45.2 MB/s, 0:07 left'"""
+        if self.finished:
+            return f"Done in {format_duration(self.elapsed_seconds)}"
+        mb = 1024 * 1024
+        parts = []
+        if self.stage_bytes_total:
+            parts.append(f"{self.stage_bytes_done / mb:.0f}/{self.stage_bytes_total / mb:.0f} MB")
+        if self.mb_per_s is not None:
+            parts.append(f"{self.mb_per_s:.1f} MB/s")
+        if self.eta_seconds is not None:
+            parts.append(f"{format_duration(self.eta_seconds)} left")
+        text = self.stage_label
+        if parts:
+            text += ": " + ", ".join(parts)
+        return text
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+class BuildProgress:
+    """
+    Byte-based progress of one build. Thread-safe; listeners are called from
+    whichever thread advanced the progress.
+    """
+
+    def __init__(self, listener=None, fraction_callback=None, min_interval=0.1):
+        """
+        Args:
+            listener: Called with a ProgressEvent
+            fraction_callback: Called with the overall fraction (0.0 - 1.0),
+                               for callers that only drive a progress bar
+            min_interval: Minimum seconds between two throttled events
+        """
+        self.listener = listener
+        self.fraction_callback = fraction_callback
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._order = []
+        self._current = None
+        self._file = None
+        self._started = time.perf_counter()
+        self._stage_started = self._started
+        self._samples = []
+        self._last_emit = 0.0
+        self._finished = False
+
+    def add_stage(self, name, label, total_bytes=0):
+        """Declare a stage (in the order the stages run) and its size in bytes"""
+        with self._lock:
+            self._stages[name] = {"label": label, "total": max(0, int(total_bytes)), "done": 0}
+            self._order.append(name)
+
+    def set_total(self, name, total_bytes):
+        """Correct a stage's size once it is known exactly"""
+        with self._lock:
+            stage = self._stages[name]
+            stage["total"] = max(0, int(total_bytes))
+            stage["done"] = min(stage["done"], stage["total"])
+
+    def start_stage(self, name, file=None):
+        """Mark every earlier stage complete and switch to name"""
+        with self._lock:
+            for earlier in self._order[:self._order.index(name)]:
+                self._stages[earlier]["done"] = self._stages[earlier]["total"]
+            self._current = name
+            self._file = file
+            self._stage_started = time.perf_counter()
+            self._samples = [(self._stage_started, self._stages[name]["done"])]
+            event = self._snapshot()
+        self._emit(event)
+
+    def advance(self, nbytes, file=None):
+        """Count nbytes of the current stage as done"""
+        with self._lock:
+            if self._current is None:
+                return
+            stage = self._stages[self._current]
+            stage["done"] = min(stage["total"], stage["done"] + nbytes) if stage["total"] else stage["done"] + nbytes
+            if file is not None:
+                self._file = file
+
+            now = time.perf_counter()
+            if now - self._last_emit < self.min_interval:
+                return
+            self._samples.append((now, stage["done"]))
+            while len(self._samples) > 2 and now - self._samples[0][0] > RATE_WINDOW:
+                self._samples.pop(0)
+            event = self._snapshot()
+        self._emit(event)
+
+    def finish(self):
+        """Mark the build complete and send the final event"""
+        with self._lock:
+            for stage in self._stages.values():
+                stage["done"] = stage["total"]
+            self._finished = True
+            event = self._snapshot()
+        self._emit(event)
+
+    def _snapshot(self):
+        now = time.perf_counter()
+        self._last_emit = now
+        stage = self._stages.get(self._current, {"label": "", "total": 0, "done": 0})
+        bytes_total = sum(s["total"] for s in self._stages.values())
+        bytes_done = sum(min(s["done"], s["total"]) for s in self._stages.values())
+
+        rate = None
+        if len(self._samples) >= 2:
+            (first_time, first_done), (last_time, last_done) = self._samples[0], self._samples[-1]
+            if last_time > first_time:
+                rate = (last_done - first_done) / (last_time - first_time)
+
+        eta = None
+        if rate and not self._finished and now - self._stage_started >= MIN_ETA_SECONDS:
+            eta = (bytes_total - bytes_done) / rate
+
+        return ProgressEvent(
+            stage=self._current,
+            stage_label=stage["label"],
+            file=self._file,
+            bytes_done=bytes_done,
+            bytes_total=bytes_total,
+            stage_bytes_done=min(stage["done"], stage["total"]) if stage["total"] else stage["done"],
+            stage_bytes_total=stage["total"],
+            mb_per_s=rate / (1024 * 1024) if rate is not None else None,
+            eta_seconds=eta,
+            elapsed_seconds=now - self._started,
+            finished=self._finished,
+        )
+
+    def _emit(self, event):
+        if self.listener:
+            self.listener(event)
+        if self.fraction_callback:
+            self.fraction_callback(event.fraction)
+
+    def chunk_counter(self, file, file_size, chunk_total):
+        """
+        Callback for chunks of a different size than the entry itself (e.g.
+        compressed bytes copied from another archive). Each call reports the
+        matching share of file_size, so the entry adds up to exactly file_size.
+        """
+        state = {"seen": 0, "reported": 0}
+
+        def on_chunk(nbytes):
+            state["seen"] += nbytes
+            reported = file_size * state["seen"] // chunk_total if chunk_total else file_size
+            self.advance(reported - state["reported"], file)
+            state["reported"] = reported
+
+        return on_chunk
@@ -419,6 +419,92 @@ def get_mods_folder_path() -> str:
     """Get the BeamNG mods folder path"""
     return app_settings.get("mods_folder", "")
 
+def get_build_workers() -> int:
+    """Get how many skins are built in parallel (0 or unset = one per CPU core)"""
+    workers = app_settings.get("build_workers", 0)
+    try:
+        workers = int(workers)
+    except (TypeError, ValueError):
+        workers = 0
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+def get_build_use_processes() -> bool:
+    """Check if parallel builds should use worker processes instead of threads"""
+    return bool(app_settings.get("build_use_processes", False))
+
+def get_build_mode() -> str:
+    """Get the mod build mode: "stream" (default) or "staged" (temp folder, for debugging)"""
+    mode = app_settings.get("build_mode", "stream")
+    return mode if mode in ("stream", "staged") else "stream"
+
+def get_build_incremental() -> bool:
+    """Check if builds should reuse unchanged skins from the build cache (data/cache/build)"""
+    return bool(app_settings.get("build_incremental", False))
+
+def get_compression_rules() -> dict:
+    """Get per-extension compression rule overrides, e.g. {".dds": "store"} (see core/compression.py)"""
+    rules = app_settings.get("compression_rules", {})
+    return rules if isinstance(rules, dict) else {}
+
+def get_build_journal() -> bool:
+    """Check if builds keep a journal so a failed or interrupted build can be resumed (default)"""
+    return bool(app_settings.get("build_journal", True))
+
+def get_build_reproducible() -> bool:
+    """Check if builds write reproducible archives (sorted entries, fixed timestamps); off by default"""
+    return bool(app_settings.get("build_reproducible", False))
+
+def get_build_shard_size_mb() -> float:
+    """Largest mod ZIP in MB; bigger mods are split into several ZIPs (0 or unset = one ZIP)"""
+    try:
+        return max(0.0, float(app_settings.get("build_shard_size_mb", 0)))
+    except (TypeError, ValueError):
+        return 0.0
+
+def get_watch_debounce() -> float:
+    """Seconds watched files must stay unchanged before watch mode rebuilds (default 1.0)"""
+    try:
+        return max(0.0, float(app_settings.get("watch_debounce", 1.0)))
+    except (TypeError, ValueError):
+        return 1.0
+
+def get_watch_max_concurrent() -> int:
+    """Maximum number of watch mode rebuilds running at the same time (default 1); rebuilds of one mod never overlap"""
+    try:
+        return max(1, int(app_settings.get("watch_max_concurrent", 1)))
+    except (TypeError, ValueError):
+        return 1
+
+def get_build_queue_concurrency() -> int:
+    """Number of queued mod builds that run at the same time (default 1)"""
+    try:
+        return max(1, int(app_settings.get("build_queue_concurrency", 1)))
+    except (TypeError, ValueError):
+        return 1
+
+def get_build_in_process() -> bool:
+    """Check if mod builds run in a separate worker process (default) instead of a thread of the GUI"""
+    return bool(app_settings.get("build_in_process", True))
+
+def get_thumbnail_cache_mb() -> float:
+    """Size limit of the texture preview cache (data/cache/thumbs) in MB (default 100)"""
+    try:
+        return max(0.0, float(app_settings.get("thumbnail_cache_mb", 100)))
+    except (TypeError, ValueError):
+        return 100.0
+
+def get_texture_format() -> str:
+    """Block format PNG/TGA/JPG skins are converted to: "auto" (default), "BC1", "BC3" or "BC7" """
+    texture_format = app_settings.get("texture_format", "auto")
+    return texture_format if texture_format in ("auto", "BC1", "BC3", "BC7") else "auto"
+
+def get_texture_preset() -> str:
+    """Speed/quality preset of texture conversion: "fast", "balanced" (default) or "quality" """
+    preset = app_settings.get("texture_preset", "balanced")
+    return preset if preset in ("fast", "balanced", "quality") else "balanced"
+
 def is_setup_complete() -> bool:
     """Check if first-time setup has been completed"""
     return app_settings.get("setup_complete", False)
@@ -0,0 +1,317 @@
+"""
+Sharded mod output
+
+Distribution channels limit upload sizes, and the game mounts one huge ZIP
+slower than a few smaller ones. With a shard size, a build splits the mod
+into <mod name>_part01.zip, <mod name>_part02.zip, ... that each stay under
+that size, plus <mod name>.shards.json, a manifest listing every shard and
+the cars and skins in it.
+
+shard_plan packs the planned skins before anything is rendered, using the
+sizes the build plan already knows (templates, DDS and config files):
+
+    - cars are packed whole, largest first, into the first shard with room
+      left, so a car's skins usually end up in one archive
+    - a car larger than the shard size is split into its skins
+    - a skin larger than the shard size cannot be split; it gets an archive
+      of its own and a warning
+    - a texture shared by skins in different shards (see
+      core.build_plan.dedupe_textures) is stored once per shard
+
+Sizes are uncompressed sizes plus the ZIP headers of every entry, so an
+archive never ends up larger than planned (textures are stored instead of
+deflated when deflating does not pay off, see core/compression.py).
+
+The manifest of the previous build tells which shards it wrote, so shards
+a smaller build no longer produces are removed.
+"""
+import json
+import os
+import threading
+
+# Bump when the manifest layout changes
+MANIFEST_VERSION = 1
+
+# Local file header plus central directory record of one entry, without the name
+ZIP_ENTRY_OVERHEAD = 30 + 46
+
+# End of central directory record
+ZIP_END_OVERHEAD = 22
+
+
+def shard_manifest_path(output_folder, mod_name):
+    """Path of a mod's shard manifest"""
+    return os.path.join(output_folder, f"{mod_name}.shards.json")
+
+
+def shard_file_name(mod_name, index, count):
+    """<mod name>_part01.zip (more digits once there are more than 99 shards)"""
+    return f"{mod_name}_part{index:0{max(2, len(str(count)))}d}.zip"
+
+
+def read_shard_manifest(path):
+    """
+    Returns:
+        dict: The manifest, or None if it is missing or unusable
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def write_shard_manifest(path, manifest):
+    """Write a manifest next to its shards (swapped in once complete)"""
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    os.replace(temp_path, path)
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _entry_size(arcname, size):
+    """Bytes an entry takes in the ZIP at most"""
+    return size + ZIP_ENTRY_OVERHEAD + 2 * len(arcname.encode("utf-8"))
+
+
+def _own_dds_entry(planned):
+    """The DDS entry a skin with a shared texture would have had"""
+    return {
+        "arcname": f"vehicles/{planned['base_carid']}/{planned['skin_folder']}/{planned['final_dds_filename']}",
+        "kind": "dds",
+        "source": planned["dds_path"],
+        "size": _file_size(planned["dds_path"]),
+    }
+
+
+def _skins_size(skins, texture_owners):
+    """
+    Planned bytes of a group of skins. A skin whose shared texture is owned
+    by a skin outside the group is counted with its own copy, since the
+    group may end up in another shard than the owner.
+    """
+    members = {id(planned) for planned in skins}
+    size = 0
+    for planned in skins:
+        size += sum(_entry_size(entry["arcname"], entry["size"]) for entry in planned["entries"])
+        shared = planned.get("shared_dds")
+        if shared and id(texture_owners.get(shared)) not in members:
+            own = _own_dds_entry(planned)
+            size += _entry_size(own["arcname"], own["size"])
+    return size
+
+
+def _localize_shared_textures(skins):
+    """
+    Give every shard its own copy of the shared textures its skins use: the
+    first skin (in build order) whose texture is owned by a skin in another
+    shard gets its DDS entry back, the others point at that copy.
+    """
+    arcnames = {entry["arcname"] for planned in skins for entry in planned["entries"]}
+    local_copies = {}
+    for planned in skins:
+        shared = planned.get("shared_dds")
+        if not shared or shared in arcnames:
+            continue
+        if shared in local_copies:
+            planned["shared_dds"] = local_copies[shared]
+            continue
+        own = _own_dds_entry(planned)
+        prefix = own["arcname"].rsplit("/", 1)[0] + "/"
+        position = next(
+            (i for i, entry in enumerate(planned["entries"]) if not entry["arcname"].startswith(prefix)),
+            len(planned["entries"])
+        )
+        planned["entries"].insert(position, own)
+        planned["shared_dds"] = None
+        local_copies[shared] = own["arcname"]
+        arcnames.add(own["arcname"])
+
+
+def _shared_textures(plan):
+    """plan.shared_textures again, after textures were copied into shards"""
+    owners = {}
+    for planned in plan.skins:
+        for entry in planned["entries"]:
+            if entry["kind"] == "dds":
+                owners[entry["arcname"]] = (planned, entry)
+    shared = {}
+    for planned in plan.skins:
+        arcname = planned.get("shared_dds")
+        if not arcname or arcname not in owners:
+            continue
+        texture = shared.get(arcname)
+        if texture is None:
+            owner, entry = owners[arcname]
+            texture = shared[arcname] = {
+                "arcname": arcname,
+                "size": entry["size"],
+                "skins": [f"{owner['car_instance_id']}/{owner['skin_name']}"],
+            }
+        texture["skins"].append(f"{planned['car_instance_id']}/{planned['skin_name']}")
+    return list(shared.values())
+
+
+def shard_plan(plan, shard_size, update_existing=False):
+    """
+    Split a build plan into size-capped shards.
+
+    Args:
+        plan: BuildPlan from plan_build with a shard size (plan.zip_path is
+              the manifest); skins whose shared texture ends up in another
+              shard are changed in place to store their own copy
+        shard_size: Largest archive size in bytes
+        update_existing: Existing shard ZIPs will be replaced instead of
+                         being an error
+
+    Returns:
+        list: plan.shards, dicts with index, zip_path, skins (planned skin
+              dicts in build order) and size (planned bytes)
+    """
+    shard_size = int(shard_size)
+    if shard_size <= 0:
+        raise ValueError(f"Shard size must be positive: {shard_size}")
+
+    order = {id(planned): i for i, planned in enumerate(plan.skins)}
+    texture_owners = {
+        entry["arcname"]: planned
+        for planned in plan.skins for entry in planned["entries"] if entry["kind"] == "dds"
+    }
+
+    cars = {}
+    for planned in plan.skins:
+        cars.setdefault(planned["car_instance_id"], []).append(planned)
+
+    units = []
+    for skins in cars.values():
+        size = _skins_size(skins, texture_owners)
+        if size <= shard_size:
+            units.append((size, skins))
+        else:
+            units.extend((_skins_size([planned], texture_owners), [planned]) for planned in skins)
+
+    # First fit, largest first
+    units.sort(key=lambda unit: (-unit[0], order[id(unit[1][0])]))
+    bins = []
+    for size, skins in units:
+        if size > shard_size:
+            for planned in skins:
+                plan.add_problem(
+                    "warning",
+                    f"Skin alone is {size / (1024 * 1024):.1f} MB, more than the shard size "
+                    f"({shard_size / (1024 * 1024):.1f} MB); it gets an archive of its own",
+                    planned["car_instance_id"], planned["skin_name"]
+                )
+            bins.append({"size": size, "skins": list(skins), "full": True})
+            continue
+        target = next((b for b in bins if not b["full"] and b["size"] + size <= shard_size), None)
+        if target is None:
+            target = {"size": 0, "skins": [], "full": False}
+            bins.append(target)
+        target["size"] += size
+        target["skins"].extend(skins)
+
+    # Shards in build order, skins in build order within each shard
+    for b in bins:
+        b["skins"].sort(key=lambda planned: order[id(planned)])
+    bins.sort(key=lambda b: order[id(b["skins"][0])])
+
+    folder = os.path.dirname(plan.zip_path)
+    plan.shards = []
+    for index, b in enumerate(bins, 1):
+        _localize_shared_textures(b["skins"])
+        zip_path = os.path.join(folder, shard_file_name(plan.mod_name, index, len(bins)))
+        plan.shards.append({
+            "index": index,
+            "zip_path": zip_path,
+            "skins": b["skins"],
+            "size": ZIP_END_OVERHEAD + sum(
+                _entry_size(entry["arcname"], entry["size"]) for planned in b["skins"] for entry in planned["entries"]
+            ),
+        })
+        if os.path.exists(zip_path) and not update_existing:
+            plan.zip_exists = True
+            plan.add_problem("error", f"ZIP already exists: {zip_path}")
+    plan.shared_textures = _shared_textures(plan)
+
+    unsharded = os.path.join(folder, f"{plan.mod_name}.zip")
+    if os.path.exists(unsharded):
+        plan.add_problem("warning", f"The unsharded mod is installed too and will load alongside: {unsharded}")
+
+    return plan.shards
+
+
+def shard_manifest(plan, shard_files):
+    """
+    Manifest of a finished sharded build.
+
+    Args:
+        plan: BuildPlan the shards were written from
+        shard_files: Shard index -> (size in bytes, SHA-256 or None)
+
+    Returns:
+        dict: JSON-ready manifest
+    """
+    shards = []
+    for shard in plan.shards:
+        size_bytes, sha256 = shard_files[shard["index"]]
+        shards.append({
+            "index": shard["index"],
+            "file": os.path.basename(shard["zip_path"]),
+            "size_bytes": size_bytes,
+            "planned_bytes": shard["size"],
+            "sha256": sha256,
+            "cars": list(dict.fromkeys(planned["car_instance_id"] for planned in shard["skins"])),
+            "skins": [f"{planned['car_instance_id']}/{planned['skin_name']}" for planned in shard["skins"]],
+        })
+    return {
+        "version": MANIFEST_VERSION,
+        "mod_name": plan.mod_name,
+        "shard_size": plan.shard_size,
+        "skins": len(plan.skins),
+        "shards": shards,
+    }
+
+
+def remove_stale_shards(previous, manifest, folder):
+    """
+    Remove the shards an earlier build wrote that this one did not.
+
+    Args:
+        previous: Manifest of the earlier build (or None)
+        manifest: Manifest just written
+        folder: Folder both manifests describe
+
+    Returns:
+        list: Removed paths
+    """
+    if not previous:
+        return []
+    current = {shard["file"] for shard in manifest["shards"]}
+    removed = []
+    for shard in previous.get("shards", []):
+        name = shard.get("file")
+        # Only plain file names, never a path out of the folder
+        if not name or name in current or os.path.basename(name) != name:
+            continue
+        path = os.path.join(folder, name)
+        try:
+            os.remove(path)
+            removed.append(path)
+            print(f"[DEBUG] Removed shard of an earlier build: {path}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"[WARNING] Could not remove old shard {path}: {e}")
+    return removed
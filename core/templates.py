@@ -0,0 +1,253 @@
+"""
+Compiled SKINNAME templates
+
+Each vehicles/<carid>/SKINNAME file (and the info template next to it) is run
+through the regular regex pipeline once with placeholder markers instead of
+real values. The result is split into literal text and value slots, so
+rendering a skin is a single join instead of 8-15 re.sub passes.
+
+Values that could interact with the regex patterns (quotes, backslashes,
+"carid", "SKINNAME", ".skin" ...) fall back to the regex pipeline, so the
+output is always byte-identical to process_jbeam_files / process_json_files /
+update_info_json_fields.
+"""
+import os
+import re
+import threading
+
+from core.file_ops import render_jbeam_text, render_json_text, render_info_text
+
+# Slot names per template kind, in the order the renderer takes them
+TEMPLATE_SLOTS = {
+    "jbeam": ("dds_identifier", "skin_display_name", "author", "vehicle_id"),
+    "json": ("vehicle_id", "skin_folder_name", "dds_filename", "dds_identifier"),
+    "info": ("config_type", "config_name"),
+}
+
+# Slots whose values normally contain a file extension
+_DOTTED_SLOTS = ("dds_filename",)
+
+# Marker used in place of each value while compiling: `~A~`, `~B~`, ...
+_MARKER_OPEN = "`~"
+_MARKER_CLOSE = "~`"
+_MARKER_PATTERN = re.compile(r"`~([A-Z])~`")
+
+# Values containing any of these (case-insensitive) are matched by the regex
+# passes themselves, so they always go through the regex pipeline
+_UNSAFE_SUBSTRINGS = ("carid", "skinname", ".skin", "extra")
+_UNSAFE_CHARS = set('"\\/`~')
+
+
+def _render_with_regex(kind, content, values, file_label=None, quiet=False):
+    """Run the original regex pipeline for one template kind (quiet: no debug output)"""
+    if kind == "jbeam":
+        return render_jbeam_text(
+            content,
+            values["dds_identifier"],
+            values["skin_display_name"],
+            values["author"],
+            values["vehicle_id"]
+        )
+    if kind == "json":
+        return render_json_text(
+            content,
+            values["vehicle_id"],
+            values["skin_folder_name"],
+            values["dds_filename"],
+            values["dds_identifier"],
+            file_label=file_label or "materials",
+            quiet=quiet
+        )
+    if kind == "info":
+        return render_info_text(content, values["config_type"], values["config_name"], quiet=quiet)
+    raise ValueError(f"Unknown template kind: {kind}")
+
+
+def _is_plain_value(value, allow_extension=False):
+    """
+    Check if a value can be dropped into a compiled slot as-is.
+    Plain values are non-empty printable ASCII without characters or words
+    that any of the regex passes look at.
+    """
+    if not isinstance(value, str) or not value:
+        return False
+
+    if any(ord(c) < 0x20 or ord(c) > 0x7e or c in _UNSAFE_CHARS for c in value):
+        return False
+
+    lowered = value.lower()
+    if any(word in lowered for word in _UNSAFE_SUBSTRINGS):
+        return False
+
+    if "." in value:
+        if not allow_extension:
+            return False
+        stem, _, extension = value.rpartition(".")
+        if "." in stem or not stem or not extension.isalnum():
+            return False
+
+    return True
+
+
+class CompiledTemplate:
+    """A template file split into literal text and value slots"""
+
+    def __init__(self, kind, source_text, parts=None, slots=None, file_label=None):
+        """
+        Args:
+            kind: "jbeam", "json" or "info"
+            source_text: Original template text (used for the regex fallback)
+            parts: Literal strings with None placeholders where values go
+            slots: List of (index into parts, slot name)
+            file_label: Name used in debug output
+        """
+        self.kind = kind
+        self.source_text = source_text
+        self.file_label = file_label
+        self._parts = parts
+        self._slots = slots or []
+        self.fast_path = parts is not None
+        self.fast_renders = 0
+        self.fallback_renders = 0
+
+    def can_render_fast(self, values):
+        """Check if these values can use the compiled slots"""
+        if not self.fast_path:
+            return False
+        return all(
+            _is_plain_value(values[name], allow_extension=name in _DOTTED_SLOTS)
+            for name in TEMPLATE_SLOTS[self.kind]
+        )
+
+    def render(self, **values):
+        """
+        Render the template for one skin.
+
+        Args:
+            **values: One keyword per slot in TEMPLATE_SLOTS[kind]
+
+        Returns:
+            str: Same text the regex pipeline would produce
+        """
+        if self.can_render_fast(values):
+            self.fast_renders += 1
+            parts = list(self._parts)
+            for index, name in self._slots:
+                parts[index] = values[name]
+            return "".join(parts)
+
+        self.fallback_renders += 1
+        return _render_with_regex(self.kind, self.source_text, values, self.file_label)
+
+
+def compile_template(kind, source_text, file_label=None):
+    """
+    Compile template text into a CompiledTemplate.
+
+    Runs the regex pipeline once with markers as values and records where the
+    markers ended up. Templates where a value would sit directly against a
+    letter/digit (so the real value could change how "carid" etc. match)
+    keep using the regex pipeline for every render.
+    """
+    slot_names = TEMPLATE_SLOTS[kind]
+
+    if _MARKER_OPEN in source_text or _MARKER_CLOSE in source_text:
+        return CompiledTemplate(kind, source_text, file_label=file_label)
+
+    markers = {
+        name: f"{_MARKER_OPEN}{chr(ord('A') + i)}{_MARKER_CLOSE}"
+        for i, name in enumerate(slot_names)
+    }
+    names_by_letter = {chr(ord('A') + i): name for i, name in enumerate(slot_names)}
+
+    rendered = _render_with_regex(kind, source_text, markers, file_label, quiet=True)
+
+    parts = []
+    slots = []
+    position = 0
+    for match in _MARKER_PATTERN.finditer(rendered):
+        parts.append(rendered[position:match.start()])
+        slots.append((len(parts), names_by_letter[match.group(1)]))
+        parts.append(None)
+        position = match.end()
+    parts.append(rendered[position:])
+
+    # Every value must be surrounded by non-alphanumeric literal text
+    for index, name in slots:
+        before = parts[index - 1]
+        after = parts[index + 1]
+        if not before and index > 1:
+            return CompiledTemplate(kind, source_text, file_label=file_label)
+        if not after and index + 1 < len(parts) - 1:
+            return CompiledTemplate(kind, source_text, file_label=file_label)
+        if (before and before[-1].isalnum()) or (after and after[0].isalnum()):
+            return CompiledTemplate(kind, source_text, file_label=file_label)
+
+        # A dotted value inside a ".skin" string could change where the
+        # ".skin_*." pattern stops, so keep those on the regex pipeline
+        if name in _DOTTED_SLOTS:
+            quoted_before = before.rsplit('"', 1)[-1]
+            quoted_after = after.split('"', 1)[0]
+            if ".skin" in (quoted_before + quoted_after).lower():
+                return CompiledTemplate(kind, source_text, file_label=file_label)
+
+    return CompiledTemplate(kind, source_text, parts, slots, file_label=file_label)
+
+
+class TemplateCache:
+    """
+    Thread-safe cache of compiled templates, keyed by file path and kind.
+    Entries are recompiled automatically when the file's size or mtime changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, kind):
+        """
+        Get the compiled template for a file, compiling it on first use.
+
+        Args:
+            path: Path to the template file
+            kind: "jbeam", "json" or "info"
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        key = (path, kind)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Text mode read, exactly like the staged build
+        with open(path, "r", encoding="utf-8") as f:
+            source_text = f.read()
+
+        compiled = compile_template(kind, source_text, file_label=path)
+        print(f"[DEBUG] Compiled {kind} template: {path} ({'fast' if compiled.fast_path else 'regex'})")
+
+        with self._lock:
+            self._entries[key] = (signature, compiled)
+        return compiled
+
+    def clear(self):
+        """Forget all compiled templates"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_default_cache = TemplateCache()
+
+
+def get_template_cache():
+    """Get the process-wide template cache shared by all builds"""
+    return _default_cache
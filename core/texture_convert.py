@@ -0,0 +1,644 @@
+"""
+PNG/TGA/JPG to DDS conversion
+
+Skins can point at a PNG, TGA or JPG instead of a DDS file. The build
+plans such a texture as the <name>.dds it becomes, and once the plan has
+no errors converts it into a block-compressed DDS file with a full mip
+chain, then plans again with the DDS (dry runs convert nothing):
+
+    BC1     opaque textures (4 bits per pixel)
+    BC3     textures with alpha (8 bits per pixel)
+    BC7     better quality at BC3's size (mode 6 blocks only: one color
+            line per 4x4 block with alpha; slower to encode)
+    auto    BC3 if any pixel is not fully opaque, otherwise BC1
+
+Block compression is vectorized with NumPy: every block of a tile is
+encoded at once (endpoints from the block's bounds or principal axis,
+refined by least squares, and indices picked against the exact palette
+the decoder builds). The blocks of all mip levels are split into tiles of
+TILE_BLOCKS, which run on a process pool when more than one worker is
+allowed. PRESETS trade speed for quality.
+
+Converted files are cached by content under data/cache/textures: the
+hash of the source bytes, the format, the preset and CONVERTER_VERSION
+name a folder holding <source name>.dds. The DDS keeps the source's file
+name, so the skin's texture is named as it would be had the artist
+exported it. Converting an unchanged texture again is a hash and a stat.
+
+`python -m core.texture_convert skin.png [-o skin.dds]` converts by hand.
+"""
+import argparse
+import hashlib
+import multiprocessing
+import os
+import shutil
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from core.cancel import check_cancelled
+
+# Bump when the encoder's output changes, so cached conversions are redone
+CONVERTER_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join("data", "cache", "textures")
+
+# Image files skins can use instead of a DDS texture
+SOURCE_EXTENSIONS = (".png", ".tga", ".jpg", ".jpeg")
+
+TEXTURE_FORMATS = ("auto", "BC1", "BC3", "BC7")
+
+# endpoints: "bounds" (bounding box, inset) or "pca" (principal axis)
+# refine: least-squares endpoint refinement passes
+# mip_filter: "box" (each level from the one above) or "lanczos" (each
+#             level from the full-size image)
+PRESETS = {
+    "fast": {"endpoints": "bounds", "refine": 0, "mip_filter": "box"},
+    "balanced": {"endpoints": "pca", "refine": 1, "mip_filter": "box"},
+    "quality": {"endpoints": "pca", "refine": 3, "mip_filter": "lanczos"},
+}
+
+# Blocks per work item of the process pool (a 512x512 area)
+TILE_BLOCKS = 16384
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# DDS header fields
+_DDSD_FLAGS = 0x1 | 0x2 | 0x4 | 0x1000 | 0x20000 | 0x80000  # caps, height, width, pixelformat, mipcount, linearsize
+_DDSCAPS = 0x8 | 0x1000 | 0x400000  # complex, texture, mipmap
+_BLOCK_BYTES = {"BC1": 8, "BC3": 16, "BC7": 16}
+_DXGI_BC7_UNORM = 98
+
+# BC7 mode 6 interpolation weights (4-bit indices)
+_BC7_WEIGHTS = (0, 4, 9, 13, 17, 21, 26, 30, 34, 38, 43, 47, 51, 55, 60, 64)
+
+# Source hashes are remembered per (size, mtime)
+_hash_cache = {}
+_hash_lock = threading.Lock()
+
+
+class TextureConversionError(ValueError):
+    """A texture could not be converted to DDS"""
+
+
+def is_source_texture(path):
+    """True if path is an image the build converts to DDS (PNG/TGA/JPG)"""
+    return os.path.splitext(path or "")[1].lower() in SOURCE_EXTENSIONS
+
+
+def available():
+    """True if NumPy is installed (needed to convert)"""
+    return np is not None
+
+
+# ----------------------------------------------------------------------
+# Block encoders: (blocks, 16, 4) uint8 RGBA pixels -> (blocks, bytes)
+# ----------------------------------------------------------------------
+
+def _endpoints(points, method):
+    """
+    Two endpoints spanning each block's points.
+
+    Args:
+        points: (blocks, 16, channels) float32
+        method: "bounds" or "pca"
+
+    Returns:
+        tuple: (blocks, channels) float32 start and end
+    """
+    low = points.min(axis=1)
+    high = points.max(axis=1)
+    if method == "bounds":
+        inset = (high - low) / 16
+        return high - inset, low + inset
+
+    mean = points.mean(axis=1, keepdims=True)
+    centered = points - mean
+    covariance = np.einsum("npi,npj->nij", centered, centered)
+    axis = high - low
+    axis[np.abs(axis).sum(axis=1) == 0] = 1
+    for _ in range(6):
+        axis = np.einsum("nij,nj->ni", covariance, axis)
+        norm = np.linalg.norm(axis, axis=1, keepdims=True)
+        flat = norm[:, 0] < 1e-6
+        axis = np.where(flat[:, None], 1.0, axis / np.maximum(norm, 1e-6))
+    projection = np.einsum("npc,nc->np", centered, axis)
+    start = mean[:, 0] + axis * projection.max(axis=1, keepdims=True)
+    end = mean[:, 0] + axis * projection.min(axis=1, keepdims=True)
+    return np.clip(start, 0, 255), np.clip(end, 0, 255)
+
+
+def _least_squares(points, weights, start, end):
+    """
+    Endpoints minimizing the squared error for fixed interpolation weights.
+
+    Args:
+        points: (blocks, 16, channels) float32
+        weights: (blocks, 16) float32, 0 = start, 1 = end
+
+    Returns:
+        tuple: Refined (start, end); blocks where the system is singular
+               keep theirs
+    """
+    inverse = 1 - weights
+    a = (inverse * inverse).sum(axis=1)[:, None]
+    b = (inverse * weights).sum(axis=1)[:, None]
+    c = (weights * weights).sum(axis=1)[:, None]
+    x = np.einsum("np,npc->nc", inverse, points)
+    y = np.einsum("np,npc->nc", weights, points)
+    determinant = a * c - b * b
+    solvable = np.abs(determinant) > 1e-6
+    safe = np.where(solvable, determinant, 1)
+    new_start = np.where(solvable, (c * x - b * y) / safe, start)
+    new_end = np.where(solvable, (a * y - b * x) / safe, end)
+    return np.clip(new_start, 0, 255), np.clip(new_end, 0, 255)
+
+
+def _quantize_565(colors):
+    """(blocks, 3) float 8-bit -> uint16 R5G6B5"""
+    r = np.rint(colors[:, 0] * 31 / 255).astype(np.uint16)
+    g = np.rint(colors[:, 1] * 63 / 255).astype(np.uint16)
+    b = np.rint(colors[:, 2] * 31 / 255).astype(np.uint16)
+    return (r << 11) | (g << 5) | b
+
+
+def _expand_565(colors):
+    colors = colors.astype(np.int32)
+    r = (colors >> 11) & 31
+    g = (colors >> 5) & 63
+    b = colors & 31
+    return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=-1)
+
+
+def _encode_color_blocks(pixels, preset):
+    """
+    BC1 color part (also BC3's): endpoints and 2-bit indices.
+
+    Returns:
+        numpy.ndarray: (blocks, 8) uint8
+    """
+    points = pixels[:, :, :3].astype(np.float32)
+    start, end = _endpoints(points, preset["endpoints"])
+    count = len(points)
+    best_error = np.full(count, np.inf, dtype=np.float32)
+    best = (np.zeros(count, np.uint16), np.zeros(count, np.uint16), np.zeros((count, 16), np.uint32))
+    # Index -> weight of the second endpoint in four-color mode
+    index_weights = np.array([0, 1, 1 / 3, 2 / 3], dtype=np.float32)
+
+    for attempt in range(preset["refine"] + 1):
+        c0 = _quantize_565(start)
+        c1 = _quantize_565(end)
+        # Four-color mode needs c0 > c1 (equal endpoints stay at index 0)
+        swap = c0 < c1
+        c0, c1 = np.where(swap, c1, c0), np.where(swap, c0, c1)
+        e0 = _expand_565(c0)
+        e1 = _expand_565(c1)
+        palette = np.stack([e0, e1, (2 * e0 + e1) // 3, (e0 + 2 * e1) // 3], axis=1).astype(np.float32)
+
+        difference = points[:, :, None, :] - palette[:, None, :, :]
+        distances = np.einsum("npkc,npkc->npk", difference, difference)
+        indices = distances.argmin(axis=2)
+        indices[c0 == c1] = 0
+        error = np.take_along_axis(distances, indices[:, :, None], axis=2)[:, :, 0].sum(axis=1)
+
+        better = error < best_error
+        best_error = np.where(better, error, best_error)
+        best = (
+            np.where(better, c0, best[0]),
+            np.where(better, c1, best[1]),
+            np.where(better[:, None], indices, best[2]),
+        )
+        if attempt < preset["refine"]:
+            start, end = _least_squares(points, index_weights[indices], e0.astype(np.float32),
+                                        e1.astype(np.float32))
+
+    c0, c1, indices = best
+    packed = (indices.astype(np.uint32) << (2 * np.arange(16, dtype=np.uint32))).sum(axis=1, dtype=np.uint32)
+    out = np.empty((count, 8), dtype=np.uint8)
+    out[:, 0:2] = c0.astype("<u2").view(np.uint8).reshape(count, 2)
+    out[:, 2:4] = c1.astype("<u2").view(np.uint8).reshape(count, 2)
+    out[:, 4:8] = packed.astype("<u4").view(np.uint8).reshape(count, 4)
+    return out
+
+
+def _encode_alpha_blocks(alpha):
+    """
+    BC3 alpha part: 8-value ramp between the block's extremes.
+
+    Args:
+        alpha: (blocks, 16) uint8
+
+    Returns:
+        numpy.ndarray: (blocks, 8) uint8
+    """
+    a0 = alpha.max(axis=1).astype(np.int32)[:, None]
+    a1 = alpha.min(axis=1).astype(np.int32)[:, None]
+    steps = np.arange(1, 7, dtype=np.int32)
+    ramp = np.concatenate([a0, a1, ((7 - steps) * a0 + steps * a1) // 7], axis=1)
+    indices = np.abs(alpha[:, :, None].astype(np.int32) - ramp[:, None, :]).argmin(axis=2).astype(np.uint64)
+    # Equal extremes use the 6-value mode, where index 0 is still a0
+    indices[(a0 == a1)[:, 0]] = 0
+
+    packed = (indices << (3 * np.arange(16, dtype=np.uint64))).sum(axis=1, dtype=np.uint64)
+    out = np.empty((len(alpha), 8), dtype=np.uint8)
+    out[:, 0] = a0[:, 0]
+    out[:, 1] = a1[:, 0]
+    out[:, 2:8] = packed.astype("<u8").view(np.uint8).reshape(len(alpha), 8)[:, :6]
+    return out
+
+
+def _encode_bc1(pixels, preset):
+    return _encode_color_blocks(pixels, preset)
+
+
+def _encode_bc3(pixels, preset):
+    return np.concatenate([_encode_alpha_blocks(pixels[:, :, 3]), _encode_color_blocks(pixels, preset)], axis=1)
+
+
+def _quantize_bc7_endpoint(endpoint):
+    """
+    Mode 6 endpoint: 7 bits per channel plus a p-bit shared by the channels.
+
+    Returns:
+        tuple: ((blocks, 4) 7-bit values, (blocks,) p-bits, (blocks, 4) decoded 8-bit values)
+    """
+    candidates = []
+    for pbit in (0, 1):
+        raw = np.clip(np.rint((endpoint - pbit) / 2), 0, 127).astype(np.int32)
+        value = 2 * raw + pbit
+        candidates.append((raw, value, ((value - endpoint) ** 2).sum(axis=1)))
+    use_one = candidates[1][2] < candidates[0][2]
+    raw = np.where(use_one[:, None], candidates[1][0], candidates[0][0])
+    value = np.where(use_one[:, None], candidates[1][1], candidates[0][1])
+    return raw, use_one.astype(np.int32), value
+
+
+def _put_bits(bits, offset, values, width):
+    """Write width-bit values (blocks,) LSB first at offset of (blocks, 128) bits"""
+    for bit in range(width):
+        bits[:, offset + bit] = (values >> bit) & 1
+
+
+def _encode_bc7(pixels, preset):
+    """
+    BC7 mode 6 blocks: one RGBA line per block, 4-bit indices.
+
+    Returns:
+        numpy.ndarray: (blocks, 16) uint8
+    """
+    points = pixels.astype(np.float32)
+    count = len(points)
+    start, end = _endpoints(points, preset["endpoints"])
+    weights = np.array(_BC7_WEIGHTS, dtype=np.int32)
+    best_error = np.full(count, np.inf, dtype=np.float32)
+    best = None
+
+    for attempt in range(preset["refine"] + 1):
+        raw0, p0, q0 = _quantize_bc7_endpoint(start)
+        raw1, p1, q1 = _quantize_bc7_endpoint(end)
+        palette = ((64 - weights[None, :, None]) * q0[:, None, :] + weights[None, :, None] * q1[:, None, :] + 32) >> 6
+
+        # Nearest palette entry: project on the endpoint line, then check
+        # the neighbors of the projected index against the real palette
+        direction = (q1 - q0).astype(np.float32)
+        length = np.maximum((direction * direction).sum(axis=1), 1e-6)
+        projected = np.einsum("npc,nc->np", points - q0[:, None, :], direction) / length[:, None]
+        guess = np.clip(np.rint(projected * 15), 0, 15).astype(np.int32)
+        candidates = np.clip(guess[:, :, None] + np.arange(-1, 2), 0, 15)
+        entries = np.take_along_axis(palette[:, None, :, :], candidates[:, :, :, None], axis=2)
+        difference = points[:, :, None, :] - entries
+        distances = np.einsum("npkc,npkc->npk", difference, difference)
+        choice = distances.argmin(axis=2)
+        indices = np.take_along_axis(candidates, choice[:, :, None], axis=2)[:, :, 0]
+        error = np.take_along_axis(distances, choice[:, :, None], axis=2)[:, :, 0].sum(axis=1)
+
+        better = error < best_error
+        best_error = np.where(better, error, best_error)
+        current = (raw0, p0, raw1, p1, indices)
+        best = current if best is None else tuple(
+            np.where(better.reshape((-1,) + (1,) * (new.ndim - 1)), new, old) for new, old in zip(current, best)
+        )
+        if attempt < preset["refine"]:
+            start, end = _least_squares(points, weights[indices].astype(np.float32) / 64,
+                                        q0.astype(np.float32), q1.astype(np.float32))
+
+    raw0, p0, raw1, p1, indices = best
+    # The first pixel's index is stored without its top bit: keep it below 8
+    flip = indices[:, 0] >= 8
+    raw0, raw1 = np.where(flip[:, None], raw1, raw0), np.where(flip[:, None], raw0, raw1)
+    p0, p1 = np.where(flip, p1, p0), np.where(flip, p0, p1)
+    indices = np.where(flip[:, None], 15 - indices, indices)
+
+    bits = np.zeros((count, 128), dtype=np.uint8)
+    bits[:, 6] = 1
+    offset = 7
+    for channel in range(4):
+        _put_bits(bits, offset, raw0[:, channel], 7)
+        _put_bits(bits, offset + 7, raw1[:, channel], 7)
+        offset += 14
+    bits[:, offset] = p0
+    bits[:, offset + 1] = p1
+    offset += 2
+    _put_bits(bits, offset, indices[:, 0], 3)
+    offset += 3
+    for pixel in range(1, 16):
+        _put_bits(bits, offset, indices[:, pixel], 4)
+        offset += 4
+    return np.packbits(bits, axis=1, bitorder="little")
+
+
+_ENCODERS = {"BC1": _encode_bc1, "BC3": _encode_bc3, "BC7": _encode_bc7}
+
+
+def _encode_tile(pixel_format, preset_name, pixels):
+    """Encode one tile of blocks (runs in the process pool)"""
+    return _ENCODERS[pixel_format](pixels, PRESETS[preset_name])
+
+
+# ----------------------------------------------------------------------
+# Images, mip chains and DDS files
+# ----------------------------------------------------------------------
+
+def _image_blocks(image):
+    """RGBA PIL image -> (blocks, 16, 4) uint8, edges repeated to whole blocks"""
+    pixels = np.asarray(image, dtype=np.uint8)
+    height, width = pixels.shape[:2]
+    padded_height = (height + 3) // 4 * 4
+    padded_width = (width + 3) // 4 * 4
+    if (padded_height, padded_width) != (height, width):
+        pixels = np.pad(pixels, ((0, padded_height - height), (0, padded_width - width), (0, 0)), mode="edge")
+    blocks = pixels.reshape(padded_height // 4, 4, padded_width // 4, 4, 4).transpose(0, 2, 1, 3, 4)
+    return blocks.reshape(-1, 16, 4)
+
+
+def _mip_chain(image, mip_filter):
+    """The image and every smaller level down to 1x1"""
+    from PIL import Image
+
+    levels = [image]
+    width, height = image.size
+    while width > 1 or height > 1:
+        width, height = max(1, width // 2), max(1, height // 2)
+        if mip_filter == "lanczos":
+            levels.append(image.resize((width, height), Image.Resampling.LANCZOS))
+        else:
+            levels.append(levels[-1].resize((width, height), Image.Resampling.BOX))
+    return levels
+
+
+def _dds_header(pixel_format, width, height, mip_count, top_level_size):
+    """128-byte DDS header (plus the DX10 header for BC7)"""
+    header = bytearray(128)
+    header[:4] = b"DDS "
+    struct.pack_into("<7I", header, 4, 124, _DDSD_FLAGS, height, width, top_level_size, 0, mip_count)
+    fourcc = {"BC1": b"DXT1", "BC3": b"DXT5", "BC7": b"DX10"}[pixel_format]
+    struct.pack_into("<2I4s", header, 76, 32, 0x4, fourcc)
+    struct.pack_into("<I", header, 108, _DDSCAPS)
+    if pixel_format == "BC7":
+        header += struct.pack("<5I", _DXGI_BC7_UNORM, 3, 0, 1, 0)
+    return bytes(header)
+
+
+def _has_alpha(image):
+    return image.getchannel("A").getextrema()[0] < 255
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def source_hash(path):
+    """SHA-256 of a source image, reused while its size and mtime are unchanged"""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    with _hash_lock:
+        cached = _hash_cache.get(path)
+    if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    result = digest.hexdigest()
+    with _hash_lock:
+        _hash_cache[path] = (stat.st_size, stat.st_mtime_ns, result)
+    return result
+
+
+def converted_texture_path(source, pixel_format="auto", preset="balanced", cache_dir=None):
+    """Where the DDS converted from source with these settings is cached"""
+    key = hashlib.sha256(
+        f"{CONVERTER_VERSION}|{source_hash(source)}|{pixel_format}|{preset}".encode("utf-8")
+    ).hexdigest()[:32]
+    name = os.path.splitext(os.path.basename(source))[0] + ".dds"
+    return os.path.join(cache_dir or DEFAULT_CACHE_DIR, key, name)
+
+
+def _encode_blocks(pixel_format, preset, blocks, workers, cancel_token):
+    """Encode all blocks, tile by tile, on a process pool when workers > 1"""
+    tiles = [blocks[start:start + TILE_BLOCKS] for start in range(0, len(blocks), TILE_BLOCKS)]
+    if workers <= 1 or len(tiles) <= 1:
+        encoded = []
+        for tile in tiles:
+            check_cancelled(cancel_token)
+            encoded.append(_encode_tile(pixel_format, preset, tile))
+        return encoded
+
+    results = [None] * len(tiles)
+    # Never fork: this can run on a thread of the GUI process, and forking a
+    # process that runs Tk is unsafe
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(tiles)), mp_context=multiprocessing.get_context("spawn"))
+    try:
+        futures = {pool.submit(_encode_tile, pixel_format, preset, tile): index for index, tile in enumerate(tiles)}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            check_cancelled(cancel_token)
+            for future in done:
+                results[futures[future]] = future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return results
+
+
+def convert_texture(source, pixel_format="auto", preset="balanced", workers=1, cache_dir=None,
+                    cancel_token=None):
+    """
+    Convert a PNG/TGA/JPG image to a mipmapped, block-compressed DDS file
+    (or find the conversion in the cache).
+
+    Args:
+        source: Image file
+        pixel_format: "auto", "BC1", "BC3" or "BC7"
+        preset: "fast", "balanced" or "quality" (see PRESETS)
+        workers: Processes the blocks are encoded on
+        cache_dir: Converted texture cache (defaults to data/cache/textures)
+        cancel_token: Optional CancelToken, checked between tiles
+
+    Returns:
+        dict: source, dds_path, format, preset, width, height, mip_count,
+              cached (True if nothing was encoded) and seconds
+
+    Raises:
+        TextureConversionError: NumPy is missing, or the image cannot be read
+        BuildCancelled: cancel_token was cancelled
+    """
+    from PIL import Image
+
+    if pixel_format not in TEXTURE_FORMATS:
+        raise ValueError(f"Unknown texture format: {pixel_format}")
+    if preset not in PRESETS:
+        raise ValueError(f"Unknown texture preset: {preset}")
+    if np is None:
+        raise TextureConversionError("Converting PNG/TGA/JPG textures needs NumPy (pip install numpy)")
+
+    started = time.perf_counter()
+    try:
+        dds_path = converted_texture_path(source, pixel_format, preset, cache_dir)
+    except OSError as e:
+        raise TextureConversionError(f"Cannot read {source}: {e}") from e
+
+    result = {"source": source, "dds_path": dds_path, "format": pixel_format, "preset": preset}
+    if os.path.exists(dds_path):
+        from core.dds import read_dds_info
+        info = read_dds_info(dds_path)
+        result.update(format=info.format, width=info.width, height=info.height, mip_count=info.mip_count,
+                      cached=True, seconds=time.perf_counter() - started)
+        return result
+
+    try:
+        with Image.open(source) as opened:
+            image = opened.convert("RGBA")
+    except Exception as e:
+        raise TextureConversionError(f"Cannot read {os.path.basename(source)}: {e}") from e
+
+    if pixel_format == "auto":
+        pixel_format = "BC3" if _has_alpha(image) else "BC1"
+    levels = _mip_chain(image, PRESETS[preset]["mip_filter"])
+    level_blocks = [_image_blocks(level) for level in levels]
+    encoded = _encode_blocks(pixel_format, preset, np.concatenate(level_blocks), workers, cancel_token)
+
+    block_bytes = _BLOCK_BYTES[pixel_format]
+    header = _dds_header(pixel_format, image.width, image.height, len(levels), len(level_blocks[0]) * block_bytes)
+    os.makedirs(os.path.dirname(dds_path), exist_ok=True)
+    temp_path = f"{dds_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(header)
+            for tile in encoded:
+                f.write(tile.tobytes())
+        os.replace(temp_path, dds_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    seconds = time.perf_counter() - started
+    print(f"[DEBUG] Converted {os.path.basename(source)} to {pixel_format} ({image.width}x{image.height}, "
+          f"{len(levels)} mips, {preset}) in {seconds:.2f}s")
+    result.update(format=pixel_format, width=image.width, height=image.height, mip_count=len(levels),
+                  cached=False, seconds=seconds)
+    return result
+
+
+def convert_project_textures(project_data, pixel_format="auto", preset="balanced", workers=1, cache_dir=None,
+                             progress=None, cancel_token=None):
+    """
+    Convert every PNG/TGA/JPG skin texture of a project.
+
+    Args:
+        project_data: Project dict with cars and skins
+        pixel_format, preset, workers, cache_dir, cancel_token: See convert_texture
+        progress: Optional BuildProgress; a "convert" stage measured in
+                  source bytes is added when the project has such textures
+
+    Returns:
+        tuple: (project data with each converted skin's dds_path pointing at
+               its DDS file, list of convert_texture results). The project
+               passed in is not changed. A texture that cannot be converted
+               keeps its path and gets a "texture_error" the build plan
+               reports.
+    """
+    sources = {skin["dds_path"] for car_info in project_data.get("cars", {}).values()
+               for skin in car_info.get("skins", []) if is_source_texture(skin.get("dds_path"))}
+    if progress and sources:
+        progress.add_stage("convert", "Converting textures", sum(_file_size(path) for path in sources))
+        progress.start_stage("convert")
+
+    converted = dict(project_data)
+    converted["cars"] = {}
+    results = []
+    for car_instance_id, car_info in project_data.get("cars", {}).items():
+        car_info = dict(car_info)
+        skins = []
+        for skin in car_info.get("skins", []):
+            if is_source_texture(skin.get("dds_path")):
+                skin = dict(skin)
+                try:
+                    result = convert_texture(skin["dds_path"], pixel_format, preset, workers, cache_dir, cancel_token)
+                except TextureConversionError as e:
+                    print(f"[WARNING] {e}")
+                    skin["texture_error"] = str(e)
+                else:
+                    skin["source_texture"] = skin["dds_path"]
+                    skin["dds_path"] = result["dds_path"]
+                    results.append(result)
+                if progress:
+                    progress.advance(_file_size(skin.get("source_texture", skin["dds_path"])),
+                                     os.path.basename(skin.get("source_texture", skin["dds_path"])))
+            skins.append(skin)
+        car_info["skins"] = skins
+        converted["cars"][car_instance_id] = car_info
+
+    if results:
+        fresh = [result for result in results if not result["cached"]]
+        print(f"[DEBUG] Textures: {len(fresh)} converted, {len(results) - len(fresh)} from the cache")
+    return converted, results
+
+
+def main(argv=None):
+    """Convert images to DDS from the command line"""
+    parser = argparse.ArgumentParser(prog="python -m core.texture_convert",
+                                     description="Convert PNG/TGA/JPG skins to mipmapped DDS textures.")
+    parser.add_argument("images", nargs="+", help="Images to convert")
+    parser.add_argument("-o", "--output", help="Output file (one image) or folder (default: next to the image)")
+    parser.add_argument("--format", choices=TEXTURE_FORMATS, default=None, help="Block format (default: app setting)")
+    parser.add_argument("--preset", choices=tuple(PRESETS), default=None, help="Speed/quality preset "
+                                                                               "(default: app setting)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Encoding processes (default: app setting)")
+    options = parser.parse_args(argv)
+
+    from core.settings import get_build_workers, get_texture_format, get_texture_preset
+    pixel_format = options.format or get_texture_format()
+    preset = options.preset or get_texture_preset()
+    workers = options.workers or get_build_workers()
+
+    for image in options.images:
+        try:
+            result = convert_texture(image, pixel_format, preset, workers)
+        except TextureConversionError as e:
+            print(f"{image}: {e}")
+            return 1
+        if options.output and len(options.images) == 1 and not os.path.isdir(options.output):
+            target = options.output
+        else:
+            folder = options.output or os.path.dirname(os.path.abspath(image))
+            target = os.path.join(folder, os.path.basename(result["dds_path"]))
+        shutil.copyfile(result["dds_path"], target)
+        timing = "cached" if result["cached"] else f"{result['seconds']:.2f}s"
+        print(f"{image} -> {target}: {result['format']} {result['width']}x{result['height']}, "
+              f"{result['mip_count']} mips, {timing}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
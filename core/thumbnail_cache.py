@@ -0,0 +1,299 @@
+"""
+Texture thumbnail cache
+
+Decoding a skin's preview takes tens of milliseconds at best (a 1024x1024
+mip, see core/previews.py) and seconds for big textures without mipmaps.
+Finished previews are kept under data/cache/thumbs as lossless WebP files
+(PNG when Pillow has no WebP support), named after a hash of the texture's
+absolute path, size, modification time and the preview box. An edited
+texture gets a new name, and its old thumbnail ages out.
+
+The cache is bounded by size and evicts the least recently used
+thumbnails first. A hit touches the file's modification time, so the LRU
+order survives restarts without an index file. Reading a thumbnail is a
+stat, an open and a small WebP decode, a few milliseconds.
+
+Hits and misses are counted for stats(). maintain() reconciles the
+in-memory index with the folder, drops leftover temporary files and
+evicts down to the size limit. The GUI runs it on shutdown, and
+`python -m core.thumbnail_cache` prints the stats or clears the cache.
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Bump when previews are rendered differently, old thumbnails are then
+# never looked up again and age out
+THUMBNAIL_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join("data", "cache", "thumbs")
+
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+# Temporary files older than this are from a crashed write
+STALE_TEMP_SECONDS = 3600
+
+
+def _thumbnail_format():
+    """(Pillow format, file extension, save options) thumbnails are stored with"""
+    from PIL import features
+    if features.check("webp"):
+        return "WEBP", ".webp", {"lossless": True, "method": 0}
+    return "PNG", ".png", {"compress_level": 1}
+
+
+class ThumbnailCache:
+    """
+    Size-bounded LRU cache of texture previews in one folder.
+    Safe to use from the GUI thread and a preview worker at the same time.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        """
+        Args:
+            cache_dir: Cache folder (defaults to data/cache/thumbs)
+            max_bytes: Size limit of the folder (defaults to 100 MB)
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+        self.format, self.extension, self.save_options = _thumbnail_format()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        # file name -> bytes, least recently used first; loaded from the
+        # folder the first time a thumbnail is stored
+        self._entries = None
+        self._total_bytes = 0
+
+    def key(self, path, box):
+        """
+        Cache key of a texture's preview, or None if the texture cannot be
+        read. Compute it before decoding so an edit made meanwhile is not
+        stored under the new version's key.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        text = (f"{THUMBNAIL_VERSION}|{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|"
+                f"{box[0]}x{box[1]}")
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _file_path(self, key):
+        return os.path.join(self.cache_dir, key + self.extension)
+
+    def get(self, path, box):
+        """
+        Returns:
+            PIL.Image.Image: The cached preview of path, or None
+        """
+        key = self.key(path, box)
+        return self.load(key) if key is not None else None
+
+    def load(self, key):
+        """
+        Returns:
+            PIL.Image.Image: The thumbnail stored under key, or None
+        """
+        from PIL import Image
+
+        file_path = self._file_path(key)
+        try:
+            image = Image.open(file_path)
+            image.load()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except Exception as e:
+            print(f"[WARNING] Dropping unreadable thumbnail {file_path}: {e}")
+            self._remove(key + self.extension)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            os.utime(file_path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+            if self._entries is not None and key + self.extension in self._entries:
+                self._entries.move_to_end(key + self.extension)
+        return image
+
+    def store(self, key, image):
+        """Save a preview under key, evicting old thumbnails beyond the size limit"""
+        if key is None:
+            return
+        name = key + self.extension
+        file_path = self._file_path(key)
+        temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if self.format == "WEBP" and image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            image.save(temp_path, self.format, **self.save_options)
+            os.replace(temp_path, file_path)
+            size = os.path.getsize(file_path)
+        except Exception as e:
+            print(f"[WARNING] Could not save thumbnail: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self.writes += 1
+            self._load_entries()
+            self._total_bytes += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+            self._evict()
+
+    def _load_entries(self):
+        """Index the folder, least recently used first (call with the lock held)"""
+        if self._entries is not None:
+            return
+        found = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            names = []
+        for name in names:
+            if not name.endswith(self.extension):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            found.append((stat.st_mtime_ns, name, stat.st_size))
+        found.sort()
+        self._entries = OrderedDict((name, size) for _, name, size in found)
+        self._total_bytes = sum(self._entries.values())
+
+    def _evict(self):
+        """Remove least recently used thumbnails over the size limit (call with the lock held)"""
+        while self._entries and self._total_bytes > self.max_bytes:
+            name, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+    def _remove(self, name):
+        try:
+            os.remove(os.path.join(self.cache_dir, name))
+        except OSError:
+            pass
+        with self._lock:
+            if self._entries is not None and name in self._entries:
+                self._total_bytes -= self._entries.pop(name)
+
+    def maintain(self, max_bytes=None):
+        """
+        Re-read the folder, delete leftover temporary files and evict least
+        recently used thumbnails down to the size limit.
+
+        Args:
+            max_bytes: New size limit (keeps the current one if None)
+
+        Returns:
+            int: Number of files removed
+        """
+        removed = 0
+        now = time.time()
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            names = []
+        for name in names:
+            if name.endswith(".tmp"):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    if os.path.getmtime(path) < now - STALE_TEMP_SECONDS:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._entries = None
+            self._load_entries()
+            evictions = self.evictions
+            self._evict()
+            removed += self.evictions - evictions
+        if removed:
+            print(f"[DEBUG] Thumbnail cache: removed {removed} file(s)")
+        return removed
+
+    def clear(self):
+        """Delete every thumbnail"""
+        with self._lock:
+            self._load_entries()
+            for name in self._entries:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits, misses, writes, evictions, entries, bytes and max_bytes
+        """
+        with self._lock:
+            self._load_entries()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def describe(self):
+        """One-line summary of stats()"""
+        stats = self.stats()
+        lookups = stats["hits"] + stats["misses"]
+        rate = f", {stats['hits'] / lookups:.0%} hit rate" if lookups else ""
+        return (
+            f"{stats['entries']} thumbnail(s), {stats['bytes'] / (1024 * 1024):.1f} of "
+            f"{stats['max_bytes'] / (1024 * 1024):.0f} MB, {stats['hits']} hit(s), "
+            f"{stats['misses']} miss(es){rate}, {stats['evictions']} evicted"
+        )
+
+
+def main(argv=None):
+    """Print the thumbnail cache's size, or clear it with --clear"""
+    from core.settings import get_thumbnail_cache_mb
+
+    args = sys.argv[1:] if argv is None else argv
+    cache = ThumbnailCache(max_bytes=int(get_thumbnail_cache_mb() * 1024 * 1024))
+    if "--clear" in args:
+        entries = cache.stats()["entries"]
+        cache.clear()
+        print(f"Removed {entries} thumbnail(s) from {cache.cache_dir}")
+        return 0
+    cache.maintain()
+    print(f"{cache.cache_dir}: {cache.describe()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+Unpacked mod output
+
+BeamNG.drive also loads mods that are plain folders in mods/unpacked/<name>.
+sync_unpacked_mod writes a build into such a folder and only touches the
+files whose content changed, so iterating on one texture does not rewrite
+(or recompress) the whole mod.
+
+What was last written is remembered per mod in
+data/cache/build/unpacked/<mod name>.json: size, mtime and SHA-256 of every
+file in the folder, plus size and mtime of the file it was copied from. A
+file is skipped when:
+
+    - it was copied from a file whose size and mtime are unchanged, and the
+      copy in the folder is untouched (no file is read at all), or
+    - it has the same size as the new content and the same hash (the hash
+      of the file in the folder is taken from the state when it is
+      untouched, so only the new content is hashed)
+
+Files written by an earlier sync that the build no longer produces are
+removed; files added to the folder by hand are left alone.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from core.cancel import check_cancelled
+
+# Bump when the state layout changes
+STATE_VERSION = 1
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def unpacked_state_path(mod_name, cache_dir=None):
+    """Path of the sync state of a mod's unpacked folder"""
+    from core.build_cache import DEFAULT_CACHE_DIR
+    return os.path.join(cache_dir or DEFAULT_CACHE_DIR, "unpacked", f"{mod_name}.json")
+
+
+def _file_hash(path, cancel_token=None):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            check_cancelled(cancel_token)
+    return digest.hexdigest()
+
+
+def _stat(path):
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _load_state(path, folder):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get("version") != STATE_VERSION or state.get("folder") != os.path.abspath(folder):
+        return {}
+    return state.get("files", {})
+
+
+def _save_state(path, folder, files):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": STATE_VERSION, "folder": os.path.abspath(folder), "files": files}, f)
+    os.replace(temp_path, path)
+
+
+class SyncReport:
+    """What one sync did"""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.written = 0
+        self.written_bytes = 0
+        self.unchanged = 0
+        self.unchanged_bytes = 0
+        self.removed = 0
+        self.seconds = 0.0
+
+    def format(self):
+        mb = 1024 * 1024
+        return (
+            f"Synced unpacked mod in {self.seconds * 1000:.0f} ms: "
+            f"{self.written} file(s) written ({self.written_bytes / mb:.1f} MB), "
+            f"{self.unchanged} unchanged ({self.unchanged_bytes / mb:.1f} MB), "
+            f"{self.removed} removed"
+        )
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def _write_file(dest, data, source_path, progress=None, cancel_token=None):
+    """
+    Write one file next to its destination, then swap it in, so the game
+    never sees it half-written. Returns the SHA-256 of what was written.
+    """
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    temp_path = os.path.join(
+        os.path.dirname(dest),
+        f".{os.path.basename(dest)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    digest = hashlib.sha256()
+    try:
+        with open(temp_path, "wb") as out:
+            if data is not None:
+                out.write(data)
+                digest.update(data)
+                if progress:
+                    progress.advance(len(data), dest)
+            else:
+                with open(source_path, "rb") as f:
+                    while True:
+                        chunk = f.read(COPY_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        out.write(chunk)
+                        digest.update(chunk)
+                        if progress:
+                            progress.advance(len(chunk), dest)
+                        check_cancelled(cancel_token)
+        os.replace(temp_path, dest)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return digest.hexdigest()
+
+
+def _remove_empty_dirs(folder, paths):
+    """Remove the folders that held paths if they are empty now (never folder itself)"""
+    root = os.path.abspath(folder)
+    dirs = sorted({os.path.dirname(os.path.abspath(path)) for path in paths}, key=len, reverse=True)
+    for directory in dirs:
+        while directory.startswith(root + os.sep):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+            directory = os.path.dirname(directory)
+
+
+def sync_unpacked_mod(folder, results, state_path, progress=None, cancel_token=None):
+    """
+    Bring an unpacked mod folder up to date with a rendered build.
+
+    Args:
+        folder: Mod folder (mods/unpacked/<mod name>), created if missing
+        results: Rendered skins (see _render_skin in core/file_ops.py), each
+                 with entries of (arcname, data, source_path)
+        state_path: Sync state file (see unpacked_state_path)
+        progress: Optional BuildProgress, advanced by every file's size
+        cancel_token: Optional CancelToken, checked per file and chunk.
+                      Files already synced stay; the state is saved either
+                      way, so the next sync picks up where this one stopped
+
+    Returns:
+        SyncReport
+    """
+    start = time.perf_counter()
+    report = SyncReport(folder)
+    os.makedirs(folder, exist_ok=True)
+
+    previous = _load_state(state_path, folder)
+    files = dict(previous)
+    produced = set()
+
+    try:
+        for result in results:
+            for arcname, data, source_path in result['entries']:
+                check_cancelled(cancel_token)
+                produced.add(arcname)
+                dest = os.path.join(folder, *arcname.split("/"))
+                dest_stat = _stat(dest)
+                record = files.get(arcname)
+
+                # The state only describes the file if nobody changed it since
+                known_hash = None
+                if record and dest_stat and record["size"] == dest_stat.st_size \
+                        and record["mtime_ns"] == dest_stat.st_mtime_ns:
+                    known_hash = record["sha256"]
+
+                source = None
+                if data is not None:
+                    size = len(data)
+                else:
+                    source_stat = os.stat(source_path)
+                    size = source_stat.st_size
+                    source = [source_stat.st_size, source_stat.st_mtime_ns]
+
+                unchanged = False
+                if known_hash and source is not None and record.get("source") == source:
+                    unchanged = True
+                elif dest_stat and dest_stat.st_size == size:
+                    new_hash = (
+                        hashlib.sha256(data).hexdigest() if data is not None
+                        else _file_hash(source_path, cancel_token)
+                    )
+                    unchanged = new_hash == (known_hash or _file_hash(dest, cancel_token))
+
+                if unchanged:
+                    files[arcname] = {
+                        "size": dest_stat.st_size,
+                        "mtime_ns": dest_stat.st_mtime_ns,
+                        "sha256": known_hash or new_hash,
+                        "source": source,
+                    }
+                    report.unchanged += 1
+                    report.unchanged_bytes += size
+                    if progress:
+                        progress.advance(size, dest)
+                    continue
+
+                digest = _write_file(dest, data, source_path, progress, cancel_token)
+                written = os.stat(dest)
+                files[arcname] = {
+                    "size": written.st_size,
+                    "mtime_ns": written.st_mtime_ns,
+                    "sha256": digest,
+                    "source": source,
+                }
+                report.written += 1
+                report.written_bytes += size
+
+        # Files an earlier sync wrote that this build no longer has
+        stale = [arcname for arcname in previous if arcname not in produced]
+        removed_paths = []
+        for arcname in stale:
+            path = os.path.join(folder, *arcname.split("/"))
+            try:
+                os.remove(path)
+                removed_paths.append(path)
+                report.removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"[WARNING] Could not remove old file {path}: {e}")
+                continue
+            del files[arcname]
+        _remove_empty_dirs(folder, removed_paths)
+    finally:
+        try:
+            _save_state(state_path, folder, files)
+        except OSError as e:
+            print(f"[WARNING] Could not save unpacked mod state {state_path}: {e}")
+        report.seconds = time.perf_counter() - start
+
+    return report
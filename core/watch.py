@@ -0,0 +1,281 @@
+"""
+Watch mode
+
+Rebuilds a mod whenever a file its project reads changes: every skin's
+dds_path and the .pc/.jpg files of its config data.
+
+    FileWatcher   background thread that compares (size, mtime) stat
+                  signatures every poll_interval seconds. A change is only
+                  reported once no watched file has changed for debounce
+                  seconds, so an editor saving in several writes (or an
+                  artist re-saving a few textures) causes one rebuild
+    WatchSession  turns reported changes into rebuilds, runs at most
+                  max_concurrent of them at once but never two of the same
+                  mod, merges changes that arrive in the meantime into the
+                  next rebuild and keeps a log of every rebuild's latency
+
+Rebuilds are meant to be incremental (see core/build_cache.py), so only the
+skins whose inputs changed are rendered again; the rest are copied from the
+build cache.
+
+WatchSession.poll() never blocks. The GUI calls it from a Tk after() loop,
+the command line (python -m core.build --watch) from a sleep loop.
+"""
+import copy
+import os
+import queue
+import threading
+import time
+
+# Seconds between two stat scans
+DEFAULT_POLL_INTERVAL = 0.5
+
+# Seconds the watched files must stay unchanged before a rebuild starts
+DEFAULT_DEBOUNCE = 1.0
+
+
+def watched_files(project_data):
+    """
+    Files a project's build reads, and the skins that read them.
+
+    Returns:
+        dict: Path -> list of "car_instance_id/skin name" slots
+    """
+    files = {}
+    for car_instance_id, car_info in project_data.get("cars", {}).items():
+        for skin in car_info.get("skins", []):
+            slot = f"{car_instance_id}/{skin.get('name', '')}"
+            config_data = skin.get("config_data") or {}
+            for path in (skin.get("dds_path"), config_data.get("pc_file_path"), config_data.get("jpg_file_path")):
+                if path:
+                    files.setdefault(os.path.abspath(path), []).append(slot)
+    return files
+
+
+def _signature(path):
+    """(size, mtime) of a file, or None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class FileWatcher:
+    """
+    Polls stat signatures of a set of files on a background thread.
+    """
+
+    def __init__(self, paths, poll_interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+        """
+        Args:
+            paths: Files to watch
+            poll_interval: Seconds between two scans
+            debounce: Seconds without further changes before a batch of
+                      changes is reported
+        """
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self._lock = threading.Lock()
+        self._signatures = {path: _signature(path) for path in paths}
+        self._pending = {}
+        self._batches = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="BeamSkinWatch", daemon=True)
+        self._thread.start()
+
+    def set_paths(self, paths):
+        """Change the watched files; new ones start from their current state"""
+        with self._lock:
+            self._signatures = {
+                path: self._signatures[path] if path in self._signatures else _signature(path)
+                for path in paths
+            }
+
+    def get_changes(self):
+        """
+        Batches of settled changes reported since the last call.
+
+        Returns:
+            list: Dicts with paths (changed files) and detected_at
+                  (time.perf_counter() of the first change in the batch)
+        """
+        batches = []
+        while True:
+            try:
+                batches.append(self._batches.get_nowait())
+            except queue.Empty:
+                return batches
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=self.poll_interval + 1)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.scan()
+
+    def scan(self):
+        """Compare every signature once (called by the watcher thread)"""
+        now = time.perf_counter()
+        with self._lock:
+            paths = list(self._signatures)
+        for path in paths:
+            signature = _signature(path)
+            with self._lock:
+                if path not in self._signatures or signature == self._signatures[path]:
+                    continue
+                self._signatures[path] = signature
+            first_seen = self._pending.get(path, (now, now))[0]
+            self._pending[path] = (first_seen, now)
+
+        if self._pending and now - max(last for _, last in self._pending.values()) >= self.debounce:
+            self._batches.put({
+                "paths": sorted(self._pending),
+                "detected_at": min(first for first, _ in self._pending.values()),
+            })
+            self._pending = {}
+
+
+class WatchSession:
+    """
+    Rebuilds a project when its files change.
+    """
+
+    def __init__(self, project_data, start_rebuild, poll_interval=DEFAULT_POLL_INTERVAL,
+                 debounce=DEFAULT_DEBOUNCE, max_concurrent=1):
+        """
+        Args:
+            project_data: Project dict; read again at every rebuild, so skins
+                          added while watching are picked up
+            start_rebuild: Called with a snapshot of project_data, returns a
+                           started build runner (see core/build_worker.py)
+            poll_interval: Seconds between two stat scans
+            debounce: Seconds the files must stay unchanged before rebuilding
+            max_concurrent: Rebuilds allowed to run at the same time.
+                            Rebuilds of the same mod never overlap (they
+                            would race on its ZIP, build cache index and
+                            journal); changes arriving while one runs or
+                            the limit is reached wait and are merged into
+                            one rebuild
+        """
+        self.project_data = project_data
+        self.start_rebuild = start_rebuild
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.log = []
+        self._files = watched_files(project_data)
+        self._watcher = FileWatcher(self._files, poll_interval, debounce)
+        self._queued = None
+        self._running = []
+        self.stopped = False
+        self._started = 0
+        print(f"[DEBUG] Watching {len(self._files)} file(s) of {project_data.get('mod_name', '')}")
+
+    @property
+    def busy(self):
+        """True while a rebuild is running or waiting to start (keep polling)"""
+        return bool(self._running or self._queued)
+
+    def poll(self):
+        """
+        Start due rebuilds and collect what the running ones report.
+
+        Returns:
+            list: (kind, payload) events. The build's own "progress",
+                  "log" and "report" events are passed on; ("rebuilding", info) is sent
+                  when a rebuild starts and ("rebuilt", record) when it
+                  ends (record as in self.log)
+        """
+        events = []
+
+        for batch in [] if self.stopped else self._watcher.get_changes():
+            if self._queued is None:
+                self._queued = {"paths": set(), "detected_at": batch["detected_at"]}
+            self._queued["paths"].update(batch["paths"])
+            self._queued["detected_at"] = min(self._queued["detected_at"], batch["detected_at"])
+
+        for rebuild in list(self._running):
+            for kind, payload in rebuild["runner"].poll():
+                if kind in ("progress", "log", "report"):
+                    events.append((kind, payload))
+                else:
+                    self._running.remove(rebuild)
+                    events.append(("rebuilt", self._finish(rebuild, kind, payload)))
+                    break
+
+        if (self._queued and not self.stopped and len(self._running) < self.max_concurrent
+                and not any(rebuild["mod"] == self._mod() for rebuild in self._running)):
+            events.append(("rebuilding", self._start(self._queued)))
+            self._queued = None
+
+        return events
+
+    def _mod(self):
+        """The mod the project builds now (its name may change while watching)"""
+        from core.file_ops import sanitize_mod_name
+        return sanitize_mod_name(self.project_data.get("mod_name", ""))
+
+    def _start(self, queued):
+        # Skins may have been added or removed since the last rebuild
+        self._files = watched_files(self.project_data)
+        self._watcher.set_paths(self._files)
+
+        paths = sorted(queued["paths"])
+        skins = sorted({slot for path in paths for slot in self._files.get(path, [])})
+        self._started += 1
+        rebuild = {
+            "number": self._started,
+            "mod": self._mod(),
+            "paths": paths,
+            "skins": skins,
+            "detected_at": queued["detected_at"],
+            "started_at": time.perf_counter(),
+        }
+        print(f"[DEBUG] Watch: {len(paths)} file(s) changed, rebuilding "
+              f"{len(skins)} affected skin(s): {', '.join(skins[:5])}{' ...' if len(skins) > 5 else ''}")
+        # A snapshot, like the build queue takes: thread builds read the
+        # project while the user keeps editing it
+        rebuild["runner"] = self.start_rebuild(copy.deepcopy(self.project_data))
+        self._running.append(rebuild)
+        return {key: value for key, value in rebuild.items() if key != "runner"}
+
+    def _finish(self, rebuild, kind, payload):
+        finished = time.perf_counter()
+        record = {
+            "number": rebuild["number"],
+            "status": kind,
+            "error": payload.get("message") if kind == "error" else None,
+            "zip_path": payload if kind == "done" else None,
+            "paths": rebuild["paths"],
+            "skins": rebuild["skins"],
+            "wait_seconds": round(rebuild["started_at"] - rebuild["detected_at"], 3),
+            "build_seconds": round(finished - rebuild["started_at"], 3),
+            "latency_seconds": round(finished - rebuild["detected_at"], 3),
+            "finished_at": time.strftime("%H:%M:%S"),
+        }
+        self.log.append(record)
+        print(f"[DEBUG] Watch rebuild #{record['number']} {kind}: {len(record['skins'])} skin(s), "
+              f"build {record['build_seconds']:.2f}s, change to mod {record['latency_seconds']:.2f}s"
+              + (f" ({record['error']})" if record["error"] else ""))
+        return record
+
+    def latency_summary(self):
+        """One line about the rebuilds so far, e.g. for a status label"""
+        done = [record["latency_seconds"] for record in self.log if record["status"] == "done"]
+        if not done:
+            return f"{len(self.log)} rebuild(s)"
+        return (
+            f"{len(self.log)} rebuild(s), last {done[-1]:.1f}s, "
+            f"average {sum(done) / len(done):.1f}s, max {max(done):.1f}s"
+        )
+
+    def stop(self):
+        """
+        Stop watching and cancel running rebuilds. Keep calling poll() while
+        busy to collect how they ended.
+        """
+        self.stopped = True
+        self._watcher.stop()
+        self._queued = None
+        for rebuild in self._running:
+            rebuild["runner"].cancel()
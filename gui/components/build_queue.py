@@ -0,0 +1,252 @@
+"""
+Build Queue Panel - Status of queued and running mod builds, and their history
+"""
+from typing import Callable, Dict, List, Optional
+import os
+import time
+import customtkinter as ctk
+from gui.state import state
+
+# Finished jobs listed under the queue
+HISTORY_ROWS = 8
+
+STATUS_ICONS = {"done": "✓", "failed": "✗", "cancelled": "⊘"}
+
+print(f"[DEBUG] Loading class: BuildQueuePanel")
+
+
+class BuildQueuePanel(ctk.CTkFrame):
+    """One row per queued/running job with progress and a cancel button, then the history"""
+
+    def __init__(self, parent, build_queue, on_queue_per_car: Optional[Callable[[], None]] = None):
+
+        print(f"[DEBUG] __init__ called")
+        super().__init__(
+            parent,
+            fg_color=state.colors["card_bg"],
+            corner_radius=12,
+            border_width=1,
+            border_color=state.colors["border"]
+        )
+        self.build_queue = build_queue
+        self.on_queue_per_car = on_queue_per_car
+        self._rows: Dict[int, dict] = {}
+        self._history_ids: List[int] = []
+
+        self._setup_ui()
+
+    def _setup_ui(self):
+        """Set up the panel UI"""
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", padx=15, pady=(12, 5))
+
+        ctk.CTkLabel(
+            header,
+            text="BUILD QUEUE",
+            font=ctk.CTkFont(size=13, weight="bold"),
+            text_color=state.colors["text_secondary"],
+            anchor="w"
+        ).pack(side="left")
+
+        self.summary_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=ctk.CTkFont(size=11),
+            text_color=state.colors["text_secondary"],
+            anchor="w"
+        )
+        self.summary_label.pack(side="left", padx=(10, 0))
+
+        ctk.CTkButton(
+            header,
+            text="Clear History",
+            width=100,
+            height=26,
+            command=self.clear_history,
+            fg_color=state.colors["frame_bg"],
+            hover_color=state.colors["card_hover"],
+            text_color=state.colors["text"],
+            corner_radius=6,
+            font=ctk.CTkFont(size=11)
+        ).pack(side="right")
+
+        if self.on_queue_per_car:
+            ctk.CTkButton(
+                header,
+                text="Queue One Mod per Car",
+                width=160,
+                height=26,
+                command=self.on_queue_per_car,
+                fg_color=state.colors["frame_bg"],
+                hover_color=state.colors["card_hover"],
+                text_color=state.colors["text"],
+                corner_radius=6,
+                font=ctk.CTkFont(size=11)
+            ).pack(side="right", padx=(0, 8))
+
+        self.jobs_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.jobs_frame.pack(fill="x", padx=15, pady=(0, 5))
+
+        self.history_label = ctk.CTkLabel(
+            self,
+            text="History",
+            font=ctk.CTkFont(size=11, weight="bold"),
+            text_color=state.colors["text_secondary"],
+            anchor="w"
+        )
+
+        self.history_frame = ctk.CTkFrame(self, fg_color="transparent")
+
+    def _create_job_row(self, job) -> dict:
+        """Create the widgets of one queued/running job"""
+        row = ctk.CTkFrame(self.jobs_frame, fg_color=state.colors["frame_bg"], corner_radius=8)
+        row.pack(fill="x", pady=3)
+
+        top = ctk.CTkFrame(row, fg_color="transparent")
+        top.pack(fill="x", padx=10, pady=(8, 2))
+
+        ctk.CTkLabel(
+            top,
+            text=f"#{job.id}  {job.label}  ·  {job.skin_count} skin(s)",
+            font=ctk.CTkFont(size=12, weight="bold"),
+            text_color=state.colors["text"],
+            anchor="w"
+        ).pack(side="left")
+
+        cancel_button = ctk.CTkButton(
+            top,
+            text="✖",
+            width=28,
+            height=24,
+            command=lambda job_id=job.id: self.cancel_job(job_id),
+            fg_color="transparent",
+            hover_color=state.colors["card_hover"],
+            text_color=state.colors["text_secondary"],
+            corner_radius=6
+        )
+        cancel_button.pack(side="right")
+
+        status_label = ctk.CTkLabel(
+            row,
+            text=job.status_text,
+            font=ctk.CTkFont(size=11),
+            text_color=state.colors["text_secondary"],
+            anchor="w",
+            justify="left"
+        )
+        status_label.pack(fill="x", padx=10)
+
+        progress_bar = ctk.CTkProgressBar(
+            row,
+            height=6,
+            corner_radius=3,
+            fg_color=state.colors["card_bg"],
+            progress_color=state.colors["accent"]
+        )
+        progress_bar.set(job.fraction)
+        progress_bar.pack(fill="x", padx=10, pady=(2, 8))
+
+        return {"frame": row, "status": status_label, "progress": progress_bar, "cancel": cancel_button,
+                "text": None, "fraction": None}
+
+    def _history_text(self, job) -> str:
+        icon = STATUS_ICONS.get(job.status, "•")
+        finished = time.strftime("%H:%M", time.localtime(job.finished_at)) if job.finished_at else ""
+        parts = [f"{icon} {finished}  #{job.id} {job.label}"]
+        if job.status == "done":
+            parts.append(f"{job.skin_count} skin(s) in {job.duration:.1f}s → {os.path.basename(job.result or '')}")
+            if job.report and job.report["memory"].get("peak_rss_bytes"):
+                parts.append(f"peak {job.report['memory']['peak_rss_bytes'] / (1024 * 1024):.0f} MB")
+        elif job.status == "failed":
+            parts.append(job.status_text)
+        elif job.duration is not None:
+            parts.append(f"cancelled after {job.duration:.1f}s")
+        else:
+            parts.append("cancelled before it started")
+        return "  ·  ".join(parts)
+
+    def refresh(self):
+        """Bring the rows in line with the queue (cheap when nothing changed)"""
+        build_queue = self.build_queue
+        active_ids = {job.id for job in build_queue.jobs}
+
+        for job_id in [job_id for job_id in self._rows if job_id not in active_ids]:
+            self._rows.pop(job_id)["frame"].destroy()
+
+        for job in build_queue.jobs:
+            row = self._rows.get(job.id)
+            if row is None:
+                row = self._rows[job.id] = self._create_job_row(job)
+            text = job.status_text
+            if job.status == "queued":
+                position = build_queue.queued.index(job) + 1
+                text = f"Queued ({position} waiting)  ·  {job.status_text}" if position > 1 else f"Queued  ·  {job.status_text}"
+            if text != row["text"]:
+                row["status"].configure(text=text)
+                row["text"] = text
+            if job.fraction != row["fraction"]:
+                row["progress"].set(job.fraction)
+                row["fraction"] = job.fraction
+
+        history = build_queue.history[:HISTORY_ROWS]
+        history_ids = [job.id for job in history]
+        if history_ids != self._history_ids:
+            self._history_ids = history_ids
+            for child in self.history_frame.winfo_children():
+                child.destroy()
+            for job in history:
+                row = ctk.CTkFrame(self.history_frame, fg_color="transparent")
+                row.pack(fill="x", pady=1)
+                ctk.CTkLabel(
+                    row,
+                    text=self._history_text(job),
+                    font=ctk.CTkFont(size=11),
+                    text_color=state.colors["text"] if job.status == "done" else state.colors["text_secondary"],
+                    anchor="w",
+                    justify="left"
+                ).pack(side="left", fill="x", expand=True)
+                if job.report:
+                    ctk.CTkButton(
+                        row,
+                        text="📊 Report",
+                        width=80,
+                        height=22,
+                        command=lambda job=job: self.show_report(job),
+                        fg_color=state.colors["frame_bg"],
+                        hover_color=state.colors["card_hover"],
+                        text_color=state.colors["text"],
+                        corner_radius=6,
+                        font=ctk.CTkFont(size=11)
+                    ).pack(side="right")
+            if history:
+                self.history_label.pack(fill="x", padx=15, pady=(5, 2))
+                self.history_frame.pack(fill="x", padx=15, pady=(0, 10))
+            else:
+                self.history_label.pack_forget()
+                self.history_frame.pack_forget()
+
+        running = len(build_queue.running)
+        waiting = len(build_queue.queued)
+        self.summary_label.configure(
+            text=f"{running} running, {waiting} waiting" if build_queue.jobs else "idle"
+        )
+
+    def cancel_job(self, job_id: int):
+        """Cancel a queued or running job"""
+        print(f"[DEBUG] cancel_job called: #{job_id}")
+        self.build_queue.cancel(job_id)
+        row = self._rows.get(job_id)
+        if row is not None:
+            row["cancel"].configure(state="disabled")
+        self.refresh()
+
+    def show_report(self, job):
+        """Open the build report of a finished job"""
+        print(f"[DEBUG] show_report called: #{job.id}")
+        from gui.components.dialogs import show_build_report_dialog
+        show_build_report_dialog(self.winfo_toplevel(), job.report, job.build_settings.get("report_path"))
+
+    def clear_history(self):
+        """Forget finished jobs"""
+        self.build_queue.clear_history()
+        self.refresh()
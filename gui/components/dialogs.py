@@ -420,4 +420,76 @@ def show_wip_warning(app):
         print(f"[DEBUG] ========== WIP WARNING COMPLETE ==========\n")
     else:
         print(f"[DEBUG] Not first launch - skipping WIP warning")
-        print(f"[DEBUG] ========== WIP WARNING SKIPPED ==========\n")
\ No newline at end of file
+        print(f"[DEBUG] ========== WIP WARNING SKIPPED ==========\n")
+
+def show_build_report_dialog(app, report_data, report_path=None):
+
+    print(f"[DEBUG] show_build_report_dialog called")
+    """Show a finished build's report and how it compares with the builds before it"""
+    from core.build_report import BuildReport, load_build_reports, previous_build_report
+
+    report = BuildReport.from_dict(report_data)
+    history = load_build_reports(report_path) if report_path else []
+
+    report_window = ctk.CTkToplevel(app)
+    report_window.title(f"Build Report - {report.mod_name}")
+    report_window.geometry("760x560")
+    report_window.transient(app)
+    report_window.grab_set()
+
+    report_window.update_idletasks()
+    width = report_window.winfo_width()
+    height = report_window.winfo_height()
+    x = (report_window.winfo_screenwidth() // 2) - (width // 2)
+    y = (report_window.winfo_screenheight() // 2) - (height // 2)
+    report_window.geometry(f"{width}x{height}+{x}+{y}")
+
+    main_frame = ctk.CTkFrame(report_window, fg_color=state.colors["frame_bg"])
+    main_frame.pack(fill="both", expand=True, padx=15, pady=15)
+
+    ctk.CTkLabel(
+        main_frame,
+        text=f"📊 Build Report: {report.mod_name}",
+        font=ctk.CTkFont(size=18, weight="bold"),
+        text_color=state.colors["accent"]
+    ).pack(pady=(5, 10))
+
+    text = report.format(slowest=10)
+    previous = previous_build_report(report, history)
+    if previous is not None:
+        text += "\n\n" + report.compare(previous)
+    if len(history) > 1:
+        text += "\n\nRecent builds (newest first):"
+        for saved in reversed(history[-10:]):
+            peak = saved.memory.get("peak_rss_bytes")
+            text += (
+                f"\n  {saved.started_at}  {saved.wall_seconds:>8.2f}s  {len(saved.skins):>4} skin(s)"
+                + (f"  {peak / (1024 * 1024):>6.0f} MB" if peak else "")
+                + (f"  v{saved.app_version}" if saved.app_version else "")
+            )
+    if report_path:
+        text += f"\n\nSaved in {report_path}"
+
+    report_textbox = ctk.CTkTextbox(
+        main_frame,
+        font=ctk.CTkFont(family="Courier", size=12),
+        fg_color=state.colors["card_bg"],
+        text_color=state.colors["text"],
+        wrap="none",
+        activate_scrollbars=True
+    )
+    report_textbox.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+    report_textbox.insert("0.0", text)
+    report_textbox.configure(state="disabled")
+
+    ctk.CTkButton(
+        main_frame,
+        text="Close",
+        command=report_window.destroy,
+        fg_color=state.colors["card_bg"],
+        hover_color=state.colors["card_hover"],
+        text_color=state.colors["text"],
+        height=36,
+        corner_radius=8,
+        font=ctk.CTkFont(size=13)
+    ).pack(fill="x", padx=10, pady=(0, 5))
@@ -146,6 +146,36 @@ class Sidebar(ctk.CTkFrame):
 
         self.custom_option_sidebar = custom_option_sidebar
 
+        unpacked_option_sidebar = ctk.CTkFrame(self, fg_color=state.colors["frame_bg"], corner_radius=8, height=45)
+        unpacked_option_sidebar.pack(fill="x", padx=15, pady=(0, 5))
+        unpacked_option_sidebar.pack_propagate(False)
+
+        self.unpacked_icon_label = ctk.CTkLabel(unpacked_option_sidebar, text="", image=None)
+        self.unpacked_icon_label.pack(side="left", padx=(10, 5), pady=10)
+
+        self.unpacked_radio_sidebar = ctk.CTkRadioButton(
+            unpacked_option_sidebar,
+            text="Unpacked (fast test)",
+            variable=self.output_mode_var,
+            value="unpacked",
+            fg_color=state.colors["accent"],
+            hover_color=state.colors["accent_hover"],
+            text_color=state.colors["text"],
+            font=ctk.CTkFont(size=13, weight="bold")
+        )
+        self.unpacked_radio_sidebar.pack(side="left", padx=0, pady=10)
+
+        self.unpacked_option_sidebar = unpacked_option_sidebar
+
+        self.unpacked_hint_label = ctk.CTkLabel(
+            self,
+            text="Writes mods/unpacked/<ZIP name> as a folder.\nOnly changed files are copied.",
+            font=ctk.CTkFont(size=10),
+            text_color=state.colors["text_secondary"],
+            justify="left",
+            anchor="w"
+        )
+
         self.output_mode_var.trace_add("write", lambda *args: self._update_output_mode())
 
         self.custom_output_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -265,6 +295,11 @@ class Sidebar(ctk.CTkFrame):
         else:
             self.custom_output_frame.pack_forget()
 
+        if self.output_mode_var.get() == "unpacked":
+            self.unpacked_hint_label.pack(fill="x", padx=20, pady=(0, 5), after=self.unpacked_option_sidebar)
+        else:
+            self.unpacked_hint_label.pack_forget()
+
     def _filter_vehicles(self):
         """Filter vehicle buttons based on search"""
         search_query = self.sidebar_search_var.get()
@@ -428,6 +463,7 @@ class Sidebar(ctk.CTkFrame):
             self.steam_icon_label.configure(image=steam_icon)
         if folder_icon:
             self.custom_icon_label.configure(image=folder_icon)
+            self.unpacked_icon_label.configure(image=folder_icon)
 
 print(f"[DEBUG] Loading class: Topbar")
 
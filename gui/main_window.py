@@ -5,6 +5,7 @@ from typing import Dict, Optional
 import customtkinter as ctk
 from PIL import Image
 import os
+import sys
 
 from gui.state import state
 from gui.components.preview import HoverPreviewManager
@@ -19,6 +20,12 @@ from gui.tabs.about import AboutTab
 
 from utils.debug import setup_universal_scroll_handler
 
+try:
+    from core.build_queue import BuildQueue
+except ImportError:
+    print("[WARNING] core.build_queue not found, mod generation unavailable")
+    BuildQueue = None
+
 print(f"[DEBUG] Loading class: BeamSkinStudioApp")
 
 class BeamSkinStudioApp(ctk.CTk):
@@ -66,11 +73,24 @@ class BeamSkinStudioApp(ctk.CTk):
         self.tabs: Dict[str, ctk.CTkFrame] = {}
         self.current_tab: str = "generator"
 
+        # Generate queues builds here; they run in the background while the user keeps editing
+        self.build_queue = None
+        if BuildQueue is not None:
+            try:
+                from core.settings import get_build_queue_concurrency
+                build_queue_concurrency = get_build_queue_concurrency()
+            except ImportError:
+                build_queue_concurrency = 1
+            self.build_queue = BuildQueue(max_concurrent=build_queue_concurrency)
+
         self._setup_ui()
         self._update_output_icons()
 
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
 
+        if self.build_queue is not None:
+            self.after(100, self._poll_build_queue)
+
     def show_notification(self, message: str, type: str = "info", duration: int = 3000):
 
         print(f"[DEBUG] show_notification called")
@@ -227,7 +247,10 @@ class BeamSkinStudioApp(ctk.CTk):
 
         self.tabs["generator"] = GeneratorTab(
             self.main_container,
-            notification_callback=self.show_notification
+            notification_callback=self.show_notification,
+            on_resume_build=lambda: self._generate_mod(resume=True),
+            build_queue=self.build_queue,
+            on_queue_per_car=lambda: self._generate_mod(per_car=True)
         )
 
         self.tabs["howto"] = HowToTab(self.main_container)
@@ -299,9 +322,10 @@ class BeamSkinStudioApp(ctk.CTk):
         self.update_idletasks()
         self.after(50, lambda: setup_universal_scroll_handler(self))
 
-    def _generate_mod(self):
-        """Generate mod - calls the generator tab's method"""
-        print("[DEBUG] Generate mod button clicked")
+    def _generate_mod(self, resume=False, per_car=False):
+        """Generate mod - the generator tab validates the project and adds it to the build queue
+        (resume=True continues the last unfinished build, per_car=True queues one mod per car)"""
+        print(f"[DEBUG] {'Resume build' if resume else 'Generate mod'} button clicked")
 
         generator_tab = self.tabs.get("generator")
         if generator_tab and isinstance(generator_tab, GeneratorTab):
@@ -309,11 +333,30 @@ class BeamSkinStudioApp(ctk.CTk):
             generator_tab.generate_mod(
                 self.topbar.generate_button,
                 self.sidebar.output_mode_var,
-                self.sidebar.custom_output_var
+                self.sidebar.custom_output_var,
+                resume=resume,
+                per_car=per_car
             )
         else:
             print("[DEBUG] ERROR: Generator tab not found or wrong type")
 
+    def _poll_build_queue(self):
+        """Apply what the queued builds report, then poll again"""
+        generator_tab = self.tabs.get("generator")
+        try:
+            for job, kind, payload in self.build_queue.poll():
+                if kind == "log":
+                    sys.stdout.write(payload)
+                elif generator_tab is not None:
+                    generator_tab.on_build_event(job, kind, payload)
+            if generator_tab is not None:
+                generator_tab.refresh_build_queue()
+        except Exception as e:
+            print(f"[ERROR] Build queue poll failed: {e}")
+
+        # Quick while builds run, relaxed while idle
+        self.after(50 if self.build_queue.busy else 250, self._poll_build_queue)
+
     def _add_vehicle_to_project_from_sidebar(self, carid: str, display_name: str):
         """Add a vehicle to the project from sidebar
 
@@ -345,6 +388,13 @@ class BeamSkinStudioApp(ctk.CTk):
     def _on_closing(self):
         """Handle window closing"""
         print("[DEBUG] \nShutting down BeamSkin Studio...")
+        if self.build_queue is not None and self.build_queue.busy:
+            print(f"[DEBUG] Cancelling {len(self.build_queue.jobs)} queued build(s)")
+            self.build_queue.cancel_all()
+        generator_tab = self.tabs.get("generator")
+        if generator_tab and isinstance(generator_tab, GeneratorTab):
+            generator_tab.stop_watch()
+            generator_tab.stop_previews()
         self.destroy()
 
     def show_startup_warning(self):
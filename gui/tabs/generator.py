@@ -3,13 +3,15 @@ Generator Tab
 """
 from typing import Dict, List, Optional, Any, Callable
 import customtkinter as ctk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog
 from PIL import Image
 import threading
 import json
 import os
+import sys
 
 from gui.state import state
+from gui.components.build_queue import BuildQueuePanel
 
 try:
     from utils.file_ops import load_added_vehicles_json
@@ -19,24 +21,73 @@ except ImportError:
         return {}
 
 try:
-    from core.file_ops import generate_multi_skin_mod
+    from core.build_worker import start_build
 except ImportError:
-    print("[WARNING] generate_multi_skin_mod not found, using fallback")
-    def generate_multi_skin_mod(*args, **kwargs):
-        print(f"[DEBUG] generate_multi_skin_mod called")
-        messagebox.showerror("Error", "generate_multi_skin_mod function not available")
+    print("[WARNING] core.build_worker not found, mod generation unavailable")
+    start_build = None
+
+try:
+    from core.watch import WatchSession
+except ImportError:
+    WatchSession = None
+
+try:
+    from core.build_journal import find_resumable_build
+    from core.file_ops import sanitize_mod_name
+except ImportError:
+    find_resumable_build = None
+
+try:
+    from core.dds import read_dds_info, dds_problems, DDSError
+except ImportError:
+    read_dds_info = None
+
+try:
+    from core.texture_convert import is_source_texture, convert_texture, available as texture_conversion_available
+    from core.settings import get_texture_format, get_texture_preset, get_build_workers
+except ImportError:
+    is_source_texture = None
+
+try:
+    from core.previews import PreviewLoader
+except ImportError:
+    PreviewLoader = None
+
+try:
+    from core.thumbnail_cache import ThumbnailCache
+    from core.settings import get_thumbnail_cache_mb
+except ImportError:
+    ThumbnailCache = None
+
+try:
+    from core.build_report import build_report_path
+    from core.file_ops import sanitize_mod_name
+except ImportError:
+    build_report_path = None
+
+try:
+    from core.file_ops import SkinBuildError
+except ImportError:
+    print("[WARNING] SkinBuildError not found, using fallback")
+    class SkinBuildError(Exception):
+        errors = []
 
 print(f"[DEBUG] Loading class: GeneratorTab")
 
 class GeneratorTab(ctk.CTkFrame):
     """Complete generator tab - fully functional project creation and mod generation"""
 
-    def __init__(self, parent: ctk.CTk, notification_callback: Callable[[str, str, int], None] = None):
+    def __init__(self, parent: ctk.CTk, notification_callback: Callable[[str, str, int], None] = None,
+                 on_resume_build: Callable[[], None] = None, build_queue=None,
+                 on_queue_per_car: Callable[[], None] = None):
 
         print(f"[DEBUG] __init__ called")
         super().__init__(parent, fg_color=state.colors["app_bg"])
 
         self.show_notification = notification_callback or self._fallback_notification
+        self.on_resume_build = on_resume_build
+        self.build_queue = build_queue
+        self.on_queue_per_car = on_queue_per_car
 
         self.mod_name_entry_sidebar = None
         self.author_entry_sidebar = None
@@ -46,8 +97,25 @@ class GeneratorTab(ctk.CTkFrame):
         self.project_search_entry: Optional[ctk.CTkEntry] = None
         self.current_car_label: Optional[ctk.CTkLabel] = None
         self.dds_preview_label: Optional[ctk.CTkLabel] = None
+        self.dds_info_label: Optional[ctk.CTkLabel] = None
+        # Decodes texture previews off the UI thread and keeps them in
+        # data/cache/thumbs, see _load_dds_preview
+        self.preview_cache = None
+        if ThumbnailCache is not None:
+            self.preview_cache = ThumbnailCache(max_bytes=int(get_thumbnail_cache_mb() * 1024 * 1024))
+        self.preview_loader = PreviewLoader(cache=self.preview_cache) if PreviewLoader is not None else None
+        self._preview_request: Optional[int] = None
+        self._preview_polling = False
         self.progress_bar: Optional[ctk.CTkProgressBar] = None
         self.export_status_label: Optional[ctk.CTkLabel] = None
+        self.resume_build_button: Optional[ctk.CTkButton] = None
+        self.watch_button: Optional[ctk.CTkButton] = None
+        self.build_queue_panel: Optional[BuildQueuePanel] = None
+        self.watch_session = None
+        self.last_build_settings = None
+        # .bsproject file the project was saved to or loaded from; build
+        # reports are saved next to it
+        self.project_path: Optional[str] = None
         self.skin_name_entry: Optional[ctk.CTkEntry] = None
         self.jpg_file_entry: Optional[ctk.CTkEntry] = None
         self.config_name_entry: Optional[ctk.CTkEntry] = None
@@ -491,6 +559,16 @@ class GeneratorTab(ctk.CTkFrame):
         )
         self.dds_preview_label.pack(padx=15, pady=(5, 5))
 
+        self.dds_info_label = ctk.CTkLabel(
+            skin_card,
+            text="",
+            font=ctk.CTkFont(size=11),
+            text_color=state.colors["text_secondary"],
+            anchor="w",
+            justify="left"
+        )
+        self.dds_info_label.pack(fill="x", padx=15, pady=(0, 5))
+
         self.material_properties_container.pack(fill="x", padx=15, pady=(10, 10), before=self.dds_texture_label)
 
         skin_button_frame = ctk.CTkFrame(skin_card, fg_color="transparent")
@@ -537,6 +615,19 @@ class GeneratorTab(ctk.CTkFrame):
             progress_color=state.colors["accent"]
         )
 
+        self.resume_build_button = self._create_button(
+            self.generator_scroll, "⟲ Resume Build", self.resume_build, width=220, height=32
+        )
+
+        self.watch_button = self._create_button(
+            self.generator_scroll, "👁 Watch & Auto-Rebuild", self.toggle_watch, width=220, height=32
+        )
+
+        if self.build_queue is not None:
+            self.build_queue_panel = BuildQueuePanel(
+                self.generator_scroll, self.build_queue, on_queue_per_car=self.on_queue_per_car
+            )
+
     def _create_card(self, parent) -> ctk.CTkFrame:
         """Create a card container"""
         return ctk.CTkFrame(
@@ -715,11 +806,11 @@ class GeneratorTab(ctk.CTkFrame):
             return
 
         if not dds_path or dds_path == "No file selected...":
-            self.show_notification("Please select a DDS file", "warning")
+            self.show_notification("Please select a DDS or PNG/TGA/JPG texture", "warning")
             return
 
         if not os.path.exists(dds_path):
-            self.show_notification("DDS file does not exist", "error")
+            self.show_notification("Texture file does not exist", "error")
             return
 
         skin_data = {
@@ -789,6 +880,7 @@ class GeneratorTab(ctk.CTkFrame):
                 print(f"[DEBUG] Added material properties to skin: {len(material_properties)} materials")
 
         self.project_data["cars"][self.selected_car_for_skin]["skins"].append(skin_data)
+        self._prepare_texture(dds_path)
         print(f"[DEBUG] Added skin '{skin_name}'. Total skins: {len(self.project_data['cars'][self.selected_car_for_skin]['skins'])}")
 
         self.skin_name_var.set("")
@@ -799,12 +891,14 @@ class GeneratorTab(ctk.CTkFrame):
 
         try:
             if hasattr(self, 'dds_preview_label') and self.dds_preview_label:
+                self._cancel_dds_preview()
                 if hasattr(self.dds_preview_label, 'image'):
                     self.dds_preview_label.image = None
                 try:
                     self.dds_preview_label.configure(image=None, text="")
                 except:
                     pass
+                self._show_texture_info(None)
                 print(f"[DEBUG] DDS preview cleared")
         except Exception as e:
             print(f"[DEBUG] Error with preview (non-critical, skipping): {e}")
@@ -949,37 +1043,7 @@ class GeneratorTab(ctk.CTkFrame):
             if 'dds_path' in skin:
                 self.dds_path_var.set(skin['dds_path'])
 
-                try:
-                    img = Image.open(skin['dds_path'])
-                    img.thumbnail((800, 800), Image.Resampling.LANCZOS)
-                    photo = ctk.CTkImage(light_image=img, dark_image=img, size=img.size)
-
-                    try:
-                        self.dds_preview_label.configure(image="", text="")
-                    except:
-                        pass
-
-                    if hasattr(self.dds_preview_label, 'image'):
-                        old_image = self.dds_preview_label.image
-                        self.dds_preview_label.image = None
-                        del old_image
-
-                    self.dds_preview_label.image = photo
-                    self.dds_preview_label.configure(image=photo)
-
-                    self.dds_preview_label.update_idletasks()
-
-                    print(f"[DEBUG] Loaded DDS preview for editing: {skin['dds_path']}")
-                except Exception as e:
-                    print(f"[DEBUG] Could not load DDS preview: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    try:
-                        self.dds_preview_label.configure(image="", text="Preview unavailable")
-                        if hasattr(self.dds_preview_label, 'image'):
-                            self.dds_preview_label.image = None
-                    except:
-                        pass
+                self._load_dds_preview(skin['dds_path'])
         except Exception as e:
             print(f"[DEBUG] Error setting DDS path: {e}")
 
@@ -1156,6 +1220,7 @@ class GeneratorTab(ctk.CTkFrame):
 
         skin['name'] = skin_name
         skin['dds_path'] = dds_path
+        self._prepare_texture(dds_path)
 
         if self.add_config_data_var.get():
             config_name = self.get_real_value(self.config_name_entry, "Enter configuration name...").strip()
@@ -1279,9 +1344,11 @@ class GeneratorTab(ctk.CTkFrame):
         try:
 
             self.dds_path_var.set("")
+            self._cancel_dds_preview()
             if self.dds_preview_label:
                 self.dds_preview_label.image = None
                 self.dds_preview_label.configure(image=None, text="No DDS selected")
+            self._show_texture_info(None)
         except Exception as e:
             print(f"[DEBUG] Error resetting DDS: {e}")
 
@@ -1368,38 +1435,152 @@ class GeneratorTab(ctk.CTkFrame):
         """Browse for DDS file"""
         filename = filedialog.askopenfilename(
             title="Select DDS Texture",
-            filetypes=[("DDS files", "*.dds"), ("All files", "*.*")]
+            filetypes=[
+                ("DDS files", "*.dds"),
+                ("Images (converted to DDS)", "*.png *.tga *.jpg *.jpeg"),
+                ("All files", "*.*"),
+            ]
         )
 
         if filename:
             self.dds_path_var.set(filename)
 
+            self._load_dds_preview(filename)
+
+    def _load_dds_preview(self, path: str):
+        """Show a texture's preview. A small mip is shown right away and then
+        a sharp one; both are decoded off the UI thread (see core/previews.py)"""
+        if not self._show_texture_info(path):
+            self._cancel_dds_preview()
+            self._set_dds_preview(None, text="Preview unavailable")
+            return
+
+        if self.preview_loader is None:
             try:
-                img = Image.open(filename)
+                img = Image.open(path)
                 img.thumbnail((800, 800), Image.Resampling.LANCZOS)
-                photo = ctk.CTkImage(light_image=img, dark_image=img, size=img.size)
+                self._set_dds_preview(img, img.size)
+            except Exception as e:
+                print(f"[DEBUG] Could not load DDS preview: {e}")
+                self._set_dds_preview(None, text="Preview unavailable")
+            return
 
-                try:
-                    self.dds_preview_label.configure(image=None, text="")
-                except:
-                    pass
+        self._set_dds_preview(None, text="Loading preview...")
+        self._preview_request = self.preview_loader.request(path)
+        if not self._preview_polling:
+            # Cached previews are ready right away
+            self._preview_polling = True
+            self._poll_dds_preview()
+
+    def _poll_dds_preview(self):
+        """Show the preview stages decoded since the last poll"""
+        if self._preview_request is None:
+            self._preview_polling = False
+            return
+        for request_id, stage, img, size in self.preview_loader.poll():
+            if request_id != self._preview_request:
+                continue
+            if stage == "error":
+                print(f"[DEBUG] Could not load DDS preview: {img}")
+                self._set_dds_preview(None, text="Preview unavailable")
+            else:
+                self._set_dds_preview(img, size)
+                print(f"[DEBUG] DDS preview {stage} stage shown ({img.size[0]}x{img.size[1]})")
+        if self.preview_loader.busy:
+            self.after(30, self._poll_dds_preview)
+        else:
+            self._preview_request = None
+            self._preview_polling = False
+
+    def _cancel_dds_preview(self):
+        """Drop the preview still being decoded, if any"""
+        if self.preview_loader is not None and self._preview_request is not None:
+            self.preview_loader.cancel()
+        self._preview_request = None
+
+    def stop_previews(self):
+        """Drop the preview being decoded and trim the thumbnail cache (on shutdown)"""
+        self._cancel_dds_preview()
+        if self.preview_cache is not None:
+            print(f"[DEBUG] Thumbnail cache: {self.preview_cache.describe()}")
+            self.preview_cache.maintain()
+
+    def _set_dds_preview(self, img, size=None, text: str = ""):
+        """Put an image (scaled to size) or a text in the preview label"""
+        if not self.dds_preview_label:
+            return
+        try:
+            if img is None:
+                self.dds_preview_label.image = None
+                self.dds_preview_label.configure(image="", text=text)
+                return
+            photo = ctk.CTkImage(light_image=img, dark_image=img, size=size or img.size)
+            self.dds_preview_label.image = photo
+            self.dds_preview_label.configure(image=photo, text="")
+        except Exception as e:
+            print(f"[DEBUG] Error with preview (non-critical, skipping): {e}")
 
-                self.dds_preview_label.image = photo
+    def _show_texture_info(self, path: Optional[str]) -> bool:
+        """Show what a texture's header says (size, format, mipmaps, problems) without decoding it.
+        Returns False if the file is not a readable DDS texture"""
+        if self.dds_info_label is None or read_dds_info is None:
+            return True
+        if not path:
+            self.dds_info_label.configure(text="")
+            return True
+        if is_source_texture is not None and is_source_texture(path):
+            return self._show_source_texture_info(path)
 
-                try:
-                    self.dds_preview_label.configure(image=photo)
-                except:
-                    pass
+        try:
+            info = read_dds_info(path)
+        except (OSError, DDSError) as e:
+            print(f"[DEBUG] Texture header unreadable: {e}")
+            self.dds_info_label.configure(text=f"⚠ {e}")
+            return False
+
+        lines = [info.describe()]
+        problems = dds_problems(info)
+        lines.extend(f"⚠ {message}" for _, message in problems)
+        self.dds_info_label.configure(text="\n".join(lines))
+        print(f"[DEBUG] Texture header: {info.describe()}")
+        return not any(severity == "error" for severity, _ in problems)
+
+    def _show_source_texture_info(self, path: str) -> bool:
+        """Show a PNG/TGA/JPG texture's size and the DDS format the build converts it to.
+        Returns False if the image cannot be read"""
+        try:
+            with Image.open(path) as img:
+                width, height = img.size
+                description = f"{img.format} {width}x{height} {img.mode}"
+        except Exception as e:
+            print(f"[DEBUG] Image unreadable: {e}")
+            self.dds_info_label.configure(text=f"⚠ {e}")
+            return False
+
+        texture_format = get_texture_format()
+        target = "BC1/BC3 (by alpha)" if texture_format == "auto" else texture_format
+        lines = [f"{description}, converted to {target} DDS with mipmaps when built"]
+        if not texture_conversion_available():
+            lines.append("⚠ Converting images needs NumPy (pip install numpy)")
+        if width % 4 or height % 4:
+            lines.append("⚠ Block-compressed textures need sizes in multiples of 4")
+        self.dds_info_label.configure(text="\n".join(lines))
+        print(f"[DEBUG] Source texture: {lines[0]}")
+        return True
+
+    def _prepare_texture(self, path: str):
+        """Convert a PNG/TGA/JPG texture in the background, so the build finds it in the cache"""
+        if is_source_texture is None or not is_source_texture(path) or not texture_conversion_available():
+            return
 
-                print(f"[DEBUG] DDS preview loaded: {filename}")
+        def convert():
+            try:
+                convert_texture(path, get_texture_format(), get_texture_preset(), workers=get_build_workers())
             except Exception as e:
-                print(f"[DEBUG] Could not load DDS preview: {e}")
-                try:
-                    if hasattr(self, 'dds_preview_label') and self.dds_preview_label:
-                        self.dds_preview_label.image = None
-                        self.dds_preview_label.configure(text="Preview unavailable")
-                except:
-                    pass
+                # The build reports it again, with the skin it belongs to
+                print(f"[DEBUG] Background texture conversion failed: {e}")
+
+        threading.Thread(target=convert, name="BeamSkinTextureConvert", daemon=True).start()
 
     def _toggle_config_data(self):
         """Toggle visibility of config data section"""
@@ -1971,6 +2152,128 @@ class GeneratorTab(ctk.CTkFrame):
                     else:
                         print(f"[DEBUG] Entry {entry_key} not found for {material_name}")
 
+    def resume_build(self):
+        """Resume the last unfinished build of this mod"""
+        print(f"[DEBUG] resume_build called")
+        if self.on_resume_build is None:
+            return
+        self.on_resume_build()
+
+    def toggle_watch(self):
+        """Start or stop rebuilding the mod whenever a texture or config file changes"""
+        print(f"[DEBUG] toggle_watch called")
+        if self.watch_session is not None and not self.watch_session.stopped:
+            self.stop_watch()
+        else:
+            self.start_watch()
+
+    def start_watch(self):
+        """Watch the project's files and rebuild with the settings of the last build"""
+        if WatchSession is None or start_build is None:
+            self.show_notification("Watch mode is not available", "error")
+            return
+        if self.last_build_settings is None:
+            self.show_notification("Generate the mod once, then watch it for changes", "info")
+            return
+        if self.watch_session is not None:
+            return
+        if self.build_queue is not None and self.build_queue.busy:
+            self.show_notification("Wait for the queued builds to finish, then start watching", "info")
+            return
+
+        try:
+            from core.settings import get_watch_debounce, get_watch_max_concurrent
+            debounce = get_watch_debounce()
+            max_concurrent = get_watch_max_concurrent()
+        except ImportError:
+            debounce = 1.0
+            max_concurrent = 1
+
+        # Rebuilds update the existing mod and only render the skins that changed
+        build_settings = dict(self.last_build_settings, incremental=True, update_existing=True, resume=False)
+        use_process = build_settings.pop("use_process")
+
+        def start_rebuild(project_data):
+            return start_build(project_data, use_process=use_process, **build_settings)
+
+        session = WatchSession(self.project_data, start_rebuild, debounce=debounce, max_concurrent=max_concurrent)
+        self.watch_session = session
+        self.watch_button.configure(text="⏹ Stop Watching")
+        self.export_status_label.configure(text="Watching for changes...")
+        self.export_status_label.pack(padx=20, pady=(10, 5))
+        self.show_notification("Watching textures and config files, the mod is rebuilt when they change", "info", 4000)
+
+        def poll_watch():
+
+            if self.watch_session is not session:
+                return
+
+            latest_progress = None
+            for kind, payload in session.poll():
+                if kind == "progress":
+                    latest_progress = payload
+                elif kind == "log":
+                    sys.stdout.write(payload)
+                elif kind == "rebuilding":
+                    self.progress_bar.pack(fill="x", padx=20, pady=(0, 5))
+                    self.progress_bar.set(0)
+                    self.export_status_label.configure(text=f"Rebuilding {len(payload['skins'])} changed skin(s)...")
+                elif kind == "rebuilt":
+                    self.progress_bar.pack_forget()
+                    if payload["status"] == "done":
+                        self.export_status_label.configure(
+                            text=f"✓ Rebuilt in {payload['latency_seconds']:.1f}s after the change\n"
+                                 f"{session.latency_summary()}"
+                        )
+                    elif payload["status"] == "error":
+                        self.export_status_label.configure(text="Rebuild failed, still watching")
+                        self.show_notification(f"Rebuild failed: {payload['error']}", "error", 5000)
+
+            if latest_progress is not None and self.progress_bar.winfo_ismapped():
+                self.progress_bar.set(latest_progress.fraction)
+
+            if not session.stopped or session.busy:
+                self.after(100, poll_watch)
+            elif self.watch_session is session:
+                self.watch_session = None
+                self.progress_bar.pack_forget()
+                self.export_status_label.configure(text=f"Stopped watching ({session.latency_summary()})")
+                self.after(3000, lambda: self.export_status_label.pack_forget())
+
+        self.after(100, poll_watch)
+
+    def stop_watch(self):
+        """Stop watch mode; a rebuild that is running is cancelled"""
+        if self.watch_session is None or self.watch_session.stopped:
+            return
+        print(f"[DEBUG] Stopping watch mode: {self.watch_session.latency_summary()}")
+        self.watch_session.stop()
+        self.watch_button.configure(text="👁 Watch & Auto-Rebuild")
+
+    def refresh_resume_button(self):
+        """Show "Resume Build" while the project's mod has a failed, cancelled or interrupted build"""
+        if self.resume_build_button is None:
+            return
+
+        resumable = None
+        idle = self.build_queue is None or not self.build_queue.busy
+        if idle and find_resumable_build is not None and self.on_resume_build is not None:
+            mod_name = self.project_data.get("mod_name", "")
+            if self.mod_name_entry_sidebar:
+                mod_name = self.get_real_value(self.mod_name_entry_sidebar, "Enter mod name...").strip() or mod_name
+            resumable = find_resumable_build(sanitize_mod_name(mod_name))
+
+        if resumable is None:
+            self.resume_build_button.pack_forget()
+            return
+
+        print(f"[DEBUG] Resumable build found: {resumable['status']}, "
+              f"{len(resumable['skins'])}/{resumable['skin_count']} skins done")
+        self.resume_build_button.configure(
+            text=f"⟲ Resume Build ({len(resumable['skins'])}/{resumable['skin_count']} skins done)"
+        )
+        self.resume_build_button.pack(pady=(5, 10))
+
     def save_project(self):
 
         print(f"[DEBUG] save_project called")
@@ -2001,6 +2304,7 @@ class GeneratorTab(ctk.CTkFrame):
             try:
                 with open(filename, 'w') as f:
                     json.dump(self.project_data, f, indent=2)
+                self.project_path = filename
                 print(f"[DEBUG] Project saved to: {filename}")
                 self.show_notification("Project saved successfully", "success")
             except Exception as e:
@@ -2026,6 +2330,7 @@ class GeneratorTab(ctk.CTkFrame):
                     return
 
                 self.project_data = loaded_data
+                self.project_path = filename
                 self.selected_car_for_skin = None
 
                 self.editing_mode = False
@@ -2056,6 +2361,10 @@ class GeneratorTab(ctk.CTkFrame):
                 self.show_notification(f"Loaded project with {len(loaded_data['cars'])} cars", "success")
 
                 self.refresh_project_display()
+                self.refresh_resume_button()
+                self.stop_watch()
+                self.last_build_settings = None
+                self.watch_button.pack_forget()
 
             except Exception as e:
                 print(f"[DEBUG] Error loading project: {e}")
@@ -2080,6 +2389,7 @@ class GeneratorTab(ctk.CTkFrame):
         if confirmed:
 
             self.project_data["cars"] = {}
+            self.project_path = None
             self.selected_car_for_skin = None
 
             self.editing_mode = False
@@ -2109,6 +2419,10 @@ class GeneratorTab(ctk.CTkFrame):
 
             self.show_notification("Project cleared", "info")
             self.refresh_project_display()
+            self.refresh_resume_button()
+            self.stop_watch()
+            self.last_build_settings = None
+            self.watch_button.pack_forget()
 
     def refresh_project_display(self):
 
@@ -2361,14 +2675,22 @@ class GeneratorTab(ctk.CTkFrame):
 
         pass
 
-    def generate_mod(self, generate_button_topbar, output_mode_var, custom_output_var):
+    def generate_mod(self, generate_button_topbar, output_mode_var, custom_output_var, resume=False, per_car=False):
 
         print(f"[DEBUG] generate_mod called")
-        """Generate the mod with all cars and skins"""
+        """Queue a build of the mod with all cars and skins (resume=True continues the last
+        unfinished build, per_car=True queues one mod per car). The Generate button stays
+        enabled: builds run in the background queue"""
         print("[DEBUG] \n" + "="*50)
         print("[DEBUG] MULTI-SKIN MOD GENERATION INITIATED")
         print("[DEBUG] ="*50)
 
+        if self.watch_session is not None:
+            # A manual build replaces watch mode; it never races a rebuild
+            self.stop_watch()
+            self.show_notification("Stopped watching to build the mod, click Generate again", "info", 3000)
+            return
+
         mod_name = ""
         author_name = ""
         if self.mod_name_entry_sidebar:
@@ -2427,7 +2749,7 @@ class GeneratorTab(ctk.CTkFrame):
                 self.show_notification("Please select a custom output location", "error")
                 return
             print(f"[DEBUG] Output mode: Custom - {output_path}")
-        elif output_mode == "steam":
+        elif output_mode in ("steam", "unpacked"):
 
             try:
                 from core.settings import get_mods_folder_path
@@ -2441,7 +2763,12 @@ class GeneratorTab(ctk.CTkFrame):
                     self.show_notification(f"Mods folder does not exist: {output_path}", "error", 4000)
                     return
 
-                print(f"[DEBUG] Output mode: Steam - {output_path}")
+                if output_mode == "unpacked":
+                    # BeamNG loads plain mod folders from mods/unpacked
+                    output_path = os.path.join(output_path, "unpacked")
+                    print(f"[DEBUG] Output mode: Unpacked - {output_path}")
+                else:
+                    print(f"[DEBUG] Output mode: Steam - {output_path}")
             except ImportError:
                 self.show_notification("Could not load settings. Please configure mods folder path.", "error", 4000)
                 return
@@ -2450,81 +2777,228 @@ class GeneratorTab(ctk.CTkFrame):
             output_path = None
             print(f"[DEBUG] Output mode: Default/Unknown")
 
+        output_format = "folder" if output_mode == "unpacked" else "zip"
+
         self.project_data["mod_name"] = mod_name
         self.project_data["author"] = author_name if author_name else "Unknown"
 
-        print(f"[DEBUG] Mod Name: {mod_name}")
-        print(f"[DEBUG] Author: {self.project_data['author']}")
-        print(f"[DEBUG] Cars: {len(self.project_data['cars'])}")
-        total_skins = sum(len(car_info['skins']) for car_info in self.project_data['cars'].values())
-        print(f"[DEBUG] Total Skins: {total_skins}")
-
-        self.export_status_label.configure(text="Preparing to export...")
-        self.export_status_label.pack(padx=20, pady=(10, 5))
-        self.progress_bar.pack(fill="x", padx=20, pady=(0, 5))
-        self.progress_bar.set(0)
-        generate_button_topbar.configure(state="disabled")
+        if self.build_queue is None:
+            self.show_notification("Error: the build queue is not available, cannot build", "error", 5000)
+            return
 
-        def update_status(message):
+        if per_car:
+            from core.build_queue import split_project_by_car
+            projects = [project for _, project in split_project_by_car(self.project_data)]
+        else:
+            projects = [self.project_data]
 
-            print(f"[DEBUG] update_status called")
-            self.export_status_label.configure(text=message)
+        try:
+            from core.settings import (
+                get_build_workers, get_build_use_processes, get_build_mode,
+                get_build_incremental, get_compression_rules, get_build_in_process,
+                get_build_journal, get_build_reproducible, get_build_shard_size_mb,
+                get_texture_format, get_texture_preset
+            )
+            build_workers = get_build_workers()
+            build_use_processes = get_build_use_processes()
+            build_mode = get_build_mode()
+            build_incremental = get_build_incremental()
+            compression_rules = get_compression_rules()
+            build_in_process = get_build_in_process()
+            build_journal = get_build_journal()
+            build_reproducible = get_build_reproducible()
+            shard_size = int(get_build_shard_size_mb() * 1024 * 1024) or None
+            texture_format = get_texture_format()
+            texture_preset = get_texture_preset()
+        except ImportError:
+            build_workers = 1
+            build_use_processes = False
+            build_mode = "stream"
+            build_incremental = False
+            compression_rules = None
+            build_in_process = True
+            build_journal = True
+            build_reproducible = False
+            shard_size = None
+            texture_format = "auto"
+            texture_preset = "balanced"
+        print(f"[DEBUG] Build workers: {build_workers} ({'processes' if build_use_processes else 'threads'})")
+        print(f"[DEBUG] Build mode: {build_mode}{' (incremental)' if build_incremental else ''}")
+
+        build_settings = dict(
+            use_process=build_in_process,
+            output_path=output_path,
+            workers=build_workers,
+            use_processes=build_use_processes,
+            build_mode=build_mode,
+            incremental=build_incremental,
+            update_existing=False,
+            compression_rules=compression_rules,
+            journal=build_journal,
+            resume=resume,
+            reproducible=build_reproducible,
+            output_format=output_format,
+            shard_size=shard_size,
+            texture_format=texture_format,
+            texture_preset=texture_preset
+        )
 
-        def update_progress(value):
+        # Pre-flight: plan every build (no files written) and stop on any problem
+        existing_zips = []
+        for project in projects:
+            try:
+                from core.build_plan import plan_build
+                preflight = plan_build(project, output_path, update_existing=True,
+                                       output_format=output_format, shard_size=shard_size)
+            except ImportError:
+                preflight = None
 
-            print(f"[DEBUG] update_progress called")
-            if self.progress_bar.winfo_ismapped():
-                self.progress_bar.set(value)
+            if preflight is None:
+                continue
+            print(f"[DEBUG] {preflight.summary()}")
+            if not preflight.ok:
+                lines = []
+                for problem in preflight.errors[:5]:
+                    where = problem["skin_name"] or problem["car_instance_id"]
+                    lines.append(f"'{where}': {problem['message']}" if where else problem["message"])
+                error_msg = f"Cannot build {preflight.mod_name}:\n" + "\n".join(lines)
+                if len(preflight.errors) > 5:
+                    error_msg += f"\n... and {len(preflight.errors) - 5} more"
+                self.show_notification(error_msg, "error", 6000)
+                return
 
-        def thread_fn():
+            # An existing unpacked folder is simply synced, and a mod that an
+            # earlier queued job writes is updated without asking again
+            if (preflight.zip_exists and output_format != "folder"
+                    and not self.build_queue.writes(project, build_settings)):
+                existing_zips.append(preflight.zip_path)
+
+        # Offer to update existing mods instead of failing with FileExistsError
+        if existing_zips:
+            from gui.confirmation_dialog import askyesno
+            if len(existing_zips) == 1:
+                message = (
+                    f"'{os.path.basename(existing_zips[0])}' already exists.\n\n"
+                    f"Update it? Unchanged files are reused from the existing ZIP, "
+                    f"which is only replaced once the new one is complete."
+                )
+            else:
+                message = (
+                    f"{len(existing_zips)} of these {len(projects)} mods already exist.\n\n"
+                    f"Update them? Unchanged files are reused from the existing ZIPs, "
+                    f"which are only replaced once the new ones are complete."
+                )
+            if not askyesno(
+                self.winfo_toplevel(),
+                "Mod Already Exists",
+                message,
+                state.colors,
+                icon="📦",
+                danger=False
+            ):
+                print(f"[DEBUG] User declined to update existing mod(s): {existing_zips}")
+                return
+            print(f"[DEBUG] Updating existing mod(s): {existing_zips}")
 
-            print(f"[DEBUG] thread_fn called")
-            try:
-                print("[DEBUG] \nStarting mod generation thread...")
-                update_status("Processing skins...")
+        print(f"[DEBUG] Mod Name: {mod_name}")
+        print(f"[DEBUG] Author: {self.project_data['author']}")
+        print(f"[DEBUG] Cars: {len(self.project_data['cars'])}")
+        total_skins = sum(len(car_info['skins']) for car_info in self.project_data['cars'].values())
+        print(f"[DEBUG] Total Skins: {total_skins}")
 
-                def progress_with_status(value):
+        # Each job builds a snapshot of its project in the background, so the
+        # project can be edited (and the next mod queued) right away
+        for project in projects:
+            update_existing = bool(existing_zips) or self.build_queue.writes(project, build_settings)
+            report_path = None
+            if build_report_path is not None:
+                report_path = build_report_path(self.project_path, sanitize_mod_name(project["mod_name"]))
+            self.build_queue.enqueue(project, dict(build_settings, update_existing=update_existing,
+                                                   report_path=report_path))
+
+        if per_car:
+            self.show_notification(f"Queued {len(projects)} mods, one per car", "info", 3000)
+        else:
+            waiting = len(self.build_queue.jobs) - 1
+            self.show_notification(
+                f"{'Resuming' if resume else 'Building'} '{mod_name}'"
+                + (f" after {waiting} queued build(s)" if waiting else "")
+                + ", you can keep editing",
+                "info", 3000
+            )
+        self.resume_build_button.pack_forget()
+        self.refresh_build_queue()
 
-                    print(f"[DEBUG] progress_with_status called")
-                    update_progress(value)
-                    if value < 0.3:
-                        update_status("Copying template files...")
-                    elif value < 0.7:
-                        update_status(f"Processing {total_skins} skins...")
-                    else:
-                        update_status("Creating ZIP archive...")
+    def on_build_event(self, job, kind, payload):
+        """Handle what a queued build reports (called by the app's queue poll)"""
+        if kind not in ("done", "cancelled", "error"):
+            return
 
-                if generate_multi_skin_mod:
-                    generate_multi_skin_mod(
-                        self.project_data,
-                        output_path=output_path,
-                        progress_callback=progress_with_status
+        # Watch mode rebuilds with the settings of the last build of this project
+        own_project = job.project_data.get("mod_name") == self.project_data.get("mod_name")
+        try:
+            if kind == "done":
+                print(f"[DEBUG] Mod generation completed successfully: {job.result}")
+                print("[DEBUG] ="*50 + "\n")
+                if own_project:
+                    self.last_build_settings = dict(job.build_settings, resume=False)
+                if job.build_settings.get("output_format") == "folder":
+                    self.show_notification(f"✓ Unpacked mod '{job.label}' synced ({job.skin_count} skins)", "success", 5000)
+                elif job.result and job.result.endswith(".shards.json"):
+                    from core.sharding import read_shard_manifest
+                    manifest = read_shard_manifest(job.result) or {"shards": []}
+                    self.show_notification(
+                        f"✓ Mod '{job.label}' created with {job.skin_count} skins "
+                        f"in {len(manifest['shards'])} ZIPs!", "success", 5000
                     )
-
-                    update_status("Export completed successfully!")
-                    print("[DEBUG] Mod generation completed successfully!")
-                    print("[DEBUG] ="*50 + "\n")
-                    self.show_notification(f"✓ Mod '{mod_name}' created with {total_skins} skins!", "success", 5000)
-
-                    self.after(2000, lambda: self.show_notification("Project kept. Click 'Clear Project' to start new one.", "info", 4000))
                 else:
-                    update_status("Error: Generation function not available")
-                    self.show_notification("Error: generate_multi_skin_mod function not found", "error", 5000)
-
-            except FileExistsError as e:
-                update_status("Error: File already exists")
-                print(f"[DEBUG] ERROR: File already exists - {e}")
-                self.show_notification(f"File already exists: {str(e)}", "error", 5000)
-            except Exception as e:
-                update_status("Error: Export failed")
-                print(f"[DEBUG] ERROR: {e}")
-                import traceback
-                traceback.print_exc()
-                self.show_notification(f"Error: {str(e)}", "error", 5000)
-            finally:
-                self.progress_bar.set(0)
-                generate_button_topbar.configure(state="normal")
-                self.after(2000, lambda: self.progress_bar.pack_forget())
-                self.after(2000, lambda: self.export_status_label.pack_forget())
-
-        threading.Thread(target=thread_fn, daemon=True).start()
\ No newline at end of file
+                    self.show_notification(f"✓ Mod '{job.label}' created with {job.skin_count} skins!", "success", 5000)
+            elif kind == "cancelled":
+                # Cancel-to-idle latency: from the click until the build has cleaned up
+                latency = job.cancel_latency
+                print(f"[DEBUG] Build cancelled, idle after {latency * 1000:.0f} ms" if latency is not None
+                      else "[DEBUG] Build cancelled")
+                # A cancelled sync keeps the files it already wrote; a ZIP build
+                # removes its partial archive
+                if job.build_settings.get("output_format") == "folder":
+                    outcome = "unpacked folder partly updated"
+                else:
+                    outcome = "nothing was written"
+                self.show_notification(
+                    f"Build of '{job.label}' cancelled, {outcome}"
+                    + (f" (stopped in {latency:.2f}s)" if latency is not None else ""),
+                    "info", 4000
+                )
+            else:
+                raise job.exception()
+
+        except SkinBuildError as e:
+            print(f"[DEBUG] ERROR: {e}")
+            first_car, first_skin, first_error = e.errors[0]
+            self.show_notification(
+                f"'{job.label}': {len(e.errors)} skin(s) failed to build. "
+                f"First: '{first_skin}' ({first_car}): {first_error}",
+                "error", 6000
+            )
+        except FileExistsError as e:
+            print(f"[DEBUG] ERROR: File already exists - {e}")
+            self.show_notification(f"File already exists: {str(e)}", "error", 5000)
+        except Exception as e:
+            # The build's traceback has already arrived as log output
+            print(f"[DEBUG] ERROR: {e}")
+            self.show_notification(f"Error building '{job.label}': {str(e)}", "error", 5000)
+        finally:
+            self.refresh_resume_button()
+            if self.last_build_settings is not None and WatchSession is not None:
+                self.watch_button.pack(pady=(5, 10))
+
+    def refresh_build_queue(self):
+        """Show the queue panel while there are queued jobs or history"""
+        if self.build_queue_panel is None:
+            return
+        if self.build_queue.jobs or self.build_queue.history:
+            if not self.build_queue_panel.winfo_ismapped():
+                self.build_queue_panel.pack(fill="x", padx=20, pady=(10, 10))
+            self.build_queue_panel.refresh()
+        elif self.build_queue_panel.winfo_ismapped():
+            self.build_queue_panel.pack_forget()
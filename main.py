@@ -33,6 +33,10 @@ def center_window(window):
 
 if __name__ == "__main__":
 
+    # Needed for parallel builds with worker processes in the frozen (PyInstaller) app
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     try:
         from utils.single_instance import check_single_instance, release_global_lock
         import atexit
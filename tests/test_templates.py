@@ -0,0 +1,131 @@
+"""
+Golden tests for compiled SKINNAME templates (core/templates.py)
+
+Every bundled template file is rendered with CompiledTemplate.render and with
+the original regex pipeline, for values that take the compiled fast path and
+for values that must fall back to the regex pipeline. The output has to be
+byte-identical.
+
+Run with `python -m pytest tests` from the repository root.
+"""
+import os
+
+import pytest
+
+from core.file_ops import sanitize_folder_name
+from core.templates import _render_with_regex, compile_template
+
+VEHICLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vehicles")
+
+# (skin name, DDS file name stem after the car id, author, config type, config name)
+PLAIN_VALUES = [
+    ("Red", "Red", "Tester", "Factory", "Red Paint"),
+    ("Race Livery 2", "RaceLivery2", "Some Author", "Custom", "Race 2"),
+    ("x", "x", "A", "Police", "Unit-7"),
+]
+
+# Values the regex passes look at themselves (quotes, backslashes, "carid",
+# "SKINNAME", ".skin", dots, non-ASCII), so the compiled template must fall back
+FALLBACK_VALUES = [
+    ('Quote "Skin"', "Quote", 'Au"thor', "Factory", 'Say "hi"'),
+    ("carid SKINNAME", "carid", "SKINNAME", "carid", "SKINNAME"),
+    ("Back\\slash", "slash", "C:\\Users", "Custom", "a\\b"),
+    ("Dotted.skin", "v1.2", "extra.skin", "Factory", "name.skin"),
+    ("Ünïcode Ski", "Ünï", "Zoë", "Custom", "Ünïcode"),
+    ("", "", "", "", ""),
+]
+
+
+def _template_files():
+    """
+    (car id, kind, path) of every bundled template file: the files in each
+    vehicle's SKINNAME folders (some vehicles spell it in lower case or have
+    variants such as skinnameambulance) and its info_SKINNAME*.json files
+    """
+    files = []
+    for carid in sorted(os.listdir(VEHICLES_DIR)):
+        car_dir = os.path.join(VEHICLES_DIR, carid)
+        if not os.path.isdir(car_dir):
+            continue
+        for entry in sorted(os.listdir(car_dir)):
+            path = os.path.join(car_dir, entry)
+            lowered = entry.lower()
+            if os.path.isdir(path) and lowered.startswith("skinname"):
+                for root, dirs, names in os.walk(path):
+                    dirs.sort()
+                    for name in sorted(names):
+                        if name.endswith(".jbeam"):
+                            files.append((carid, "jbeam", os.path.join(root, name)))
+                        elif name.endswith(".json") and not name.startswith("info"):
+                            files.append((carid, "json", os.path.join(root, name)))
+            elif lowered.startswith("info_skinname") and lowered.endswith(".json"):
+                files.append((carid, "info", path))
+    return files
+
+
+TEMPLATE_FILES = _template_files()
+
+
+def _values(carid, skin_name, dds_stem, author, config_type, config_name):
+    """Slot values as the build computes them for one skin"""
+    dds_filename = f"{carid}_skin_{dds_stem}.dds"
+    return {
+        "dds_identifier": os.path.splitext(dds_filename)[0].split("_")[-1],
+        "skin_display_name": skin_name,
+        "author": author,
+        "vehicle_id": carid,
+        "skin_folder_name": sanitize_folder_name(skin_name),
+        "dds_filename": dds_filename,
+        "config_type": config_type,
+        "config_name": config_name,
+    }
+
+
+def _read(path):
+    # Text mode, like TemplateCache and the staged build
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _outcome(render, *args):
+    """
+    ("text", output) or ("error", exception type). The regex pipeline
+    rejects some values (a backslash followed by a letter is a bad escape in
+    its replacement strings); the compiled template must fail the same way.
+    """
+    try:
+        return "text", render(*args)
+    except Exception as e:
+        return "error", type(e)
+
+
+def test_every_vehicle_has_templates():
+    vehicles = {carid for carid, _, _ in TEMPLATE_FILES}
+    bundled = {name for name in os.listdir(VEHICLES_DIR) if os.path.isdir(os.path.join(VEHICLES_DIR, name))}
+    assert vehicles == bundled
+    assert {kind for _, kind, _ in TEMPLATE_FILES} == {"jbeam", "json", "info"}
+
+
+@pytest.mark.parametrize("carid,kind,path", TEMPLATE_FILES,
+                         ids=[os.path.relpath(path, VEHICLES_DIR) for _, _, path in TEMPLATE_FILES])
+def test_compiled_render_matches_regex_pipeline(carid, kind, path):
+    source_text = _read(path)
+    compiled = compile_template(kind, source_text, file_label=path)
+
+    for skin_values in PLAIN_VALUES + FALLBACK_VALUES:
+        values = _values(carid, *skin_values)
+        expected = _outcome(_render_with_regex, kind, source_text, values, path)
+        assert _outcome(lambda: compiled.render(**values)) == expected, f"{path} differs for {skin_values!r}"
+
+
+def test_plain_values_take_the_fast_path():
+    fast = 0
+    for carid, kind, path in TEMPLATE_FILES:
+        compiled = compile_template(kind, _read(path), file_label=path)
+        if not compiled.fast_path:
+            continue
+        fast += 1
+        for skin_values in PLAIN_VALUES:
+            assert compiled.can_render_fast(_values(carid, *skin_values)), f"{path}: {skin_values!r}"
+    # The equivalence tests above must cover the compiled slots, not only the fallback
+    assert fast > len(TEMPLATE_FILES) // 2